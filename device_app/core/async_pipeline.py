@@ -0,0 +1,302 @@
+# device_app/core/async_pipeline.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from device_app.core.jobs import UtteranceJob
+from device_app.core.model_server import WorkerCrashed
+from device_app.core.modes import Mode
+from device_app.core.pipeline import TranslatorPipeline
+from device_app.core.state import InvalidTransition, State
+from device_app.hardware.buttons import ButtonEvent
+from device_app.utils.deadline import StageTimeout
+from device_app.utils.log import get_logger
+
+_log = get_logger("pipeline")
+
+
+class AsyncTranslatorPipeline(TranslatorPipeline):
+    """
+    Core asyncio cho thiết bị, dựa trên FSM `State`.
+
+    - Trạng thái đổi qua `_transition()` theo bảng TRANSITIONS (không còn
+      gán chuỗi tự do); `self.state` vẫn giữ tên để code cũ / display dùng
+    - Nút bấm là nguồn event async (thread đọc driver → asyncio.Queue)
+    - STT / NMT / TTS (blocking) chạy trong executor riêng, event loop
+      luôn rảnh để nhận nút + cập nhật màn hình
+    - Power tick là timer asyncio, không còn time.sleep(0.02)
+    - Đo độ trễ event loop (loop_lag_ms / loop_lag_max_ms)
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        core_cfg = (self.config.get("PIPELINE") or {}).get("ASYNC") or {}
+        self.lag_interval_sec = float(core_cfg.get("LAG_INTERVAL_SEC", 1.0))
+
+        self.fsm: State = State.READY
+        self.loop_lag_ms = 0.0
+        self.loop_lag_max_ms = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_evt: Optional[asyncio.Event] = None
+        self._flow: Optional[asyncio.Task] = None
+        # 1 worker: các model dùng chung CPU, chạy tuần tự là đủ
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model")
+
+    # ==================================================
+    # ENTRY
+    # ==================================================
+
+    def run(self, start_mode: Mode = Mode.VI_EN) -> None:
+        self.mode = start_mode
+        self._running = True
+        try:
+            asyncio.run(self._main())
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_evt = asyncio.Event()
+        events: asyncio.Queue = asyncio.Queue()
+
+        self._transition(State.READY, force=True)
+        _log.info("Async device loop started: %s", self.mode)
+
+        source = threading.Thread(
+            target=self._button_source, args=(events,), name="buttons", daemon=True
+        )
+        source.start()
+
+        tasks = [
+            asyncio.create_task(self._dispatch(events)),
+            asyncio.create_task(self._power_timer()),
+            asyncio.create_task(self._lag_monitor()),
+        ]
+        worker = asyncio.create_task(self._job_worker()) if self.jobs is not None else None
+        await self._stop_evt.wait()
+
+        for t in tasks:
+            t.cancel()
+        if self._flow is not None and not self._flow.done():
+            # đang dịch dở → chờ xong rồi mới thoát (không giết giữa chừng)
+            await asyncio.gather(self._flow, return_exceptions=True)
+        if worker is not None:
+            # câu đang dịch được làm xong, câu còn chờ bị bỏ
+            self.jobs.close()
+            await asyncio.gather(worker, return_exceptions=True)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ==================================================
+    # FSM
+    # ==================================================
+
+    def _transition(self, to: State, *, force: bool = False) -> None:
+        if not force and not self.fsm.can_transition(to):
+            raise InvalidTransition(f"{self.fsm.name} -> {to.name}")
+
+        self.fsm = to
+        self.state = to.name
+        if to is State.READY:
+            self._ready_since = time.monotonic()
+            self._safe_display_mode()
+        else:
+            self._show_busy(to.label)
+
+    def _back_to_ready(self) -> None:
+        # câu kế tiếp đang được ghi (QUEUE) → quay về RECORDING thay vì READY
+        self._transition(State.RECORDING if self._recording else State.READY, force=True)
+
+    def _mark_first_audio(self) -> None:
+        super()._mark_first_audio()
+        # được gọi từ thread model/stream → đẩy về event loop
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._enter_speaking)
+
+    def _enter_speaking(self) -> None:
+        if self.fsm.can_transition(State.SPEAKING):
+            self._transition(State.SPEAKING)
+
+    async def _blocking(self, fn: Callable, *args: Any) -> Any:
+        assert self._loop is not None
+        return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def _audio_blocking(self, fn: Callable, *args: Any) -> Any:
+        # start / stop ghi âm không xếp hàng sau STT / NMT của câu trước
+        assert self._loop is not None
+        return await self._loop.run_in_executor(None, fn, *args)
+
+    # ==================================================
+    # EVENT SOURCES
+    # ==================================================
+
+    def _button_source(self, events: asyncio.Queue) -> None:
+        """Thread: driver nút → asyncio.Queue (event-based hoặc polling cũ)."""
+        loop = self._loop
+        assert loop is not None
+        has_events = hasattr(self.buttons, "get_event")
+        talk_prev = False
+
+        while self._running:
+            try:
+                if has_events:
+                    evt = self.buttons.get_event(timeout=0.5)
+                    if evt is not None:
+                        loop.call_soon_threadsafe(events.put_nowait, evt)
+                    continue
+
+                # backend chỉ có polling: chuyển mức → cạnh ở đây
+                now = time.monotonic()
+                pressed = self.buttons.is_talk_pressed()
+                if pressed != talk_prev:
+                    talk_prev = pressed
+                    kind = "talk_down" if pressed else "talk_up"
+                    loop.call_soon_threadsafe(events.put_nowait, ButtonEvent(kind, now))
+                mode_evt = self.buttons.poll_mode_event()
+                if mode_evt in ("short", "long"):
+                    kind = f"mode_{mode_evt}"
+                    loop.call_soon_threadsafe(events.put_nowait, ButtonEvent(kind, now))
+                time.sleep(0.02)
+            except RuntimeError:
+                return  # event loop đã đóng
+            except Exception as e:
+                _log.warning("button source error: %s", e)
+                time.sleep(self.tick_sec)
+
+    async def _dispatch(self, events: asyncio.Queue) -> None:
+        while True:
+            evt = await events.get()
+            try:
+                await self._on_button(evt)
+            except Exception as e:
+                _log.warning("button event ignored: %s", e)
+
+    async def _on_button(self, evt: Any) -> None:
+        kind = evt.kind
+
+        if kind == "talk_down":
+            if self._can_start_talk(evt.t):
+                self._talk_pressed_prev = True
+                self._recording = True
+                if self.fsm is State.READY:
+                    self._transition(State.RECORDING)
+                else:
+                    self._show_busy(State.RECORDING.label)
+                _log.info("Talk start")
+                try:
+                    await self._audio_blocking(self.audio.start_record)
+                except Exception as e:
+                    _log.error("start_record failed: %s", e)
+                    self._recording = False
+                    if not self._busy:
+                        self._back_to_ready()
+                    return
+                self._start_incremental(self.mode)
+
+        elif kind == "talk_up":
+            if self._talk_pressed_prev and self._recording:
+                self._talk_pressed_prev = False
+                self._flight(+1)
+                self._flow = asyncio.create_task(self._talk_flow())
+            else:
+                self._talk_pressed_prev = False
+
+        elif kind == "mode_short":
+            # flow đang chạy đã chốt mode lúc bắt đầu → đổi mode lúc nào cũng an toàn
+            self._toggle_mode()
+
+        elif kind == "mode_long":
+            self.display.show_status(mode=self.mode, state="SHUTDOWN")
+            self._request_shutdown()
+
+    # ==================================================
+    # TALK FLOW
+    # ==================================================
+
+    async def _talk_flow(self) -> None:
+        _log.info("Talk stop")
+        t_release = time.monotonic()
+        mode = self.mode
+
+        try:
+            wav_path = await self._audio_blocking(self._stop_recording)
+        except BaseException:
+            self._flight(-1)
+            raise
+        if wav_path is None or self.device_env == "DEV":
+            self._flight(-1)
+            if not self._busy:
+                self._back_to_ready()
+            return
+
+        job = self._make_job(wav_path, mode, t_release)
+        if self.jobs is not None:
+            self._enqueue(job)
+            return
+        await self._run_job_async(job)
+
+    async def _run_job_async(self, job: UtteranceJob) -> None:
+        await self._blocking(self._apply_pending_profile)
+        self._begin_job(job)
+        try:
+            self._transition(State.TRANSLATING)
+            result = await self._blocking(self._recognize, job.wav_path, job.mode)
+            if result is not None:
+                # SPEAKING được bật từ _mark_first_audio khi loa bắt đầu phát
+                await self._blocking(self._translate_result, result, job.mode)
+            await self._blocking(self._after_utterance)
+
+        except StageTimeout as e:
+            await self._blocking(self._on_stage_timeout, e, job.mode)
+            await self._blocking(self._after_utterance)
+        except WorkerCrashed as e:
+            await self._blocking(self._on_worker_crash, e, job.mode)
+            await self._blocking(self._after_utterance)
+        except Exception as e:
+            _log.exception("talk flow error: %s", e)
+        finally:
+            self._busy = False
+            self._flight(-1)
+            self._back_to_ready()
+
+    async def _job_worker(self) -> None:
+        assert self._loop is not None
+        while True:
+            # thread của default executor chờ queue; event loop vẫn rảnh
+            job = await self._loop.run_in_executor(None, self.jobs.get)
+            if job is None:
+                return
+            await self._run_job_async(job)
+
+    # ==================================================
+    # TIMERS
+    # ==================================================
+
+    async def _power_timer(self) -> None:
+        while True:
+            self._safe_power_tick()
+            await asyncio.sleep(self.tick_sec)
+
+    async def _lag_monitor(self) -> None:
+        """Ngủ đúng interval; thức muộn bao nhiêu = loop bị chặn bấy nhiêu."""
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.lag_interval_sec)
+            lag = max(0.0, (loop.time() - t0 - self.lag_interval_sec) * 1000.0)
+            self.loop_lag_ms = lag
+            if lag > self.loop_lag_max_ms:
+                self.loop_lag_max_ms = lag
+
+    # ==================================================
+    # SHUTDOWN
+    # ==================================================
+
+    def _request_shutdown(self) -> None:
+        super()._request_shutdown()
+        if self._loop is not None and self._stop_evt is not None:
+            self._loop.call_soon_threadsafe(self._stop_evt.set)
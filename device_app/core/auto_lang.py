@@ -0,0 +1,93 @@
+# device_app/core/auto_lang.py
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from device_app.core.modes import Mode
+from device_app.models.nlp.lang_id import BigramLangID, default_lang_id
+
+
+@dataclass(frozen=True)
+class Detection:
+    mode: Mode
+    text: str
+    scores: Dict[str, float] = field(default_factory=dict)
+    sec: float = 0.0
+    # SttConfidence của transcript thắng (None nếu backend không có)
+    confidence: Any = None
+
+
+class AutoLanguageDetector:
+    """
+    Mode.AUTO: chạy STT VI và STT EN SONG SONG trên cùng 1 buffer audio,
+    chấm điểm từng transcript rồi chọn hướng dịch.
+
+        score(lang) = CTC log-prob / frame  +  LM_WEIGHT * margin bigram
+
+    ORT nhả GIL khi run → 2 session chạy thật sự song song trên 2 nhóm core,
+    thời gian quyết định ≈ 1 lần STT (chậm hơn trong 2) chứ không phải 2.
+    """
+
+    def __init__(
+        self,
+        stt_vi: Any,
+        stt_en: Any,
+        *,
+        lang_id: Optional[BigramLangID] = None,
+        lm_weight: float = 1.0,
+    ) -> None:
+        self.stt = {"vi": stt_vi, "en": stt_en}
+        self.lang_id = lang_id or default_lang_id()
+        self.lm_weight = float(lm_weight)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stt-auto")
+
+    @classmethod
+    def from_config(cls, config: dict, stt_vi: Any, stt_en: Any) -> "AutoLanguageDetector":
+        auto_cfg = (config.get("PIPELINE") or {}).get("AUTO") or {}
+        return cls(stt_vi, stt_en, lm_weight=float(auto_cfg.get("LM_WEIGHT", 1.0)))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def detect(self, wav_path: str) -> Detection:
+        t0 = time.monotonic()
+
+        # đọc WAV 1 lần, 2 STT dùng chung mảng (chỉ đọc)
+        loader = getattr(self.stt["vi"], "load_audio", None)
+        audio = loader(wav_path) if loader is not None else None
+
+        futures = {
+            lang: self._executor.submit(self._transcribe, stt, wav_path, audio)
+            for lang, stt in self.stt.items()
+        }
+        results = {lang: f.result() for lang, f in futures.items()}
+
+        scores: Dict[str, float] = {}
+        for lang, (text, ctc, _) in results.items():
+            if not text:
+                scores[lang] = float("-inf")
+                continue
+            scores[lang] = ctc + self.lm_weight * self.lang_id.margin(text, lang)
+
+        lang = max(scores, key=scores.get)
+        mode = Mode.VI_EN if lang == "vi" else Mode.EN_VI
+        return Detection(
+            mode=mode,
+            text=results[lang][0],
+            scores=scores,
+            sec=time.monotonic() - t0,
+            confidence=results[lang][2],
+        )
+
+    @staticmethod
+    def _transcribe(stt: Any, wav_path: str, audio: Any) -> Tuple[str, float, Any]:
+        if audio is not None and hasattr(stt, "transcribe_detailed"):
+            res = stt.transcribe_detailed(audio)
+            return res.text, res.confidence.avg_logprob, res.confidence
+        if audio is not None and hasattr(stt, "transcribe_scored"):
+            return (*stt.transcribe_scored(audio), None)
+        # backend không có điểm CTC → chỉ dựa vào bigram
+        return stt.transcribe_file(wav_path), 0.0, None
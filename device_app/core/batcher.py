@@ -0,0 +1,233 @@
+# device_app/core/batcher.py
+"""
+Gộp request đồng thời thành 1 lần inference (service nhiều client).
+
+    submit(item) ──▶ [queue <= max_queue] ──▶ worker: chờ tối đa max_wait_ms
+                                               hoặc đủ max_batch → run_batch(items)
+
+- Backpressure: queue đầy → Overloaded ngay (HTTP 503), không xếp hàng vô hạn
+- run_batch(items) → list kết quả cùng thứ tự; phần tử là Exception → chỉ
+  request đó lỗi; run_batch ném → cả batch lỗi
+- Mỗi request có thời gian chờ queue / chạy / tổng + cỡ batch đã đi cùng
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Generic, List, Optional, Sequence, TypeVar
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("batcher")
+
+T = TypeVar("T")
+
+
+class Overloaded(RuntimeError):
+    def __init__(self, name: str, depth: int) -> None:
+        super().__init__(f"{name}: queue full ({depth})")
+        self.name = name
+        self.depth = depth
+
+
+@dataclass(frozen=True)
+class Timed(Generic[T]):
+    value: T
+    queue_ms: float
+    run_ms: float
+    batch_size: int
+
+    @property
+    def total_ms(self) -> float:
+        return self.queue_ms + self.run_ms
+
+    def latency(self) -> Dict[str, Any]:
+        return {
+            "queue_ms": round(self.queue_ms, 2),
+            "run_ms": round(self.run_ms, 2),
+            "total_ms": round(self.total_ms, 2),
+            "batch": self.batch_size,
+        }
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+class LatencyStats:
+    """Cửa sổ trượt N request gần nhất → p50 / p95 / p99 (ms)."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._total: Deque[float] = deque(maxlen=window)
+        self._queue: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, queue_ms: float, total_ms: float) -> None:
+        with self._lock:
+            self._queue.append(queue_ms)
+            self._total.append(total_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            total, waits = sorted(self._total), sorted(self._queue)
+        return {
+            "n": len(total),
+            "p50_ms": percentile(total, 0.5),
+            "p95_ms": percentile(total, 0.95),
+            "p99_ms": percentile(total, 0.99),
+            "queue_p95_ms": percentile(waits, 0.95),
+        }
+
+
+@dataclass
+class _Pending:
+    item: Any
+    future: Future
+    t_submit: float
+
+
+class DynamicBatcher:
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[Any]], Sequence[Any]],
+        *,
+        max_batch: int = 8,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 64,
+    ) -> None:
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait_sec = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_queue = max(1, int(max_queue))
+
+        self._q: "queue.Queue[Optional[_Pending]]" = queue.Queue(self.max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.latency = LatencyStats()
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.failed = 0
+
+    @classmethod
+    def from_config(cls, config: dict, name: str, run_batch: Callable[[List[Any]], Sequence[Any]]) -> "DynamicBatcher":
+        b_cfg = (config.get("SERVICE") or {}).get("BATCH") or {}
+        return cls(
+            name,
+            run_batch,
+            max_batch=int(b_cfg.get("MAX_SIZE", 8)),
+            max_wait_ms=float(b_cfg.get("MAX_WAIT_MS", 5)),
+            max_queue=int(b_cfg.get("MAX_QUEUE", 64)),
+        )
+
+    # ================= LIFECYCLE =================
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=f"batch-{self.name}", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 2.0) -> None:
+        if self._thread is None:
+            return
+        try:
+            self._q.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ================= CLIENT =================
+
+    @property
+    def depth(self) -> int:
+        return self._q.qsize()
+
+    def submit(self, item: Any) -> "Future[Timed[Any]]":
+        fut: "Future[Timed[Any]]" = Future()
+        try:
+            self._q.put_nowait(_Pending(item, fut, time.perf_counter()))
+        except queue.Full:
+            self.rejected += 1
+            raise Overloaded(self.name, self.max_queue) from None
+        return fut
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Timed[Any]:
+        return self.submit(item).result(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else None,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            **self.latency.summary(),
+        }
+
+    # ================= WORKER =================
+
+    def _collect(self, first: _Pending) -> List[_Pending]:
+        """Gom thêm request tới khi đủ max_batch hoặc hết max_wait (tính từ request đầu)."""
+        batch = [first]
+        end = time.perf_counter() + self.max_wait_sec
+        while len(batch) < self.max_batch:
+            left = end - time.perf_counter()
+            try:
+                nxt = self._q.get(timeout=left) if left > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if nxt is None:
+                self._q.put_nowait(None)  # dừng sau batch này
+                break
+            batch.append(nxt)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            first = self._q.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+            self._run(batch)
+
+        # còn request chưa chạy → báo lỗi thay vì treo client
+        while True:
+            try:
+                p = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if p is not None:
+                p.future.set_exception(RuntimeError(f"{self.name}: batcher stopped"))
+
+    def _run(self, batch: List[_Pending]) -> None:
+        t0 = time.perf_counter()
+        try:
+            results = list(self.run_batch([p.item for p in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            _log.warning("%s: batch of %d failed: %s", self.name, len(batch), e)
+            results = [e] * len(batch)
+        t1 = time.perf_counter()
+
+        self.batches += 1
+        self.items += len(batch)
+        run_ms = (t1 - t0) * 1000
+        for p, res in zip(batch, results):
+            queue_ms = (t0 - p.t_submit) * 1000
+            self.latency.add(queue_ms, queue_ms + run_ms)
+            if isinstance(res, BaseException):
+                self.failed += 1
+                p.future.set_exception(res)
+            else:
+                p.future.set_result(Timed(res, queue_ms, run_ms, len(batch)))
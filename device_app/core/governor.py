@@ -0,0 +1,199 @@
+# device_app/core/governor.py
+"""
+Governor hiệu năng theo pin + nhiệt độ SoC.
+
+Pin yếu / vỏ máy nóng → chủ động hạ mức tính toán (beam NMT, thread,
+model STT nhẹ, tần số poll / làm tươi OLED) thay vì để kernel throttle
+thất thường hoặc máy tắt sớm.
+
+    performance ── pin <= BALANCED_PCT | nhiệt >= WARM_C ──▶ balanced
+    balanced    ── pin <= SAVER_PCT    | nhiệt >= HOT_C  ──▶ saver
+
+Hysteresis:
+- Lên mức tiết kiệm hơn: ngay lập tức (an toàn trước)
+- Về mức mạnh hơn: chỉ khi đã qua ngưỡng 1 khoảng BATTERY_HYST_PCT /
+  TEMP_HYST_C VÀ đã giữ profile hiện tại ít nhất MIN_HOLD_SEC
+
+Listener (on_change) chạy ngay trong update → chỉ dành cho việc nhẹ.
+Phần đụng model (load STT, beam, thread torch) lấy qua take_pending()
+ở thread model, giữa 2 câu.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from device_app.utils.log import get_logger
+from device_app.utils.telemetry import thermal_c
+
+_log = get_logger("governor")
+
+
+@dataclass(frozen=True)
+class PerfProfile:
+    name: str
+    num_beams: int = 4
+    torch_threads: int = 0  # 0 = giữ theo THREADS
+    stt_variant: str = "default"  # key trong STT_*.VARIANTS
+    tick_sec: float = 1.0  # chu kỳ power tick
+    display_fps: float = 10.0
+    battery_sample_sec: float = 5.0
+
+
+DEFAULT_PROFILES: Tuple[PerfProfile, ...] = (
+    PerfProfile("performance"),
+    PerfProfile("balanced", num_beams=2, tick_sec=2.0, display_fps=5.0, battery_sample_sec=10.0),
+    PerfProfile(
+        "saver",
+        num_beams=1,
+        torch_threads=2,
+        stt_variant="lite",
+        tick_sec=5.0,
+        display_fps=2.0,
+        battery_sample_sec=30.0,
+    ),
+)
+
+_CFG_KEYS = {
+    "NUM_BEAMS": ("num_beams", int),
+    "TORCH_THREADS": ("torch_threads", int),
+    "STT_VARIANT": ("stt_variant", str),
+    "TICK_SEC": ("tick_sec", float),
+    "DISPLAY_FPS": ("display_fps", float),
+    "BATTERY_SAMPLE_SEC": ("battery_sample_sec", float),
+}
+
+
+def soc_temp_c() -> Optional[float]:
+    """Nhiệt độ cao nhất trong các thermal zone (None nếu không đọc được)."""
+    temps = thermal_c()
+    return max(temps.values()) if temps else None
+
+
+class Governor:
+    def __init__(
+        self,
+        profiles: Tuple[PerfProfile, ...] = DEFAULT_PROFILES,
+        *,
+        balanced_pct: int = 50,
+        saver_pct: int = 20,
+        warm_c: float = 65.0,
+        hot_c: float = 75.0,
+        battery_hyst_pct: int = 5,
+        temp_hyst_c: float = 5.0,
+        min_hold_sec: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if len(profiles) != 3:
+            raise ValueError("cần đúng 3 profile: performance, balanced, saver")
+        self.profiles = profiles
+        self.balanced_pct = int(balanced_pct)
+        self.saver_pct = int(saver_pct)
+        self.warm_c = float(warm_c)
+        self.hot_c = float(hot_c)
+        self.battery_hyst_pct = int(battery_hyst_pct)
+        self.temp_hyst_c = float(temp_hyst_c)
+        self.min_hold_sec = float(min_hold_sec)
+        self._clock = clock
+
+        self.level = 0
+        self._since = clock()
+        self.switches = 0
+        # profile đã chọn nhưng model chưa đổi theo
+        self.pending: Optional[PerfProfile] = None
+        self._listeners: List[Callable[[PerfProfile], None]] = []
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["Governor"]:
+        g_cfg = config.get("GOVERNOR") or {}
+        if not g_cfg.get("ENABLED", False):
+            return None
+
+        overrides = g_cfg.get("PROFILES") or {}
+        profiles = []
+        for base in DEFAULT_PROFILES:
+            fields: Dict[str, Any] = {}
+            for key, value in (overrides.get(base.name.upper()) or {}).items():
+                if key in _CFG_KEYS:
+                    name, cast = _CFG_KEYS[key]
+                    fields[name] = cast(value)
+            profiles.append(replace(base, **fields))
+
+        return cls(
+            tuple(profiles),
+            balanced_pct=g_cfg.get("BALANCED_PCT", 50),
+            saver_pct=g_cfg.get("SAVER_PCT", 20),
+            warm_c=g_cfg.get("WARM_C", 65.0),
+            hot_c=g_cfg.get("HOT_C", 75.0),
+            battery_hyst_pct=g_cfg.get("BATTERY_HYST_PCT", 5),
+            temp_hyst_c=g_cfg.get("TEMP_HYST_C", 5.0),
+            min_hold_sec=g_cfg.get("MIN_HOLD_SEC", 30.0),
+        )
+
+    @property
+    def profile(self) -> PerfProfile:
+        return self.profiles[self.level]
+
+    def on_change(self, fn: Callable[[PerfProfile], None]) -> None:
+        self._listeners.append(fn)
+
+    def take_pending(self) -> Optional[PerfProfile]:
+        """Profile model cần đổi sang (None nếu không có) và xoá cờ chờ."""
+        profile, self.pending = self.pending, None
+        return profile
+
+    # ================= DECISION =================
+
+    def _required(self, pct: Optional[float], temp: Optional[float], bat_off: float, temp_off: float) -> int:
+        level = 0
+        if pct is not None:
+            if pct <= self.saver_pct + bat_off:
+                level = 2
+            elif pct <= self.balanced_pct + bat_off:
+                level = 1
+        if temp is not None:
+            if temp >= self.hot_c - temp_off:
+                level = max(level, 2)
+            elif temp >= self.warm_c - temp_off:
+                level = max(level, 1)
+        return level
+
+    def update(self, battery_pct: Optional[float], temp_c: Optional[float]) -> bool:
+        """1 lần quyết định; True nếu đã đổi profile."""
+        now = self._clock()
+        need = self._required(battery_pct, temp_c, 0, 0)
+
+        if need > self.level:
+            target = need
+        elif need < self.level:
+            # chỉ nới khi đã cách ngưỡng đủ xa và giữ đủ lâu
+            if now - self._since < self.min_hold_sec:
+                return False
+            target = self._required(battery_pct, temp_c, self.battery_hyst_pct, self.temp_hyst_c)
+            if target >= self.level:
+                return False
+        else:
+            return False
+
+        prev = self.profile
+        self.level = target
+        self._since = now
+        self.switches += 1
+        self.pending = self.profile
+        _log.info(
+            "profile %s → %s (battery=%s%% temp=%s°C)",
+            prev.name,
+            self.profile.name,
+            battery_pct,
+            temp_c,
+        )
+        self.apply()
+        return True
+
+    def apply(self) -> None:
+        for fn in self._listeners:
+            try:
+                fn(self.profile)
+            except Exception as e:
+                _log.warning("apply %s failed: %s", self.profile.name, e)
@@ -0,0 +1,180 @@
+# device_app/core/incremental.py
+"""
+Dịch dần transcript tạm trong lúc người dùng còn đang nói.
+
+    [worker] audio.snapshot() → STT → prepare (skeleton...) → IncrementalTranslator.update()
+    [nhả nút] IncrementalTranslator.translate_final(seg) cho từng đoạn câu cuối
+
+- Đoạn (Segmenter) đã đóng trong transcript tạm → dịch 1 lần, cache theo
+  câu nguồn; câu cuối có đoạn y hệt → dùng lại, không chạy NMT
+- Đoạn đuôi (còn đang nói dở): giữ 2 bản dịch gần nhất, phần từ chung ở
+  đầu = tiền tố đã chốt → lần dịch sau ép decoder đi qua tiền tố đó
+  (nmt.translate_prefixed, encoder output cache theo câu nguồn)
+- done_ratio = phần bản dịch cuối (ký tự) đã có sẵn lúc nhả nút
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("incremental")
+
+
+def common_word_prefix(a: str, b: str) -> str:
+    """Tiền tố chung theo TỪ (không cắt giữa từ)."""
+    out: List[str] = []
+    for wa, wb in zip(a.split(), b.split()):
+        if wa != wb:
+            break
+        out.append(wa)
+    return " ".join(out)
+
+
+class IncrementalTranslator:
+    def __init__(self, nmt: Any, segmenter: Any = None) -> None:
+        self.nmt = nmt
+        self.segmenter = segmenter
+
+        self._done: Dict[str, str] = {}  # đoạn đã đóng: nguồn → bản dịch
+        self._tail_src = ""
+        self._tail_hyps: List[str] = []  # 2 bản dịch gần nhất của đoạn đuôi
+
+        self.partials = 0
+        self.decodes = 0
+        self.reused_chars = 0
+        self.final_chars = 0
+
+    # ================= PARTIAL =================
+
+    def split(self, text: str) -> List[str]:
+        text = " ".join((text or "").split())
+        if not text:
+            return []
+        if self.segmenter is None:
+            return [text]
+        return self.segmenter.split(text) or [text]
+
+    def update(self, partial: str) -> None:
+        segments = self.split(partial)
+        if not segments:
+            return
+        self.partials += 1
+
+        for seg in segments[:-1]:
+            if seg not in self._done:
+                self._done[seg] = self._decode(seg, self._prefix_for(seg))
+
+        tail = segments[-1]
+        if tail == self._tail_src and self._tail_hyps:
+            return
+        hyp = self._decode(tail, self._prefix_for(tail))
+        if not tail.startswith(self._tail_src):
+            # STT sửa lại đoạn đuôi → lịch sử cũ không còn giá trị
+            self._tail_hyps = []
+        self._tail_hyps = (self._tail_hyps + [hyp])[-2:]
+        self._tail_src = tail
+
+    # ================= FINAL =================
+
+    def translate_final(self, seg: str) -> str:
+        """Dịch 1 đoạn của câu cuối, tận dụng tối đa phần đã dịch lúc nói."""
+        seg = " ".join((seg or "").split())
+        if not seg:
+            return ""
+
+        out = self._done.get(seg)
+        if out is None and seg == self._tail_src and self._tail_hyps:
+            out = self._tail_hyps[-1]
+        if out is not None:
+            self.reused_chars += len(out)
+            self.final_chars += len(out)
+            return out
+
+        prefix = self._prefix_for(seg)
+        out = self._decode(seg, prefix)
+        if prefix and out.startswith(prefix):
+            self.reused_chars += len(prefix)
+        self.final_chars += len(out)
+        return out
+
+    @property
+    def done_ratio(self) -> float:
+        return self.reused_chars / self.final_chars if self.final_chars else 0.0
+
+    # ================= HELPERS =================
+
+    def _prefix_for(self, seg: str) -> str:
+        """Tiền tố đã chốt: chỉ hợp lệ khi nguồn mới NỐI DÀI đoạn đuôi cũ."""
+        if len(self._tail_hyps) < 2 or not self._tail_src or not seg.startswith(self._tail_src):
+            return ""
+        return common_word_prefix(*self._tail_hyps)
+
+    def _decode(self, seg: str, prefix: str) -> str:
+        self.decodes += 1
+        if prefix and hasattr(self.nmt, "translate_prefixed"):
+            return self.nmt.translate_prefixed(seg, prefix)
+        return self.nmt.translate(seg)
+
+
+class PartialWorker:
+    """
+    Thread nền khi đang ghi âm: mỗi INTERVAL_SEC lấy audio đã thu, STT lại,
+    đưa transcript (đã qua prepare) vào IncrementalTranslator.
+
+    stop() chờ lượt đang chạy xong → sau đó model NMT / STT chỉ còn thread
+    gọi dùng, không chạy chồng.
+    """
+
+    def __init__(
+        self,
+        *,
+        snapshot: Callable[[], Any],
+        transcribe: Callable[[Any], str],
+        translator: IncrementalTranslator,
+        prepare: Optional[Callable[[str], str]] = None,
+        interval_sec: float = 1.0,
+        min_samples: int = 16000,
+    ) -> None:
+        self.snapshot = snapshot
+        self.transcribe = transcribe
+        self.translator = translator
+        self.prepare = prepare
+        self.interval_sec = float(interval_sec)
+        self.min_samples = int(min_samples)
+
+        self.last_text = ""
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="incremental", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            t0 = time.monotonic()
+            try:
+                audio = self.snapshot()
+                if audio is None or len(audio) < self.min_samples:
+                    continue
+                text = self.transcribe(audio)
+                if self._stop.is_set():
+                    return
+                if not text or text == self.last_text:
+                    continue
+                self.last_text = text
+                self.translator.update(self.prepare(text) if self.prepare else text)
+            except Exception as e:
+                _log.warning("partial step failed: %s", e)
+                return
+            _log.debug("partial %d in %.3fs", self.translator.partials, time.monotonic() - t0)
@@ -0,0 +1,131 @@
+# device_app/core/jobs.py
+"""
+Hàng đợi câu nói đã ghi xong → worker dịch / nói lần lượt.
+
+Người thứ 2 bấm TALK được ngay khi người thứ 1 còn đang được dịch / nói;
+bản ghi vào hàng đợi có giới hạn (MAX_PENDING, không tính câu đang xử lý).
+
+Khi đầy:
+- drop_oldest : bỏ câu chờ lâu nhất, nhận câu mới (mặc định)
+- drop_newest : giữ các câu đang chờ, bỏ câu vừa ghi
+- keep_latest : bỏ MỌI câu đang chờ, chỉ giữ câu vừa ghi
+"""
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from device_app.core.modes import Mode
+from device_app.utils.log import get_logger
+
+_log = get_logger("jobs")
+
+POLICIES = ("drop_oldest", "drop_newest", "keep_latest")
+
+
+@dataclass(frozen=True)
+class UtteranceJob:
+    wav_path: str
+    mode: Mode
+    t_release: float
+    # IncrementalTranslator của đúng lượt ghi âm này (None = không có)
+    incremental: Any = None
+    t_enqueued: float = field(default_factory=time.monotonic)
+
+
+class JobQueue:
+    def __init__(
+        self,
+        *,
+        max_pending: int = 2,
+        policy: str = "drop_oldest",
+        window: int = 50,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"DROP_POLICY phải là 1 trong {POLICIES}")
+        self.max_pending = max(1, int(max_pending))
+        self.policy = policy
+
+        self._q: Deque[UtteranceJob] = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        # metrics
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._waits: Deque[float] = collections.deque(maxlen=window)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["JobQueue"]:
+        q_cfg = (config.get("PIPELINE") or {}).get("QUEUE") or {}
+        if not q_cfg.get("ENABLED", False):
+            return None
+        return cls(
+            max_pending=int(q_cfg.get("MAX_PENDING", 2)),
+            policy=str(q_cfg.get("DROP_POLICY", "drop_oldest")),
+        )
+
+    # ================= PRODUCER =================
+
+    def put(self, job: UtteranceJob) -> List[UtteranceJob]:
+        """Thêm câu mới; trả về các câu bị bỏ do đầy (để log / dọn file)."""
+        dropped: List[UtteranceJob] = []
+        with self._cond:
+            if len(self._q) >= self.max_pending:
+                if self.policy == "drop_newest":
+                    dropped.append(job)
+                elif self.policy == "keep_latest":
+                    dropped.extend(self._q)
+                    self._q.clear()
+                else:
+                    dropped.append(self._q.popleft())
+
+            if job not in dropped:
+                self._q.append(job)
+                self.enqueued += 1
+                self.max_depth = max(self.max_depth, len(self._q))
+                self._cond.notify()
+            self.dropped += len(dropped)
+
+        for d in dropped:
+            _log.warning("queue full (%s): dropped %s", self.policy, d.wav_path)
+        return dropped
+
+    # ================= CONSUMER =================
+
+    def get(self, timeout: Optional[float] = None) -> Optional[UtteranceJob]:
+        """Câu kế tiếp theo thứ tự ghi; None khi hết timeout hoặc đã close()."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._q or self._closed, timeout):
+                return None
+            if self._closed:
+                return None
+            job = self._q.popleft()
+        self._waits.append(time.monotonic() - job.t_enqueued)
+        return job
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ================= METRICS =================
+
+    @property
+    def depth(self) -> int:
+        return len(self._q)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+            "wait_max_ms": round(waits[-1] * 1000, 1) if waits else None,
+        }
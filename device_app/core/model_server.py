@@ -0,0 +1,612 @@
+# device_app/core/model_server.py
+"""
+STT / NMT / TTS chạy ở process riêng, main process chỉ giữ UI + phần cứng
++ pipeline (MODEL_SERVER.ENABLED).
+
+    [main]  pipeline ─ ModelProxy ──Pipe──▶ [model-stt]  STTVi, STTEn
+                     ─ ModelProxy ──Pipe──▶ [model-nmt]  NMTViEn, NMTEnVi
+                     ─ TTSProxy   ──Pipe──▶ [model-tts]  TTSVi, TTSEn
+                       (tham số nhỏ: pickle; ndarray lớn: shared memory)
+
+- Không tranh GIL: torch / ORT / resample chạy ở process khác, thread
+  audio + GPIO + event loop của main không bị khựng
+- Model crash (segfault, OOM kill) chỉ chết worker đó: câu đang dịch nhận
+  WorkerCrashed → pipeline nói câu báo lỗi; supervisor khởi động lại worker
+  ở nền và gọi lại các setter (set_num_beams, set_variant...) đã dùng
+- Audio (load_audio / transcribe_detailed) và PCM của TTS đi qua 2 vùng
+  shared_memory mỗi worker (in: main → worker, out: worker → main)
+- Loa vẫn thuộc main: TTS worker chỉ tổng hợp + resample, main phát PCM
+"""
+from __future__ import annotations
+
+import importlib
+import itertools
+import multiprocessing as mp
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from device_app.models.tts_base import TTSBase
+from device_app.utils.log import get_logger
+
+_log = get_logger("model_server")
+
+# nhóm process → object trong đó (trùng tên kwargs của TranslatorPipeline)
+GROUPS: Dict[str, Tuple[str, ...]] = {
+    "stt": ("stt_vi", "stt_en"),
+    "nmt": ("nmt_vi_en", "nmt_en_vi"),
+    "tts": ("tts_vi", "tts_en"),
+}
+
+FACTORIES: Dict[str, str] = {
+    "stt_vi": "device_app.models.stt_vi:STTVi",
+    "stt_en": "device_app.models.stt_en:STTEn",
+    "nmt_vi_en": "device_app.models.nmt_vi_en:NMTViEn",
+    "nmt_en_vi": "device_app.models.nmt_en_vi:NMTEnVi",
+    "tts_vi": "device_app.models.tts_vi:TTSVi",
+    "tts_en": "device_app.models.tts_en:TTSEn",
+}
+
+# "module:Class" (import trong worker) hoặc callable(config) → object
+Spec = Union[str, Callable[[dict], Any]]
+
+_SHM_MIN_BYTES = 64 * 1024  # ndarray nhỏ hơn → pickle luôn cho nhanh
+_ALIGN = 64
+PCM_PREFIX = "pcm:"
+
+
+class WorkerCrashed(RuntimeError):
+    def __init__(self, worker: str, reason: str) -> None:
+        super().__init__(f"model worker {worker}: {reason}")
+        self.worker = worker
+        self.reason = reason
+
+
+# ================= SHARED MEMORY =================
+
+
+@dataclass(frozen=True)
+class ArrayRef:
+    """ndarray nằm trong vùng shared memory của worker."""
+
+    offset: int
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class ShmArena:
+    """
+    1 vùng shared memory cố định, ghi tuần tự trong 1 message (reset mỗi lần gọi).
+    RPC của 1 worker chạy tuần tự → mỗi chiều 1 vùng là đủ. Mảng không vừa
+    vùng → pickle như tham số thường.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory) -> None:
+        self.shm = shm
+        self.size = shm.size
+        self._pos = 0
+
+    @classmethod
+    def create(cls, size: int) -> "ShmArena":
+        return cls(shared_memory.SharedMemory(create=True, size=max(_ALIGN, int(size))))
+
+    @classmethod
+    def attach(cls, name: str) -> "ShmArena":
+        # worker dùng chung resource_tracker với main (multiprocessing truyền
+        # sang) → register lại là no-op, main unlink 1 lần khi stop
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def reset(self) -> None:
+        self._pos = 0
+
+    def pack(self, value: Any) -> Any:
+        if isinstance(value, np.ndarray):
+            if value.nbytes < _SHM_MIN_BYTES or value.dtype.hasobject:
+                return value
+            start = -(-self._pos // _ALIGN) * _ALIGN
+            if start + value.nbytes > self.size:
+                _log.debug("array %s B > shm %s B → pickle", value.nbytes, self.size)
+                return value
+            dst = np.ndarray(value.shape, value.dtype, buffer=self.shm.buf, offset=start)
+            dst[...] = value
+            self._pos = start + value.nbytes
+            return ArrayRef(start, value.shape, value.dtype.str)
+        if isinstance(value, tuple):
+            return tuple(self.pack(v) for v in value)
+        if isinstance(value, list):
+            return [self.pack(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self.pack(v) for k, v in value.items()}
+        return value
+
+    def unpack(self, value: Any, *, copy: bool) -> Any:
+        """copy=False: view trên shm, chỉ hợp lệ tới lần gọi kế tiếp."""
+        if isinstance(value, ArrayRef):
+            arr = np.ndarray(value.shape, np.dtype(value.dtype), buffer=self.shm.buf, offset=value.offset)
+            return arr.copy() if copy else arr
+        if isinstance(value, tuple):
+            return tuple(self.unpack(v, copy=copy) for v in value)
+        if isinstance(value, list):
+            return [self.unpack(v, copy=copy) for v in value]
+        if isinstance(value, dict):
+            return {k: self.unpack(v, copy=copy) for k, v in value.items()}
+        return value
+
+    def close(self, *, unlink: bool = False) -> None:
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # còn view trong process này; OS dọn khi thoát
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# ================= WORKER PROCESS =================
+
+
+def build_model(spec: Spec, config: dict) -> Any:
+    """Spec ("module:Class" | callable) → object; dùng chung với service."""
+    if callable(spec):
+        return spec(config)
+    module, _, cls = spec.partition(":")
+    return getattr(importlib.import_module(module), cls)(config)
+
+
+def _describe(obj: Any) -> dict:
+    """Method public (cho proxy) + attribute kiểu đơn giản (hw_sr, model...)."""
+    methods = [
+        n for n in dir(type(obj)) if not n.startswith("_") and callable(getattr(type(obj), n, None))
+    ]
+    attrs = {
+        k: v
+        for k, v in vars(obj).items()
+        if not k.startswith("_") and isinstance(v, (str, int, float, bool, type(None)))
+    }
+    return {"methods": methods, "attrs": attrs}
+
+
+def _picklable(e: BaseException) -> BaseException:
+    try:
+        pickle.dumps(e)
+        return e
+    except Exception:
+        return RuntimeError(f"{type(e).__name__}: {e}")
+
+
+def _worker_main(
+    group: str,
+    specs: Dict[str, Spec],
+    config: dict,
+    conn: Any,
+    in_name: str,
+    out_name: str,
+) -> None:
+    from device_app.utils.bundle import configure_bundles
+    from device_app.utils.deadline import configure_deadlines
+    from device_app.utils.log import setup_logging
+    from device_app.utils.thread_budget import apply_thread_budget, log_thread_budget
+
+    apply_thread_budget(config)
+    setup_logging(config)
+    log_thread_budget()
+    configure_bundles(config)
+    configure_deadlines(config)
+
+    arena_in, arena_out = ShmArena.attach(in_name), ShmArena.attach(out_name)
+    try:
+        objects = {name: build_model(spec, config) for name, spec in specs.items()}
+    except BaseException as e:
+        conn.send(("err", _picklable(e)))
+        return
+    conn.send(("ready", {name: _describe(obj) for name, obj in objects.items()}))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break  # main đã thoát
+        if msg is None:
+            break
+
+        obj_name, method, args, kwargs = msg
+        arena_out.reset()
+        try:
+            fn = getattr(objects[obj_name], method)
+            result = fn(*arena_in.unpack(args, copy=False), **arena_in.unpack(kwargs, copy=False))
+            reply = ("ok", arena_out.pack(result))
+        except Exception as e:
+            reply = ("err", _picklable(e))
+        try:
+            conn.send(reply)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            conn.send(("err", RuntimeError(f"{obj_name}.{method}: unpicklable result ({e})")))
+
+    arena_in.close()
+    arena_out.close()
+
+
+# ================= MAIN SIDE =================
+
+
+@dataclass
+class _Live:
+    proc: Any
+    conn: Any
+    arena_in: ShmArena
+    arena_out: ShmArena
+
+    def close(self) -> None:
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self.arena_in.close(unlink=True)
+        self.arena_out.close(unlink=True)
+
+
+class ModelWorker:
+    """1 process chứa vài model; RPC tuần tự (lock); khởi động lại thay process mới."""
+
+    def __init__(
+        self,
+        group: str,
+        specs: Dict[str, Spec],
+        config: dict,
+        *,
+        ctx: Any,
+        shm_bytes: int,
+        start_timeout_sec: float,
+        call_timeout_sec: float,
+    ) -> None:
+        self.group = group
+        self.specs = dict(specs)
+        self.config = config
+        self.ctx = ctx
+        self.shm_bytes = int(shm_bytes)
+        self.start_timeout_sec = float(start_timeout_sec)
+        self.call_timeout_sec = float(call_timeout_sec)
+
+        self.describe: Dict[str, dict] = {}
+        self.calls = 0
+        self.restarts = 0
+        self.failed = False  # supervisor đã bỏ cuộc (restart quá nhiều)
+        self.started = False
+
+        self._lock = threading.Lock()
+        self._live: Optional[_Live] = None
+        # setter đã gọi → gọi lại sau khi restart (profile governor...)
+        self._sticky: Dict[Tuple[str, str], Tuple[tuple, dict]] = {}
+
+    @property
+    def alive(self) -> bool:
+        live = self._live
+        return live is not None and live.proc.is_alive()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._live.proc.pid if self._live is not None else None
+
+    # ---------- lifecycle ----------
+
+    def _spawn(self) -> _Live:
+        """Tạo process + chờ load model xong (không giữ lock: RPC khác fail nhanh)."""
+        arena_in, arena_out = ShmArena.create(self.shm_bytes), ShmArena.create(self.shm_bytes)
+        parent, child = self.ctx.Pipe()
+        proc = self.ctx.Process(
+            target=_worker_main,
+            name=f"model-{self.group}",
+            args=(self.group, self.specs, self.config, child, arena_in.name, arena_out.name),
+            daemon=True,
+        )
+        live = _Live(proc, parent, arena_in, arena_out)
+        try:
+            proc.start()
+            child.close()
+            if not parent.poll(self.start_timeout_sec):
+                raise WorkerCrashed(self.group, f"not ready after {self.start_timeout_sec:.0f}s")
+            try:
+                kind, payload = parent.recv()
+            except EOFError:
+                proc.join(1.0)
+                raise WorkerCrashed(self.group, f"exit {proc.exitcode} while loading") from None
+            if kind != "ready":
+                raise WorkerCrashed(self.group, f"load failed: {payload}") from payload
+        except BaseException:
+            self._kill(live)
+            raise
+        self.describe = payload
+        return live
+
+    def start(self) -> None:
+        t0 = time.monotonic()
+        live = self._spawn()
+        with self._lock:
+            old, self._live = self._live, live
+            for (obj, method), (args, kwargs) in self._sticky.items():
+                try:
+                    self._call_locked(obj, method, args, kwargs)
+                except Exception as e:
+                    _log.warning("%s: replay %s.%s failed: %s", self.group, obj, method, e)
+        if old is not None:
+            self._kill(old)
+        if self.started:
+            self.restarts += 1
+        self.started = True
+        _log.info(
+            "worker %s pid=%s ready in %.1fs (%s)",
+            self.group,
+            live.proc.pid,
+            time.monotonic() - t0,
+            ", ".join(self.specs),
+        )
+
+    def stop(self) -> None:
+        with self._lock:
+            live, self._live = self._live, None
+        if live is None:
+            return
+        try:
+            live.conn.send(None)
+            live.proc.join(2.0)
+        except (OSError, ValueError):
+            pass
+        self._kill(live)
+
+    @staticmethod
+    def _kill(live: _Live) -> None:
+        if live.proc.is_alive():
+            live.proc.kill()
+        try:
+            live.proc.join(2.0)
+        except (AssertionError, ValueError):
+            pass  # chưa start
+        live.close()
+
+    # ---------- RPC ----------
+
+    def call(self, obj: str, method: str, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            if not self.alive:
+                raise WorkerCrashed(self.group, "not running (restarting)")
+            result = self._call_locked(obj, method, args, kwargs)
+            if method.startswith("set_"):
+                self._sticky[(obj, method)] = (args, kwargs)
+            return result
+
+    def _call_locked(self, obj: str, method: str, args: tuple, kwargs: dict) -> Any:
+        live = self._live
+        assert live is not None
+        live.arena_in.reset()
+        msg = (obj, method, live.arena_in.pack(args), live.arena_in.pack(kwargs))
+        self.calls += 1
+
+        end = time.monotonic() + self.call_timeout_sec if self.call_timeout_sec > 0 else None
+        try:
+            live.conn.send(msg)
+            while not live.conn.poll(0.1):
+                if not live.proc.is_alive():
+                    raise EOFError
+                if end is not None and time.monotonic() > end:
+                    # treo (deadlock native...) → kill, monitor sẽ khởi động lại
+                    live.proc.kill()
+                    raise WorkerCrashed(
+                        self.group, f"{obj}.{method} hung > {self.call_timeout_sec:.0f}s"
+                    )
+            kind, payload = live.conn.recv()
+        except (EOFError, OSError):
+            live.proc.join(1.0)
+            raise WorkerCrashed(
+                self.group, f"died in {obj}.{method} (exit {live.proc.exitcode})"
+            ) from None
+
+        if kind == "err":
+            raise payload
+        return live.arena_out.unpack(payload, copy=True)
+
+
+class ModelProxy:
+    """Đứng thay model trong main: method public của model → RPC sang worker."""
+
+    def __init__(self, worker: ModelWorker, name: str) -> None:
+        self._worker = worker
+        self._name = name
+        self._methods = frozenset(worker.describe[name]["methods"])
+
+    def __getattr__(self, item: str) -> Any:
+        # hasattr(stt, "transcribe_with_confidence")... vẫn đúng như model thật
+        if item.startswith("_") or item not in self._methods:
+            raise AttributeError(item)
+
+        def rpc(*args: Any, **kwargs: Any) -> Any:
+            return self._worker.call(self._name, item, args, kwargs)
+
+        rpc.__name__ = item
+        return rpc
+
+    def __repr__(self) -> str:
+        return f"ModelProxy({self._worker.group}/{self._name})"
+
+
+class TTSProxy(TTSBase):
+    """
+    TTS tổng hợp trong worker, phát loa ở main.
+
+    render() trả handle "pcm:<n>" thay cho đường dẫn WAV: PCM đã resample về
+    hw_sr đi qua shared memory, main không phải đọc / resample lại file.
+    play_file() / discard() nhận cả handle lẫn đường dẫn WAV thật
+    (câu fallback render sẵn, phrasebook).
+    """
+
+    def __init__(self, worker: ModelWorker, name: str) -> None:
+        attrs = worker.describe[name]["attrs"]
+        super().__init__(hw_sr=int(attrs.get("hw_sr") or 48000), out_device=attrs.get("out_device"))
+        # key cache prerender như model thật
+        self.model = attrs.get("model")
+        self._remote = ModelProxy(worker, name)
+        self._pcm: Dict[str, Tuple[np.ndarray, int]] = {}
+        self._pcm_lock = threading.Lock()
+        self._ids = itertools.count()
+
+    def synthesize_to_file(self, path: str, text: str) -> None:
+        self._remote.synthesize_to_file(path, text)
+
+    def render(self, text: str) -> str:
+        data, sr = self._remote.render_pcm(text)
+        handle = f"{PCM_PREFIX}{next(self._ids)}"
+        with self._pcm_lock:
+            self._pcm[handle] = (data, sr)
+        return handle
+
+    def play_file(self, wav_path: str, *, delete: bool = False) -> None:
+        with self._pcm_lock:
+            pcm = self._pcm.pop(wav_path, None) if delete else self._pcm.get(wav_path)
+        if pcm is None:
+            super().play_file(wav_path, delete=delete)
+            return
+        self.play_pcm(*pcm)
+
+    def discard(self, wav_path: str) -> None:
+        with self._pcm_lock:
+            if self._pcm.pop(wav_path, None) is not None:
+                return
+        self._discard(wav_path)
+
+
+# ================= SUPERVISOR =================
+
+
+class ModelSupervisor:
+    def __init__(
+        self,
+        config: dict,
+        groups: Dict[str, Dict[str, Spec]],
+        *,
+        start_method: str = "spawn",
+        shm_mb: float = 8.0,
+        start_timeout_sec: float = 180.0,
+        call_timeout_sec: float = 60.0,
+        monitor_sec: float = 1.0,
+        max_restarts: int = 5,
+        restart_window_sec: float = 300.0,
+    ) -> None:
+        ctx = mp.get_context(start_method)
+        self.workers: Dict[str, ModelWorker] = {
+            group: ModelWorker(
+                group,
+                specs,
+                config,
+                ctx=ctx,
+                shm_bytes=int(shm_mb * 1024 * 1024),
+                start_timeout_sec=start_timeout_sec,
+                call_timeout_sec=call_timeout_sec,
+            )
+            for group, specs in groups.items()
+        }
+        self.monitor_sec = float(monitor_sec)
+        self.max_restarts = int(max_restarts)
+        self.restart_window_sec = float(restart_window_sec)
+
+        self._restart_times: Dict[str, List[float]] = {g: [] for g in self.workers}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["ModelSupervisor"]:
+        s_cfg = config.get("MODEL_SERVER") or {}
+        if not s_cfg.get("ENABLED", False):
+            return None
+        names: Sequence[str] = s_cfg.get("GROUPS") or list(GROUPS)
+        groups = {g: {name: FACTORIES[name] for name in GROUPS[g]} for g in names}
+        return cls(
+            config,
+            groups,
+            start_method=str(s_cfg.get("START_METHOD", "spawn")),
+            shm_mb=float(s_cfg.get("SHM_MB", 8)),
+            start_timeout_sec=float(s_cfg.get("START_TIMEOUT_SEC", 180)),
+            call_timeout_sec=float(s_cfg.get("CALL_TIMEOUT_SEC", 60)),
+            max_restarts=int(s_cfg.get("MAX_RESTARTS", 5)),
+            restart_window_sec=float(s_cfg.get("RESTART_WINDOW_SEC", 300)),
+        )
+
+    def start(self) -> None:
+        """Load các nhóm song song (boot nhanh hơn), rồi bật thread giám sát."""
+        errors: List[BaseException] = []
+
+        def boot(w: ModelWorker) -> None:
+            try:
+                w.start()
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=boot, args=(w,)) for w in self.workers.values()]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            self.close()
+            raise errors[0]
+
+        self._thread = threading.Thread(target=self._monitor, name="model-supervisor", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        for w in self.workers.values():
+            w.stop()
+
+    def proxies(self) -> Dict[str, Any]:
+        """name → proxy, dùng thẳng làm kwargs model của TranslatorPipeline."""
+        out: Dict[str, Any] = {}
+        for w in self.workers.values():
+            for name in w.specs:
+                out[name] = TTSProxy(w, name) if name.startswith("tts") else ModelProxy(w, name)
+        return out
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            g: {"pid": w.pid, "alive": w.alive, "calls": w.calls, "restarts": w.restarts}
+            for g, w in self.workers.items()
+        }
+
+    # ---------- giám sát ----------
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.monitor_sec):
+            for w in self.workers.values():
+                if w.started and not w.failed and not w.alive and not self._stop.is_set():
+                    self._restart(w)
+
+    def _restart(self, w: ModelWorker) -> None:
+        now = time.monotonic()
+        recent = [t for t in self._restart_times[w.group] if now - t < self.restart_window_sec]
+        if len(recent) >= self.max_restarts:
+            w.failed = True
+            _log.error(
+                "worker %s crashed %d times in %.0fs → giving up",
+                w.group,
+                len(recent),
+                self.restart_window_sec,
+            )
+            return
+        self._restart_times[w.group] = recent + [now]
+
+        _log.warning("worker %s died → restarting", w.group)
+        try:
+            w.start()
+        except Exception as e:
+            _log.error("restart %s failed: %s", w.group, e)
@@ -7,14 +7,16 @@ from enum import Enum, auto
 
 class Mode(Enum):
     """
-    2 chế độ hoạt động:
+    3 chế độ hoạt động:
 
     - VI_EN : nói tiếng Việt, dịch sang tiếng Anh
     - EN_VI : nói tiếng Anh, dịch sang tiếng Việt
+    - AUTO  : tự nhận ngôn ngữ nói (chạy cả 2 STT) rồi dịch sang tiếng kia
     """
 
     VI_EN = auto()
     EN_VI = auto()
+    AUTO = auto()
 
     @property
     def short_label(self) -> str:
@@ -22,6 +24,8 @@ class Mode(Enum):
             return "VI→EN"
         if self is Mode.EN_VI:
             return "EN→VI"
+        if self is Mode.AUTO:
+            return "AUTO"
         return self.name
 
     @property
@@ -30,12 +34,20 @@ class Mode(Enum):
             return "Nói tiếng VIỆT, dịch sang tiếng ANH"
         if self is Mode.EN_VI:
             return "Nói tiếng ANH, dịch sang tiếng VIỆT"
+        if self is Mode.AUTO:
+            return "Tự nhận tiếng VIỆT / ANH, dịch sang tiếng còn lại"
         return self.name
 
     @classmethod
-    def cycle(cls, current: "Mode") -> "Mode":
-        """Dùng cho nút MODE: chuyển qua lại giữa VI_EN ↔ EN_VI."""
-        return Mode.EN_VI if current is Mode.VI_EN else Mode.VI_EN
+    def cycle(cls, current: "Mode", *, auto: bool = True) -> "Mode":
+        """
+        Dùng cho nút MODE: VI_EN → EN_VI → AUTO → VI_EN.
+        auto=False (PIPELINE.AUTO tắt / thiếu 1 STT): chỉ VI_EN ⇄ EN_VI.
+        """
+        order = (Mode.VI_EN, Mode.EN_VI, Mode.AUTO) if auto else (Mode.VI_EN, Mode.EN_VI)
+        if current not in order:
+            return order[0]
+        return order[(order.index(current) + 1) % len(order)]
 
 
 @dataclass
@@ -46,7 +58,8 @@ class ModeState:
     """
 
     current: Mode = Mode.EN_VI  # mặc định: EN → VI
+    auto: bool = True  # AUTO có trong vòng nút MODE
 
     def next(self) -> Mode:
-        self.current = Mode.cycle(self.current)
+        self.current = Mode.cycle(self.current, auto=self.auto)
         return self.current
@@ -1,10 +1,32 @@
 from __future__ import annotations
 
+import os
+import threading
 import time
-import re
-from typing import Any
-
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from device_app.core.auto_lang import AutoLanguageDetector
+from device_app.core.governor import Governor, PerfProfile, soc_temp_c
+from device_app.core.incremental import IncrementalTranslator, PartialWorker
+from device_app.core.jobs import JobQueue, UtteranceJob
+from device_app.core.model_server import WorkerCrashed
 from device_app.core.modes import Mode
+from device_app.core.streaming import SegmentStreamer
+from device_app.models.nlp.phrasebook import Phrasebook, PhraseHit
+from device_app.models.nlp.segmenter import Segmenter, slot_tokens
+from device_app.models.nlp.slots import SlotEngine
+from device_app.utils.deadline import StageTimeout
+from device_app.utils.log import get_logger
+from device_app.utils.thread_budget import set_torch_threads
+
+_log = get_logger("pipeline")
+# transcript / slot / bản dịch: DEBUG riêng → tắt được mà không mất log vận hành
+_log_text = get_logger("pipeline.text")
+
+
+# tập các ký tự nhạc phổ biến: U+2669..U+266F plus 🎵 🎶 (U+1F3B5, U+1F3B6)
+_MUSIC_CHARS = "\u2669\u266A\u266B\u266C\u266D\u266E\u266F\U0001F3B5\U0001F3B6"
 
 
 def _strip_music_marks(text: str) -> str:
@@ -15,12 +37,20 @@ def _strip_music_marks(text: str) -> str:
     """
     if not text:
         return text
-    # tập các ký tự nhạc phổ biến: U+2669..U+266F plus common music symbols
-    music_chars = r"\u2669\u266A\u266B\u266C\u266D\u266E\u266F\u1F3B5\u1F3B6"
     # xóa liên tiếp các ký tự nhạc + whitespace ở đầu và cuối
-    text = re.sub(rf"^[{music_chars}\s]+", "", text)
-    text = re.sub(rf"[{music_chars}\s]+$", "", text)
-    return text.strip()
+    # (str.strip chỉ chạm vào 2 đầu chuỗi, không quét cả câu như regex `...$`)
+    prev = None
+    while prev != text:
+        prev = text
+        text = text.strip().strip(_MUSIC_CHARS)
+    return text
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.unlink(path)
+    except Exception:
+        pass
 
 
 class TranslatorPipeline:
@@ -32,8 +62,10 @@ class TranslatorPipeline:
         audio: Any,
         power: Any,
         device_env: str = "DEV",
+        config: Optional[dict] = None,
         **models,
     ) -> None:
+        self.config = config or {}
         self.display = display
         self.buttons = buttons
         self.audio = audio
@@ -49,6 +81,79 @@ class TranslatorPipeline:
         self.nlp_en = models.get("nlp_en")
         self.nlp_vi = models.get("nlp_vi")
         self.skeleton = models.get("skeleton")
+        # tuỳ chọn: device_app.utils.telemetry.Telemetry
+        self.telemetry = models.get("telemetry")
+
+        # ===== AUTO: chạy song song 2 STT, chọn ngôn ngữ =====
+        # chỉ khi PIPELINE.AUTO.ENABLED + có đủ 2 STT; không thì nút MODE bỏ qua AUTO
+        self.auto_detector: Optional[AutoLanguageDetector] = None
+        auto_cfg = (self.config.get("PIPELINE") or {}).get("AUTO") or {}
+        if auto_cfg.get("ENABLED", False) and self.stt_vi is not None and self.stt_en is not None:
+            self.auto_detector = AutoLanguageDetector.from_config(
+                self.config, self.stt_vi, self.stt_en
+            )
+
+        # ===== SEGMENTATION (trước NMT) =====
+        seg_cfg = (self.config.get("NMT") or {}).get("SEGMENT") or {}
+        if seg_cfg.get("ENABLED", True):
+            self.segmenter_vi = Segmenter.from_config(self.config, "vi")
+            self.segmenter_en = Segmenter.from_config(self.config, "en")
+        else:
+            self.segmenter_vi = self.segmenter_en = None
+
+        # ===== STREAMING NMT → TTS =====
+        stream_cfg = (self.config.get("PIPELINE") or {}).get("STREAMING") or {}
+        self.streaming = bool(stream_cfg.get("ENABLED", True))
+        self.stream_queue_size = int(stream_cfg.get("QUEUE_SIZE", 2))
+
+        # ===== INCREMENTAL: dịch transcript tạm trong lúc còn nói =====
+        inc_cfg = (self.config.get("PIPELINE") or {}).get("INCREMENTAL") or {}
+        self.incremental = bool(inc_cfg.get("ENABLED", False))
+        self.incremental_interval_sec = float(inc_cfg.get("INTERVAL_SEC", 1.0))
+        self._partial_worker: Optional[PartialWorker] = None
+        self._inc_translator: Optional[IncrementalTranslator] = None  # lượt đang ghi
+        self._job_inc: Optional[IncrementalTranslator] = None  # lượt đang dịch
+        # phần bản dịch cuối đã có sẵn lúc nhả nút (None = không dùng incremental)
+        self.last_done_ratio: Optional[float] = None
+        # NLP.SPELL của câu gần nhất: {corrections, ms, truncated}
+        self.last_spell: Optional[dict] = None
+
+        # số lần quá hạn theo stage (DEADLINES)
+        self.timeouts: Dict[str, int] = {}
+
+        # ===== PHRASEBOOK (câu mẫu: bỏ qua NMT + TTS) =====
+        self.phrasebooks: Dict[Mode, Phrasebook] = {}
+        pb_cfg = self.config.get("PHRASEBOOK") or {}
+        if pb_cfg.get("ENABLED", False):
+            pb_dir = Path(pb_cfg.get("DIR", "artifacts/phrasebook"))
+            for mode, name in ((Mode.VI_EN, "vi_en"), (Mode.EN_VI, "en_vi")):
+                pb = Phrasebook.open_optional(
+                    pb_dir / f"{name}.pbk", min_score=float(pb_cfg.get("MIN_SCORE", 0.82))
+                )
+                if pb is not None:
+                    self.phrasebooks[mode] = pb
+            _log.info("phrasebook: %s", {m.name: len(pb) for m, pb in self.phrasebooks.items()})
+
+        # ===== QUEUE: ghi câu mới trong lúc câu trước còn đang dịch / nói =====
+        self.jobs: Optional[JobQueue] = JobQueue.from_config(self.config)
+        self._recording = False
+        self._busy = False
+        # câu đã nhả nút nhưng chưa nói xong (đang dừng ghi + chờ + đang dịch)
+        self.in_flight = 0
+        self._flight_lock = threading.Lock()
+
+        # chu kỳ việc định kỳ (power tick) trong event loop
+        self.tick_sec = float((self.config.get("PIPELINE") or {}).get("TICK_SEC", 1.0))
+
+        # ===== GOVERNOR: profile theo pin + nhiệt độ =====
+        self.governor: Optional[Governor] = Governor.from_config(self.config)
+        if self.governor is not None:
+            self.governor.on_change(self._apply_profile)
+        self.last_profile: Optional[str] = None
+        self._ready_since = 0.0
+
+        self._t_release: Optional[float] = None
+        self.last_first_audio_sec: Optional[float] = None
 
         self.device_env = (device_env or "DEV").upper()
         self.mode: Mode = Mode.VI_EN
@@ -57,9 +162,7 @@ class TranslatorPipeline:
         self._running = True
         self._talk_pressed_prev = False
 
-        print("[PIPELINE] Initializing pipeline")
-        print(f"[PIPELINE] Device env = {self.device_env}")
-        print("[PIPELINE] Ready")
+        _log.info("Ready (device env = %s)", self.device_env)
 
     # ==================================================
     # MAIN LOOP
@@ -71,13 +174,54 @@ class TranslatorPipeline:
         self._running = True
 
         self._safe_display_mode()
-        print("[PIPELINE] Device loop started:", self.mode)
+        _log.info("Device loop started: %s", self.mode)
+
+        worker = None
+        if self.jobs is not None:
+            worker = threading.Thread(target=self._job_worker, name="utterance", daemon=True)
+            worker.start()
+
+        try:
+            if hasattr(self.buttons, "get_event"):
+                self._run_event_loop()
+                return
+
+            # backend cũ chỉ hỗ trợ polling
+            while self._running:
+                self._safe_power_tick()
+                self._safe_mode_button()
+                self._safe_talk_button()
+                time.sleep(0.02)
+        finally:
+            if worker is not None:
+                # câu đang dịch dở được làm xong, câu còn chờ bị bỏ
+                self.jobs.close()
+                worker.join()
+
+    def _run_event_loop(self) -> None:
+        """
+        Block trên queue event nút bấm; timeout = hạn của việc định kỳ
+        kế tiếp (power tick) → lúc idle thread ngủ, không thức mỗi 20 ms.
+        """
+        next_tick = 0.0
 
         while self._running:
-            self._safe_power_tick()
-            self._safe_mode_button()
-            self._safe_talk_button()
-            time.sleep(0.02)
+            now = time.monotonic()
+            if now >= next_tick:
+                self._safe_power_tick()
+                next_tick = now + self.tick_sec
+                if not self._running:
+                    break
+
+            try:
+                evt = self.buttons.get_event(timeout=max(0.0, next_tick - time.monotonic()))
+            except Exception as e:
+                _log.warning("get_event failed: %s", e)
+                time.sleep(self.tick_sec)
+                continue
+
+            if evt is not None:
+                self._safe_button_event(evt)
 
     # ==================================================
     # POWER
@@ -86,6 +230,8 @@ class TranslatorPipeline:
     def _safe_power_tick(self) -> None:
         try:
             pct = self.power.get_percent()
+            if self.governor is not None:
+                self.governor.update(pct, soc_temp_c())
             self.display.show_status(
                 mode=self.mode,
                 state=self.state,
@@ -101,7 +247,41 @@ class TranslatorPipeline:
                 self._request_shutdown()
 
         except Exception as e:
-            print("[POWER] ignored:", e)
+            _log.warning("power tick ignored: %s", e)
+
+    # ==================================================
+    # BUTTON EVENTS (IRQ / SCRIPTED)
+    # ==================================================
+
+    def _safe_button_event(self, evt: Any) -> None:
+        try:
+            kind = evt.kind
+
+            if kind == "talk_down":
+                # không có QUEUE: nhấn trong lúc đang dịch/nói → bỏ (giống polling cũ)
+                if self._can_start_talk(evt.t):
+                    self._talk_pressed_prev = True
+                    self._handle_talk_start()
+
+            elif kind == "talk_up":
+                if self._talk_pressed_prev and self._recording:
+                    self._talk_pressed_prev = False
+                    self._handle_talk_stop()
+                else:
+                    self._talk_pressed_prev = False
+
+            elif kind == "mode_short":
+                self._toggle_mode()
+
+            elif kind == "mode_long":
+                self.display.show_status(
+                    mode=self.mode,
+                    state="SHUTDOWN",
+                )
+                self._request_shutdown()
+
+        except Exception as e:
+            _log.warning("button event ignored: %s", e)
 
     # ==================================================
     # MODE BUTTON
@@ -122,12 +302,12 @@ class TranslatorPipeline:
                 self._request_shutdown()
 
         except Exception as e:
-            print("[BUTTON] mode ignored:", e)
+            _log.warning("mode button ignored: %s", e)
 
     def _toggle_mode(self) -> None:
-        self.mode = Mode.EN_VI if self.mode == Mode.VI_EN else Mode.VI_EN
+        self.mode = Mode.cycle(self.mode, auto=self.auto_detector is not None)
         self._safe_display_mode()
-        print("[MODE] Switched to", self.mode)
+        _log.info("Mode switched to %s", self.mode)
 
     def _safe_display_mode(self) -> None:
         try:
@@ -143,11 +323,11 @@ class TranslatorPipeline:
         try:
             pressed = self.buttons.is_talk_pressed()
 
-            if pressed and not self._talk_pressed_prev and self.state == "READY":
+            if pressed and not self._talk_pressed_prev and self._can_start_talk(time.monotonic()):
                 self._talk_pressed_prev = True
                 self._handle_talk_start()
 
-            elif not pressed and self._talk_pressed_prev and self.state == "RECORDING":
+            elif not pressed and self._talk_pressed_prev and self._recording:
                 self._talk_pressed_prev = False
                 self._handle_talk_stop()
 
@@ -155,125 +335,499 @@ class TranslatorPipeline:
                 self._talk_pressed_prev = False
 
         except Exception as e:
-            print("[BUTTON] talk ignored:", e)
+            _log.warning("talk button ignored: %s", e)
 
     # ==================================================
     # TALK FLOW
     # ==================================================
 
+    def _can_start_talk(self, t: float) -> bool:
+        if self._recording:
+            return False
+        if self.jobs is None:
+            return self.state == "READY" and t >= self._ready_since
+        return True
+
     def _handle_talk_start(self) -> None:
-        print("[TALK] Start")
-        self.state = "RECORDING"
+        _log.info("Talk start")
+        self._recording = True
+        if not self._busy:
+            self.state = "RECORDING"
         self.display.show_status(mode=self.mode, state="LISTENING")
 
         try:
             self.audio.start_record()
         except Exception as e:
-            print("[AUDIO] start_record failed:", e)
-            self._back_to_ready()
+            _log.error("start_record failed: %s", e)
+            self._recording = False
+            if not self._busy:
+                self._back_to_ready()
+            return
+        self._start_incremental(self.mode)
 
     def _handle_talk_stop(self) -> None:
-        print("[TALK] Stop")
+        _log.info("Talk stop")
+        t_release = time.monotonic()
+        self._flight(+1)
+
+        wav_path = self._stop_recording()
+        if wav_path is None or self.device_env == "DEV":
+            self._flight(-1)
+            if not self._busy:
+                self._back_to_ready()
+            return
+
+        job = self._make_job(wav_path, self.mode, t_release)
+        if self.jobs is not None:
+            self._enqueue(job)
+            return
+        self._run_job(job)
 
+    def _run_job(self, job: UtteranceJob) -> None:
+        self._apply_pending_profile()
+        self._begin_job(job)
         try:
-            wav_path = self.audio.stop_record()
+            self.state = "TRANSLATING"
+            self._show_busy("TRANSLATING")
+
+            result = self._recognize(job.wav_path, job.mode)
+            if result is not None:
+                self._translate_result(result, job.mode)
+
+        except StageTimeout as e:
+            self._on_stage_timeout(e, job.mode)
+        except WorkerCrashed as e:
+            self._on_worker_crash(e, job.mode)
         except Exception as e:
-            print("[AUDIO] stop_record failed:", e)
-            self._back_to_ready()
-            return
+            _log.exception("talk flow error: %s", e)
 
-        print(f"[AUDIO] WAV saved: {wav_path}")
+        self._after_utterance()
+        self._busy = False
+        self._flight(-1)
+        self._back_to_ready()
 
-        if self.device_env == "DEV":
-            self._back_to_ready()
-            return
+    # ==================================================
+    # UTTERANCE QUEUE
+    # ==================================================
 
-        # ================= TRANSLATE =================
+    def is_idle(self) -> bool:
+        """READY và không còn câu nào đang dừng ghi / chờ / dịch."""
+        return self.state == "READY" and self.in_flight == 0
+
+    def _flight(self, delta: int) -> None:
+        with self._flight_lock:
+            self.in_flight += delta
+
+    def _enqueue(self, job: UtteranceJob) -> None:
+        dropped = self.jobs.put(job)
+        for d in dropped:
+            # câu bị bỏ không bao giờ tới STT → dọn WAV ngay, không để đầy /tmp
+            _remove_file(d.wav_path)
+        if dropped:
+            self._flight(-len(dropped))
+
+    def _make_job(self, wav_path: str, mode: Mode, t_release: float) -> UtteranceJob:
+        inc, self._inc_translator = self._inc_translator, None
+        return UtteranceJob(wav_path, mode, t_release, incremental=inc)
+
+    def _begin_job(self, job: UtteranceJob) -> None:
+        self._busy = True
+        # time-to-first-speech tính từ lúc nhả nút, kể cả thời gian chờ trong queue
+        self._t_release = job.t_release
+        self.last_first_audio_sec = None
+        self.last_done_ratio = None
+        self.last_spell = None
+        self._job_inc = job.incremental
+        if self.governor is not None:
+            self.last_profile = self.governor.profile.name
+            _log.info("utterance profile=%s", self.last_profile)
+
+    def _job_worker(self) -> None:
+        """Thread: lấy câu theo thứ tự ghi, dịch + nói lần lượt."""
+        while self._running:
+            job = self.jobs.get(timeout=0.5)
+            if job is not None:
+                self._run_job(job)
+
+    def _show_busy(self, label: str) -> None:
+        # đang ghi câu kế tiếp → giữ LISTENING trên màn hình
         try:
-            self.state = "TRANSLATING"
-            self.display.show_status(mode=self.mode, state="TRANSLATING")
+            self.display.show_status(
+                mode=self.mode, state="LISTENING" if self._recording else label
+            )
+        except Exception:
+            pass
 
-            # -------- STT --------
-            if self.mode == Mode.VI_EN:
-                text_in = self.stt_vi.transcribe_file(wav_path)
+    def _stop_recording(self) -> Optional[str]:
+        self._stop_incremental()
+        try:
+            wav_path = self.audio.stop_record()
+        except Exception as e:
+            _log.error("stop_record failed: %s", e)
+            return None
+        finally:
+            self._recording = False
+
+        _log.debug("WAV saved: %s", wav_path)
+        return wav_path
+
+    def _recognize(self, wav_path: str, mode: Mode) -> Optional[dict]:
+        """
+        STT + NLP. Trả về result của NLP, hoặc None nếu đã nói fallback
+        (STT rỗng, độ tin cậy thấp...) và không cần dịch tiếp.
+
+        Mode.AUTO: result["mode"] = hướng dịch đã chọn (VI_EN / EN_VI).
+        """
+        # -------- STT (+ độ tin cậy nếu backend có) --------
+        conf = None
+        if mode == Mode.AUTO and self.auto_detector is not None:
+            det = self.auto_detector.detect(wav_path)
+            mode, text_in, conf = det.mode, det.text, det.confidence
+            _log.info("AUTO → %s in %.3fs scores=%s", mode.name, det.sec, det.scores)
+        else:
+            stt = self.stt_vi if mode == Mode.VI_EN else self.stt_en
+            if hasattr(stt, "transcribe_with_confidence"):
+                res = stt.transcribe_with_confidence(wav_path)
+                text_in, conf = res.text, res.confidence
             else:
-                text_in = self.stt_en.transcribe_file(wav_path)
+                text_in = stt.transcribe_file(wav_path)
+
+        _log_text.debug("STT text in: %r", text_in)
+
+        # -------- NLP (lọc câu rác trước NMT/TTS) --------
+        nlp = self.nlp_vi if mode == Mode.VI_EN else self.nlp_en
+        result = nlp.process(text_in) if conf is None else nlp.process(text_in, conf)
+        _log_text.debug("NLP result: %s", result)
+        if not result.get("ok") and result.get("reason") not in (None, "empty"):
+            _log.info("rejected before NMT: %s (%.2f)", result["reason"], result["confidence"])
+
+        if not result.get("ok"):
+            self._speak_fallback(result.get("fallback", ""), mode)
+            return None
+
+        spell = result.get("spell")
+        if spell is not None:
+            self.last_spell = spell
+            if spell["corrections"] or spell["truncated"]:
+                _log.info(
+                    "spell: %d corrections in %.2f ms%s",
+                    spell["corrections"],
+                    spell["ms"],
+                    " (budget hit)" if spell["truncated"] else "",
+                )
+            if "stt_text" in result:
+                _log_text.debug("spell %r → %r", result["stt_text"], result["text"])
+        result["mode"] = mode
+        return result
+
+    def _translate_result(self, result: dict, mode: Mode) -> None:
+        """NMT + TTS cho 1 câu đã qua NLP."""
+        mode = result.get("mode", mode)
+
+        # ===== PHRASEBOOK HIT → câu dịch đã duyệt + audio có sẵn =====
+        pb = self.phrasebooks.get(mode)
+        hit = pb.lookup(result["text"]) if pb is not None else None
+        if hit is not None:
+            self._speak_phrase(hit, self.tts_en if mode == Mode.VI_EN else self.tts_vi)
+            return
 
-            print("[STT] Text in:", repr(text_in))
+        if mode == Mode.VI_EN:
+            # ===== SKELETON EXTRACT =====
+            skel, slots = self.skeleton.extract_vi(result["text"])
 
-            # -------- NLP --------
-            nlp = self.nlp_vi if self.mode == Mode.VI_EN else self.nlp_en
-            result = nlp.process(text_in)
-            print("[NLP] Result:", result)
+            # ===== MAKE NMT-SAFE TOKENS =====
+            # "[PN0]" → "PN_PN0" cho mọi slot trong 1 lượt sub
+            safe_skel, safe_slots = SlotEngine.rekey(skel, slots)
+            _log_text.debug("skeleton %r slots %s", safe_skel, safe_slots)
 
-            if not result.get("ok"):
-                self._speak_fallback(result.get("fallback", ""))
-                self._back_to_ready()
-                return
+            # ===== NMT → COMPOSE BACK → TTS =====
+            def finish_en(translated: str) -> str:
+                text_out = self.skeleton.compose(translated, safe_slots)
+                # --- strip music marks only ---
+                return _strip_music_marks(text_out)
+
+            self._translate_and_speak(
+                self.nmt_vi_en,
+                safe_skel,
+                self.segmenter_vi,
+                finish_en,
+                self.tts_en,
+                tag="VI->EN",
+            )
 
-            # -------- NMT + TTS --------
-            if self.mode == Mode.VI_EN:
-                # ===== SKELETON EXTRACT =====
-                skel, slots = self.skeleton.extract_vi(result["text"])
-                print("[SKELETON][VI] skel =", skel)
-                print("[SKELETON][VI] slots =", slots)
+        else:
+            # ===== EN -> VI (BỎ skeleton HOÀN TOÀN) =====
+            src_text = result["text"]
+            _log_text.debug("NMT EN->VI input: %r", src_text)
+            self._translate_and_speak(
+                self.nmt_en_vi,
+                src_text,
+                self.segmenter_en,
+                _strip_music_marks,
+                self.tts_vi,
+                tag="EN->VI",
+            )
 
-                # ===== MAKE NMT-SAFE TOKENS =====
-                safe_skel = skel
-                safe_slots = {}
+    # ==================================================
+    # NMT (SEGMENTED + BATCHED)
+    # ==================================================
 
-                for ph, value in slots.items():
-                    # ví dụ ph = "[PN0]"
-                    name = re.sub(r"^\[|\]$", "", ph)  # PN0
-                    safe_token = f"PN_{name}"  # PN_PN0
+    def _translate(self, nmt: Any, text: str, segments: List[str]) -> str:
+        """
+        Câu dài → tách đoạn → dịch cả batch trong 1 lần generate → ghép lại.
+        Câu ngắn (1 đoạn) đi thẳng vào translate() như cũ.
+        """
+        if len(segments) <= 1 or not hasattr(nmt, "translate_batch"):
+            return nmt.translate(text)
 
-                    safe_skel = safe_skel.replace(ph, safe_token)
-                    safe_slots[safe_token] = value
+        _log_text.debug("NMT %d segments: %s", len(segments), segments)
+        outputs = nmt.translate_batch(segments)
+        translated = Segmenter.join(outputs)
 
-                print("[SKELETON][VI] safe_skel =", safe_skel)
-                print("[SKELETON][VI] safe_slots =", safe_slots)
+        # slot PN_* phải còn nguyên sau khi ghép
+        missing = set(slot_tokens(text)) - set(slot_tokens(translated))
+        if missing:
+            _log.warning("slots lost in segment output: %s", sorted(missing))
 
-                # ===== NMT =====
-                print("[NMT][VI->EN] input :", safe_skel)
-                translated = self.nmt_vi_en.translate(safe_skel)
-                print("[NMT][VI->EN] output:", translated)
+        return translated
 
-                # ===== COMPOSE BACK =====
-                text_out = self.skeleton.compose(translated, safe_slots)
-                print("[FINAL][EN]:", text_out)
+    # ==================================================
+    # NMT → TTS (PIPELINED)
+    # ==================================================
 
-                # --- strip music marks only ---
-                text_out = _strip_music_marks(text_out)
-                print("[FINAL][EN][CLEAN]:", repr(text_out))
+    def _translate_and_speak(
+        self,
+        nmt: Any,
+        text: str,
+        segmenter: Optional[Segmenter],
+        finish: Callable[[str], str],
+        tts: Any,
+        *,
+        tag: str,
+    ) -> None:
+        """
+        - Nhiều đoạn + STREAMING bật: NMT đoạn i+1 chạy song song khi
+          đoạn i đang được tổng hợp / phát (SegmentStreamer)
+        - Ngược lại: dịch batch cả câu rồi mới nói như cũ
+        """
+        segments = segmenter.split(text) if segmenter else []
+        inc = self._take_incremental(nmt)
+
+        if self.streaming and len(segments) > 1 and hasattr(tts, "render"):
+            _log.debug("%s streaming %d segments", tag, len(segments))
+            streamer = SegmentStreamer(
+                translate=lambda seg: finish(
+                    inc.translate_final(seg) if inc else nmt.translate(seg)
+                ),
+                render=tts.render,
+                play=tts.play_file,
+                # TTSProxy (MODEL_SERVER): render() trả handle PCM, không phải file
+                discard=getattr(tts, "discard", _remove_file),
+                queue_size=self.stream_queue_size,
+                on_first_audio=self._mark_first_audio,
+            )
+            stats = streamer.run(segments)
+            self._log_done_ratio(inc)
+            _log_text.debug("%s final (stream): %r", tag, Segmenter.join(stats.texts))
+            _log.info(
+                "stream first audio after %ss, total %.2fs",
+                stats.first_audio_sec,
+                stats.total_sec,
+            )
+            return
 
-                self.tts_en.speak(text_out)
+        if inc is not None:
+            translated = Segmenter.join([inc.translate_final(s) for s in segments or [text]])
+            self._log_done_ratio(inc)
+        else:
+            translated = self._translate(nmt, text, segments)
+        _log_text.debug("%s NMT output: %r", tag, translated)
 
-            else:
-                # ===== EN -> VI (BỎ skeleton HOÀN TOÀN) =====
-                src_text = result["text"]
-                print("[NMT][EN->VI] input :", src_text)
+        text_out = finish(translated)
+        _log_text.debug("%s final: %r", tag, text_out)
 
-                translated = self.nmt_en_vi.translate(src_text)
-                print("[NMT][EN->VI] output:", translated)
+        self._speak(tts, text_out)
 
-                # --- strip music marks only ---
-                translated = _strip_music_marks(translated)
-                print("[FINAL][VI][CLEAN]:", repr(translated))
+    # ==================================================
+    # INCREMENTAL (PARTIAL TRANSCRIPTS)
+    # ==================================================
+
+    def _start_incremental(self, mode: Mode) -> None:
+        """Sau start_record: bật worker STT + NMT tạm (chỉ VI_EN / EN_VI)."""
+        self._inc_translator = None
+        # đang dịch câu trước → không tranh CPU với nó
+        if self._busy or not self.incremental or mode == Mode.AUTO:
+            return
+        if not hasattr(self.audio, "snapshot"):
+            return
 
-                self.tts_vi.speak(translated)
+        if mode == Mode.VI_EN:
+            stt, nmt, segmenter = self.stt_vi, self.nmt_vi_en, self.segmenter_vi
 
+            def prepare(text: str) -> str:
+                # cùng đầu vào NMT như câu cuối → đoạn trùng mới dùng lại được
+                skel, slots = self.skeleton.extract_vi(text)
+                return SlotEngine.rekey(skel, slots)[0]
+
+        else:
+            stt, nmt, segmenter = self.stt_en, self.nmt_en_vi, self.segmenter_en
+
+            def prepare(text: str) -> str:
+                return text
+
+        if not hasattr(stt, "transcribe_detailed") or nmt is None:
+            return
+
+        self._inc_translator = IncrementalTranslator(nmt, segmenter)
+        self._partial_worker = PartialWorker(
+            snapshot=self.audio.snapshot,
+            transcribe=lambda audio: stt.transcribe_detailed(audio).text,
+            translator=self._inc_translator,
+            prepare=prepare,
+            interval_sec=self.incremental_interval_sec,
+        )
+        self._partial_worker.start()
+
+    def _stop_incremental(self) -> None:
+        worker, self._partial_worker = self._partial_worker, None
+        if worker is not None:
+            worker.stop()
+
+    def _take_incremental(self, nmt: Any) -> Optional[IncrementalTranslator]:
+        """Translator của câu đang dịch, nếu cùng model NMT (cùng hướng)."""
+        inc, self._job_inc = self._job_inc, None
+        if inc is None or inc.nmt is not nmt or not inc.partials:
+            return None
+        return inc
+
+    def _log_done_ratio(self, inc: Optional[IncrementalTranslator]) -> None:
+        if inc is None:
+            return
+        self.last_done_ratio = inc.done_ratio
+        _log.info(
+            "incremental: %d partials, %d decodes, %.0f%% done at release",
+            inc.partials,
+            inc.decodes,
+            100 * inc.done_ratio,
+        )
+
+    def _speak(self, tts: Any, text: str) -> None:
+        if not hasattr(tts, "render"):
+            self._mark_first_audio()
+            tts.speak(text)
+            return
+
+        wav_path = tts.render(text)
+        self._mark_first_audio()
+        tts.play_file(wav_path, delete=True)
+
+    def _speak_phrase(self, hit: PhraseHit, tts: Any) -> None:
+        _log.info("phrasebook hit (%.2f): %r", hit.score, hit.source)
+        if hit.wav_path and os.path.isfile(hit.wav_path) and hasattr(tts, "play_file"):
+            self._mark_first_audio()
+            tts.play_file(hit.wav_path, delete=False)
+            return
+        # index dựng với --no-audio → vẫn bỏ qua NMT, chỉ còn TTS
+        self._speak(tts, hit.target)
+
+    def _mark_first_audio(self) -> None:
+        if self._t_release is None or self.last_first_audio_sec is not None:
+            return
+        self.last_first_audio_sec = time.monotonic() - self._t_release
+        _log.info("time-to-first-speech = %.3fs", self.last_first_audio_sec)
+
+    # ==================================================
+    # GOVERNOR
+    # ==================================================
+
+    def _apply_profile(self, profile: PerfProfile) -> None:
+        """
+        Phần nhẹ của profile, chạy ngay trong power tick (event loop).
+        Model đổi sau, giữa 2 câu → _apply_pending_profile.
+        """
+        self.tick_sec = profile.tick_sec
+        if hasattr(self.display, "set_max_fps"):
+            self.display.set_max_fps(profile.display_fps)
+        if hasattr(self.power, "set_interval"):
+            self.power.set_interval(profile.battery_sample_sec)
+
+    def _apply_pending_profile(self) -> None:
+        """
+        Thread model, trước câu kế tiếp: load STT variant, đổi beam / thread
+        torch → không chặn nút / màn hình, không đổi model giữa lúc inference.
+        """
+        profile = self.governor.take_pending() if self.governor is not None else None
+        if profile is None:
+            return
+        try:
+            for nmt in (self.nmt_vi_en, self.nmt_en_vi):
+                if hasattr(nmt, "set_num_beams"):
+                    nmt.set_num_beams(profile.num_beams)
+            for stt in (self.stt_vi, self.stt_en):
+                if hasattr(stt, "set_variant"):
+                    stt.set_variant(profile.stt_variant)
+            set_torch_threads(profile.torch_threads)
         except Exception as e:
-            print("[PIPELINE] talk flow error:", e)
+            _log.warning("apply %s failed: %s", profile.name, e)
 
-        self._back_to_ready()
+    # ==================================================
+    # TELEMETRY
+    # ==================================================
+
+    def _after_utterance(self) -> None:
+        """Sau mỗi câu: malloc_trim (tuỳ chọn) + ghi 1 mẫu telemetry."""
+        if self.telemetry is None:
+            return
+        extra: Dict[str, Any] = {"queue": self.jobs.stats()} if self.jobs is not None else {}
+        if self.last_profile is not None:
+            extra["profile"] = self.last_profile
+        if self.last_spell is not None:
+            extra["spell"] = self.last_spell
+        try:
+            self.telemetry.after_utterance(
+                mode=self.mode.name, first_audio_sec=self.last_first_audio_sec, **extra
+            )
+        except Exception as e:
+            _log.warning("telemetry sample failed: %s", e)
 
     # ==================================================
     # FALLBACK
     # ==================================================
 
-    def _speak_fallback(self, text: str) -> None:
+    def _on_stage_timeout(self, e: StageTimeout, mode: Mode) -> None:
+        """Stage quá hạn: ghi event rồi nói câu báo lỗi (đã render sẵn)."""
+        self.timeouts[e.stage] = self.timeouts.get(e.stage, 0) + 1
+        _log.warning("timeout: stage=%s budget=%.1fs", e.stage, e.budget_sec)
+        if self.telemetry is not None:
+            try:
+                self.telemetry.sample("timeout", stage=e.stage, budget_sec=e.budget_sec)
+            except Exception:
+                pass
+
+        if e.stage == "playback":
+            return  # loa đang treo → nói thêm cũng không ra tiếng
+        self._speak_error(mode)
+
+    def _on_worker_crash(self, e: WorkerCrashed, mode: Mode) -> None:
+        """Process model chết giữa câu (MODEL_SERVER): supervisor tự khởi động lại."""
+        _log.error("%s", e)
+        if self.telemetry is not None:
+            try:
+                self.telemetry.sample("worker_crash", worker=e.worker, reason=e.reason)
+            except Exception:
+                pass
+        # câu báo lỗi đã render sẵn → phát từ file, kể cả khi worker TTS chết
+        self._speak_error(mode)
+
+    def _speak_error(self, mode: Mode) -> None:
+        nlp = self.nlp_vi if mode == Mode.VI_EN else self.nlp_en
+        text = getattr(nlp, "error_text", "")
+        if text:
+            self._speak_fallback(text, mode)
+
+    def _speak_fallback(self, text: str, mode: Optional[Mode] = None) -> None:
         try:
-            if self.mode == Mode.VI_EN:
+            if (mode or self.mode) == Mode.VI_EN:
                 self.tts_vi.speak(text)
             else:
                 self.tts_en.speak(text)
@@ -285,17 +839,23 @@ class TranslatorPipeline:
     # ==================================================
 
     def _request_shutdown(self) -> None:
-        print("[SYSTEM] Shutdown requested")
+        _log.info("Shutdown requested")
         self._running = False
         try:
             self.power.shutdown()
         except Exception as e:
-            print("[SYSTEM] shutdown failed:", e)
+            _log.error("shutdown failed: %s", e)
 
     # ==================================================
     # STATE
     # ==================================================
 
     def _back_to_ready(self) -> None:
+        if self._recording:
+            # câu kế tiếp đang được ghi (QUEUE)
+            self.state = "RECORDING"
+            self._show_busy("LISTENING")
+            return
         self.state = "READY"
+        self._ready_since = time.monotonic()
         self._safe_display_mode()
@@ -11,3 +11,29 @@ class State(Enum):
     RECORDING = auto()
     TRANSLATING = auto()
     SPEAKING = auto()
+
+    @property
+    def label(self) -> str:
+        """Chữ hiển thị trên OLED."""
+        return _LABELS.get(self, self.name)
+
+    def can_transition(self, to: "State") -> bool:
+        return to in TRANSITIONS.get(self, ())
+
+
+class InvalidTransition(RuntimeError):
+    pass
+
+
+# Chuyển trạng thái hợp lệ. Mọi lỗi giữa chừng đều quay về READY.
+TRANSITIONS = {
+    # READY → TRANSLATING: câu đã ghi xong đang chờ trong QUEUE
+    State.READY: (State.RECORDING, State.TRANSLATING),
+    State.RECORDING: (State.TRANSLATING, State.READY),
+    State.TRANSLATING: (State.SPEAKING, State.READY),
+    State.SPEAKING: (State.READY,),
+}
+
+_LABELS = {
+    State.RECORDING: "LISTENING",
+}
@@ -0,0 +1,194 @@
+# device_app/core/streaming.py
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class StreamStats:
+    """Thống kê 1 lần chạy streamer (giây, tính từ lúc bắt đầu run)."""
+
+    segments: int = 0
+    first_audio_sec: Optional[float] = None
+    total_sec: float = 0.0
+    texts: List[str] = field(default_factory=list)
+
+
+class _Failed:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+_DONE = object()
+
+
+class SegmentStreamer:
+    """
+    Pipeline NMT → TTS chồng lấp theo từng đoạn (producer / consumer).
+
+        [NMT thread] --q_text--> [SYNTH thread] --q_audio--> [caller: play]
+
+    - Hàng đợi giữa các stage có giới hạn (queue_size): NMT không chạy
+      quá xa so với loa, không giữ quá nhiều WAV tạm
+    - Phát đúng thứ tự đoạn (idx), kể cả khi stage trả về lệch thứ tự
+    - Lỗi ở bất kỳ stage nào được ném lại ở thread gọi run()
+
+    Thời gian tới tiếng đầu tiên = latency của đoạn ĐẦU, không phải cả câu.
+    """
+
+    def __init__(
+        self,
+        *,
+        translate: Callable[[str], str],
+        render: Callable[[str], Any],
+        play: Callable[[Any], None],
+        discard: Optional[Callable[[Any], None]] = None,
+        queue_size: int = 2,
+        on_first_audio: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.translate = translate
+        self.render = render
+        self.play = play
+        self.discard = discard
+        self.queue_size = max(1, int(queue_size))
+        self.on_first_audio = on_first_audio
+
+        self._stop = threading.Event()
+
+    # ==================================================
+    # PUBLIC
+    # ==================================================
+
+    def run(self, segments: Sequence[str]) -> StreamStats:
+        stats = StreamStats(segments=len(segments))
+        if not segments:
+            return stats
+
+        self._stop.clear()
+        q_text: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        q_audio: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        t0 = time.monotonic()
+        workers = [
+            threading.Thread(
+                target=self._nmt_stage, args=(segments, q_text), name="stream-nmt", daemon=True
+            ),
+            threading.Thread(
+                target=self._synth_stage, args=(q_text, q_audio), name="stream-tts", daemon=True
+            ),
+        ]
+        for w in workers:
+            w.start()
+
+        try:
+            self._play_stage(q_audio, stats, t0)
+        finally:
+            # dừng sớm (lỗi ở giữa chừng) → cho các stage thoát, dọn WAV còn lại
+            self._stop.set()
+            self._drain(q_text)
+            self._drain(q_audio)
+            for w in workers:
+                w.join(timeout=1.0)
+            self._drain(q_audio)
+
+        stats.total_sec = time.monotonic() - t0
+        return stats
+
+    # ==================================================
+    # STAGES
+    # ==================================================
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _nmt_stage(self, segments: Sequence[str], q_text: queue.Queue) -> None:
+        try:
+            for idx, seg in enumerate(segments):
+                if self._stop.is_set():
+                    return
+                if not self._put(q_text, (idx, self.translate(seg))):
+                    return
+        except BaseException as e:  # noqa: BLE001 - chuyển lỗi sang thread chính
+            self._put(q_text, (-1, _Failed(e)))
+            return
+        self._put(q_text, (-1, _DONE))
+
+    def _synth_stage(self, q_text: queue.Queue, q_audio: queue.Queue) -> None:
+        while not self._stop.is_set():
+            try:
+                idx, text = q_text.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            if text is _DONE or isinstance(text, _Failed):
+                self._put(q_audio, (idx, text))
+                return
+
+            try:
+                audio = self.render(text) if text else None
+            except BaseException as e:  # noqa: BLE001
+                self._put(q_audio, (-1, _Failed(e)))
+                return
+
+            if not self._put(q_audio, (idx, (text, audio))):
+                self._release(audio)
+                return
+
+    def _play_stage(self, q_audio: queue.Queue, stats: StreamStats, t0: float) -> None:
+        pending: Dict[int, Any] = {}
+        next_idx = 0
+
+        while True:
+            idx, item = q_audio.get()
+
+            if isinstance(item, _Failed):
+                raise item.exc
+            if item is _DONE:
+                return
+
+            pending[idx] = item
+            while next_idx in pending:
+                text, audio = pending.pop(next_idx)
+                next_idx += 1
+                stats.texts.append(text)
+                if audio is None:
+                    continue
+
+                if stats.first_audio_sec is None:
+                    stats.first_audio_sec = time.monotonic() - t0
+                    if self.on_first_audio is not None:
+                        self.on_first_audio()
+                try:
+                    self.play(audio)
+                finally:
+                    self._release(audio)
+
+    # ==================================================
+    # HELPERS
+    # ==================================================
+
+    def _release(self, audio: Any) -> None:
+        if audio is not None and self.discard is not None:
+            try:
+                self.discard(audio)
+            except Exception:
+                pass
+
+    def _drain(self, q: queue.Queue) -> None:
+        while True:
+            try:
+                _, item = q.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, tuple) and len(item) == 2:
+                self._release(item[1])
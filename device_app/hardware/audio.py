@@ -10,6 +10,11 @@ import sounddevice as sd
 import soundfile as sf
 from scipy.signal import resample_poly
 
+from device_app.utils.log import get_logger
+from device_app.utils.thread_budget import audio_affinity
+
+_log = get_logger("audio")
+
 
 class create_audio:
     """
@@ -38,9 +43,17 @@ class create_audio:
         self._stream: Optional[sd.InputStream] = None
         self._frames: list[np.ndarray] = []
 
-        print(
-            f"[AUDIO] Init | HW_SR={self.hw_sr} | STT_SR={self.stt_sr} "
-            f"| CH={self.channels} | IN_DEV={self.input_device} | OUT_DEV={self.output_device}"
+        # cờ status của callback PortAudio: chỉ đếm, log sau khi dừng ghi
+        self.input_overflows = 0
+        self.input_status_other = 0
+
+        _log.info(
+            "Init | HW_SR=%s | STT_SR=%s | CH=%s | IN_DEV=%s | OUT_DEV=%s",
+            self.hw_sr,
+            self.stt_sr,
+            self.channels,
+            self.input_device,
+            self.output_device,
         )
 
     # ==================================================
@@ -52,10 +65,16 @@ class create_audio:
             raise RuntimeError("Recording already started")
 
         self._frames.clear()
+        self.input_overflows = 0
+        self.input_status_other = 0
 
         def callback(indata, frames, time_info, status):
+            # thread PortAudio: không I/O, không format chuỗi
             if status:
-                print("[AUDIO] input status:", status)
+                if status.input_overflow:
+                    self.input_overflows += 1
+                else:
+                    self.input_status_other += 1
             self._frames.append(indata.copy())
 
         self._stream = sd.InputStream(
@@ -65,8 +84,22 @@ class create_audio:
             device=self.input_device,
             callback=callback,
         )
-        self._stream.start()
-        print("[AUDIO] Recording started")
+        # thread callback PortAudio được tạo ở đây → kế thừa AUDIO_CORES
+        with audio_affinity():
+            self._stream.start()
+        _log.debug("Recording started")
+
+    def snapshot(self) -> Optional[np.ndarray]:
+        """Audio 16 kHz đã thu tới lúc này (đang ghi vẫn gọi được) → STT tạm."""
+        if self._stream is None:
+            return None
+        frames = list(self._frames)  # callback vẫn append song song
+        if not frames:
+            return None
+        audio = np.concatenate(frames, axis=0).squeeze()
+        if self.hw_sr != self.stt_sr:
+            audio = resample_poly(audio, self.stt_sr, self.hw_sr)
+        return audio.astype(np.float32, copy=False)
 
     def stop_record(self) -> str:
         if self._stream is None:
@@ -76,6 +109,13 @@ class create_audio:
         self._stream.close()
         self._stream = None
 
+        if self.input_overflows or self.input_status_other:
+            _log.warning(
+                "input status during recording: overflow=%d other=%d",
+                self.input_overflows,
+                self.input_status_other,
+            )
+
         audio = np.concatenate(self._frames, axis=0).squeeze()
         self._frames.clear()
 
@@ -95,7 +135,7 @@ class create_audio:
         wav_path = self.tmp_dir / f"rec_{uuid.uuid4().hex[:8]}.wav"
         sf.write(wav_path, audio, self.stt_sr, subtype="PCM_16")
 
-        print(f"[AUDIO] Saved: {wav_path}")
+        _log.debug("Saved: %s", wav_path)
         return str(wav_path)
 
     # ==================================================
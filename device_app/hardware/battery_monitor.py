@@ -0,0 +1,195 @@
+# device_app/hardware/battery_monitor.py
+from __future__ import annotations
+
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Optional
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("power")
+
+
+@dataclass(frozen=True)
+class BatteryReading:
+    """Snapshot bất biến, được thay nguyên cục → đọc không cần lock."""
+
+    percent: int = 100
+    voltage: Optional[float] = None
+    low: bool = False
+    samples: int = 0
+    errors: int = 0
+    t: float = 0.0
+
+
+class BatteryMonitor:
+    """
+    Thread lấy mẫu pin nền cho ADS1015.
+
+    - Đọc ADC với tần số thấp (SAMPLE_SEC), không phải mỗi vòng 20 ms
+      → không tranh bus I2C với OLED
+    - Lọc median (loại gai) rồi EMA (làm mượt)
+    - Ngưỡng pin yếu có hysteresis: LOW khi <= LOW_PCT, chỉ hết LOW khi
+      >= RECOVER_PCT (tránh nhấp nháy quanh 10%)
+    - Kết quả publish bằng cách gán 1 BatteryReading mới (gán tham chiếu
+      là nguyên tử) → pipeline / display đọc lock-free
+
+    Giữ nguyên API của PowerManager (get_percent / is_low / shutdown)
+    nên pipeline không phải sửa gì.
+    """
+
+    def __init__(
+        self,
+        read_voltage: Callable[[], float],
+        to_percent: Callable[[float], int],
+        *,
+        interval_sec: float = 5.0,
+        ema_alpha: float = 0.3,
+        median_window: int = 5,
+        low_pct: int = 10,
+        recover_pct: int = 15,
+        shutdown: Optional[Callable[[], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._read_voltage = read_voltage
+        self._to_percent = to_percent
+        self.interval_sec = max(0.1, float(interval_sec))
+        self.ema_alpha = min(1.0, max(0.0, float(ema_alpha))) or 1.0
+        self.low_pct = int(low_pct)
+        self.recover_pct = max(int(recover_pct), self.low_pct)
+        self._shutdown = shutdown
+        self._clock = clock
+
+        self._window: Deque[float] = deque(maxlen=max(1, int(median_window)))
+        self._ema: Optional[float] = None
+        self._samples = 0
+        self._errors = 0
+
+        self.latest = BatteryReading()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================================================
+    # LIFECYCLE
+    # ==================================================
+
+    def start(self) -> "BatteryMonitor":
+        if self._thread is not None:
+            return self
+        self.sample_once()  # có giá trị thật ngay từ đầu
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="battery-monitor", daemon=True
+        )
+        self._thread.start()
+        _log.info("Battery monitor started (every %ss)", self.interval_sec)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            self.sample_once()
+
+    def set_interval(self, interval_sec: float) -> None:
+        """Governor: đọc ADC thưa hơn (áp dụng từ chu kỳ kế tiếp)."""
+        self.interval_sec = max(0.1, float(interval_sec))
+
+    # ==================================================
+    # SAMPLING
+    # ==================================================
+
+    def sample_once(self) -> BatteryReading:
+        """1 lần đọc ADC + lọc + publish. Gọi trực tiếp được trong test."""
+        prev = self.latest
+        try:
+            v = float(self._read_voltage())
+        except Exception as e:
+            self._errors += 1
+            # I2C lỗi lặp lại mỗi chu kỳ → RateLimitFilter gộp lại
+            _log.warning("ADC read failed: %s", e)
+            self.latest = BatteryReading(
+                percent=prev.percent,
+                voltage=prev.voltage,
+                low=prev.low,
+                samples=self._samples,
+                errors=self._errors,
+                t=self._clock(),
+            )
+            return self.latest
+
+        self._samples += 1
+        self._window.append(v)
+        med = statistics.median(self._window)
+
+        if self._ema is None:
+            self._ema = med
+        else:
+            self._ema += self.ema_alpha * (med - self._ema)
+
+        pct = int(self._to_percent(self._ema))
+
+        # ---- hysteresis ----
+        if prev.low:
+            low = pct < self.recover_pct
+        else:
+            low = pct <= self.low_pct
+
+        self.latest = BatteryReading(
+            percent=pct,
+            voltage=self._ema,
+            low=low,
+            samples=self._samples,
+            errors=self._errors,
+            t=self._clock(),
+        )
+        return self.latest
+
+    # ==================================================
+    # POWER MANAGER API (lock-free reads)
+    # ==================================================
+
+    def get_percent(self) -> int:
+        return self.latest.percent
+
+    def is_low(self) -> bool:
+        return self.latest.low
+
+    @property
+    def errors(self) -> int:
+        return self.latest.errors
+
+    def shutdown(self) -> None:
+        self.stop()
+        if self._shutdown is not None:
+            self._shutdown()
+
+
+def create_battery_monitor(cfg: dict, power: Any) -> Any:
+    """
+    Bọc PowerManager bằng BatteryMonitor. Backend không có read_voltage
+    (DummyPowerManager) thì trả về nguyên như cũ.
+    """
+    if not hasattr(power, "read_voltage"):
+        return power
+
+    p_cfg = cfg.get("POWER", cfg)
+    monitor = BatteryMonitor(
+        power.read_voltage,
+        power.voltage_to_percent,
+        interval_sec=p_cfg.get("SAMPLE_SEC", 5.0),
+        ema_alpha=p_cfg.get("EMA_ALPHA", 0.3),
+        median_window=p_cfg.get("MEDIAN_WINDOW", 5),
+        low_pct=p_cfg.get("LOW_PCT", 10),
+        recover_pct=p_cfg.get("RECOVER_PCT", 15),
+        shutdown=power.shutdown,
+    )
+    return monitor.start()
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import queue
+import threading
 import time
-from typing import Optional
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
 
 try:
     import RPi.GPIO as GPIO
@@ -10,6 +13,24 @@ try:
 except Exception:
     _HAS_GPIO = False
 
+from device_app.utils.log import get_logger
+
+_log = get_logger("buttons")
+
+
+# ================= EVENTS =================
+
+TALK_DOWN = "talk_down"
+TALK_UP = "talk_up"
+MODE_SHORT = "mode_short"
+MODE_LONG = "mode_long"
+
+
+@dataclass(frozen=True)
+class ButtonEvent:
+    kind: str  # TALK_DOWN / TALK_UP / MODE_SHORT / MODE_LONG
+    t: float  # time.monotonic() lúc xảy ra cạnh (không phải lúc xử lý)
+
 
 class GpioButtons:
     """
@@ -26,11 +47,13 @@ class GpioButtons:
     COOLDOWN_SEC = 0.4  # chặn spam mode
 
     def __init__(self, cfg: dict):
-        btn_cfg = cfg.get("BUTTON", {})
+        # config.yaml dùng BUTTONS.TALK_PIN; giữ tương thích BUTTON.TALK_GPIO cũ
+        btn_cfg = cfg.get("BUTTONS") or cfg.get("BUTTON") or {}
 
-        self.talk_pin = int(btn_cfg.get("TALK_GPIO", 17))
-        self.mode_pin = int(btn_cfg.get("MODE_GPIO", 27))
+        self.talk_pin = int(btn_cfg.get("TALK_PIN", btn_cfg.get("TALK_GPIO", 17)))
+        self.mode_pin = int(btn_cfg.get("MODE_PIN", btn_cfg.get("MODE_GPIO", 27)))
         self.active_low = btn_cfg.get("ACTIVE_LOW", True)
+        self.LONG_PRESS_SEC = float(btn_cfg.get("LONG_PRESS_SEC", self.LONG_PRESS_SEC))
 
         self._mode_last = False
         self._mode_press_t0: Optional[float] = None
@@ -42,7 +65,7 @@ class GpioButtons:
             GPIO.setup(self.talk_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
             GPIO.setup(self.mode_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
-        print(f"[BUTTON] GPIO ready (TALK={self.talk_pin}, MODE={self.mode_pin})")
+        _log.info("GPIO ready (TALK=%s, MODE=%s)", self.talk_pin, self.mode_pin)
 
     # ================= LOW LEVEL =================
 
@@ -105,18 +128,165 @@ class GpioButtons:
         return None
 
 
+class IrqGpioButtons(GpioButtons):
+    """
+    GPIO backend dùng ngắt (edge-detect callback) thay vì polling 20 ms.
+
+    - Callback của RPi.GPIO chỉ đọc mức chân + đẩy ButtonEvent (có timestamp)
+      vào queue; main loop block trên get_event(timeout)
+    - MODE long-press: timer được hẹn lúc nhấn, hết LONG_PRESS_SEC mà
+      vẫn giữ → MODE_LONG (1 lần duy nhất)
+    """
+
+    def __init__(self, cfg: dict):
+        super().__init__(cfg)
+        self._events: "queue.Queue[ButtonEvent]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._talk_down = False
+        self._mode_down = False
+        self._mode_timer: Optional[threading.Timer] = None
+
+        if _HAS_GPIO:
+            bounce_ms = max(1, int(self.DEBOUNCE_SEC * 1000))
+            GPIO.add_event_detect(
+                self.talk_pin, GPIO.BOTH, callback=self._on_edge, bouncetime=bounce_ms
+            )
+            GPIO.add_event_detect(
+                self.mode_pin, GPIO.BOTH, callback=self._on_edge, bouncetime=bounce_ms
+            )
+
+        _log.info("IRQ mode (edge-detect callbacks)")
+
+    # ================= IRQ CALLBACK =================
+
+    def _on_edge(self, pin: int) -> None:
+        now = time.monotonic()
+        pressed = self._read(pin)
+        with self._lock:
+            if pin == self.talk_pin:
+                self._talk_edge(pressed, now)
+            elif pin == self.mode_pin:
+                self._mode_edge(pressed, now)
+
+    def _talk_edge(self, pressed: bool, now: float) -> None:
+        if pressed == self._talk_down:
+            return  # bounce còn sót: cùng mức với lần trước
+        self._talk_down = pressed
+        self._events.put(ButtonEvent(TALK_DOWN if pressed else TALK_UP, now))
+
+    def _mode_edge(self, pressed: bool, now: float) -> None:
+        if pressed == self._mode_down:
+            return
+        self._mode_down = pressed
+
+        if pressed:
+            self._mode_press_t0 = now
+            self._mode_handled = False
+            self._mode_timer = threading.Timer(
+                self.LONG_PRESS_SEC, self._mode_long_fire, args=(now,)
+            )
+            self._mode_timer.daemon = True
+            self._mode_timer.start()
+            return
+
+        if self._mode_timer is not None:
+            self._mode_timer.cancel()
+            self._mode_timer = None
+
+        t0 = self._mode_press_t0
+        self._mode_press_t0 = None
+        if (
+            t0 is not None
+            and not self._mode_handled
+            and (now - t0) >= self.DEBOUNCE_SEC
+            and (now - self._mode_last_action) >= self.COOLDOWN_SEC
+        ):
+            self._mode_last_action = now
+            self._events.put(ButtonEvent(MODE_SHORT, now))
+
+    def _mode_long_fire(self, press_t0: float) -> None:
+        with self._lock:
+            if self._mode_down and self._mode_press_t0 == press_t0 and not self._mode_handled:
+                self._mode_handled = True
+                self._events.put(ButtonEvent(MODE_LONG, time.monotonic()))
+
+    # ================= EVENT API =================
+
+    def get_event(self, timeout: Optional[float] = None) -> Optional[ButtonEvent]:
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def is_talk_pressed(self) -> bool:
+        return self._talk_down
+
+    def close(self) -> None:
+        if _HAS_GPIO:
+            for pin in (self.talk_pin, self.mode_pin):
+                try:
+                    GPIO.remove_event_detect(pin)
+                except Exception:
+                    pass
+
+
 class DebugButtons:
+    """
+    Backend không có phần cứng.
+
+    script: danh sách (delay_sec, kind) – delay tính từ event trước đó.
+    Ví dụ nhấn giữ TALK 2 giây rồi tắt máy:
+
+        DebugButtons(script=[(1.0, "talk_down"), (2.0, "talk_up"), (5.0, "mode_long")])
+
+    Không có script → get_event chỉ ngủ tới timeout (idle = 0% CPU).
+    """
+
+    def __init__(self, script: Optional[Iterable[Tuple[float, str]]] = None):
+        self._events: "queue.Queue[ButtonEvent]" = queue.Queue()
+        self._talk_down = False
+        self._script = list(script or [])
+        self._thread: Optional[threading.Thread] = None
+
+    def press(self, kind: str) -> None:
+        """Đẩy 1 event ngay lập tức (dùng từ test / REPL)."""
+        if kind == TALK_DOWN:
+            self._talk_down = True
+        elif kind == TALK_UP:
+            self._talk_down = False
+        self._events.put(ButtonEvent(kind, time.monotonic()))
+
+    def _play_script(self) -> None:
+        for delay, kind in self._script:
+            time.sleep(max(0.0, float(delay)))
+            self.press(kind)
+
+    def get_event(self, timeout: Optional[float] = None) -> Optional[ButtonEvent]:
+        if self._script and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._play_script, name="debug-buttons", daemon=True
+            )
+            self._thread.start()
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
     def poll_mode_event(self):
         return None
 
     def is_talk_pressed(self):
-        return False
+        return self._talk_down
 
 
 def create_buttons(cfg: dict):
     mode = str(cfg.get("BUTTON_MODE", "gpio")).lower()
     if mode == "gpio":
-        print("[BUTTON] Using GPIO backend")
+        btn_cfg = cfg.get("BUTTONS") or cfg.get("BUTTON") or {}
+        if btn_cfg.get("IRQ", True):
+            _log.info("Using GPIO backend (IRQ)")
+            return IrqGpioButtons(cfg)
+        _log.info("Using GPIO backend (polling)")
         return GpioButtons(cfg)
-    print("[BUTTON] Using DEBUG backend")
+    _log.info("Using DEBUG backend")
     return DebugButtons()
@@ -1,24 +1,54 @@
 from __future__ import annotations
 
-from typing import Any
-from luma.core.interface.serial import i2c
-from luma.oled.device import ssd1306
-from luma.core.render import canvas
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+from PIL import Image, ImageDraw
 
-class Display:
-    """
-    OLED SSD1306 (128x64)
+from device_app.utils.log import get_logger
 
-    Hiển thị DUY NHẤT:
-    - Mode
-    - Status
-    - Battery %
+_log = get_logger("display")
+
+PAGE_ROWS = 8  # SSD1306: 1 page = 8 hàng pixel, 1 byte / cột
+
+
+# ================= FRAME =================
+
+
+def render_frame(width: int, height: int, lines: Tuple[str, str, str]) -> Image.Image:
+    """Vẽ 3 dòng MODE / STATE / BAT vào ảnh 1-bit (giống layout cũ)."""
+    img = Image.new("1", (width, height), 0)
+    draw = ImageDraw.Draw(img)
+    for y, line in zip((0, 18, 36), lines):
+        draw.text((0, y), line, fill=255)
+    return img
+
+
+def to_pages(img: Image.Image) -> List[bytes]:
+    """
+    Ảnh 1-bit → danh sách page theo định dạng GDDRAM của SSD1306:
+    mỗi byte là 1 cột 8 pixel, bit 0 = hàng trên cùng của page.
     """
+    w, h = img.size
+    px = np.asarray(img.convert("L"), dtype=np.uint8) > 0
+    pages = px.reshape(h // PAGE_ROWS, PAGE_ROWS, w).transpose(0, 2, 1)
+    packed = np.packbits(pages, axis=2, bitorder="little")[:, :, 0]
+    return [packed[p].tobytes() for p in range(packed.shape[0])]
+
+
+# ================= BACKENDS =================
+
+
+class Ssd1306Backend:
+    """Ghi thẳng page vào GDDRAM qua I2C (luma chỉ dùng cho init + serial)."""
 
     def __init__(self, config: dict[str, Any]) -> None:
-        disp_cfg = config.get("DISPLAY", {})
+        from luma.core.interface.serial import i2c
+        from luma.oled.device import ssd1306
 
+        disp_cfg = config.get("DISPLAY", {})
         self.width = disp_cfg.get("WIDTH", 128)
         self.height = disp_cfg.get("HEIGHT", 64)
 
@@ -28,9 +58,92 @@ class Display:
         )
         self.device = ssd1306(serial, width=self.width, height=self.height)
 
-        self._last = {"mode": None, "state": None, "battery": None}
+        _log.info("OLED SSD1306 initialized")
+
+    def write_pages(self, changed: Dict[int, bytes]) -> None:
+        # gộp các page liền nhau thành 1 cửa sổ → ít transaction I2C hơn
+        for first, last in _runs(sorted(changed)):
+            self.device.command(0x21, 0, self.width - 1)  # column range
+            self.device.command(0x22, first, last)  # page range
+            self.device.data(list(b"".join(changed[p] for p in range(first, last + 1))))
+
+
+class FramebufferBackend:
+    """Backend headless cho test / DISPLAY_MODE=debug: giữ GDDRAM trong RAM."""
+
+    def __init__(self, width: int = 128, height: int = 64) -> None:
+        self.width = width
+        self.height = height
+        self.pages: List[bytes] = [bytes(width)] * (height // PAGE_ROWS)
+        self.flushes = 0
+        self.pages_sent = 0
+        self.bytes_sent = 0
+
+    def write_pages(self, changed: Dict[int, bytes]) -> None:
+        for p, data in changed.items():
+            self.pages[p] = data
+        self.flushes += 1
+        self.pages_sent += len(changed)
+        self.bytes_sent += sum(len(d) for d in changed.values())
+
+    def image(self) -> Image.Image:
+        """Dựng lại ảnh từ GDDRAM (để so sánh trong test)."""
+        packed = np.frombuffer(b"".join(self.pages), dtype=np.uint8)
+        packed = packed.reshape(len(self.pages), self.width, 1)
+        bits = np.unpackbits(packed, axis=2, bitorder="little")
+        px = bits.transpose(0, 2, 1).reshape(self.height, self.width)
+        return Image.fromarray((px * 255).astype(np.uint8)).convert("1")
+
+
+def _runs(pages: List[int]) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    for p in pages:
+        if runs and runs[-1][1] == p - 1:
+            runs[-1] = (runs[-1][0], p)
+        else:
+            runs.append((p, p))
+    return runs
 
-        print("[DISPLAY] OLED SSD1306 initialized")
+
+# ================= SERVICE =================
+
+
+class Display:
+    """
+    OLED SSD1306 (128x64) – render ở thread riêng
+
+    Hiển thị DUY NHẤT:
+    - Mode
+    - Status
+    - Battery %
+
+    - show_* chỉ ghi lại trạng thái MỚI NHẤT rồi trả về ngay (không đụng I2C)
+    - Thread render gộp các trạng thái trung gian, giới hạn MAX_FPS
+    - So khung hình theo page, chỉ gửi những page thay đổi
+    """
+
+    def __init__(self, backend: Any, *, max_fps: float = 10.0) -> None:
+        self.backend = backend
+        self.width = backend.width
+        self.height = backend.height
+        self.min_interval = 1.0 / max(0.1, float(max_fps))
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending: Optional[Tuple[str, str, str]] = None
+        self._shown: Optional[Tuple[str, str, str]] = None
+        self._battery: Optional[str] = None
+        self._pages: Optional[List[bytes]] = None
+        self._last_flush = 0.0
+        self._shown_ok = True  # frame trước lên màn được → lỗi mới log WARNING
+
+        self.requests = 0
+        self.frames = 0
+        self.errors = 0
+
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="display", daemon=True)
+        self._thread.start()
 
     # ================= PUBLIC API =================
 
@@ -51,27 +164,100 @@ class Display:
     ) -> None:
         mode_name = getattr(mode, "short_label", str(mode)) if mode else "--"
         state_text = state or "--"
-        bat_text = f"{int(battery)}%" if battery is not None else "--"
 
-        # tránh redraw thừa
-        if (
-            self._last["mode"] == mode_name
-            and self._last["state"] == state_text
-            and self._last["battery"] == bat_text
-        ):
-            return
+        with self._lock:
+            # battery=None (vd: show_mode) → giữ % đã biết thay vì hiện "--"
+            if battery is not None:
+                self._battery = f"{int(battery)}%"
+            bat_text = self._battery or "--"
 
-        self._last.update({"mode": mode_name, "state": state_text, "battery": bat_text})
+            self._pending = (
+                f"MODE: {mode_name}",
+                f"STATE: {state_text}",
+                f"BAT: {bat_text}",
+            )
+            self.requests += 1
+        self._wake.set()
 
-        with canvas(self.device) as draw:
-            draw.text((0, 0), f"MODE: {mode_name}", fill=255)
-            draw.text((0, 18), f"STATE: {state_text}", fill=255)
-            draw.text((0, 36), f"BAT: {bat_text}", fill=255)
+    def set_max_fps(self, max_fps: float) -> None:
+        """Governor: làm tươi thưa hơn khi tiết kiệm (bus I2C + CPU)."""
+        self.min_interval = 1.0 / max(0.1, float(max_fps))
 
     def show_battery(self, percent: int | float) -> None:
         # battery luôn được vẽ lại thông qua show_status
         pass
 
+    def flush(self, timeout: float = 1.0) -> None:
+        """Chờ tới khi trạng thái mới nhất đã lên màn (dùng trong test)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._pending is None or self._pending == self._shown:
+                    return
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+
+    # ================= RENDER THREAD =================
+
+    def _loop(self) -> None:
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+            if not self._running:
+                return
+
+            # giới hạn tốc độ làm tươi: các yêu cầu đến trong lúc chờ bị gộp
+            wait = self._last_flush + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            with self._lock:
+                lines = self._pending
+            if lines is None or lines == self._shown:
+                continue
+
+            try:
+                self._draw(lines)
+            except Exception as e:
+                # chưa lên màn → không đánh dấu _shown, thử lại lượt sau (vẫn theo MAX_FPS)
+                self.errors += 1
+                log = _log.warning if self._shown_ok else _log.debug  # lỗi liên tiếp: chỉ log lần đầu
+                log("render failed: %s", e)
+                self._shown_ok = False
+                self._wake.set()
+            else:
+                with self._lock:
+                    self._shown = lines
+                self._shown_ok = True
+            self._last_flush = time.monotonic()
+
+    def _draw(self, lines: Tuple[str, str, str]) -> None:
+        pages = to_pages(render_frame(self.width, self.height, lines))
+        if self._pages is None:
+            changed = dict(enumerate(pages))
+        else:
+            changed = {i: p for i, p in enumerate(pages) if p != self._pages[i]}
+
+        if changed:
+            self.backend.write_pages(changed)
+        self._pages = pages
+        self.frames += 1
+
 
 def create_display(config: dict[str, Any]) -> Display:
-    return Display(config)
+    disp_cfg = config.get("DISPLAY", {})
+    mode = str(config.get("DISPLAY_MODE", "oled")).lower()
+
+    if mode == "debug" or str(disp_cfg.get("BACKEND", "")).lower() == "framebuffer":
+        _log.info("Using headless framebuffer backend")
+        backend: Any = FramebufferBackend(
+            disp_cfg.get("WIDTH", 128), disp_cfg.get("HEIGHT", 64)
+        )
+    else:
+        backend = Ssd1306Backend(config)
+
+    return Display(backend, max_fps=disp_cfg.get("MAX_FPS", 10.0))
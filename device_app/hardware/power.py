@@ -3,6 +3,10 @@ from __future__ import annotations
 import time
 from typing import Optional
 
+from device_app.utils.log import get_logger
+
+_log = get_logger("power")
+
 
 class DummyPowerManager:
     def get_percent(self) -> int:
@@ -12,23 +16,26 @@ class DummyPowerManager:
         return False
 
     def shutdown(self):
-        print("[POWER] Dummy shutdown (ignored)")
+        _log.info("Dummy shutdown (ignored)")
 
 
 class PowerManager:
-    def __init__(self, cfg: dict):
+    def __init__(self, cfg: dict, *, chan=None):
         self.cfg = cfg
         self._failed = False
-        self._initialized = False
+        self._initialized = chan is not None
 
         self._ads = None
-        self._chan = None
+        self._chan = chan  # inject được (fake ADC cho test)
 
         self.r1 = float(cfg.get("R1", 33000))
         self.r2 = float(cfg.get("R2", 100000))
-        self.min_v = 3.2
-        self.max_v = 4.2
-        self.address = int(str(cfg.get("I2C_ADDRESS", "0x48")), 16)
+        self.min_v = float(cfg.get("MIN_V", 3.2))
+        self.max_v = float(cfg.get("MAX_V", 4.2))
+        self.channel = int(cfg.get("CHANNEL", 0))
+        addr = cfg.get("I2C_ADDRESS", 0x48)
+        # YAML đọc 0x48 thành int 72 → không parse lại theo hệ 16
+        self.address = addr if isinstance(addr, int) else int(str(addr), 0)
 
         self._last_percent = 100
 
@@ -37,7 +44,7 @@ class PowerManager:
             return
 
         self._initialized = True
-        print("[POWER] Initializing ADS1015 (safe)...")
+        _log.info("Initializing ADS1015 (safe)...")
 
         try:
             import board, busio
@@ -46,40 +53,53 @@ class PowerManager:
 
             i2c = busio.I2C(board.SCL, board.SDA)
             ads = ADS1015(i2c, address=self.address)
-            chan = AnalogIn(ads, 0)
+            chan = AnalogIn(ads, self.channel)
 
             # test read (CRITICAL)
             _ = chan.voltage
 
             self._ads = ads
             self._chan = chan
-            print("[POWER] ADS1015 ready")
+            _log.info("ADS1015 ready")
 
         except Exception as e:
-            print("[POWER] ADS1015 init failed → fallback:", e)
+            _log.error("ADS1015 init failed → fallback: %s", e)
             self._failed = True
 
-    def get_percent(self) -> int:
+    # ================= RAW READ =================
+
+    def read_voltage(self) -> float:
+        """
+        1 lần đọc I2C → điện áp pin (V). Ném lỗi nếu ADC không dùng được,
+        để BatteryMonitor đếm lỗi thay vì nuốt im lặng.
+        """
         self._init_adc_once()
 
         if self._failed or not self._chan:
-            return self._last_percent
+            raise RuntimeError("ADC not available")
 
+        v_adc = self._chan.voltage
+        return v_adc * (self.r1 + self.r2) / self.r2
+
+    def voltage_to_percent(self, vbat: float) -> int:
+        pct = int(100 * (vbat - self.min_v) / (self.max_v - self.min_v))
+        return max(0, min(100, pct))
+
+    # ================= LEGACY API =================
+
+    def get_percent(self) -> int:
         try:
-            v_adc = self._chan.voltage
-            vbat = v_adc * (self.r1 + self.r2) / self.r2
-            pct = int(100 * (vbat - self.min_v) / (self.max_v - self.min_v))
-            pct = max(0, min(100, pct))
-            self._last_percent = pct
-            return pct
+            pct = self.voltage_to_percent(self.read_voltage())
         except Exception:
             return self._last_percent
+        self._last_percent = pct
+        return pct
 
     def is_low(self) -> bool:
         return self.get_percent() <= 10
 
     def shutdown(self):
-        print("[POWER] Shutdown requested")
+        _log.info("Shutdown requested")
         import os
 
         os.system("sudo shutdown now")
@@ -89,5 +109,5 @@ def create_power_manager(cfg: dict):
     try:
         return PowerManager(cfg.get("POWER", cfg))
     except Exception as e:
-        print("[POWER] Fatal error → Dummy:", e)
+        _log.error("Fatal error → Dummy: %s", e)
         return DummyPowerManager()
@@ -1,16 +1,26 @@
 # device_app/main.py
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator, Optional
 
 # ===== CORE =====
 from device_app.core.modes import Mode
 from device_app.core.pipeline import TranslatorPipeline
+from device_app.core.async_pipeline import AsyncTranslatorPipeline
+from device_app.core.model_server import ModelSupervisor
+from device_app.utils.bundle import configure_bundles
 from device_app.utils.config import load_config
+from device_app.utils.deadline import configure_deadlines
+from device_app.utils.log import get_logger, setup_logging
+from device_app.utils.thread_budget import apply_thread_budget, log_thread_budget
+from device_app.utils.telemetry import Telemetry
 
 # ===== HARDWARE =====
 from device_app.hardware.display import create_display
 from device_app.hardware.buttons import create_buttons
 from device_app.hardware.audio import create_audio
 from device_app.hardware.power import create_power_manager
+from device_app.hardware.battery_monitor import create_battery_monitor
 
 # ===== MODELS =====
 from device_app.models.stt_vi import STTVi
@@ -26,51 +36,142 @@ from device_app.models.nlp.nlp_processor import NLPProcessorV2
 from device_app.models.nlp.skeleton_translation import SkeletonTranslator
 
 
+_log = get_logger("main")
+
+
+def build_models(
+    config: dict,
+    telemetry: Optional[Telemetry] = None,
+    supervisor: Optional[ModelSupervisor] = None,
+) -> dict:
+    """Load toàn bộ model → dict kwargs cho TranslatorPipeline."""
+    # telemetry: ghi RSS tăng thêm của từng model
+    track = telemetry.track_load if telemetry is not None else _no_track
+    # MODEL_SERVER: nhóm nào chạy ở worker thì dùng proxy, còn lại load tại chỗ
+    remote = supervisor.proxies() if supervisor is not None else {}
+
+    def load(name: str, factory):
+        with track(name):
+            return remote[name] if name in remote else factory(config)
+
+    stt_vi = load("stt_vi", STTVi)
+    stt_en = load("stt_en", STTEn)
+
+    nmt_vi_en = load("nmt_vi_en", NMTViEn)
+    nmt_en_vi = load("nmt_en_vi", NMTEnVi)
+
+    tts_vi = load("tts_vi", TTSVi)
+    tts_en = load("tts_en", TTSEn)
+
+    # NLP: mỗi ngôn ngữ 1 instance (fallback + ngưỡng độ tin cậy STT)
+    with track("nlp"):
+        nlp_vi = NLPProcessorV2.from_config(config, "vi")
+        nlp_en = NLPProcessorV2.from_config(config, "en")
+
+    # câu fallback / báo lỗi render sẵn → từ chối câu rác, stage quá hạn
+    # không phải chờ Piper
+    cache_dir = (config.get("TTS") or {}).get("CACHE_DIR", "artifacts/tts_cache")
+    for tts, nlp in ((tts_vi, nlp_vi), (tts_en, nlp_en)):
+        try:
+            tts.prerender([nlp.fallback_text, nlp.error_text], cache_dir)
+        except Exception as e:
+            _log.warning("prerender fallback failed: %s", e)
+
+    # Skeleton
+    skeleton = SkeletonTranslator()
+
+    models = dict(
+        stt_vi=stt_vi,
+        stt_en=stt_en,
+        nmt_vi_en=nmt_vi_en,
+        nmt_en_vi=nmt_en_vi,
+        tts_vi=tts_vi,
+        tts_en=tts_en,
+        nlp_vi=nlp_vi,
+        nlp_en=nlp_en,
+        skeleton=skeleton,
+    )
+    if telemetry is not None:
+        telemetry.after_models_loaded()
+        models["telemetry"] = telemetry
+    return models
+
+
+@contextmanager
+def _no_track(name: str) -> Iterator[None]:
+    yield
+
+
+def create_pipeline(
+    config: dict, *, display, buttons, audio, power, models: dict
+) -> TranslatorPipeline:
+    core = str((config.get("PIPELINE") or {}).get("CORE", "async")).lower()
+    pipeline_cls = AsyncTranslatorPipeline if core == "async" else TranslatorPipeline
+
+    return pipeline_cls(
+        display=display,
+        buttons=buttons,
+        audio=audio,
+        power=power,
+        device_env=config.get("DEVICE_ENV", "PROD"),
+        config=config,
+        **models,
+    )
+
+
 def main() -> None:
     here = Path(__file__).resolve().parent
     config = load_config(here / "config.yaml")
+    # chia core cho torch / ORT / piper / audio TRƯỚC mọi thread (log,
+    # display, nút bấm) → chúng không chạy trên core dành cho audio
+    apply_thread_budget(config)
+    # log qua queue → thread riêng; LOGGING.MODE=silent khi chạy thật
+    setup_logging(config)
+    log_thread_budget()
 
     # ========== HARDWARE ==========
     display = create_display(config)
     buttons = create_buttons(config)
     audio = create_audio()
-    power = create_power_manager(config)
-
-    # ========== MODELS ==========
-    # ========== MODELS ==========
-    stt_vi = STTVi(config)
-    stt_en = STTEn(config)
+    # ADC đọc ở thread nền, pipeline chỉ đọc giá trị đã lọc
+    power = create_battery_monitor(config, create_power_manager(config))
 
-    nmt_vi_en = NMTViEn(config)
-    nmt_en_vi = NMTEnVi(config)
+    # ========== TRACE (ghi phiên thật để replay) ==========
+    record_dir = (config.get("TRACE") or {}).get("RECORD_DIR")
+    if record_dir:
+        from device_app.sim.trace import TraceRecorder
 
-    tts_vi = TTSVi(config)
-    tts_en = TTSEn(config)
+        recorder = TraceRecorder(record_dir)
+        buttons, audio, power = recorder.wrap(buttons, audio, power)
 
-    # NLP: dùng chung 1 instance cho cả VI & EN
-    nlp = NLPProcessorV2(config)
+    # ========== MODELS ==========
+    # artifacts/bundles/* (mmap, checksum kiểm nền) nếu đã đóng gói
+    configure_bundles(config)
+    configure_deadlines(config)
+    telemetry = None
+    if (config.get("TELEMETRY") or {}).get("ENABLED", False):
+        telemetry = Telemetry.from_config(config)
+    # STT / NMT / TTS ở process riêng (MODEL_SERVER.ENABLED)
+    supervisor = ModelSupervisor.from_config(config)
+    if supervisor is not None:
+        supervisor.start()
+    models = build_models(config, telemetry, supervisor)
 
-    # Skeleton
-    skeleton = SkeletonTranslator()
     # ========== PIPELINE ==========
-    pipeline = TranslatorPipeline(
+    pipeline = create_pipeline(
+        config,
         display=display,
         buttons=buttons,
         audio=audio,
         power=power,
-        device_env=config.get("DEVICE_ENV", "PROD"),
-        stt_vi=stt_vi,
-        stt_en=stt_en,
-        nmt_vi_en=nmt_vi_en,
-        nmt_en_vi=nmt_en_vi,
-        tts_vi=tts_vi,
-        tts_en=tts_en,
-        nlp_vi=nlp,
-        nlp_en=nlp,
-        skeleton=skeleton,
+        models=models,
     )
 
-    pipeline.run(start_mode=Mode.VI_EN)
+    try:
+        pipeline.run(start_mode=Mode.VI_EN)
+    finally:
+        if supervisor is not None:
+            supervisor.close()
 
 
 if __name__ == "__main__":
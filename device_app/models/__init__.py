@@ -1,9 +1,22 @@
-from .stt_vi import STTVi
-from .stt_en import STTEn
-from .nmt_vi_en import NMTViEn
-from .nmt_en_vi import NMTEnVi
-from .tts_vi import TTSVi
-from .tts_en import TTSEn
+from importlib import import_module
+
+# Import lười (PEP 562): `device_app.models.nlp.*` chỉ là xử lý text thuần,
+# không được kéo theo onnxruntime / torch khi pipeline import chúng.
+_EXPORTS = {
+    "STTVi": ".stt_vi",
+    "STTEn": ".stt_en",
+    "NMTViEn": ".nmt_vi_en",
+    "NMTEnVi": ".nmt_en_vi",
+    "TTSVi": ".tts_vi",
+    "TTSEn": ".tts_en",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "STTVi",
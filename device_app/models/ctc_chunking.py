@@ -0,0 +1,90 @@
+# device_app/models/ctc_chunking.py
+"""
+STT CTC theo cửa sổ có chồng lấn → RAM đỉnh không phụ thuộc độ dài câu.
+
+Mỗi cửa sổ = [stride trái | lõi | stride phải]. Model chạy trên cả cửa sổ
+(có ngữ cảnh 2 bên), nhưng chỉ giữ logits của phần lõi; các lõi nối liền
+nhau nên ghép logits xong decode CTC 1 lần như clip ngắn.
+
+    ctc = ChunkedCTC(run_logits, chunk_sec=10, stride_sec=1)
+    ctc.feed(samples)   # gọi nhiều lần khi audio tới dần
+    logits = ctc.finish()
+"""
+from __future__ import annotations
+
+from typing import Callable, List
+
+import numpy as np
+
+
+class ChunkedCTC:
+    def __init__(
+        self,
+        run_logits: Callable[[np.ndarray], np.ndarray],
+        *,
+        sr: int = 16000,
+        chunk_sec: float = 10.0,
+        stride_sec: float = 1.0,
+    ) -> None:
+        """run_logits(samples[N]) → logits (T, V) của 1 cửa sổ."""
+        self.run_logits = run_logits
+        self.chunk = int(chunk_sec * sr)
+        self.stride = int(stride_sec * sr)
+        self.step = self.chunk - 2 * self.stride
+        if self.step <= 0:
+            raise ValueError("chunk_sec phải lớn hơn 2 * stride_sec")
+
+        self._buf = np.zeros(0, dtype=np.float32)
+        self._buf_start = 0  # vị trí tuyệt đối (sample) của _buf[0]
+        self._core = 0  # đầu lõi kế tiếp
+        self._total = 0
+        self._parts: List[np.ndarray] = []
+        self.windows = 0
+
+    # ================= INPUT =================
+
+    def feed(self, samples: np.ndarray) -> None:
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self._buf = np.concatenate([self._buf, samples]) if self._buf.size else samples
+        self._total += samples.shape[0]
+
+        # đủ lõi + stride phải → chạy được cửa sổ, không chờ hết câu
+        while self._total >= self._core + self.step + self.stride and self._total > self.chunk:
+            self._run(self._core, self._core + self.step, final=False)
+
+    def finish(self) -> np.ndarray:
+        if self._total == 0:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not self._parts and self._total <= self.chunk:
+            # clip ngắn: 1 lần chạy, không cắt gì
+            self.windows += 1
+            return self.run_logits(self._buf)
+        while self._core < self._total:
+            core_end = min(self._core + self.step, self._total)
+            # chỉ cửa sổ chạm cuối clip mới thiếu stride phải
+            self._run(self._core, core_end, final=core_end >= self._total)
+        return np.concatenate(self._parts, axis=0)
+
+    # ================= WINDOW =================
+
+    def _run(self, core_start: int, core_end: int, *, final: bool) -> None:
+        left = min(self.stride, core_start)
+        right = 0 if final else min(self.stride, self._total - core_end)
+        w0, w1 = core_start - left, core_end + right
+
+        window = self._buf[w0 - self._buf_start : w1 - self._buf_start]
+        logits = self.run_logits(window)
+        self.windows += 1
+
+        # frame ↔ sample theo tỉ lệ thực của model (wav2vec2 ≈ 320 sample / frame)
+        ratio = logits.shape[0] / max(1, window.shape[0])
+        drop_l = int(round(left * ratio))
+        keep = int(round((w1 - w0) * ratio)) - drop_l - int(round(right * ratio))
+        self._parts.append(np.ascontiguousarray(logits[drop_l : drop_l + max(0, keep)]))
+
+        self._core = core_end
+        # bỏ phần audio không còn cần (chỉ giữ stride trái cho cửa sổ sau)
+        cut = max(0, self._core - self.stride) - self._buf_start
+        if cut > 0:
+            self._buf = self._buf[cut:]
+            self._buf_start += cut
@@ -0,0 +1,84 @@
+# device_app/models/ctc_confidence.py
+"""
+Độ tin cậy STT tính từ logits CTC mà OnnxCTCSTT đã có sẵn (chỉ cần numpy).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SttConfidence:
+    """
+    - score       : trung bình điểm các từ (0..1) – con số NLP dùng để lọc
+    - frame_prob  : max-softmax trung bình trên các frame không phải blank
+    - blank_ratio : tỉ lệ frame blank (ồn / im lặng → gần 1)
+    - word_scores : điểm từng từ theo thứ tự trong text
+    - avg_logprob : log-prob trung bình / frame của đường greedy
+    """
+
+    score: float
+    frame_prob: float
+    blank_ratio: float
+    word_scores: Tuple[float, ...]
+    avg_logprob: float
+
+    @classmethod
+    def empty(cls) -> "SttConfidence":
+        return cls(0.0, 0.0, 1.0, (), float("-inf"))
+
+
+@dataclass(frozen=True)
+class SttResult:
+    text: str
+    confidence: SttConfidence
+
+
+def _log_softmax_max(logits: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(id argmax, log-prob của argmax) cho từng frame."""
+    logits = logits.astype(np.float32, copy=False)
+    ids = logits.argmax(axis=-1)
+    top = logits.max(axis=-1)
+    lse = top + np.log(np.exp(logits - top[:, None]).sum(axis=-1))
+    return ids, top - lse
+
+
+def ctc_confidence(logits: np.ndarray, *, blank_id: int, delim_id: Optional[int]) -> SttConfidence:
+    """
+    logits (T, V) của 1 câu. Từ = chuỗi frame không blank giữa 2 delimiter
+    "|"; điểm từ = trung bình max-softmax các frame phát ra ký tự của từ.
+    """
+    if logits.shape[0] == 0:
+        return SttConfidence.empty()
+
+    ids, logp = _log_softmax_max(logits)
+    prob = np.exp(logp)
+
+    blank = ids == blank_id
+    blank_ratio = float(blank.mean())
+    speech = ~blank
+    frame_prob = float(prob[speech].mean()) if speech.any() else 0.0
+
+    # nhóm frame theo từ: delimiter (hoặc hết câu) đóng từ hiện tại
+    words: List[float] = []
+    acc: List[float] = []
+    for i in np.flatnonzero(speech):
+        if delim_id is not None and ids[i] == delim_id:
+            if acc:
+                words.append(float(np.mean(acc)))
+                acc = []
+            continue
+        acc.append(float(prob[i]))
+    if acc:
+        words.append(float(np.mean(acc)))
+
+    return SttConfidence(
+        score=float(np.mean(words)) if words else 0.0,
+        frame_prob=frame_prob,
+        blank_ratio=blank_ratio,
+        word_scores=tuple(round(w, 3) for w in words),
+        avg_logprob=float(np.mean(logp)),
+    )
@@ -2,6 +2,8 @@
 import re
 from typing import Dict, Tuple
 
+from device_app.models.nlp.slots import SlotEngine, compile_patterns
+
 
 class CSP:
     """
@@ -33,6 +35,10 @@ class CSP:
         "organization": "zzorg",
     }
 
+    # compile 1 lần cho cả class (trước đây re.search compile lại mỗi câu)
+    _VI_RULES = compile_patterns(VI_PATTERNS, re.IGNORECASE)
+    _EN_RULES = compile_patterns(EN_PATTERNS, re.IGNORECASE)
+
     def __init__(self, lang: str):
         self.lang = lang
 
@@ -43,12 +49,13 @@ class CSP:
         - entities map để restore
         """
         entities = {}
-        patterns = self.VI_PATTERNS if self.lang == "vi" else self.EN_PATTERNS
+        rules = self._VI_RULES if self.lang == "vi" else self._EN_RULES
 
         protected_text = text
 
-        for pat, role in patterns:
-            m = re.search(pat, text, re.IGNORECASE)
+        # thứ tự pattern = độ ưu tiên → giữ vòng lặp, nhưng regex đã compile sẵn
+        for regex, role in rules:
+            m = regex.search(text)
             if not m:
                 continue
 
@@ -65,7 +72,7 @@ class CSP:
         return protected_text, entities
 
     def restore(self, text: str, entities: Dict[str, Dict]) -> str:
-        restored = text
+        values = {}
 
         for token, info in entities.items():
             value = info["value"]
@@ -74,13 +81,7 @@ class CSP:
             if self.lang == "en":
                 if role == "street":
                     value = f"{value} street"
-                elif role == "location":
-                    value = value
-                elif role == "person":
-                    value = value
-                elif role == "organization":
-                    value = value
 
-            restored = restored.replace(token, value)
+            values[token] = value
 
-        return restored
+        return SlotEngine.restore(text, values)
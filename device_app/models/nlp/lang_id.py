@@ -0,0 +1,74 @@
+# device_app/models/nlp/lang_id.py
+"""
+Nhận dạng VI / EN bằng bigram ký tự (models/data/bigram_{vi,en}.json).
+
+Dấu tiếng Việt (ă â ê ô ơ ư đ + thanh) tạo ra các bigram như "ươ", "iệ"
+hầu như không có trong tiếng Anh → vài từ là đủ phân biệt.
+"""
+from __future__ import annotations
+
+import json
+import math
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+LANGS = ("vi", "en")
+
+
+class BigramLangID:
+    def __init__(self, counts: Dict[str, Dict[str, int]]) -> None:
+        self.langs = tuple(counts)
+        vocab = {bg for c in counts.values() for bg in c}
+        v = len(vocab) + 1
+        self._logp: Dict[str, Dict[str, float]] = {}
+        self._unk: Dict[str, float] = {}
+        for lang, c in counts.items():
+            # add-one smoothing trên tập bigram chung
+            total = sum(c.values()) + v
+            self._logp[lang] = {bg: math.log((n + 1) / total) for bg, n in c.items()}
+            self._unk[lang] = math.log(1 / total)
+
+    @classmethod
+    def load(cls, data_dir: Path = DATA_DIR) -> "BigramLangID":
+        counts = {}
+        for lang in LANGS:
+            with open(Path(data_dir) / f"bigram_{lang}.json", "r", encoding="utf-8") as f:
+                counts[lang] = json.load(f)
+        return cls(counts)
+
+    @staticmethod
+    def bigrams(text: str) -> Tuple[str, ...]:
+        out = []
+        for word in unicodedata.normalize("NFC", text.lower()).split():
+            letters = "".join(ch for ch in word if ch.isalpha())
+            out.extend(letters[i : i + 2] for i in range(len(letters) - 1))
+        return tuple(out)
+
+    def log_likelihood(self, text: str) -> Dict[str, float]:
+        """Log-prob trung bình / bigram cho từng ngôn ngữ (text rỗng → 0)."""
+        bgs = self.bigrams(text)
+        if not bgs:
+            return {lang: 0.0 for lang in self.langs}
+        out = {}
+        for lang in self.langs:
+            logp, unk = self._logp[lang], self._unk[lang]
+            out[lang] = sum(logp.get(bg, unk) for bg in bgs) / len(bgs)
+        return out
+
+    def margin(self, text: str, lang: str) -> float:
+        """> 0 nghĩa là `text` giống `lang` hơn ngôn ngữ còn lại."""
+        ll = self.log_likelihood(text)
+        other = max(v for k, v in ll.items() if k != lang)
+        return ll[lang] - other
+
+    def classify(self, text: str) -> str:
+        ll = self.log_likelihood(text)
+        return max(ll, key=ll.get)
+
+
+@lru_cache(maxsize=1)
+def default_lang_id() -> BigramLangID:
+    return BigramLangID.load()
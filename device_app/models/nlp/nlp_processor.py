@@ -2,38 +2,178 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from device_app.models.nlp.spell import SpellIndex, read_protected
+from device_app.utils.log import get_logger
+
+_log = get_logger("nlp")
+
+FALLBACK = {
+    "vi": "Bạn nói lại giúp mình",
+    "en": "Please say again",
+}
+
+# stage quá hạn (DEADLINES) → báo lỗi thay vì im lặng
+ERROR_PROMPT = {
+    "vi": "Xin lỗi, máy đang bận, bạn thử lại nhé",
+    "en": "Sorry, something went wrong, please try again",
+}
+
 
 class NLPProcessorV2:
     """
     NLP POST-PROCESSOR – FINAL (GIAO TIẾP THỰC TẾ)
 
     - KHÔNG sửa câu
-    - KHÔNG chặn dịch
     - KHÔNG rule
     - KHÔNG entity
-    - CHỈ fallback khi STT rỗng
+    - Fallback khi STT rỗng
+    - Fallback sớm khi độ tin cậy STT thấp (ồn, nói không rõ) → không tốn
+      beam search NMT + Piper cho câu rác
+    - Sửa chính tả từ ngoài từ điển (NLP.SPELL, có ngân sách thời gian)
+      → NMT không phải cắt từ lạ thành subword vụn. Chỉ từ STT chấm điểm
+      thấp (< spell_max_score), không phải từ được bảo vệ
     """
 
-    def __init__(self, lang: str):
+    def __init__(
+        self,
+        lang: str,
+        *,
+        min_confidence: float = 0.0,
+        min_word_score: float = 0.0,
+        max_low_word_ratio: float = 1.0,
+        max_blank_ratio: float = 1.0,
+        speller: Optional[SpellIndex] = None,
+        spell_max_score: float = 0.4,
+    ):
         self.lang = lang
+        self.speller = speller
+        self.spell_max_score = float(spell_max_score)
+        # cộng dồn cả phiên (log / telemetry)
+        self.spell_stats: Dict[str, float] = {"utterances": 0, "corrections": 0, "ms": 0.0, "truncated": 0}
+        self.min_confidence = float(min_confidence)
+        self.min_word_score = float(min_word_score)
+        self.max_low_word_ratio = float(max_low_word_ratio)
+        self.max_blank_ratio = float(max_blank_ratio)
+
+    @classmethod
+    def from_config(cls, config: dict, lang: str) -> "NLPProcessorV2":
+        nlp_cfg = config.get("NLP") or {}
+        speller = cls._load_speller(nlp_cfg.get("SPELL") or {}, lang)
+
+        rej = nlp_cfg.get("REJECT") or {}
+        # từ "yếu" theo REJECT mới được sửa chính tả (kể cả khi tắt lọc câu)
+        spell_max_score = float(rej.get("MIN_WORD_SCORE", 0.4))
+        if not rej.get("ENABLED", True):
+            return cls(lang, speller=speller, spell_max_score=spell_max_score)
+        return cls(
+            lang,
+            min_confidence=float(rej.get("MIN_CONFIDENCE", 0.55)),
+            min_word_score=float(rej.get("MIN_WORD_SCORE", 0.4)),
+            max_low_word_ratio=float(rej.get("MAX_LOW_WORD_RATIO", 0.5)),
+            max_blank_ratio=float(rej.get("MAX_BLANK_RATIO", 0.98)),
+            speller=speller,
+            spell_max_score=spell_max_score,
+        )
+
+    @staticmethod
+    def _load_speller(spell_cfg: dict, lang: str) -> Optional[SpellIndex]:
+        if not spell_cfg.get("ENABLED", False):
+            return None
+        path = Path(spell_cfg.get("DIR", "artifacts/spell")) / f"{lang}.sym"
+        speller = SpellIndex.open_optional(
+            path,
+            max_edit=int(spell_cfg.get("MAX_EDIT", 2)),
+            min_len=int(spell_cfg.get("MIN_LEN", 3)),
+            budget_ms=float(spell_cfg.get("BUDGET_MS", 15.0)),
+            protected=read_protected(lang, spell_cfg.get("PROTECTED") or ()),
+        )
+        if speller is None:
+            _log.info("spell index %s missing (python -m device_app.tools.build_spell_index)", path)
+        return speller
+
+    @property
+    def fallback_text(self) -> str:
+        return FALLBACK["en"] if self.lang == "en" else FALLBACK["vi"]
+
+    @property
+    def error_text(self) -> str:
+        return ERROR_PROMPT["en"] if self.lang == "en" else ERROR_PROMPT["vi"]
 
-    def process(self, text: str) -> dict:
+    def _fallback(self, reason: str, confidence: float) -> dict:
+        return {
+            "ok": False,
+            "text": "",
+            "confidence": confidence,
+            "reason": reason,
+            "fallback": self.fallback_text,
+        }
+
+    def process(self, text: str, confidence: Optional[Any] = None) -> dict:
+        """
+        confidence: SttConfidence của OnnxCTCSTT (None = STT không có điểm,
+        giữ hành vi cũ: chỉ chặn câu rỗng).
+        """
         text = (text or "").strip()
 
         # ❌ STT rỗng → yêu cầu nói lại
         if not text:
-            return {
-                "ok": False,
-                "text": "",
-                "confidence": 0.0,
-                "fallback": (
-                    "Please say again" if self.lang == "en" else "Bạn nói lại giúp mình"
-                ),
+            return self._fallback("empty", 0.0)
+
+        if confidence is None:
+            # ✅ Có text → LUÔN CHO DỊCH
+            return self._spell(
+                {
+                    "ok": True,
+                    "text": text,
+                    "confidence": 0.6,  # chỉ để log
+                }
+            )
+
+        score = float(confidence.score)
+        words = confidence.word_scores
+        low = sum(1 for w in words if w < self.min_word_score)
+
+        # ❌ độ tin cậy thấp → fallback ngay, không dịch
+        if score < self.min_confidence:
+            return self._fallback("low_confidence", score)
+        if confidence.blank_ratio > self.max_blank_ratio:
+            return self._fallback("mostly_blank", score)
+        if words and low / len(words) > self.max_low_word_ratio:
+            return self._fallback("low_word_scores", score)
+
+        return self._spell(
+            {
+                "ok": True,
+                "text": text,
+                "confidence": score,
+                "word_scores": words,
             }
+        )
 
-        # ✅ Có text → LUÔN CHO DỊCH
-        return {
-            "ok": True,
-            "text": text,
-            "confidence": 0.6,  # chỉ để log
+    def _spell(self, result: dict) -> dict:
+        """
+        Chỉ câu đã qua lọc mới sửa chính tả (câu bị loại không tốn thêm gì).
+        Không có word_scores (STT không chấm điểm) → không biết từ nào sai → giữ nguyên.
+        """
+        if self.speller is None or not result.get("word_scores"):
+            return result
+        rep = self.speller.correct(result["text"], result["word_scores"], self.spell_max_score)
+
+        stats = self.spell_stats
+        stats["utterances"] += 1
+        stats["corrections"] += len(rep.corrections)
+        stats["ms"] += rep.ms
+        stats["truncated"] += int(rep.truncated)
+
+        if rep.corrections:
+            result["stt_text"] = result["text"]
+            result["text"] = rep.text
+        result["spell"] = {
+            "corrections": len(rep.corrections),
+            "ms": rep.ms,
+            "truncated": rep.truncated,
         }
+        return result
@@ -0,0 +1,226 @@
+# device_app/models/nlp/phrasebook.py
+"""
+Phrasebook: câu thông dụng (chào hỏi, giá cả, chỉ đường...) đã dịch sẵn
++ audio đã tổng hợp sẵn → bỏ qua NMT và Piper.
+
+Tra cứu mờ bằng trigram ký tự (bỏ dấu, bỏ dấu câu) → chịu được lỗi STT
+kiểu sai thanh, dính / tách chữ. Điểm = Dice(trigram câu nói, trigram câu mẫu).
+Trigram cao chưa đủ ("how much is that" ~ "how much is this" = 0.85): câu
+trúng còn phải khớp từng từ (agrees) — cùng chữ khi bỏ khoảng trắng, hoặc
+cùng số từ và lệch tối đa 1 từ, từ lệch chỉ sai 1 ký tự (lỗi STT, không phải
+từ khác).
+
+File index (.pbk) dựng offline bởi tools/build_phrasebook.py, mở bằng mmap:
+chỉ đọc header lúc boot, phần còn lại để OS nạp trang khi tra.
+
+    header   : MAGIC u32:version u32:n_entries u32:n_grams
+    entries  : n_entries × (src_off, src_len, tgt_off, tgt_len, wav_off, wav_len, n_grams)  u32
+    grams    : n_grams × gram_hash u32   (tăng dần → bisect)
+    post_idx : (n_grams + 1) × u32       (offset vào postings)
+    postings : u32 entry id
+    strings  : utf-8 (src, tgt, tên file wav)
+"""
+from __future__ import annotations
+
+import bisect
+import mmap
+import re
+import struct
+import unicodedata
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+MAGIC = b"PBK1"
+VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+_ENTRY_FIELDS = 7
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+# ================= NORMALIZE =================
+
+
+def normalize(text: str) -> str:
+    """Chữ thường, bỏ dấu thanh / dấu mũ, đ → d, bỏ dấu câu, gộp khoảng trắng."""
+    text = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def trigram_hashes(text: str) -> List[int]:
+    """Tập trigram (đã hash crc32) của câu đã normalize, có đệm 2 đầu."""
+    padded = f"  {normalize(text)} "
+    grams = {padded[i : i + 3] for i in range(len(padded) - 2)}
+    return sorted(zlib.crc32(g.encode("utf-8")) for g in grams)
+
+
+def _one_edit(a: str, b: str) -> bool:
+    """a, b khác nhau đúng 1 phép sửa (thay / thêm / bớt 1 ký tự)."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    skip = 1 if len(a) == len(b) else 0
+    return a[i + skip :] == b[i + 1 :]
+
+
+def agrees(query: str, source: str) -> bool:
+    """Khớp mức từ giữa 2 câu đã normalize (xem docstring module)."""
+    q, s = query.split(), source.split()
+    if "".join(q) == "".join(s):
+        return True
+    if len(q) != len(s):
+        return False
+    diff = [(a, b) for a, b in zip(q, s) if a != b]
+    if len(diff) > 1:
+        return False
+    a, b = diff[0]
+    return min(len(a), len(b)) >= 3 and _one_edit(a, b)
+
+
+@dataclass(frozen=True)
+class PhraseHit:
+    source: str
+    target: str
+    wav_path: Optional[str]
+    score: float
+
+
+# ================= BUILD =================
+
+
+def build_index(entries: Sequence[Tuple[str, str, str]], out_path: str | Path) -> Path:
+    """entries: (câu nguồn, câu dịch, tên file wav trong cùng thư mục | "")."""
+    out_path = Path(out_path)
+    grams_per_entry = [trigram_hashes(src) for src, _, _ in entries]
+
+    postings: Dict[int, List[int]] = {}
+    for i, grams in enumerate(grams_per_entry):
+        for g in grams:
+            postings.setdefault(g, []).append(i)
+    keys = sorted(postings)
+
+    blob = bytearray()
+    table: List[int] = []
+    for (src, tgt, wav), grams in zip(entries, grams_per_entry):
+        row = []
+        for s in (src, tgt, wav):
+            b = s.encode("utf-8")
+            row += [len(blob), len(b)]
+            blob += b
+        table += row + [len(grams)]
+
+    post_idx = [0]
+    flat: List[int] = []
+    for k in keys:
+        flat += postings[k]
+        post_idx.append(len(flat))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(entries), len(keys)))
+        for arr in (table, keys, post_idx, flat):
+            f.write(struct.pack(f"<{len(arr)}I", *arr))
+        f.write(bytes(blob))
+    return out_path
+
+
+# ================= LOOKUP =================
+
+
+class Phrasebook:
+    def __init__(self, path: str | Path, *, min_score: float = 0.82) -> None:
+        self.path = Path(path)
+        self.audio_dir = self.path.parent
+        self.min_score = float(min_score)
+
+        self._f = open(self.path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, g = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: không phải phrasebook v{VERSION}")
+        self.size = n
+
+        # memoryview cast 'I' → đọc u32 trực tiếp trên mmap, không copy
+        words = memoryview(self._mm)[_HEADER.size :]
+        end = (len(words) // 4) * 4
+        u32 = words[:end].cast("I")
+        self._entries = u32[: n * _ENTRY_FIELDS]
+        self._grams = u32[n * _ENTRY_FIELDS : n * _ENTRY_FIELDS + g]
+        pos = n * _ENTRY_FIELDS + g
+        self._post_idx = u32[pos : pos + g + 1]
+        n_post = self._post_idx[g] if g else 0
+        self._postings = u32[pos + g + 1 : pos + g + 1 + n_post]
+        self._strings_at = _HEADER.size + (pos + g + 1 + n_post) * 4
+
+    @classmethod
+    def open_optional(cls, path: str | Path, **kwargs) -> Optional["Phrasebook"]:
+        return cls(path, **kwargs) if Path(path).is_file() else None
+
+    def close(self) -> None:
+        for view in (self._entries, self._grams, self._post_idx, self._postings):
+            view.release()
+        self._mm.close()
+        self._f.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _str(self, off: int, length: int) -> str:
+        start = self._strings_at + off
+        return self._mm[start : start + length].decode("utf-8")
+
+    def entry(self, i: int) -> Tuple[str, str, Optional[str]]:
+        e = self._entries[i * _ENTRY_FIELDS : (i + 1) * _ENTRY_FIELDS]
+        wav = self._str(e[4], e[5])
+        return (
+            self._str(e[0], e[1]),
+            self._str(e[2], e[3]),
+            str(self.audio_dir / wav) if wav else None,
+        )
+
+    def lookup(self, text: str) -> Optional[PhraseHit]:
+        query = trigram_hashes(text)
+        if not query:
+            return None
+
+        overlap: Counter = Counter()
+        for h in query:
+            k = bisect.bisect_left(self._grams, h)
+            if k < len(self._grams) and self._grams[k] == h:
+                overlap.update(self._postings[self._post_idx[k] : self._post_idx[k + 1]])
+        if not overlap:
+            return None
+
+        scored = []
+        for i, common in overlap.items():
+            n_grams = self._entries[i * _ENTRY_FIELDS + 6]
+            score = 2.0 * common / (len(query) + n_grams)
+            if score >= self.min_score:
+                scored.append((score, i))
+
+        said = normalize(text)
+        for score, i in sorted(scored, reverse=True):
+            src, tgt, wav = self.entry(i)
+            if agrees(said, normalize(src)):
+                return PhraseHit(source=src, target=tgt, wav_path=wav, score=round(score, 3))
+        return None
+
+
+def read_tsv(path: str | Path) -> Iterable[Tuple[str, str]]:
+    """File nguồn: `câu nguồn<TAB>câu dịch`, dòng trống / '#' bỏ qua."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            src, _, tgt = line.partition("\t")
+            if src.strip() and tgt.strip():
+                yield src.strip(), tgt.strip()
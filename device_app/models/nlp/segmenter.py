@@ -0,0 +1,179 @@
+# device_app/models/nlp/segmenter.py
+from __future__ import annotations
+
+import re
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+
+class Segmenter:
+    """
+    Tách câu dài thành các đoạn ngắn TRƯỚC khi đưa vào NMT.
+
+    - Cắt theo dấu câu (. ! ? ; …), sau đó theo dấu phẩy / liên từ
+      nếu đoạn vẫn còn dài hơn MAX_WORDS
+    - Gộp các mẩu quá ngắn (< MIN_WORDS) vào đoạn đứng trước
+    - KHÔNG bao giờ cắt ngay trước token slot (PN_*): slot luôn đi
+      cùng từ chỉ loại đứng trước nó (vd: "đường PN_PN0")
+    """
+
+    SENTENCE_END = re.compile(r"(?<=[.!?;…])\s+")
+    SLOT_TOKEN = re.compile(r"^PN_\w+")
+
+    CONJUNCTIONS = {
+        "vi": (
+            ("bởi", "vì"),
+            ("cho", "nên"),
+            ("nhưng", "mà"),
+            ("nhưng",),
+            ("và",),
+            ("vì",),
+            ("nên",),
+            ("rồi",),
+            ("hoặc",),
+            ("thì",),
+        ),
+        "en": (
+            ("because",),
+            ("but",),
+            ("and",),
+            ("so",),
+            ("or",),
+            ("then",),
+            ("although",),
+        ),
+    }
+
+    def __init__(self, lang: str, *, max_words: int = 24, min_words: int = 3) -> None:
+        self.lang = lang
+        self.max_words = max(2, int(max_words))
+        self.min_words = max(1, min(int(min_words), self.max_words))
+        self._conj = self.CONJUNCTIONS.get(lang, ())
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], lang: str) -> "Segmenter":
+        seg_cfg = (config.get("NMT") or {}).get("SEGMENT") or {}
+        return cls(
+            lang,
+            max_words=seg_cfg.get("MAX_WORDS", 24),
+            min_words=seg_cfg.get("MIN_WORDS", 3),
+        )
+
+    # ===================== PUBLIC API =======================
+
+    def split(self, text: str) -> List[str]:
+        text = " ".join((text or "").split())
+        if not text:
+            return []
+
+        segments: List[str] = []
+        for sentence in self.SENTENCE_END.split(text):
+            words = sentence.split()
+            if len(words) <= self.max_words:
+                pieces = [words]
+            else:
+                pieces = self._split_long(words)
+            segments.extend(" ".join(p) for p in pieces if p)
+
+        return self._merge_short(segments)
+
+    @staticmethod
+    def join(segments: Sequence[str]) -> str:
+        return " ".join(s.strip() for s in segments if s and s.strip())
+
+    # ===================== HELPERS =======================
+
+    @staticmethod
+    def _bare(word: str) -> str:
+        return word.strip(",.:;!?\"'()").lower()
+
+    def _is_slot(self, word: str) -> bool:
+        return bool(self.SLOT_TOKEN.match(word))
+
+    def _match_conj(self, words: List[str], i: int) -> int:
+        for conj in self._conj:
+            n = len(conj)
+            if tuple(self._bare(w) for w in words[i : i + n]) == conj:
+                return n
+        return 0
+
+    def _cut_points(self, words: List[str]) -> List[int]:
+        """Vị trí có thể cắt: sau dấu phẩy, hoặc trước liên từ."""
+        cuts: List[int] = []
+        conj_end = -1  # vị trí ngay sau liên từ vừa cắt
+        i = 1
+        while i < len(words):
+            if self._is_slot(words[i]):
+                i += 1
+                continue
+            if words[i - 1].endswith(","):
+                cuts.append(i)
+            n = self._match_conj(words, i)
+            if n:
+                # "and then", "và rồi" → một ranh giới duy nhất
+                if i != conj_end and (not cuts or cuts[-1] != i):
+                    cuts.append(i)
+                conj_end = i + n
+                i += n
+                continue
+            i += 1
+        return cuts
+
+    def _split_long(self, words: List[str]) -> List[List[str]]:
+        bounds = [0] + self._cut_points(words) + [len(words)]
+        pieces = [words[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
+
+        # gộp lại các mẩu liền kề miễn là không vượt MAX_WORDS
+        merged: List[List[str]] = []
+        for p in pieces:
+            if merged and len(merged[-1]) + len(p) <= self.max_words:
+                merged[-1] = merged[-1] + p
+            else:
+                merged.append(p)
+
+        # mẩu vẫn quá dài (không có dấu/liên từ) → cắt cứng
+        out: List[List[str]] = []
+        for p in merged:
+            while len(p) > self.max_words:
+                # chia đều thay vì để lại mẩu đuôi 1-2 từ
+                parts = -(-len(p) // self.max_words)
+                cut = self._hard_cut(p, -(-len(p) // parts))
+                if cut is None:  # toàn slot sau từ đầu → để nguyên, dài hơn MAX_WORDS
+                    break
+                out.append(p[:cut])
+                p = p[cut:]
+            out.append(p)
+        return out
+
+    def _hard_cut(self, words: List[str], target: int) -> Optional[int]:
+        """
+        Vị trí cắt gần target nhất mà không đứng ngay trước slot: ưu tiên lùi
+        lại; cả cụm trước target là slot thì tiến tới sau cụm (mẩu đó được
+        dài hơn MAX_WORDS chứ không tách slot khỏi từ đứng trước).
+        """
+        ok = [c for c in range(1, len(words)) if not self._is_slot(words[c])]
+        before = [c for c in ok if c <= target]
+        if before:
+            return before[-1]
+        return ok[0] if ok else None
+
+    def _merge_short(self, segments: List[str]) -> List[str]:
+        out: List[str] = []
+        for seg in segments:
+            n = len(seg.split())
+            if out and (n < self.min_words or self._is_slot(seg)):
+                if len(out[-1].split()) + n <= self.max_words:
+                    out[-1] = f"{out[-1]} {seg}"
+                    continue
+            out.append(seg)
+
+        # mẩu đầu quá ngắn → gộp sang đoạn sau
+        if len(out) > 1 and len(out[0].split()) < self.min_words:
+            if len(out[0].split()) + len(out[1].split()) <= self.max_words:
+                out[1] = f"{out[0]} {out[1]}"
+                out.pop(0)
+        return out
+
+
+def slot_tokens(text: str) -> Tuple[str, ...]:
+    """Liệt kê các token slot PN_* có trong chuỗi (giữ thứ tự)."""
+    return tuple(re.findall(r"\bPN_\w+", text or ""))
@@ -2,6 +2,8 @@ import re
 import unicodedata
 from typing import Dict, Tuple
 
+from device_app.models.nlp.slots import SlotEngine
+
 
 class SkeletonTranslator:
     """
@@ -45,6 +47,9 @@ class SkeletonTranslator:
     #   "Nguyen Trai"
     EN_PROPER = re.compile(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})\b")
 
+    _VI_ENGINE = SlotEngine(VI_TYPED)
+    _EN_ENGINE = SlotEngine(EN_PROPER)
+
     # ===================== HELPERS =======================
 
     @staticmethod
@@ -66,18 +71,13 @@ class SkeletonTranslator:
           - skeleton_text (còn ngữ pháp)
           - slots: { "[PN0]": "Hoang Hoa Tham", ... }
         """
-        slots: Dict[str, str] = {}
-        idx = 0
 
-        def _typed(m):
-            nonlocal idx
+        def _typed(m, idx):
             slot = f"[PN{idx}]"
             # chỉ latinize phần tên, GIỮ từ chỉ loại
-            slots[slot] = self.latinize(m.group(2))
-            idx += 1
-            return f"{m.group(1)} {slot}"
+            return f"{m.group(1)} {slot}", slot, self.latinize(m.group(2))
 
-        skeleton = self.VI_TYPED.sub(_typed, text)
+        skeleton, slots = self._VI_ENGINE.extract(text, _typed)
         skeleton = " ".join(skeleton.split())
 
         return skeleton, slots
@@ -88,17 +88,12 @@ class SkeletonTranslator:
         """
         Tách skeleton cho tiếng Anh
         """
-        slots: Dict[str, str] = {}
-        idx = 0
 
-        def _plain(m):
-            nonlocal idx
+        def _plain(m, idx):
             slot = f"[PN{idx}]"
-            slots[slot] = m.group(1)
-            idx += 1
-            return slot
+            return slot, slot, m.group(1)
 
-        skeleton = self.EN_PROPER.sub(_plain, text)
+        skeleton, slots = self._EN_ENGINE.extract(text, _plain)
         skeleton = " ".join(skeleton.split())
 
         return skeleton, slots
@@ -109,6 +104,4 @@ class SkeletonTranslator:
         """
         Ghép lại proper nouns đúng vị trí slot
         """
-        for slot, value in slots.items():
-            translated = translated.replace(slot, value)
-        return translated
+        return SlotEngine.restore(translated, slots)
@@ -0,0 +1,89 @@
+# device_app/models/nlp/slots.py
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, Mapping, Pattern, Tuple
+
+# "[PN0]" → "PN_PN0": token an toàn cho MarianMT (không bị tách / dịch)
+BRACKET_SLOT = re.compile(r"\[(PN\d+)\]")
+
+
+def compile_patterns(patterns: Iterable[Tuple[str, str]], flags: int = 0):
+    """[(regex, role), ...] → [(compiled, role), ...] (chỉ compile 1 lần)."""
+    return [(re.compile(pat, flags), role) for pat, role in patterns]
+
+
+class SlotEngine:
+    """
+    Xử lý slot cho tầng text:
+
+    - extract : 1 lần quét regex (re.sub + callback) → skeleton + slots
+    - rekey   : đổi tên slot ("[PN0]" → "PN_PN0")
+    - restore : thay slot bằng giá trị
+
+    restore / rekey dùng str.replace theo từng slot: với số slot của 1 câu
+    (vài chục trở xuống) nhanh hơn 1 lượt regex alternation
+    (tools/bench_text). Slot đánh số PN0, PN1, ...: tới 10 slot không key
+    nào là tiền tố của key khác → thay theo thứ tự chèn; nhiều hơn thì key
+    dài trước để "PN_PN1" không ăn mất tiền tố của "PN_PN10". Giá trị slot
+    là đoạn text gốc (STT) nên không chứa token slot.
+    """
+
+    def __init__(self, pattern: Pattern[str]) -> None:
+        self.pattern = pattern
+
+    # ===================== EXTRACT =======================
+
+    def extract(
+        self,
+        text: str,
+        make: Callable[[re.Match, int], Tuple[str, str, str]],
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Quét 1 lượt. `make(match, slot_index)` trả về
+        (chuỗi thay thế, tên slot, giá trị slot).
+        """
+        slots: Dict[str, str] = {}
+
+        def _sub(m: re.Match) -> str:
+            replacement, slot, value = make(m, len(slots))
+            slots[slot] = value
+            return replacement
+
+        return self.pattern.sub(_sub, text), slots
+
+    # ===================== REKEY / RESTORE =======================
+
+    @staticmethod
+    def rekey(
+        text: str,
+        slots: Mapping[str, str],
+        *,
+        pattern: Pattern[str] = BRACKET_SLOT,
+        fmt: str = "PN_{}",
+    ) -> Tuple[str, Dict[str, str]]:
+        """
+        Đổi tên slot trong text + dict.
+        Ví dụ: ("đường [PN0]", {"[PN0]": "X"}) → ("đường PN_PN0", {"PN_PN0": "X"})
+        """
+        if not slots:
+            return text, {}
+
+        rename: Dict[str, str] = {}
+        for old in slots:
+            m = pattern.fullmatch(old)
+            if m:
+                rename[old] = fmt.format(m.group(1))
+
+        new_slots = {rename.get(k, k): v for k, v in slots.items()}
+        return SlotEngine.restore(text, rename), new_slots
+
+    @staticmethod
+    def restore(text: str, slots: Mapping[str, str]) -> str:
+        """Thay mọi slot bằng giá trị của nó."""
+        if not slots or not text:
+            return text
+        keys = slots if len(slots) <= 10 else sorted(slots, key=len, reverse=True)
+        for key in keys:
+            text = text.replace(key, slots[key])
+        return text
@@ -0,0 +1,312 @@
+# device_app/models/nlp/spell.py
+"""
+Sửa chính tả transcript STT (kiểu SymSpell: symmetric delete) trước NMT.
+
+CTC hay nhầm 1–2 ký tự (sai dấu thanh, rơi / thừa chữ) → từ lạ, tokenizer
+NMT cắt thành nhiều subword vụn → beam search chậm và dịch kém. Từ điển
+là models/data/vocab_vi.txt, vocab_en.txt (xếp theo tần suất: dòng đầu
+phổ biến nhất → rank thay cho tần suất khi chọn ứng viên).
+
+Từ ngoài từ điển chưa chắc là lỗi STT ("shellfish", "phở"): chỉ sửa từ có
+điểm STT (word_scores) thấp, và không bao giờ đụng tới từ trong danh sách
+bảo vệ models/data/protected_{vi,en}.txt (dị ứng, món ăn, dịch vụ...).
+
+Symmetric delete: mọi cách xoá <= MAX_EDIT ký tự (trên PREFIX_LEN ký tự
+đầu) của từ điển được hash sẵn. Tra 1 từ = sinh delete của chính nó,
+bisect từng hash → ứng viên → tính khoảng cách thật (OSA) để xác nhận.
+
+File index (.sym) dựng offline bởi tools/build_spell_index.py, mở bằng mmap
+(cùng bố cục với phrasebook .pbk):
+
+    header   : MAGIC u32:version u32:n_words u32:n_keys u32:max_edit u32:prefix_len
+    words    : n_words × (str_off, str_len, n_chars)  u32   (id = rank)
+    keys     : n_keys × delete_hash u32   (tăng dần → bisect)
+    post_idx : (n_keys + 1) × u32         (offset vào postings)
+    postings : u32 word id
+    strings  : utf-8
+"""
+from __future__ import annotations
+
+import bisect
+import mmap
+import re
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+MAGIC = b"SYM1"
+VERSION = 1
+_HEADER = struct.Struct("<4sIIIII")
+_WORD_FIELDS = 3
+_MEMO_MAX = 4096
+
+# chỉ đụng tới từ chữ thuần (bỏ qua số, slot PN_*, ký hiệu)
+_WORD = re.compile(r"[^\W\d_]+")
+# 1 "từ" của CTC = 1 cụm không khoảng trắng (khớp thứ tự word_scores)
+_TOKEN = re.compile(r"\S+")
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+# ================= DELETES / DISTANCE =================
+
+
+def deletes(word: str, max_edit: int) -> Set[str]:
+    """Mọi chuỗi thu được khi xoá 0..max_edit ký tự của word."""
+    out = {word}
+    frontier = {word}
+    for _ in range(max_edit):
+        nxt = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1 :])
+        nxt -= out
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+def _hash(s: str) -> int:
+    return zlib.crc32(s.encode("utf-8"))
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment (Levenshtein + đổi chỗ 2 ký tự kề); > limit → limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            row_min = min(row_min, v)
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1] if prev[-1] <= limit else limit + 1
+
+
+@dataclass(frozen=True)
+class SpellReport:
+    text: str
+    corrections: Tuple[Tuple[str, str], ...]  # (từ gốc, từ sửa)
+    ms: float
+    truncated: bool  # hết ngân sách thời gian trước khi xét hết câu
+
+
+# ================= BUILD =================
+
+
+def read_vocab(path: str | Path) -> List[str]:
+    """1 từ / dòng, theo thứ tự tần suất giảm dần; bỏ trùng, giữ lần đầu."""
+    seen: Dict[str, None] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            w = line.strip().lower()
+            if w and w not in seen:
+                seen[w] = None
+    return list(seen)
+
+
+def read_protected(lang: str, extra: Iterable[str] = ()) -> FrozenSet[str]:
+    """models/data/protected_<lang>.txt (bỏ dòng #) + từ thêm trong config."""
+    words = {w.strip().lower() for w in extra if w.strip()}
+    path = DATA_DIR / f"protected_{lang}.txt"
+    if path.is_file():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip().lower()
+            if line and not line.startswith("#"):
+                words.add(line)
+    return frozenset(words)
+
+
+def build_index(
+    words: Sequence[str],
+    out_path: str | Path,
+    *,
+    max_edit: int = 2,
+    prefix_len: int = 7,
+) -> Path:
+    out_path = Path(out_path)
+
+    postings: Dict[int, List[int]] = {}
+    for i, w in enumerate(words):
+        for d in deletes(w[:prefix_len], max_edit):
+            postings.setdefault(_hash(d), []).append(i)
+    keys = sorted(postings)
+
+    blob = bytearray()
+    table: List[int] = []
+    for w in words:
+        b = w.encode("utf-8")
+        table += [len(blob), len(b), len(w)]
+        blob += b
+
+    post_idx = [0]
+    flat: List[int] = []
+    for k in keys:
+        flat += postings[k]
+        post_idx.append(len(flat))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(words), len(keys), max_edit, prefix_len))
+        for arr in (table, keys, post_idx, flat):
+            f.write(struct.pack(f"<{len(arr)}I", *arr))
+        f.write(bytes(blob))
+    return out_path
+
+
+# ================= LOOKUP =================
+
+
+class SpellIndex:
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_edit: Optional[int] = None,
+        min_len: int = 3,
+        budget_ms: float = 15.0,
+        protected: Iterable[str] = (),
+    ) -> None:
+        self.path = Path(path)
+        self.min_len = int(min_len)
+        self.budget_ms = float(budget_ms)
+        self.protected = frozenset(protected)
+
+        self._f = open(self.path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, k, built_edit, prefix_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: không phải spell index v{VERSION}")
+        self.size = n
+        self.prefix_len = prefix_len
+        # không thể tra xa hơn mức đã dựng index
+        self.max_edit = min(built_edit, max_edit) if max_edit is not None else built_edit
+
+        words = memoryview(self._mm)[_HEADER.size :]
+        end = (len(words) // 4) * 4
+        u32 = words[:end].cast("I")
+        self._words = u32[: n * _WORD_FIELDS]
+        self._keys = u32[n * _WORD_FIELDS : n * _WORD_FIELDS + k]
+        pos = n * _WORD_FIELDS + k
+        self._post_idx = u32[pos : pos + k + 1]
+        n_post = self._post_idx[k] if k else 0
+        self._postings = u32[pos + k + 1 : pos + k + 1 + n_post]
+        self._strings_at = _HEADER.size + (pos + k + 1 + n_post) * 4
+
+        # từ đã tra trong phiên (câu nói hay lặp từ)
+        self._memo: Dict[str, str] = {}
+
+    @classmethod
+    def open_optional(cls, path: str | Path, **kwargs) -> Optional["SpellIndex"]:
+        return cls(path, **kwargs) if Path(path).is_file() else None
+
+    def close(self) -> None:
+        for view in (self._words, self._keys, self._post_idx, self._postings):
+            view.release()
+        self._mm.close()
+        self._f.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def word(self, i: int) -> str:
+        off, length = self._words[i * _WORD_FIELDS], self._words[i * _WORD_FIELDS + 1]
+        start = self._strings_at + off
+        return self._mm[start : start + length].decode("utf-8")
+
+    def _postings_for(self, key: str) -> Iterable[int]:
+        h = _hash(key)
+        k = bisect.bisect_left(self._keys, h)
+        if k < len(self._keys) and self._keys[k] == h:
+            return self._postings[self._post_idx[k] : self._post_idx[k + 1]]
+        return ()
+
+    def correct_word(self, word: str) -> str:
+        """Từ gần nhất (khoảng cách, rồi rank); trong từ điển / không có ứng viên → giữ nguyên."""
+        hit = self._memo.get(word)
+        if hit is not None:
+            return hit
+
+        prefix = word[: self.prefix_len]
+        # từ ngắn: chỉ cho sửa 1 ký tự (tránh "đi" → "ở")
+        limit = 1 if len(word) <= 4 else self.max_edit
+
+        exact = any(self.word(i) == word for i in self._postings_for(prefix))
+        best, best_d, best_rank = word, limit + 1, 0
+        if not exact:
+            seen: Set[int] = set()
+            for d in sorted(deletes(prefix, limit), key=len, reverse=True):
+                for i in self._postings_for(d):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    n_chars = self._words[i * _WORD_FIELDS + 2]
+                    if abs(n_chars - len(word)) > min(limit, best_d):
+                        continue
+                    dist = edit_distance(word, self.word(i), min(limit, best_d))
+                    if dist < best_d or (dist == best_d and i < best_rank):
+                        best, best_d, best_rank = self.word(i), dist, i
+
+        if len(self._memo) >= _MEMO_MAX:
+            self._memo.clear()
+        self._memo[word] = best
+        return best
+
+    def correct(
+        self,
+        text: str,
+        word_scores: Optional[Sequence[float]] = None,
+        max_score: float = 1.0,
+    ) -> SpellReport:
+        """
+        Sửa từng từ ngoài từ điển, dừng khi hết budget_ms (phần còn lại giữ nguyên).
+
+        word_scores (điểm STT từng từ, cùng thứ tự với text): chỉ từ có điểm
+        < max_score mới được sửa; số điểm không khớp số từ → không sửa gì.
+        None = không lọc theo điểm (tool / test).
+        """
+        t0 = time.perf_counter()
+        deadline = t0 + self.budget_ms / 1000.0 if self.budget_ms > 0 else None
+        fixes: List[Tuple[str, str]] = []
+        truncated = False
+
+        starts: List[int] = []
+        if word_scores is not None:
+            starts = [m.start() for m in _TOKEN.finditer(text)]
+            if len(starts) != len(word_scores):
+                return SpellReport(text=text, corrections=(), ms=0.0, truncated=False)
+
+        def sub(m: "re.Match[str]") -> str:
+            nonlocal truncated
+            w = m.group(0)
+            if truncated or len(w) < self.min_len or not w.islower() or w in self.protected:
+                return w
+            if word_scores is not None:
+                # STT đã chắc chắn về từ này → từ lạ nhưng đúng (tên món, thuật ngữ)
+                if word_scores[bisect.bisect_right(starts, m.start()) - 1] >= max_score:
+                    return w
+            if deadline is not None and time.perf_counter() >= deadline:
+                truncated = True
+                return w
+            fixed = self.correct_word(w)
+            if fixed != w:
+                fixes.append((w, fixed))
+            return fixed
+
+        out = _WORD.sub(sub, text)
+        ms = (time.perf_counter() - t0) * 1000
+        return SpellReport(text=out, corrections=tuple(fixes), ms=round(ms, 3), truncated=truncated)
@@ -1,6 +1,29 @@
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers.modeling_outputs import BaseModelOutput
 import torch
 
+from device_app.utils.bundle import resolve
+from device_app.utils.deadline import StageTimeout, budget
+
+
+@contextmanager
+def _nmt_deadline() -> Iterator[Optional[float]]:
+    """
+    generate(max_time=...) dừng beam search khi hết giờ nhưng vẫn trả về
+    câu dở → coi là timeout, không đọc câu dịch cụt.
+    """
+    limit = budget("nmt")
+    t0 = time.monotonic()
+    yield limit
+    if limit is not None and time.monotonic() - t0 >= limit:
+        raise StageTimeout("nmt", limit)
+
 
 class NMTBase:
     """
@@ -10,6 +33,9 @@ class NMTBase:
 
     def __init__(self, model_dir: str):
         self.device = torch.device("cpu")
+        # bundle (safetensors, mmap) nếu đã đóng gói, không thì thư mục gốc
+        model_dir = str(resolve(model_dir))
+        mmap_weights = os.path.isfile(os.path.join(model_dir, "model.safetensors"))
 
         self.tokenizer = AutoTokenizer.from_pretrained(
             model_dir,
@@ -19,31 +45,123 @@ class NMTBase:
         self.model = AutoModelForSeq2SeqLM.from_pretrained(
             model_dir,
             torch_dtype=torch.float32,
+            use_safetensors=mmap_weights or None,
+            low_cpu_mem_usage=mmap_weights,
         )
 
         self.model.to(self.device)
         self.model.eval()
 
+        # governor hạ xuống 2 / 1 khi pin yếu / máy nóng
+        self.num_beams = 4
+
+        # encoder hidden state theo câu nguồn: dịch lại cùng đoạn
+        # (partial → final) chỉ chạy decoder
+        self._enc_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.enc_cache_size = 8
+
     def translate(self, text: str) -> str:
         if not text:
             return ""
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Dịch nhiều đoạn trong MỘT lần generate (batch có padding).
+        Đoạn rỗng giữ nguyên "" và không đưa vào model.
+        """
+        results = [""] * len(texts)
+        idx = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not idx:
+            return results
 
         inputs = self.tokenizer(
-            text,
+            [texts[i] for i in idx],
             return_tensors="pt",
+            padding=True,
             truncation=True,
             max_length=256,
         )
 
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
 
-        with torch.no_grad():
+        with torch.no_grad(), _nmt_deadline() as max_time:
             outputs = self.model.generate(
                 **inputs,
-                num_beams=4,
+                num_beams=self.num_beams,
+                max_length=256,
+                early_stopping=True,
+                no_repeat_ngram_size=2,
+                max_time=max_time,
+            )
+
+        decoded = self.tokenizer.batch_decode(
+            outputs,
+            skip_special_tokens=True,
+            clean_up_tokenization_spaces=True,
+        )
+        for i, out in zip(idx, decoded):
+            results[i] = out.strip()
+        return results
+
+    # ==================================================
+    # INCREMENTAL (partial transcript)
+    # ==================================================
+
+    def _encode(self, text: str) -> tuple:
+        """(hidden, mask) – tensor trong cache chỉ đọc, không đưa thẳng vào generate."""
+        hit = self._enc_cache.get(text)
+        if hit is not None:
+            self._enc_cache.move_to_end(text)
+            return hit
+
+        inputs = self.tokenizer(
+            [text],
+            return_tensors="pt",
+            truncation=True,
+            max_length=256,
+        )
+        mask = inputs["attention_mask"].to(self.device)
+        with torch.no_grad():
+            enc = self.model.get_encoder()(
+                input_ids=inputs["input_ids"].to(self.device),
+                attention_mask=mask,
+                return_dict=True,
+            )
+
+        hidden = enc.last_hidden_state
+        self._enc_cache[text] = (hidden, mask)
+        while len(self._enc_cache) > self.enc_cache_size:
+            self._enc_cache.popitem(last=False)
+        return hidden, mask
+
+    def translate_prefixed(self, text: str, prefix: str = "") -> str:
+        """
+        Dịch với encoder output cache theo câu nguồn và ép decoder đi qua
+        `prefix` (phần bản dịch đã chốt) → chỉ giải mã phần đuôi.
+        """
+        if not text or not text.strip():
+            return ""
+
+        hidden, mask = self._encode(text)
+        start = self.model.config.decoder_start_token_id
+        ids = [start]
+        if prefix:
+            ids += self.tokenizer(text_target=prefix, add_special_tokens=False)["input_ids"]
+        decoder_input_ids = torch.tensor([ids], dtype=torch.long, device=self.device)
+
+        with torch.no_grad(), _nmt_deadline() as max_time:
+            # num_beams > 1: generate() repeat_interleave encoder_outputs NGAY
+            # TRÊN object truyền vào → mỗi lần bọc object mới, cache giữ nguyên
+            outputs = self.model.generate(
+                encoder_outputs=BaseModelOutput(last_hidden_state=hidden),
+                attention_mask=mask,
+                decoder_input_ids=decoder_input_ids,
+                num_beams=self.num_beams,
                 max_length=256,
                 early_stopping=True,
                 no_repeat_ngram_size=2,
+                max_time=max_time,
             )
 
         return self.tokenizer.decode(
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, List
 from device_app.models.nmt_base import NMTBase
 
 
@@ -14,3 +14,12 @@ class NMTViEn:
 
     def translate(self, text: str) -> str:
         return self._impl.translate(text)
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        return self._impl.translate_batch(texts)
+
+    def translate_prefixed(self, text: str, prefix: str = "") -> str:
+        return self._impl.translate_prefixed(text, prefix)
+
+    def set_num_beams(self, num_beams: int) -> None:
+        self._impl.num_beams = max(1, int(num_beams))
@@ -2,12 +2,30 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
 
 import numpy as np
 import onnxruntime as ort
 import soundfile as sf
 from transformers import Wav2Vec2Processor
 
+from device_app.models.ctc_chunking import ChunkedCTC
+from device_app.models.ctc_confidence import SttConfidence, SttResult, ctc_confidence
+from device_app.models.ort_binding import (
+    BucketedSession,
+    FrameGeometry,
+    bucket_lengths,
+    keep_frames,
+    mask_input,
+    probe_geometry,
+)
+from device_app.utils.bundle import resolve
+from device_app.utils.deadline import StageTimeout, budget, watchdog
+from device_app.utils.log import get_logger
+from device_app.utils.thread_budget import ort_session_options
+
+_log = get_logger("stt")
+
 
 @dataclass
 class OnnxCTCSTT:
@@ -19,26 +37,51 @@ class OnnxCTCSTT:
     model_path: Path
     processor_dir: Path
     lang: str = "vi"
+    # cửa sổ suy luận + ngữ cảnh chồng lấn mỗi bên (giây)
+    chunk_sec: float = 10.0
+    stride_sec: float = 1.0
+    # STT_BINDING: pad cửa sổ lên các độ dài cố định + IOBinding (() = tắt)
+    bucket_sec: Sequence[float] = ()
+    warmup: bool = False
 
     def __post_init__(self) -> None:
-        self.model_path = Path(self.model_path)
-        self.processor_dir = Path(self.processor_dir)
+        # bundle: initializer ở .onnx.data (ORT mmap), graph protobuf nhỏ
+        self.model_path = resolve(self.model_path)
+        self.processor_dir = resolve(self.processor_dir)
 
         self.session = ort.InferenceSession(
             str(self.model_path),
+            sess_options=ort_session_options(ort),  # None = mặc định ORT
             providers=["CPUExecutionProvider"],
         )
 
         self.processor = Wav2Vec2Processor.from_pretrained(str(self.processor_dir))
+        # graph nhận attention_mask (wav2vec2 large / lv60) → pad không lọt vào attention
+        self._mask_dtype = mask_input(self.session)
+        # None = chưa thử; False = graph cố định batch 1 / không có mask → chạy lần lượt
+        self._batch_ok: Optional[bool] = None if self._mask_dtype is not None else False
+        self._geometry: Optional[FrameGeometry] = None
+
+        self.bucketed: Optional[BucketedSession] = None
+        if self.bucket_sec:
+            self.bucketed = BucketedSession(
+                ort, self.session, bucket_lengths(self.bucket_sec, int(self.chunk_sec * 16000))
+            )
+            self._geometry = self.bucketed.geometry
+            if self.warmup:
+                self.bucketed.warmup()
 
     # --------------------------------------------------
     # MAIN API
     # --------------------------------------------------
     def transcribe_file(self, wav_path: str | Path) -> str:
-        wav_path = str(wav_path)
+        return self.transcribe_scored(self.load_audio(wav_path))[0]
 
+    @staticmethod
+    def load_audio(wav_path: str | Path) -> np.ndarray:
+        """WAV 16 kHz → mono float32 (đọc 1 lần, dùng chung cho nhiều STT)."""
         # 1️⃣ Load audio
-        audio, sr = sf.read(wav_path)
+        audio, sr = sf.read(str(wav_path))
 
         # 2️⃣ Check sample rate (BẮT BUỘC)
         if sr != 16000:
@@ -48,33 +91,146 @@ class OnnxCTCSTT:
         if audio.ndim > 1:
             audio = audio.mean(axis=1)
 
+        # 5️⃣ float32
+        return audio.astype(np.float32)
+
+    def transcribe_scored(self, audio: np.ndarray) -> Tuple[str, float]:
+        """(text, log-prob CTC trung bình / frame) – dùng cho Mode.AUTO."""
+        res = self.transcribe_detailed(audio)
+        return res.text, res.confidence.avg_logprob
+
+    def transcribe_with_confidence(self, wav_path: str | Path) -> SttResult:
+        return self.transcribe_detailed(self.load_audio(wav_path))
+
+    def transcribe_detailed(self, audio: np.ndarray) -> SttResult:
+        """Text + độ tin cậy tính từ chính logits CTC (không tốn thêm inference)."""
         # 4️⃣ Audio quá ngắn → bỏ qua
         if audio.shape[0] < 400:  # ~25ms
-            return ""
-
-        # 5️⃣ float32
-        audio = audio.astype(np.float32)
+            return SttResult("", SttConfidence.empty())
+
+        # 6️⃣–8️⃣ Theo cửa sổ: clip dài không làm RAM / attention phình ra
+        # quá hạn STT → timer bật RunOptions.terminate, session.run thoát ra
+        run_options = ort.RunOptions()
+        limit = budget("stt", audio.shape[0] / 16000)
+        with watchdog(limit, lambda: setattr(run_options, "terminate", True)) as fired:
+            try:
+                ctc = self.stream(run_options)
+                ctc.feed(audio)
+                logits = ctc.finish()
+            except Exception:
+                if fired.is_set():
+                    raise StageTimeout("stt", limit)
+                raise
+        return self.decode(logits)
+
+    def transcribe_batch(self, audios: Sequence[np.ndarray]) -> List[SttResult]:
+        """
+        Nhiều clip ngắn (<= chunk_sec) → pad + attention_mask → 1 lần session.run
+        (service). Clip dài, model không nhận batch > 1 hoặc không có
+        attention_mask (pad sẽ đổi kết quả) → transcribe_detailed từng clip.
+        """
+        results: List[Optional[SttResult]] = [None] * len(audios)
+        chunk = int(self.chunk_sec * 16000)
+        idx = [i for i, a in enumerate(audios) if 400 <= a.shape[0] <= chunk]
+
+        if len(idx) > 1 and self._batch_ok is not False:
+            try:
+                for i, res in zip(idx, self._run_batch([audios[i] for i in idx])):
+                    results[i] = res
+                self._batch_ok = True
+            except StageTimeout:
+                raise
+            except Exception as e:
+                if self._batch_ok:
+                    raise
+                self._batch_ok = False  # vd. input_values khai báo [1, n]
+                _log.info("STT model has no batch axis (%s) → per-clip", e)
+
+        return [r if r is not None else self.transcribe_detailed(a) for r, a in zip(results, audios)]
+
+    def _run_batch(self, audios: List[np.ndarray]) -> List[SttResult]:
+        # normalize từng clip như khi chạy lẻ, rồi mới pad 0 + mask
+        values = [
+            self.processor(a.astype(np.float32), sampling_rate=16000, return_tensors="np")["input_values"][0]
+            for a in audios
+        ]
+        n_max = max(v.shape[0] for v in values)
+        batch = np.zeros((len(values), n_max), dtype=np.float32)
+        mask = np.zeros((len(values), n_max), dtype=np.int64)
+        for row, v in enumerate(values):
+            batch[row, : v.shape[0]] = v
+            mask[row, : v.shape[0]] = 1
+
+        run_options = ort.RunOptions()
+        # cả batch chạy 1 lần: chi phí ~ số clip × clip dài nhất
+        limit = budget("stt", batch.size / 16000)
+        with watchdog(limit, lambda: setattr(run_options, "terminate", True)) as fired:
+            try:
+                logits = self.session.run(None, self._feed(batch, mask), run_options)[0]
+            except Exception:
+                if fired.is_set():
+                    raise StageTimeout("stt", limit)
+                raise
+
+        # bỏ frame của phần pad: đúng số frame model cho clip dài n
+        geometry = self._frame_geometry()
+        return [
+            self.decode(row[: keep_frames(geometry, v.shape[0], n_max, row.shape[0])])
+            for row, v in zip(logits, values)
+        ]
+
+    def _frame_geometry(self) -> Optional[FrameGeometry]:
+        if self._geometry is None:
+            self._geometry = probe_geometry(
+                lambda n: self.session.run(None, self._feed(np.zeros((1, n), dtype=np.float32)))[0].shape[1]
+            )
+        return self._geometry
+
+    def stream(self, run_options: Any = None) -> ChunkedCTC:
+        """Bộ ghép logits theo cửa sổ; feed() được ngay khi audio tới."""
+        return ChunkedCTC(
+            lambda samples: self._run_window(samples, run_options),
+            sr=16000,
+            chunk_sec=self.chunk_sec,
+            stride_sec=self.stride_sec,
+        )
 
+    def _run_window(self, samples: np.ndarray, run_options: Any = None) -> np.ndarray:
         # 6️⃣ Add batch dim (QUAN TRỌNG NHẤT)
-        audio = np.expand_dims(audio, axis=0)
+        batch = np.expand_dims(samples, axis=0)
         # shape: (1, num_samples)
 
         # 7️⃣ Processor
         inputs = self.processor(
-            audio,
+            batch,
             sampling_rate=16000,
             return_tensors="np",
             padding=True,
         )
 
-        # DEBUG – bạn có thể bỏ sau khi ổn
-        # print("STT input_values shape:", inputs["input_values"].shape)
-
-        # 8️⃣ ONNX inference
-        logits = self.session.run(None, {"input_values": inputs["input_values"]})[0]
-
-        # 9️⃣ Decode CTC
+        # 8️⃣ ONNX inference → (T, V)
+        if self.bucketed is not None:
+            return self.bucketed.run(inputs["input_values"][0], run_options)
+        return self.session.run(None, self._feed(inputs["input_values"]), run_options)[0][0]
+
+    def _feed(self, values: np.ndarray, mask: Optional[np.ndarray] = None) -> dict:
+        """input_values (+ attention_mask nếu graph có; None = toàn bộ là sample thật)."""
+        feed = {"input_values": values}
+        if self._mask_dtype is not None:
+            feed["attention_mask"] = (np.ones(values.shape) if mask is None else mask).astype(self._mask_dtype)
+        return feed
+
+    def decode(self, logits: np.ndarray) -> SttResult:
+        """9️⃣ Decode CTC 1 lần trên logits đã ghép."""
+        if logits.shape[0] == 0:
+            return SttResult("", SttConfidence.empty())
         pred_ids = np.argmax(logits, axis=-1)
-        text = self.processor.batch_decode(pred_ids)[0]
+        text = self.processor.batch_decode(pred_ids[None, :])[0]
 
-        return text.strip()
+        tok = self.processor.tokenizer
+        conf = ctc_confidence(
+            logits,
+            blank_id=tok.pad_token_id,
+            delim_id=getattr(tok, "word_delimiter_token_id", None),
+        )
+        return SttResult(text.strip(), conf)
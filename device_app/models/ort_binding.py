@@ -0,0 +1,237 @@
+# device_app/models/ort_binding.py
+"""
+Input STT theo "bucket" độ dài cố định + IOBinding dùng lại buffer.
+
+Mỗi độ dài input mới → ORT cấp lại buffer output / trung gian, arena CPU
+phình theo số độ dài khác nhau đã gặp. Ở đây:
+
+- Cửa sổ audio (đã normalize) được pad 0 lên bucket nhỏ nhất đủ chứa
+  (vd. 2 / 4 / 6 / 10 s) → ORT chỉ thấy vài shape, tái dùng memory pattern
+- Mỗi bucket có sẵn input (1, L) + output (1, T, V) bind qua IOBinding:
+  session.run không cấp phát gì thêm; chỉ copy audio vào, cắt logits ra
+- warmup() chạy mỗi bucket 1 lần lúc boot → câu đầu không trả giá cấp phát
+- Graph có input attention_mask → mask = 1 trên sample thật, 0 trên pad:
+  self-attention không nhìn thấy pad. Graph không có mask (wav2vec2-base
+  export mặc định) → pad vẫn lọt vào attention / norm, logits phần thật có
+  thể đổi: đo bằng tools/bench_stt_binding trước khi bật
+- Logits phần pad bị bỏ theo đúng số frame model cho N sample thật:
+  T(N) = (N - field) // stride + 1, đo 1 lần lúc load (FrameGeometry)
+
+    runner = BucketedSession(ort, session, bucket_lengths([2, 4, 6], 160000))
+    runner.warmup()
+    logits = runner.run(input_values[0], run_options)   # (T, V)
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("stt")
+
+SR = 16000
+
+
+def bucket_lengths(bucket_sec: Sequence[float], max_samples: int, sr: int = SR) -> List[int]:
+    """Độ dài bucket (sample), tăng dần; luôn có max_samples (= cửa sổ dài nhất)."""
+    lengths = {int(s * sr) for s in bucket_sec if 0 < int(s * sr) < max_samples}
+    lengths.add(int(max_samples))
+    return sorted(lengths)
+
+
+# kiểu numpy cho input ORT (attention_mask thường là int64)
+ORT_DTYPES = {
+    "tensor(int64)": np.int64,
+    "tensor(int32)": np.int32,
+    "tensor(float)": np.float32,
+    "tensor(bool)": np.bool_,
+}
+
+
+def mask_input(session: Any, name: str = "attention_mask") -> Optional[Any]:
+    """dtype numpy của input attention_mask; None = graph không nhận mask."""
+    for i in session.get_inputs():
+        if i.name == name:
+            return ORT_DTYPES.get(i.type, np.int64)
+    return None
+
+
+@dataclass(frozen=True)
+class FrameGeometry:
+    """Chồng conv không pad (wav2vec2: stride 320, field 400) → số frame chính xác."""
+
+    stride: int
+    field: int
+
+    def frames(self, n: int) -> int:
+        return 0 if n < self.field else (n - self.field) // self.stride + 1
+
+
+def probe_geometry(probe: Callable[[int], int], base: int = SR) -> Optional[FrameGeometry]:
+    """
+    probe(n) = số frame output cho n sample. ~12 lần chạy input <= 2 s.
+    None = model không theo công thức trên (dùng tỉ lệ sample thay thế).
+    """
+    t1, t2 = probe(base), probe(2 * base)
+    if t1 < 1 or t2 <= t1:
+        return None
+    stride = int(round(base / (t2 - t1)))
+    # n nhỏ nhất còn cho t1 frame = field + (t1 - 1) * stride, nằm trong (base - stride, base]
+    lo, hi = base - stride + 1, base
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if probe(mid) >= t1:
+            hi = mid
+        else:
+            lo = mid + 1
+    geo = FrameGeometry(stride, lo - (t1 - 1) * stride)
+    if geo.field < 1 or geo.frames(base) != t1 or geo.frames(2 * base) != t2:
+        return None
+    return geo
+
+
+def keep_frames(geometry: Optional[FrameGeometry], n: int, length: int, frames: int) -> int:
+    """Số frame output thuộc về n sample thật khi input được pad lên length."""
+    if geometry is not None:
+        return max(1, min(frames, geometry.frames(n)))
+    return max(1, int(round(frames * n / length)))
+
+
+def binding_kwargs(config: dict) -> Dict[str, Any]:
+    """STT_BINDING → tham số OnnxCTCSTT (dùng chung cho STT_VI / STT_EN)."""
+    b_cfg = config.get("STT_BINDING") or {}
+    if not b_cfg.get("ENABLED", False):
+        return {}
+    return {
+        "bucket_sec": tuple(float(s) for s in b_cfg.get("BUCKETS_SEC") or ()),
+        "warmup": bool(b_cfg.get("WARMUP", True)),
+    }
+
+
+@dataclass
+class _Slot:
+    inp: np.ndarray  # (1, L) float32
+    mask: Optional[np.ndarray]  # (1, L) 1 = sample thật
+    out: np.ndarray  # (1, T, V) float32
+    binding: Any
+    lock: threading.Lock
+
+
+class BucketedSession:
+    def __init__(
+        self,
+        ort: Any,
+        session: Any,
+        lengths: Sequence[int],
+        input_name: str = "input_values",
+        mask_name: str = "attention_mask",
+        geometry: Optional[FrameGeometry] = None,
+    ) -> None:
+        if not lengths:
+            raise ValueError("cần ít nhất 1 bucket")
+        self.ort = ort
+        self.session = session
+        self.lengths = sorted(int(n) for n in lengths)
+        self.input_name = input_name
+        self.mask_name = mask_name
+        self.mask_dtype = mask_input(session, mask_name)
+        self.output_name = session.get_outputs()[0].name
+        if self.mask_dtype is None:
+            _log.warning("STT graph has no %s: bucket padding is visible to the model", mask_name)
+        self.geometry = geometry or probe_geometry(self.probe)
+        if self.geometry is None:
+            _log.warning("STT frame count is not a plain conv stack → trimming by sample ratio")
+
+        self._slots: Dict[int, _Slot] = {}
+        self._create_lock = threading.Lock()
+        self.hits: Dict[int, int] = {n: 0 for n in self.lengths}
+        self.misses = 0  # dài hơn bucket lớn nhất hoặc bucket đang bận
+        self.warmup_ms: Dict[int, float] = {}
+
+    # ================= BUFFERS =================
+
+    def _feed(self, values: np.ndarray) -> Dict[str, np.ndarray]:
+        feed = {self.input_name: values}
+        if self.mask_dtype is not None:
+            feed[self.mask_name] = np.ones(values.shape, dtype=self.mask_dtype)
+        return feed
+
+    def probe(self, n: int) -> int:
+        """Số frame output cho n sample (input 0)."""
+        feed = self._feed(np.zeros((1, n), dtype=np.float32))
+        return int(self.session.run([self.output_name], feed)[0].shape[1])
+
+    def bucket_for(self, n: int) -> Optional[int]:
+        i = bisect.bisect_left(self.lengths, n)
+        return self.lengths[i] if i < len(self.lengths) else None
+
+    def _slot(self, length: int) -> _Slot:
+        slot = self._slots.get(length)
+        if slot is not None:
+            return slot
+        with self._create_lock:
+            slot = self._slots.get(length)
+            if slot is None:
+                feed = self._feed(np.zeros((1, length), dtype=np.float32))
+                inp, mask = feed[self.input_name], feed.get(self.mask_name)
+                # shape output (T phụ thuộc conv stride của model) → chạy thử 1 lần
+                shape = self.session.run([self.output_name], feed)[0].shape
+                out = np.empty(shape, dtype=np.float32)
+
+                binding = self.session.io_binding()
+                for name, arr in feed.items():
+                    binding.bind_ortvalue_input(name, self.ort.OrtValue.ortvalue_from_numpy(arr))
+                binding.bind_ortvalue_output(self.output_name, self.ort.OrtValue.ortvalue_from_numpy(out))
+                slot = self._slots[length] = _Slot(inp, mask, out, binding, threading.Lock())
+        return slot
+
+    def warmup(self) -> Dict[int, float]:
+        """Cấp buffer + chạy mỗi bucket 1 lần (ms / bucket)."""
+        for length in self.lengths:
+            t0 = time.perf_counter()
+            slot = self._slot(length)
+            with slot.lock:
+                self.session.run_with_iobinding(slot.binding)
+            self.warmup_ms[length] = round((time.perf_counter() - t0) * 1000, 1)
+        _log.info("STT buckets warmed: %s", {f"{n / SR:g}s": ms for n, ms in self.warmup_ms.items()})
+        return self.warmup_ms
+
+    # ================= RUN =================
+
+    def run(self, values: np.ndarray, run_options: Any = None) -> np.ndarray:
+        """values (N,) đã qua processor → logits (T', V) chỉ của N sample thật."""
+        n = values.shape[0]
+        length = self.bucket_for(n)
+        slot = self._slot(length) if length is not None else None
+        # bucket đang được thread khác dùng → chạy thường, không chờ
+        if slot is None or not slot.lock.acquire(blocking=False):
+            self.misses += 1
+            return self.session.run(None, self._feed(values[None, :]), run_options)[0][0]
+        try:
+            slot.inp[0, :n] = values
+            slot.inp[0, n:] = 0.0
+            if slot.mask is not None:
+                slot.mask[0, :n] = 1
+                slot.mask[0, n:] = 0
+            self.session.run_with_iobinding(slot.binding, run_options)
+            keep = keep_frames(self.geometry, n, length, slot.out.shape[1])
+            self.hits[length] += 1
+            return slot.out[0, :keep].copy()
+        finally:
+            slot.lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buckets_sec": [n / SR for n in self.lengths],
+            "hits": {f"{n / SR:g}s": c for n, c in self.hits.items()},
+            "misses": self.misses,
+            "attention_mask": self.mask_dtype is not None,
+            "geometry": None if self.geometry is None else [self.geometry.stride, self.geometry.field],
+            "warmup_ms": {f"{n / SR:g}s": ms for n, ms in self.warmup_ms.items()},
+        }
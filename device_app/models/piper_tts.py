@@ -6,6 +6,11 @@ import sys
 import os
 from typing import Optional
 from device_app.models.tts_base import TTSBase
+from device_app.utils.deadline import StageTimeout, budget
+from device_app.utils.log import get_logger
+from device_app.utils.thread_budget import pin_subprocess, subprocess_kwargs
+
+_log = get_logger("tts")
 
 
 class PiperTTS(TTSBase):
@@ -78,14 +83,27 @@ class PiperTTS(TTSBase):
                 # some piper builds accept --speaker or --speaker-id
                 cmd.extend(["--speaker", str(self.voice)])
 
-            # run
-            completed = subprocess.run(
-                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            # run (quá SYNTH_SEC → kill piper)
+            limit = budget("synth")
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                **subprocess_kwargs(),  # giới hạn thread cho piper
             )
+            pin_subprocess(proc.pid)  # giới hạn core cho piper
+            try:
+                stdout, stderr = proc.communicate(timeout=limit)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise StageTimeout("synth", limit)
+            completed = subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
             if completed.returncode != 0:
                 # surface error for debugging but try fallback
-                print(
-                    "[PIPER] synth failed:",
+                _log.error(
+                    "piper synth failed: rc=%s %s",
                     completed.returncode,
                     completed.stderr.strip(),
                 )
@@ -3,10 +3,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Sequence, Tuple, Union
 
 from .stt_base import STTBase
 from .onnx_ctc_stt import OnnxCTCSTT
+from .ort_binding import binding_kwargs
 
 PathLike = Union[str, Path]
 
@@ -78,7 +79,21 @@ class STTEn(STTBase):
 
         # --- 3. Khởi tạo backend OnnxCTCSTT ---
         # LÚC NÀY THAM SỐ ĐẦU TIÊN LÀ FILE .onnx, KHÔNG CÒN LÀ THƯ MỤC NỮA
-        self._impl = OnnxCTCSTT(str(model_path), str(processor_dir))
+        self._build_kwargs: Dict[str, Any] = dict(
+            chunk_sec=float(stt_cfg.get("CHUNK_SEC", 10.0)),
+            stride_sec=float(stt_cfg.get("STRIDE_SEC", 1.0)),
+            **binding_kwargs(self.config),
+        )
+        self._processor_dir = str(processor_dir)
+        self._impl = OnnxCTCSTT(str(model_path), self._processor_dir, **self._build_kwargs)
+
+        # --- 4. Model nhẹ hơn cho governor (VARIANTS: {lite: path.onnx}) ---
+        # chỉ giữ 1 model trong RAM; đổi variant = load lại từ path
+        self._variant_paths: Dict[str, str] = {
+            **dict(stt_cfg.get("VARIANTS") or {}),
+            "default": str(model_path),
+        }
+        self.variant = "default"
 
     # ------------------------------------------------------------------
     # API dùng trong pipeline
@@ -104,3 +119,32 @@ class STTEn(STTBase):
             "Backend OnnxCTCSTT không có hàm nào trong các hàm "
             "[transcribe_file, infer_file, infer_from_file, transcribe]."
         )
+
+    def load_audio(self, wav_path: PathLike) -> Any:
+        return self._impl.load_audio(wav_path)
+
+    def transcribe_scored(self, audio: Any) -> Tuple[str, float]:
+        """(text, log-prob CTC trung bình / frame) – dùng cho Mode.AUTO."""
+        return self._impl.transcribe_scored(audio)
+
+    def transcribe_detailed(self, audio: Any) -> Any:
+        """SttResult(text, confidence) trên buffer đã load."""
+        return self._impl.transcribe_detailed(audio)
+
+    def transcribe_with_confidence(self, wav_path: PathLike) -> Any:
+        """SttResult(text, confidence): max-softmax, blank ratio, điểm từng từ."""
+        return self._impl.transcribe_with_confidence(str(wav_path))
+
+    def transcribe_batch(self, audios: Sequence[Any]) -> List[Any]:
+        """Nhiều buffer 16 kHz → SttResult, gộp 1 lần inference khi được (service)."""
+        return self._impl.transcribe_batch(audios)
+
+    def set_variant(self, name: str) -> None:
+        """Đổi model; model cũ được bỏ (không giữ mọi variant trong RAM)."""
+        if name not in self._variant_paths:
+            name = "default"
+        if name == self.variant:
+            return
+        # load xong mới thay → load lỗi thì vẫn dùng model cũ
+        self._impl = OnnxCTCSTT(self._variant_paths[name], self._processor_dir, **self._build_kwargs)
+        self.variant = name
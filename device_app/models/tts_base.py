@@ -1,9 +1,17 @@
 # tts_base.py
 from __future__ import annotations
 import abc
+import hashlib
 import os
 import tempfile
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from device_app.utils.deadline import StageTimeout, budget, wait_until
+from device_app.utils.log import get_logger
+from device_app.utils.thread_budget import audio_affinity
+
+_log = get_logger("tts")
 
 
 class TTSBase(abc.ABC):
@@ -19,6 +27,8 @@ class TTSBase(abc.ABC):
         """
         self.hw_sr = int(hw_sr)
         self.out_device = out_device
+        # text → wav đã render sẵn (câu fallback cố định)
+        self._prerendered: Dict[str, str] = {}
 
     @abc.abstractmethod
     def synthesize_to_file(self, path: str, text: str) -> None:
@@ -33,25 +43,100 @@ class TTSBase(abc.ABC):
         Convenience: synthesize to a temp file, then play it (resample to hw_sr if needed).
         Pipeline should call this.
         """
+        cached = self._prerendered.get(text)
+        if cached and os.path.isfile(cached):
+            self.play_file(cached, delete=False)
+            return
+        wav_path = self.render(text)
+        self.play_file(wav_path, delete=True)
+
+    def prerender(self, texts: Iterable[str], cache_dir: str) -> None:
+        """
+        Render sẵn các câu cố định (vd. fallback "nói lại giúp mình") vào
+        cache_dir; file giữ qua các lần boot, key theo model + text.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        model = getattr(self, "model", "") or ""
+        for text in texts:
+            key = hashlib.sha1(f"{type(self).__name__}|{model}|{text}".encode("utf-8"))
+            path = os.path.join(cache_dir, f"{key.hexdigest()[:16]}.wav")
+            if not os.path.isfile(path):
+                self.synthesize_to_file(path, text)
+            self._prerendered[text] = path
+
+    def render(self, text: str) -> str:
+        """
+        Synthesize `text` into a new temp WAV and return its path (no playback).
+        Lets the pipeline synthesize segment N+1 while segment N is playing.
+        """
         tf = tempfile.NamedTemporaryFile(prefix="tts_", suffix=".wav", delete=False)
         tf.close()
-        wav_path = tf.name
         try:
-            self.synthesize_to_file(wav_path, text)
-            # playback + resample handled by helper below
+            self.synthesize_to_file(tf.name, text)
+        except Exception:
+            self._discard(tf.name)
+            raise
+        return tf.name
+
+    def synthesize_many(
+        self, items: Sequence[Tuple[str, str]], *, max_workers: int = 2
+    ) -> List[Optional[BaseException]]:
+        """
+        Nhiều (path, text) 1 lượt (service gộp request). Backend CLI không có
+        batch trong 1 lần gọi → chạy song song tối đa max_workers lần tổng hợp.
+        Trả lỗi của từng câu (None = thành công), không ném.
+        """
+
+        def one(item: Tuple[str, str]) -> Optional[BaseException]:
+            try:
+                self.synthesize_to_file(*item)
+                return None
+            except Exception as e:
+                return e
+
+        if len(items) <= 1 or max_workers <= 1:
+            return [one(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+            return list(pool.map(one, items))
+
+    def render_pcm(self, text: str) -> Tuple[Any, int]:
+        """
+        render() + đọc + resample về hw_sr → (PCM float32, sr), không để lại file.
+        Dùng khi tổng hợp ở process khác (core/model_server): PCM đi qua
+        shared memory, process phát chỉ việc play_pcm().
+        """
+        wav_path = self.render(text)
+        try:
+            return self._load_resampled(wav_path)
+        finally:
+            self._discard(wav_path)
+
+    def play_file(self, wav_path: str, *, delete: bool = False) -> None:
+        """
+        Play a WAV produced by render(); optionally remove it afterwards.
+        """
+        try:
             self._play_wav_resampled(wav_path)
         finally:
-            try:
-                os.unlink(wav_path)
-            except Exception:
-                pass
+            if delete:
+                self._discard(wav_path)
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.unlink(path)
+        except Exception:
+            pass
 
     def _play_wav_resampled(self, wav_path: str) -> None:
         """
         Read the wav file, resample if needed to self.hw_sr and play via sounddevice.
         """
+        self.play_pcm(*self._load_resampled(wav_path))
+
+    def _load_resampled(self, wav_path: str) -> Tuple[Any, int]:
+        """Read the wav file → (float32 samples at self.hw_sr, self.hw_sr)."""
         import soundfile as sf
-        import sounddevice as sd
         from scipy.signal import resample_poly
         import numpy as np
 
@@ -72,11 +157,30 @@ class TTSBase(abc.ABC):
                 data_rs = np.stack(channels, axis=1)
             data = data_rs.astype("float32")
             sr = self.hw_sr
+        return data, sr
+
+    def play_pcm(self, data: Any, sr: int) -> None:
+        """Play samples already at the output rate via sounddevice."""
+        import sounddevice as sd
 
         # play (use out_device if provided)
+        slack = budget("playback")
+        limit = len(data) / sr + (slack or 0.0)
+        finished = True
         try:
-            sd.play(data, sr, device=self.out_device)
-            sd.wait()
+            # thread callback của stream phát nằm trên core audio riêng
+            with audio_affinity():
+                sd.play(data, sr, device=self.out_device)
+            if slack is None:
+                sd.wait()
+            else:
+                # sd.wait() không có timeout: ALSA treo → chờ mãi
+                stream = sd.get_stream()
+                finished = wait_until(lambda: not stream.active, limit)
+                if not finished:
+                    sd.stop()
         except Exception as e:
-            # best-effort: print error but do not crash pipeline
-            print("[TTS] playback error:", e)
+            # best-effort: log error but do not crash pipeline
+            _log.error("playback error: %s", e)
+        if not finished:
+            raise StageTimeout("playback", limit)
@@ -0,0 +1,349 @@
+# device_app/service.py
+"""
+Dịch vụ dịch nội bộ (kiosk nhiều client) trên cùng STT / NMT / TTS của máy.
+
+    python -m device_app.service                         # SERVICE.HOST:PORT
+    python -m device_app.service --socket /run/translator.sock
+
+API (HTTP/1.1, chỉ localhost hoặc Unix socket):
+    POST /v1/transcribe/<vi|en>      body: WAV 16 kHz   → {"text", "confidence", "latency"}
+    POST /v1/translate/<vi_en|en_vi> {"text": "..."}    → {"text", "latency"}
+    POST /v1/synthesize/<vi|en>      {"text": "..."}    → audio/wav (header X-Latency-*)
+    GET  /v1/stats                                      → thống kê từng batcher
+    GET  /healthz
+
+Mỗi (tác vụ, ngôn ngữ) 1 DynamicBatcher: request đồng thời được gộp trong
+SERVICE.BATCH.MAX_WAIT_MS → STT pad 1 lần session.run, NMT 1 lần generate,
+TTS chạy song song. Queue đầy → 503 + Retry-After (backpressure).
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import socketserver
+import tempfile
+import wave
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from device_app.core.batcher import DynamicBatcher, Overloaded, Timed
+from device_app.utils.deadline import StageTimeout
+from device_app.utils.log import get_logger
+
+_log = get_logger("service")
+
+STT_LANGS = ("vi", "en")
+NMT_DIRECTIONS = ("vi_en", "en_vi")
+MAX_BODY = 16 * 1024 * 1024
+
+
+# ================= BATCH RUNNERS =================
+
+
+def _stt_runner(stt: Any) -> Callable[[List[np.ndarray]], Sequence[Any]]:
+    if hasattr(stt, "transcribe_batch"):
+        return stt.transcribe_batch
+    return lambda audios: [stt.transcribe_detailed(a) for a in audios]
+
+
+def _nmt_runner(nmt: Any) -> Callable[[List[str]], Sequence[str]]:
+    if hasattr(nmt, "translate_batch"):
+        return nmt.translate_batch
+    return lambda texts: [nmt.translate(t) for t in texts]
+
+
+def _tts_runner(tts: Any, parallel: int) -> Callable[[List[str]], Sequence[Any]]:
+    def run(texts: List[str]) -> List[Any]:
+        paths = []
+        for _ in texts:
+            tf = tempfile.NamedTemporaryFile(prefix="svc_", suffix=".wav", delete=False)
+            tf.close()
+            paths.append(tf.name)
+        try:
+            if hasattr(tts, "synthesize_many"):
+                errors = tts.synthesize_many(list(zip(paths, texts)), max_workers=parallel)
+            else:
+                errors = []
+                for p, t in zip(paths, texts):
+                    try:
+                        tts.synthesize_to_file(p, t)
+                        errors.append(None)
+                    except Exception as e:
+                        errors.append(e)
+            return [err if err is not None else Path(p).read_bytes() for p, err in zip(paths, errors)]
+        finally:
+            for p in paths:
+                try:
+                    os.unlink(p)
+                except OSError:
+                    pass
+
+    return run
+
+
+def decode_wav(data: bytes) -> np.ndarray:
+    """WAV PCM 16-bit 16 kHz → mono float32 (stdlib, không cần soundfile)."""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as w:
+            sr, ch, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+            frames = w.readframes(w.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"invalid WAV: {e}") from None
+    if sr != 16000 or width != 2:
+        raise ValueError(f"need 16 kHz 16-bit PCM, got {sr} Hz {8 * width}-bit")
+    pcm = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if ch > 1:
+        pcm = pcm.reshape(-1, ch).mean(axis=1)
+    return pcm
+
+
+# ================= SERVICE =================
+
+
+class TranslationService:
+    """Các batcher theo route; không phụ thuộc HTTP (test gọi thẳng được)."""
+
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        *,
+        make_batcher: Callable[[str, Callable[[List[Any]], Sequence[Any]]], DynamicBatcher],
+        tts_parallel: int = 2,
+        timeout_sec: float = 60.0,
+    ) -> None:
+        self.timeout_sec = float(timeout_sec)
+        self.batchers: Dict[str, DynamicBatcher] = {}
+        for lang in STT_LANGS:
+            if models.get(f"stt_{lang}") is not None:
+                self.batchers[f"transcribe/{lang}"] = make_batcher(
+                    f"stt_{lang}", _stt_runner(models[f"stt_{lang}"])
+                )
+        for d in NMT_DIRECTIONS:
+            if models.get(f"nmt_{d}") is not None:
+                self.batchers[f"translate/{d}"] = make_batcher(f"nmt_{d}", _nmt_runner(models[f"nmt_{d}"]))
+        for lang in STT_LANGS:
+            if models.get(f"tts_{lang}") is not None:
+                self.batchers[f"synthesize/{lang}"] = make_batcher(
+                    f"tts_{lang}", _tts_runner(models[f"tts_{lang}"], tts_parallel)
+                )
+
+    @classmethod
+    def from_config(cls, config: dict, models: Dict[str, Any]) -> "TranslationService":
+        s_cfg = config.get("SERVICE") or {}
+        return cls(
+            models,
+            make_batcher=lambda name, run: DynamicBatcher.from_config(config, name, run),
+            tts_parallel=int(s_cfg.get("TTS_PARALLEL", 2)),
+            timeout_sec=float(s_cfg.get("TIMEOUT_SEC", 60)),
+        )
+
+    def start(self) -> None:
+        for b in self.batchers.values():
+            b.start()
+
+    def close(self) -> None:
+        for b in self.batchers.values():
+            b.close()
+
+    def _call(self, route: str, item: Any) -> Timed[Any]:
+        batcher = self.batchers.get(route)
+        if batcher is None:
+            raise KeyError(route)
+        return batcher(item, timeout=self.timeout_sec)
+
+    def transcribe(self, lang: str, wav: bytes) -> Dict[str, Any]:
+        res = self._call(f"transcribe/{lang}", decode_wav(wav))
+        conf = getattr(res.value, "confidence", None)
+        return {
+            "text": getattr(res.value, "text", res.value),
+            "confidence": round(float(conf.score), 4) if conf is not None else None,
+            "latency": res.latency(),
+        }
+
+    def translate(self, direction: str, text: str) -> Dict[str, Any]:
+        res = self._call(f"translate/{direction}", text)
+        return {"text": res.value, "latency": res.latency()}
+
+    def synthesize(self, lang: str, text: str) -> Timed[bytes]:
+        return self._call(f"synthesize/{lang}", text)
+
+    def stats(self) -> Dict[str, Any]:
+        return {route: b.stats() for route, b in self.batchers.items()}
+
+
+# ================= HTTP =================
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: Any  # có .service
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        _log.debug("%s " + fmt, self.command, *args)
+
+    def _send(self, code: int, body: bytes, ctype: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, code: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(code, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json", headers)
+
+    def _body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        if n > MAX_BODY:
+            raise ValueError(f"body too large ({n} B)")
+        return self.rfile.read(n) if n else b""
+
+    def _text(self) -> str:
+        try:
+            text = json.loads(self._body() or b"{}").get("text", "")
+        except (json.JSONDecodeError, AttributeError):
+            raise ValueError('expected JSON {"text": "..."}') from None
+        if not isinstance(text, str):
+            raise ValueError("text must be a string")
+        return text
+
+    def do_GET(self) -> None:
+        if self.path == "/healthz":
+            self._json(200, {"ok": True})
+        elif self.path == "/v1/stats":
+            self._json(200, self.server.service.stats())
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        svc: TranslationService = self.server.service
+        parts = self.path.strip("/").split("/")
+        try:
+            if len(parts) != 3 or parts[0] != "v1":
+                raise KeyError(self.path)
+            task, arg = parts[1], parts[2]
+            if task == "transcribe":
+                self._json(200, svc.transcribe(arg, self._body()))
+            elif task == "translate":
+                self._json(200, svc.translate(arg, self._text()))
+            elif task == "synthesize":
+                res = svc.synthesize(arg, self._text())
+                lat = res.latency()
+                self._send(
+                    200,
+                    res.value,
+                    "audio/wav",
+                    {
+                        "X-Latency-Queue-Ms": str(lat["queue_ms"]),
+                        "X-Latency-Run-Ms": str(lat["run_ms"]),
+                        "X-Batch-Size": str(lat["batch"]),
+                    },
+                )
+            else:
+                raise KeyError(self.path)
+        except KeyError:
+            self._json(404, {"error": f"no route {self.path}"})
+        except ValueError as e:
+            self._json(400, {"error": str(e)})
+        except Overloaded as e:
+            self._json(503, {"error": str(e)}, {"Retry-After": "1"})
+        except StageTimeout as e:
+            self._json(504, {"error": str(e)})
+        except FutureTimeout:
+            self._json(504, {"error": f"no result within {svc.timeout_sec:g}s"})
+        except Exception as e:
+            _log.exception("request %s failed", self.path)
+            self._json(500, {"error": f"{type(e).__name__}: {e}"})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self) -> Tuple[Any, Any]:
+        sock, _ = super().get_request()
+        # BaseHTTPRequestHandler cần client_address dạng (host, port)
+        return sock, ("unix", 0)
+
+
+def make_server(
+    service: TranslationService, *, host: str = "127.0.0.1", port: int = 8765, socket_path: str = ""
+) -> socketserver.BaseServer:
+    if socket_path:
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+        server: Any = _UnixHTTPServer(socket_path, _Handler)
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+
+# ================= MAIN =================
+
+
+def _load_models(config: dict, names: Sequence[str]) -> Dict[str, Any]:
+    from device_app.core.model_server import FACTORIES, build_model
+
+    models = {}
+    for name in names:
+        _log.info("loading %s", name)
+        models[name] = build_model(FACTORIES[name], config)
+    return models
+
+
+def main() -> None:
+    from device_app.utils.bundle import configure_bundles
+    from device_app.utils.config import load_config
+    from device_app.utils.deadline import configure_deadlines
+    from device_app.utils.log import setup_logging
+    from device_app.utils.thread_budget import apply_thread_budget, log_thread_budget
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--config", default=None)
+    ap.add_argument("--host", default=None)
+    ap.add_argument("--port", type=int, default=None)
+    ap.add_argument("--socket", default=None, help="Unix socket thay cho TCP")
+    ap.add_argument("--models", default=None, help="vd. stt_vi,nmt_vi_en (mặc định SERVICE.MODELS)")
+    args = ap.parse_args()
+
+    cfg_path = args.config or Path(__file__).resolve().parent / "config.yaml"
+    config = load_config(cfg_path)
+    s_cfg = config.get("SERVICE") or {}
+    apply_thread_budget(config)
+    setup_logging(config)
+    log_thread_budget()
+    configure_bundles(config)
+    configure_deadlines(config)
+
+    names = args.models.split(",") if args.models else list(s_cfg.get("MODELS") or [])
+    service = TranslationService.from_config(config, _load_models(config, names))
+    service.start()
+
+    server = make_server(
+        service,
+        host=args.host or s_cfg.get("HOST", "127.0.0.1"),
+        port=args.port if args.port is not None else int(s_cfg.get("PORT", 8765)),
+        socket_path=args.socket if args.socket is not None else s_cfg.get("SOCKET", ""),
+    )
+    _log.info("serving %s on %s", sorted(service.batchers), server.server_address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
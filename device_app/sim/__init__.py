@@ -0,0 +1,8 @@
+"""
+Mô phỏng phần cứng + ghi / phát lại phiên làm việc (trace).
+
+- backends : nút, audio (WAV), pin, màn hình giả theo đúng interface thật
+- trace    : ghi phiên thật trên thiết bị → trace.jsonl + các WAV
+- replay   : chạy TranslatorPipeline.run từ trace, đo latency mỗi câu
+- tiny_models : model ONNX / Marian / piper giả cỡ nhỏ cho test/test_perf.py
+"""
@@ -0,0 +1,189 @@
+# device_app/sim/backends.py
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from device_app.hardware.buttons import MODE_LONG, TALK_DOWN, TALK_UP, ButtonEvent
+
+
+class SimButtons:
+    """
+    Nút bấm phát lại từ trace (backend event, giống IrqGpioButtons).
+
+    - Khoảng cách giữa 2 event giữ như trong trace (chia cho `speed`;
+      speed=0 → phát ngay, không chờ)
+    - `gate`: TALK_DOWN chỉ được phát khi gate() đúng (pipeline READY) →
+      replay tất định, không phụ thuộc máy nhanh / chậm
+    - `timed=True`: TALK_DOWN phát đúng timestamp, KHÔNG chờ gate → câu sau
+      được ghi trong lúc câu trước còn dịch / nói (như người dùng thật);
+      chỉ MODE_LONG cuối trace còn chờ gate
+    - Hết trace → MODE_LONG để pipeline tự tắt
+    """
+
+    def __init__(
+        self,
+        events: Sequence[Tuple[float, str]],
+        *,
+        speed: float = 1.0,
+        gate: Optional[Callable[[], bool]] = None,
+        shutdown_at_end: bool = True,
+        timed: bool = False,
+    ) -> None:
+        self._events: List[Tuple[float, str]] = sorted(events)
+        if shutdown_at_end:
+            last_t = self._events[-1][0] if self._events else 0.0
+            self._events.append((last_t, MODE_LONG))
+        self.speed = float(speed)
+        self.gate = gate
+        self._gated = (MODE_LONG,) if timed else (TALK_DOWN, MODE_LONG)
+
+        self._idx = 0
+        self._prev_t = 0.0
+        self._due: Optional[float] = None
+        self._talk_down = False
+
+        self.emitted: List[ButtonEvent] = []
+        self.last_release: Optional[float] = None
+
+    def _delay(self, trace_t: float) -> float:
+        if self.speed <= 0:
+            return 0.0
+        return max(0.0, trace_t - self._prev_t) / self.speed
+
+    def get_event(self, timeout: Optional[float] = None) -> Optional[ButtonEvent]:
+        if self._idx >= len(self._events):
+            time.sleep(timeout or 0.0)
+            return None
+
+        trace_t, kind = self._events[self._idx]
+        now = time.monotonic()
+
+        # chờ pipeline rảnh trước khi "nhấn" câu tiếp theo / tắt máy
+        if kind in self._gated and self.gate is not None and not self.gate():
+            time.sleep(min(timeout if timeout is not None else 0.01, 0.01))
+            self._due = None
+            return None
+
+        if self._due is None:
+            self._due = now + self._delay(trace_t)
+
+        if now < self._due:
+            wait = self._due - now
+            time.sleep(wait if timeout is None else min(wait, timeout))
+            if time.monotonic() < self._due:
+                return None
+
+        self._idx += 1
+        self._prev_t = trace_t
+        self._due = None
+
+        evt = ButtonEvent(kind, time.monotonic())
+        if kind == TALK_DOWN:
+            self._talk_down = True
+        elif kind == TALK_UP:
+            self._talk_down = False
+            self.last_release = evt.t
+        self.emitted.append(evt)
+        return evt
+
+    def poll_mode_event(self):
+        return None
+
+    def is_talk_pressed(self) -> bool:
+        return self._talk_down
+
+
+class SimAudio:
+    """
+    Audio giả: mỗi lần stop_record trả về BẢN SAO của WAV kế tiếp trong danh
+    sách (như AudioManager ghi file rec_* mới) → pipeline xoá file của câu bị
+    bỏ mà không đụng tới trace.
+    """
+
+    def __init__(self, wav_paths: Sequence[str], tmp_dir: Optional[str] = None) -> None:
+        self._wavs = [str(p) for p in wav_paths]
+        self.tmp_dir = tmp_dir or tempfile.mkdtemp(prefix="sim_audio_")
+        self._idx = 0
+        self._recording = False
+
+    def start_record(self) -> None:
+        if self._recording:
+            raise RuntimeError("Recording already started")
+        self._recording = True
+
+    def stop_record(self) -> str:
+        if not self._recording:
+            raise RuntimeError("Recording not started")
+        self._recording = False
+
+        if self._idx >= len(self._wavs):
+            raise RuntimeError("Audio too short")
+        src = self._wavs[self._idx]
+        # giữ tên file gốc (STT giả trong test đọc theo tên), mỗi lượt 1 thư mục
+        path = os.path.join(self.tmp_dir, str(self._idx), os.path.basename(src))
+        self._idx += 1
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(src, path)
+        return path
+
+
+class SimPower:
+    """Pin theo timeline [(t_giây, percent), ...] tính từ lúc tạo object."""
+
+    def __init__(
+        self,
+        timeline: Sequence[Tuple[float, int]] = ((0.0, 100),),
+        *,
+        speed: float = 1.0,
+        low_pct: int = 10,
+    ) -> None:
+        self._timeline = sorted(timeline) or [(0.0, 100)]
+        self.speed = float(speed)
+        self.low_pct = low_pct
+        self._t0 = time.monotonic()
+        self.shutdowns = 0
+
+    def get_percent(self) -> int:
+        if self.speed <= 0:
+            return int(self._timeline[0][1])
+        elapsed = (time.monotonic() - self._t0) * self.speed
+        pct = self._timeline[0][1]
+        for t, p in self._timeline:
+            if t > elapsed:
+                break
+            pct = p
+        return int(pct)
+
+    def is_low(self) -> bool:
+        return self.get_percent() <= self.low_pct
+
+    def shutdown(self) -> None:
+        self.shutdowns += 1
+
+
+class SimDisplay:
+    """Màn hình giả: chỉ ghi lại lịch sử show_status."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.history: List[Tuple[float, str, Any, Any]] = []
+
+    def show_mode(self, mode: Any, battery: Any = None) -> None:
+        self.show_status(mode=mode, state="READY", battery=battery)
+
+    def show_status(self, *, mode: Any = None, state: Any = None, battery: Any = None, **_) -> None:
+        with self._lock:
+            self.history.append((time.monotonic(), str(state), mode, battery))
+
+    def show_battery(self, percent: Any) -> None:
+        pass
+
+    @property
+    def states(self) -> List[str]:
+        with self._lock:
+            return [h[1] for h in self.history]
@@ -0,0 +1,229 @@
+# device_app/sim/replay.py
+"""
+Phát lại trace qua TranslatorPipeline.run và đo latency từng câu.
+
+    python -m device_app.sim.replay traces/s1 [--speed 0] [--core sync] [--mode VI_EN]
+                                    [--timed] [--telemetry logs/bench.jsonl] [--json]
+
+Latency = lúc nhả TALK → lúc bắt đầu phát âm thanh đầu tiên (kể cả thời
+gian câu nằm chờ trong queue).
+
+Mặc định mỗi TALK_DOWN chờ pipeline rảnh hẳn (tất định, đo latency từng câu
+riêng lẻ). --timed: phát đúng timestamp đã ghi, không chờ → ghi câu mới
+trong lúc câu trước còn dịch (PIPELINE.QUEUE); không có queue thì câu bấm
+lúc đang bận bị bỏ qua như trên máy thật.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from device_app.core.modes import Mode
+from device_app.sim.backends import SimAudio, SimButtons, SimDisplay, SimPower
+from device_app.sim.trace import load_trace
+
+
+@dataclass
+class UtteranceLatency:
+    index: int
+    wav: str
+    release_to_first_audio_sec: Optional[float] = None
+
+
+@dataclass
+class ReplayReport:
+    utterances: List[UtteranceLatency]
+    wall_sec: float
+    display_states: List[str]
+    queue: Optional[Dict[str, Any]] = None  # JobQueue.stats() khi PIPELINE.QUEUE bật
+
+    def summary(self) -> Dict[str, Any]:
+        done = [u.release_to_first_audio_sec for u in self.utterances]
+        done = sorted(x for x in done if x is not None)
+        return {
+            "n": len(done),
+            "p50_ms": round(done[len(done) // 2] * 1000, 1) if done else None,
+            "max_ms": round(done[-1] * 1000, 1) if done else None,
+            "wall_sec": round(self.wall_sec, 3),
+            "queue": self.queue,
+        }
+
+    def print_table(self) -> None:
+        print("=== REPLAY: release → first audio ===")
+        for u in self.utterances:
+            lat = u.release_to_first_audio_sec
+            txt = f"{lat * 1000:8.1f} ms" if lat is not None else "   (no audio)"
+            print(f"  #{u.index:<3} {Path(u.wav).name:<16} {txt}")
+        s = self.summary()
+        if s["n"]:
+            print(f"  n={s['n']}  p50={s['p50_ms']:.1f} ms  max={s['max_ms']:.1f} ms")
+        print(f"  wall = {self.wall_sec:.2f}s")
+        if self.queue is not None:
+            print(f"  queue = {self.queue}")
+
+
+def replay(
+    trace_dir: str | Path,
+    models: Dict[str, Any],
+    *,
+    config: Optional[dict] = None,
+    speed: float = 1.0,
+    core: str = "sync",
+    start_mode: Mode = Mode.VI_EN,
+    timed: bool = False,
+) -> ReplayReport:
+    trace_dir = Path(trace_dir)
+    events = load_trace(trace_dir)
+
+    buttons_script = [(e["t"], e["kind"]) for e in events if e["type"] == "button"]
+    wavs = [str(trace_dir / e["wav"]) for e in events if e["type"] == "audio"]
+    battery = [(e["t"], e["pct"]) for e in events if e["type"] == "battery"]
+
+    pipeline_ref: List[Any] = []
+    handled = [0]
+
+    def _idle() -> bool:
+        # mọi event đã phát đều đã được pipeline xử lý (async: event nằm chờ
+        # trong asyncio.Queue) và không còn câu nào đang dở
+        return (
+            bool(pipeline_ref)
+            and handled[0] == len(buttons.emitted)
+            and pipeline_ref[0].is_idle()
+        )
+
+    buttons = SimButtons(buttons_script, speed=speed, gate=_idle, timed=timed)
+    audio = SimAudio(wavs)
+    power = SimPower(battery or [(0.0, 100)], speed=speed)
+    display = SimDisplay()
+
+    if core == "async":
+        from device_app.core.async_pipeline import AsyncTranslatorPipeline as cls
+    else:
+        from device_app.core.pipeline import TranslatorPipeline as cls
+
+    pipeline = cls(
+        display=display,
+        buttons=buttons,
+        audio=audio,
+        power=power,
+        device_env="PROD",
+        config=config or {},
+        **models,
+    )
+    pipeline_ref.append(pipeline)
+
+    if core == "async":
+        orig_on_button = pipeline._on_button
+
+        async def _on_button(evt: Any) -> None:
+            try:
+                await orig_on_button(evt)
+            finally:
+                handled[0] += 1
+
+        pipeline._on_button = _on_button  # type: ignore[method-assign]
+    else:
+        orig_event = pipeline._safe_button_event
+
+        def _safe_button_event(evt: Any) -> None:
+            try:
+                orig_event(evt)
+            finally:
+                handled[0] += 1
+
+        pipeline._safe_button_event = _safe_button_event  # type: ignore[method-assign]
+
+    utterances = [UtteranceLatency(i, w) for i, w in enumerate(wavs)]
+    # câu thứ k ghi xong = WAV thứ k (SimAudio) → gắn index + lúc nhả nút
+    # vào job; câu đang dịch lấy từ job (--timed: nhiều câu chờ cùng lúc)
+    job_of: Dict[str, Tuple[int, float]] = {}
+    current: List[Optional[Tuple[int, float]]] = [None]
+    orig_make, orig_begin = pipeline._make_job, pipeline._begin_job
+
+    def _make_job(wav_path: str, mode: Mode, t_release: float) -> Any:
+        job_of[wav_path] = (len(job_of), t_release)
+        return orig_make(wav_path, mode, t_release)
+
+    def _begin_job(job: Any) -> None:
+        current[0] = job_of.get(job.wav_path)
+        orig_begin(job)
+
+    orig_mark = pipeline._mark_first_audio
+
+    def _mark_first_audio() -> None:
+        if current[0] is not None and current[0][0] < len(utterances):
+            idx, t_release = current[0]
+            u = utterances[idx]
+            if u.release_to_first_audio_sec is None:
+                u.release_to_first_audio_sec = time.monotonic() - t_release
+        orig_mark()
+
+    pipeline._make_job = _make_job  # type: ignore[method-assign]
+    pipeline._begin_job = _begin_job  # type: ignore[method-assign]
+    pipeline._mark_first_audio = _mark_first_audio  # type: ignore[method-assign]
+
+    t0 = time.monotonic()
+    pipeline.run(start_mode=start_mode)
+    wall = time.monotonic() - t0
+
+    queue = pipeline.jobs.stats() if pipeline.jobs is not None else None
+    return ReplayReport(utterances, wall, display.states, queue)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("trace_dir")
+    ap.add_argument("--speed", type=float, default=1.0, help="0 = không chờ giữa các event")
+    ap.add_argument("--core", choices=("sync", "async"), default="sync")
+    ap.add_argument("--mode", choices=[m.name for m in Mode], default=Mode.VI_EN.name)
+    ap.add_argument("--timed", action="store_true", help="phát đúng timestamp, không chờ pipeline rảnh")
+    ap.add_argument("--config", default=None)
+    ap.add_argument("--telemetry", default=None, help="ghi RSS/CPU/nhiệt độ vào log này")
+    ap.add_argument("--json", action="store_true", help="in 1 dòng JSON tóm tắt (cho tools)")
+    args = ap.parse_args()
+
+    from device_app.main import build_models
+    from device_app.utils.bundle import configure_bundles
+    from device_app.utils.config import load_config
+    from device_app.utils.deadline import configure_deadlines
+    from device_app.utils.log import setup_logging
+    from device_app.utils.thread_budget import apply_thread_budget, log_thread_budget
+    from device_app.utils.telemetry import Telemetry, load_log, summarize
+
+    cfg_path = args.config or Path(__file__).resolve().parent.parent / "config.yaml"
+    config = load_config(cfg_path)
+    apply_thread_budget(config)
+    setup_logging(config)
+    log_thread_budget()
+    configure_bundles(config)
+    configure_deadlines(config)
+
+    telemetry = None
+    if args.telemetry:
+        telemetry = Telemetry.from_config(config, log_path=args.telemetry)
+
+    report = replay(
+        args.trace_dir,
+        build_models(config, telemetry),
+        config=config,
+        speed=args.speed,
+        core=args.core,
+        start_mode=Mode[args.mode],
+        timed=args.timed,
+    )
+    if args.json:
+        print(json.dumps(report.summary()))
+    else:
+        report.print_table()
+
+    if telemetry is not None:
+        telemetry.close()
+        print("[TELEMETRY]", summarize(load_log(args.telemetry)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# device_app/sim/tiny_models.py
+"""
+Model giả KÍCH THƯỚC NHỎ, khởi tạo ngẫu nhiên, cùng định dạng với artifacts thật
+→ chạy OnnxCTCSTT / NMTBase / PiperTTS / pipeline mà không cần vài trăm MB weights.
+
+- make_tiny_ctc    : graph ONNX CTC (conv stride 320 ≈ wav2vec2) + thư mục processor
+- make_tiny_marian : MarianMT 1 layer + tokenizer sentencepiece
+- make_fake_piper  : script `piper` giả, ghi WAV sine theo độ dài câu
+
+Chỉ dùng cho test / benchmark (test/test_perf.py). Dependency nặng
+(onnx, transformers, torch, sentencepiece) import bên trong từng hàm.
+"""
+from __future__ import annotations
+
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+from typing import Sequence, Tuple
+
+import numpy as np
+
+CTC_VOCAB = ["<pad>", "<s>", "</s>", "<unk>", "|"] + list("abcdefghijklmnopqrstuvwxyz'")
+FRAME_SAMPLES = 320  # 20 ms @ 16 kHz, giống wav2vec2
+
+_SPM_SENTENCES = (
+    "xin chào bạn khỏe không",
+    "tôi muốn đi chợ hôm nay",
+    "cảm ơn bạn rất nhiều",
+    "hello how are you today",
+    "i would like to go to the market",
+    "thank you very much my friend",
+)
+
+
+def make_tiny_ctc(
+    out_dir: str | Path, *, hidden: int = 32, seed: int = 0, attention_mask: bool = False
+) -> Tuple[Path, Path]:
+    """
+    → (model.onnx, processor_dir). logits (B, T, V), T = N // 320.
+
+    attention_mask=True: thêm input attention_mask và 1 vector ngữ cảnh trung
+    bình trên các frame có mask (giống self-attention: pad không mask là
+    đổi logits của cả câu) → test được đường pad + mask.
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+    from transformers import Wav2Vec2CTCTokenizer, Wav2Vec2FeatureExtractor, Wav2Vec2Processor
+
+    out_dir = Path(out_dir)
+    proc_dir = out_dir / "processor"
+    proc_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_vocab = len(CTC_VOCAB)
+
+    conv_w = rng.standard_normal((hidden, 1, FRAME_SAMPLES)).astype(np.float32) * 0.05
+    proj_w = rng.standard_normal((hidden, n_vocab)).astype(np.float32) * 0.5
+    initializer = [
+        numpy_helper.from_array(np.array([1], dtype=np.int64), "axis1"),
+        numpy_helper.from_array(conv_w, "conv_w"),
+        numpy_helper.from_array(proj_w, "proj_w"),
+    ]
+    inputs = [helper.make_tensor_value_info("input_values", TensorProto.FLOAT, ["b", "n"])]
+    nodes = [
+        helper.make_node("Unsqueeze", ["input_values", "axis1"], ["x3"]),
+        helper.make_node("Conv", ["x3", "conv_w"], ["h"], strides=[FRAME_SAMPLES]),
+    ]
+    if attention_mask:
+        inputs.append(helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["b", "n"]))
+        initializer += [
+            numpy_helper.from_array(np.array([2], dtype=np.int64), "axis2"),
+            numpy_helper.from_array(np.full((1, 1, FRAME_SAMPLES), 1 / FRAME_SAMPLES, np.float32), "pool_w"),
+            numpy_helper.from_array(np.array(1e-3, dtype=np.float32), "eps"),
+        ]
+        nodes += [
+            # mask sample → mask frame (b, 1, T): frame chỉ tính khi đủ sample thật
+            helper.make_node("Cast", ["attention_mask"], ["mf"], to=TensorProto.FLOAT),
+            helper.make_node("Unsqueeze", ["mf", "axis1"], ["m3"]),
+            helper.make_node("Conv", ["m3", "pool_w"], ["fp"], strides=[FRAME_SAMPLES]),
+            helper.make_node("Add", ["fp", "eps"], ["fe"]),
+            helper.make_node("Floor", ["fe"], ["fm"]),
+            # ngữ cảnh = trung bình h trên frame thật, cộng vào mọi frame
+            helper.make_node("Mul", ["h", "fm"], ["hm"]),
+            helper.make_node("ReduceSum", ["hm", "axis2"], ["hs"], keepdims=1),
+            helper.make_node("ReduceSum", ["fm", "axis2"], ["fs"], keepdims=1),
+            helper.make_node("Div", ["hs", "fs"], ["ctx"]),
+            helper.make_node("Add", ["h", "ctx"], ["hc"]),
+        ]
+    nodes += [
+        helper.make_node("Transpose", ["hc" if attention_mask else "h"], ["ht"], perm=[0, 2, 1]),
+        helper.make_node("Tanh", ["ht"], ["act"]),
+        helper.make_node("MatMul", ["act", "proj_w"], ["logits"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "tiny_ctc",
+        inputs,
+        [helper.make_tensor_value_info("logits", TensorProto.FLOAT, ["b", "t", n_vocab])],
+        initializer=initializer,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    # onnx mới ghi IR version mà onnxruntime (nhất là bản trên Pi) chưa đọc được
+    model.ir_version = 8
+    model_path = out_dir / "tiny_ctc.onnx"
+    onnx.save_model(model, str(model_path))
+
+    vocab_file = out_dir / "vocab.json"
+    vocab_file.write_text(json.dumps({c: i for i, c in enumerate(CTC_VOCAB)}), encoding="utf-8")
+    tokenizer = Wav2Vec2CTCTokenizer(
+        str(vocab_file), pad_token="<pad>", unk_token="<unk>", word_delimiter_token="|"
+    )
+    extractor = Wav2Vec2FeatureExtractor(
+        feature_size=1,
+        sampling_rate=16000,
+        padding_value=0.0,
+        do_normalize=True,
+        return_attention_mask=attention_mask,
+    )
+    Wav2Vec2Processor(feature_extractor=extractor, tokenizer=tokenizer).save_pretrained(proc_dir)
+    return model_path, proc_dir
+
+
+def make_tiny_marian(
+    out_dir: str | Path,
+    *,
+    sentences: Sequence[str] = _SPM_SENTENCES,
+    d_model: int = 32,
+    seed: int = 0,
+) -> Path:
+    """Thư mục HF (config + weights + tokenizer) mà NMTBase load được."""
+    import sentencepiece as spm
+    import torch
+    from transformers import MarianConfig, MarianMTModel
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(sentences),
+        model_prefix=str(out_dir / "spm"),
+        vocab_size=64,
+        character_coverage=1.0,
+        hard_vocab_limit=False,
+    )
+    for name in ("source.spm", "target.spm"):
+        (out_dir / name).write_bytes((out_dir / "spm.model").read_bytes())
+    for leftover in ("spm.model", "spm.vocab"):
+        (out_dir / leftover).unlink()
+
+    sp = spm.SentencePieceProcessor(model_file=str(out_dir / "source.spm"))
+    vocab = {sp.id_to_piece(i): i for i in range(sp.get_piece_size())}
+    vocab.setdefault("<pad>", len(vocab))
+    (out_dir / "vocab.json").write_text(json.dumps(vocab, ensure_ascii=False), encoding="utf-8")
+    (out_dir / "tokenizer_config.json").write_text(
+        json.dumps({"source_lang": "src", "target_lang": "tgt", "model_max_length": 256}),
+        encoding="utf-8",
+    )
+
+    torch.manual_seed(seed)
+    config = MarianConfig(
+        vocab_size=len(vocab),
+        d_model=d_model,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=2 * d_model,
+        decoder_ffn_dim=2 * d_model,
+        max_position_embeddings=256,
+        pad_token_id=vocab["<pad>"],
+        eos_token_id=vocab["</s>"],
+        decoder_start_token_id=vocab["<pad>"],
+        forced_eos_token_id=vocab["</s>"],
+    )
+    MarianMTModel(config).save_pretrained(out_dir, safe_serialization=False)
+    return out_dir
+
+
+_FAKE_PIPER = '''#!{python}
+"""piper giả: -i <txt> -f <wav> → sine 22050 Hz, 60 ms / ký tự."""
+import math, struct, sys, wave
+
+args = sys.argv[1:]
+text = open(args[args.index("-i") + 1], encoding="utf-8").read()
+n = int(22050 * 0.06 * max(1, len(text)))
+frames = b"".join(
+    struct.pack("<h", int(8000 * math.sin(2 * math.pi * 220 * i / 22050))) for i in range(n)
+)
+with wave.open(args[args.index("-f") + 1], "wb") as w:
+    w.setnchannels(1)
+    w.setsampwidth(2)
+    w.setframerate(22050)
+    w.writeframes(frames)
+'''
+
+
+def make_fake_piper(out_dir: str | Path) -> Path:
+    """Executable cùng giao diện CLI mà PiperTTS gọi (-i, -f, -m)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    exe = out_dir / "piper"
+    exe.write_text(_FAKE_PIPER.format(python=sys.executable), encoding="utf-8")
+    exe.chmod(exe.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return exe
+
+
+def write_tone_wav(path: str | Path, seconds: float, *, sr: int = 16000, seed: int = 0) -> Path:
+    """WAV 16-bit mono (tone + nhiễu) làm input STT."""
+    import wave
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sr * seconds)) / sr
+    audio = 0.3 * np.sin(2 * np.pi * 180 * t) + 0.05 * rng.standard_normal(t.shape)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype("<i2")
+    with wave.open(os.fspath(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm.tobytes())
+    return Path(path)
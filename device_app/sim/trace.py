@@ -0,0 +1,164 @@
+# device_app/sim/trace.py
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from device_app.hardware.buttons import MODE_LONG, MODE_SHORT, TALK_DOWN, TALK_UP
+from device_app.utils.log import get_logger
+
+_log = get_logger("trace")
+
+TRACE_FILE = "trace.jsonl"
+TRACE_VERSION = 1
+
+# Định dạng trace.jsonl (mỗi dòng 1 record, t = giây kể từ lúc bắt đầu ghi):
+#   {"type": "meta", "version": 1, "started": <unix time>}
+#   {"type": "button", "t": 1.234, "kind": "talk_down"}
+#   {"type": "audio", "t": 3.456, "wav": "utt_000.wav"}
+#   {"type": "battery", "t": 0.0, "pct": 87}
+
+
+class TraceWriter:
+    def __init__(self, out_dir: str | Path) -> None:
+        self.dir = Path(out_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.t0 = time.monotonic()
+        self._lock = threading.Lock()
+        self._f = open(self.dir / TRACE_FILE, "w", encoding="utf-8")
+        self.write({"type": "meta", "version": TRACE_VERSION, "started": time.time()})
+
+    def rel(self, t_mono: Optional[float] = None) -> float:
+        return round((time.monotonic() if t_mono is None else t_mono) - self.t0, 4)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._f.write(line + "\n")
+            self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._f.close()
+
+
+# ================= RECORDING PROXIES =================
+
+
+class _Proxy:
+    def __init__(self, inner: Any, writer: TraceWriter) -> None:
+        self._inner = inner
+        self._w = writer
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._inner, name)
+
+
+class _RecordingButtons(_Proxy):
+    """Backend polling: đổi mức → ghi cạnh."""
+
+    def __init__(self, inner: Any, writer: TraceWriter) -> None:
+        super().__init__(inner, writer)
+        self._talk_prev = False
+
+    def is_talk_pressed(self) -> bool:
+        pressed = self._inner.is_talk_pressed()
+        if pressed != self._talk_prev:
+            self._talk_prev = pressed
+            kind = TALK_DOWN if pressed else TALK_UP
+            self._w.write({"type": "button", "t": self._w.rel(), "kind": kind})
+        return pressed
+
+    def poll_mode_event(self):
+        evt = self._inner.poll_mode_event()
+        if evt in ("short", "long"):
+            kind = MODE_SHORT if evt == "short" else MODE_LONG
+            self._w.write({"type": "button", "t": self._w.rel(), "kind": kind})
+        return evt
+
+
+class _RecordingEventButtons(_RecordingButtons):
+    """Backend event (IRQ): ghi đúng timestamp của ngắt."""
+
+    def get_event(self, timeout: Optional[float] = None):
+        evt = self._inner.get_event(timeout=timeout)
+        if evt is not None:
+            self._w.write({"type": "button", "t": self._w.rel(evt.t), "kind": evt.kind})
+        return evt
+
+
+class _RecordingAudio(_Proxy):
+    def __init__(self, inner: Any, writer: TraceWriter) -> None:
+        super().__init__(inner, writer)
+        self._n = 0
+
+    def stop_record(self) -> str:
+        path = self._inner.stop_record()
+        name = f"utt_{self._n:03d}.wav"
+        self._n += 1
+        try:
+            shutil.copyfile(path, self._w.dir / name)
+            self._w.write({"type": "audio", "t": self._w.rel(), "wav": name})
+        except Exception as e:
+            _log.warning("copy wav failed: %s", e)
+        return path
+
+
+class _RecordingPower(_Proxy):
+    def __init__(self, inner: Any, writer: TraceWriter) -> None:
+        super().__init__(inner, writer)
+        self._last: Optional[int] = None
+
+    def get_percent(self) -> int:
+        pct = self._inner.get_percent()
+        if pct != self._last:
+            self._last = pct
+            self._w.write({"type": "battery", "t": self._w.rel(), "pct": int(pct)})
+        return pct
+
+
+class TraceRecorder:
+    """
+    Bọc backend thật để ghi lại phiên làm việc (nút, WAV, pin).
+    Pipeline không biết gì: proxy giữ nguyên interface.
+    """
+
+    def __init__(self, out_dir: str | Path) -> None:
+        self.writer = TraceWriter(out_dir)
+        _log.info("Recording session to %s", self.writer.dir)
+
+    def wrap(self, buttons: Any, audio: Any, power: Any) -> Tuple[Any, Any, Any]:
+        btn_cls = _RecordingEventButtons if hasattr(buttons, "get_event") else _RecordingButtons
+        return (
+            btn_cls(buttons, self.writer),
+            _RecordingAudio(audio, self.writer),
+            _RecordingPower(power, self.writer),
+        )
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+# ================= LOAD =================
+
+
+def load_trace(trace_dir: str | Path) -> List[Dict[str, Any]]:
+    path = Path(trace_dir) / TRACE_FILE
+    records: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+
+    meta = [r for r in records if r.get("type") == "meta"]
+    if meta and meta[0].get("version", TRACE_VERSION) > TRACE_VERSION:
+        raise ValueError(f"Trace version {meta[0]['version']} is newer than supported")
+
+    events = [r for r in records if r.get("type") != "meta"]
+    events.sort(key=lambda r: r.get("t", 0.0))
+    return events
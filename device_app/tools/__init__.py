@@ -0,0 +1 @@
+"""Công cụ chạy tay (benchmark, build index, đóng gói model): python -m device_app.tools.<tên>."""
@@ -0,0 +1,155 @@
+# device_app/tools/bench_stt_binding.py
+"""
+So sánh STT chạy thường với STT_BINDING (bucket độ dài + IOBinding).
+
+    python -m device_app.tools.bench_stt_binding --lang vi --clips 200
+    python -m device_app.tools.bench_stt_binding --tiny        # model giả, không cần artifacts
+
+Mỗi chế độ chạy trong 1 process mới (arena ORT sạch), cùng 1 dãy clip có độ
+dài ngẫu nhiên (mỗi clip 1 độ dài khác nhau = trường hợp xấu nhất cho arena).
+In: thời gian load (+ warmup), p50 / p95 mỗi clip, RSS tăng lúc load và từ
+clip thứ 2 tới hết (arena ORT phình theo số độ dài khác nhau),
+số clip cho cùng text giữa 2 chế độ (pad có thể đổi logits ở model có norm
+toàn chuỗi).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from device_app.core.batcher import percentile
+
+
+def rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def clips(n: int, max_sec: float, seed: int) -> List[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(8000, int(max_sec * 16000), size=n)
+    t = np.arange(int(max_sec * 16000), dtype=np.float32) / 16000
+    base = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(t.shape).astype(np.float32)
+    return [base[:k].astype(np.float32) for k in lengths]
+
+
+def _child(args: argparse.Namespace) -> None:
+    from device_app.models.onnx_ctc_stt import OnnxCTCSTT
+    from device_app.utils.log import setup_logging
+
+    setup_logging({"LOGGING": {"MODE": "silent"}})
+    kwargs: Dict[str, Any] = {}
+    if args.mode == "bucketed":
+        kwargs = {"bucket_sec": tuple(args.buckets), "warmup": True}
+
+    rss0 = rss_mb()
+    t0 = time.perf_counter()
+    stt = OnnxCTCSTT(args.model, args.processor, chunk_sec=args.chunk_sec, stride_sec=1.0, **kwargs)
+    load_ms = (time.perf_counter() - t0) * 1000
+    rss_load = rss_mb()
+
+    times, texts = [], []
+    rss_first = rss_load
+    for i, audio in enumerate(clips(args.clips, args.chunk_sec, args.seed)):
+        t = time.perf_counter()
+        texts.append(stt.transcribe_detailed(audio).text)
+        times.append((time.perf_counter() - t) * 1000)
+        if i == 0:
+            # lần đầu còn import / cache của processor → không tính vào arena
+            rss_first = rss_mb()
+    times.sort()
+
+    print(
+        json.dumps(
+            {
+                "mode": args.mode,
+                "load_ms": round(load_ms, 1),
+                "p50_ms": round(percentile(times, 0.5), 2),
+                "p95_ms": round(percentile(times, 0.95), 2),
+                "rss_load_mb": round(rss_load - rss0, 1),
+                "rss_growth_mb": round(rss_mb() - rss_first, 1),
+                "bucket_stats": stt.bucketed.stats() if stt.bucketed else None,
+                "texts": texts,
+            }
+        )
+    )
+
+
+def _model_paths(args: argparse.Namespace, tmp: str) -> None:
+    if args.tiny:
+        from device_app.sim.tiny_models import make_tiny_ctc
+
+        model, proc = make_tiny_ctc(tmp, attention_mask=args.tiny_mask)
+    else:
+        from device_app.utils.config import load_config
+
+        cfg_path = args.config or Path(__file__).resolve().parent.parent / "config.yaml"
+        stt_cfg = load_config(cfg_path).get(f"STT_{args.lang.upper()}") or {}
+        model = Path(stt_cfg["MODEL_PATH"])
+        proc = Path(stt_cfg.get("PROCESSOR_DIR") or model.parent / "processor")
+    args.model, args.processor = str(model), str(proc)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--config", default=None)
+    ap.add_argument("--lang", choices=("vi", "en"), default="vi")
+    ap.add_argument("--tiny", action="store_true", help="dùng model CTC giả (sim/tiny_models)")
+    ap.add_argument("--tiny-mask", action="store_true", help="model giả có attention_mask + ngữ cảnh toàn câu")
+    ap.add_argument("--clips", type=int, default=100)
+    ap.add_argument("--chunk-sec", type=float, default=10.0)
+    ap.add_argument("--buckets", type=float, nargs="+", default=[2.0, 4.0, 6.0])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--mode", choices=("plain", "bucketed"), help=argparse.SUPPRESS)
+    ap.add_argument("--model", help=argparse.SUPPRESS)
+    ap.add_argument("--processor", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.mode:
+        _child(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _model_paths(args, tmp)
+        results = {}
+        for mode in ("plain", "bucketed"):
+            cmd = [
+                sys.executable, "-m", "device_app.tools.bench_stt_binding", "--mode", mode,
+                "--model", args.model, "--processor", args.processor,
+                "--clips", str(args.clips), "--chunk-sec", str(args.chunk_sec),
+                "--seed", str(args.seed), "--buckets", *map(str, args.buckets),
+            ]
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            if proc.returncode != 0:
+                print(f"[{mode}] failed: {proc.stderr.strip().splitlines()[-1:]}")
+                return
+            results[mode] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    print(f"{'mode':>9} {'load ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'RSS load':>9} {'RSS +run':>9}")
+    for mode, r in results.items():
+        print(
+            f"{mode:>9} {r['load_ms']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['rss_load_mb']:>8.1f}M {r['rss_growth_mb']:>8.1f}M"
+        )
+    same = sum(a == b for a, b in zip(results["plain"]["texts"], results["bucketed"]["texts"]))
+    print(f"\nsame text: {same}/{args.clips}")
+    print(f"buckets: {json.dumps(results['bucketed']['bucket_stats'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# device_app/tools/bench_text.py
+"""
+Micro-benchmark tầng xử lý text (không cần model / phần cứng).
+
+    python -m device_app.tools.bench_text [--repeat 200]
+
+- So sánh cách cũ (replace / re.sub theo từng slot) với SlotEngine 1 lượt
+- Chuỗi STT dài + chuỗi "đối kháng" cho VI_TYPED: nếu thời gian tăng
+  nhanh hơn tuyến tính khi gấp đôi độ dài → regex đang backtrack bệnh lý
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Callable, Dict, List, Tuple
+
+from device_app.core.pipeline import _strip_music_marks
+from device_app.models.nlp.csp import CSP
+from device_app.models.nlp.skeleton_translation import SkeletonTranslator
+from device_app.models.nlp.slots import SlotEngine
+
+# ================= INPUTS =================
+
+SHORT_VI = "tôi muốn đi đường hoàng hoa thám vì trời đẹp"
+LONG_VI = " ".join(
+    ["hôm nay tôi đi đường lê lợi rồi ghé quận bến thành để mua đồ"] * 40
+)
+
+
+def adversarial_cases(n: int) -> Dict[str, str]:
+    """Chuỗi STT xấu có độ dài ~ n từ."""
+    return {
+        # từ chỉ loại lặp liên tục: mỗi vị trí đều là điểm bắt đầu match
+        "typed_repeat": " ".join(["đường phố quận"] * (n // 3)),
+        # 1 "từ" cực dài không khoảng trắng sau từ chỉ loại
+        "typed_long_word": "đường " + "a" * (n * 5),
+        # tên 3 từ không bao giờ gặp biên dừng (vì/để/...) → lookahead fail
+        "typed_no_stop": " ".join(["quận bến thành xa"] * (n // 4)),
+        # khoảng trắng dài giữa từ chỉ loại và tên
+        "typed_spaces": ("phố" + " " * 50 + "x ") * (n // 10),
+    }
+
+
+def make_slots(n: int) -> Tuple[str, Dict[str, str]]:
+    # giá trị không kết thúc bằng số: "PN_PN1" ăn tiền tố "PN_PN10" sẽ lộ ra
+    slots = {f"[PN{i}]": f"Name {i}." for i in range(n)}
+    text = " ".join(f"word {slot}" for slot in slots)
+    return text, slots
+
+
+# ================= LEGACY (trước SlotEngine) =================
+
+
+def legacy_safe_tokens(skel: str, slots: Dict[str, str]):
+    safe_skel = skel
+    safe_slots = {}
+    for ph, value in slots.items():
+        name = re.sub(r"^\[|\]$", "", ph)
+        safe_token = f"PN_{name}"
+        safe_skel = safe_skel.replace(ph, safe_token)
+        safe_slots[safe_token] = value
+    return safe_skel, safe_slots
+
+
+def legacy_compose(translated: str, slots: Dict[str, str]) -> str:
+    for slot, value in slots.items():
+        translated = translated.replace(slot, value)
+    return translated
+
+
+def legacy_strip_music(text: str) -> str:
+    music_chars = r"♩♪♫♬♭♮♯Ἳ5Ἳ6"
+    text = re.sub(rf"^[{music_chars}\s]+", "", text)
+    text = re.sub(rf"[{music_chars}\s]+$", "", text)
+    return text.strip()
+
+
+def legacy_csp_protect(lang: str, text: str):
+    patterns = CSP.VI_PATTERNS if lang == "vi" else CSP.EN_PATTERNS
+    for pat, role in patterns:
+        m = re.search(pat, text, re.IGNORECASE)
+        if m:
+            name = m.groups()[-1].strip()
+            return text.replace(name, CSP.ROLE_TOKEN[role])
+    return text
+
+
+# ================= RUNNER =================
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> float:
+    """Trả về µs / lần (median của 5 vòng)."""
+    rounds: List[float] = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        rounds.append((time.perf_counter() - t0) / repeat * 1e6)
+    rounds.sort()
+    return rounds[len(rounds) // 2]
+
+
+def row(name: str, old_us: float, new_us: float, note: str = "") -> None:
+    ratio = old_us / new_us if new_us else float("inf")
+    print(f"  {name:<28} old={old_us:10.1f}µs  new={new_us:10.1f}µs  x{ratio:5.2f}{note}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+    rep = args.repeat
+
+    sk = SkeletonTranslator()
+    csp = CSP("vi")
+
+    print("=== SLOT ENGINE vs LEGACY ===")
+    for n in (2, 8, 16, 64):
+        text, slots = make_slots(n)
+        row(
+            f"rekey [{n} slots]",
+            timeit(lambda: legacy_safe_tokens(text, slots), rep),
+            timeit(lambda: SlotEngine.rekey(text, slots), rep),
+        )
+        safe, safe_slots = SlotEngine.rekey(text, slots)
+        # cách cũ sai từ slot thứ 11 (ít việc hơn vì các key sau không còn gì để thay)
+        wrong = legacy_compose(safe, safe_slots) != sk.compose(safe, safe_slots)
+        row(
+            f"compose [{n} slots]",
+            timeit(lambda: legacy_compose(safe, safe_slots), rep),
+            timeit(lambda: sk.compose(safe, safe_slots), rep),
+            "  (old output WRONG)" if wrong else "",
+        )
+
+    music = "♪ ♫ " + LONG_VI + " ♬ ♪"
+    row(
+        "strip_music_marks [long]",
+        timeit(lambda: legacy_strip_music(music), rep),
+        timeit(lambda: _strip_music_marks(music), rep),
+    )
+    for label, text in (("short", SHORT_VI), ("long", LONG_VI)):
+        row(
+            f"csp.protect [{label}]",
+            timeit(lambda: legacy_csp_protect("vi", text), rep),
+            timeit(lambda: csp.protect(text), rep),
+        )
+
+    print("\n=== VI_TYPED: STT dài ===")
+    for label, text in (("short", SHORT_VI), ("long", LONG_VI)):
+        us = timeit(lambda: sk.extract_vi(text), rep)
+        print(f"  extract_vi [{label}, {len(text)} chars] {us:10.1f}µs")
+
+    print("\n=== VI_TYPED: ĐỐI KHÁNG (tăng trưởng khi gấp đôi độ dài) ===")
+    small, big = adversarial_cases(400), adversarial_cases(800)
+    for name in small:
+        t1 = timeit(lambda: sk.extract_vi(small[name]), max(1, rep // 10))
+        t2 = timeit(lambda: sk.extract_vi(big[name]), max(1, rep // 10))
+        growth = t2 / t1 if t1 else float("inf")
+        flag = "  <-- SUPERLINEAR" if growth > 3.0 else ""
+        print(f"  {name:<18} n={t1:10.1f}µs  2n={t2:10.1f}µs  growth x{growth:4.2f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# device_app/tools/build_phrasebook.py
+"""
+Dựng phrasebook offline: TSV đã duyệt → index .pbk (mmap) + WAV tổng hợp sẵn.
+
+    python -m device_app.tools.build_phrasebook [--out artifacts/phrasebook] [--no-audio]
+
+Nguồn: models/data/phrasebook_vi_en.tsv, phrasebook_en_vi.tsv.
+Audio câu dịch được render bằng đúng TTS của hướng đó (vi_en → TTS EN).
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from device_app.models.nlp.phrasebook import Phrasebook, build_index, read_tsv
+from device_app.utils.config import load_config
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "models" / "data"
+DIRECTIONS = ("vi_en", "en_vi")
+
+
+def _make_tts(config: dict, direction: str):
+    if direction == "vi_en":
+        from device_app.models.tts_en import TTSEn
+
+        return TTSEn(config)
+    from device_app.models.tts_vi import TTSVi
+
+    return TTSVi(config)
+
+
+def build(direction: str, out_dir: Path, config: dict, with_audio: bool) -> Path:
+    rows = list(read_tsv(DATA_DIR / f"phrasebook_{direction}.tsv"))
+    tts = _make_tts(config, direction) if with_audio else None
+
+    entries = []
+    for i, (src, tgt) in enumerate(rows):
+        wav = ""
+        if tts is not None:
+            wav = f"{direction}/{i:04d}.wav"
+            (out_dir / direction).mkdir(parents=True, exist_ok=True)
+            tts.synthesize_to_file(str(out_dir / wav), tgt)
+        entries.append((src, tgt, wav))
+
+    return build_index(entries, out_dir / f"{direction}.pbk")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--config", default=None)
+    ap.add_argument("--out", default=None, help="mặc định PHRASEBOOK.DIR trong config")
+    ap.add_argument("--no-audio", action="store_true", help="chỉ dựng index (không cần piper)")
+    args = ap.parse_args()
+
+    cfg_path = args.config or Path(__file__).resolve().parent.parent / "config.yaml"
+    config = load_config(cfg_path)
+    out_dir = Path(args.out or (config.get("PHRASEBOOK") or {}).get("DIR", "artifacts/phrasebook"))
+
+    for direction in DIRECTIONS:
+        path = build(direction, out_dir, config, with_audio=not args.no_audio)
+
+        t0 = time.perf_counter()
+        pb = Phrasebook(path)
+        open_ms = (time.perf_counter() - t0) * 1000
+        print(f"[PHRASEBOOK] {path}: {len(pb)} phrases, {path.stat().st_size} B, open {open_ms:.2f} ms")
+        pb.close()
+
+
+if __name__ == "__main__":
+    main()
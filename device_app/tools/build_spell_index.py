@@ -0,0 +1,54 @@
+# device_app/tools/build_spell_index.py
+"""
+Dựng index sửa chính tả (symmetric delete) từ vocab đi kèm → file .sym (mmap).
+
+    python -m device_app.tools.build_spell_index [--out artifacts/spell] [--max-edit 2]
+
+Nguồn: models/data/vocab_vi.txt, vocab_en.txt (1 từ / dòng, tần suất giảm dần).
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from device_app.models.nlp.spell import SpellIndex, build_index, read_vocab
+from device_app.utils.config import load_config
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "models" / "data"
+LANGS = ("vi", "en")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--config", default=None)
+    ap.add_argument("--out", default=None, help="mặc định NLP.SPELL.DIR trong config")
+    ap.add_argument("--max-edit", type=int, default=2)
+    ap.add_argument("--prefix-len", type=int, default=7)
+    args = ap.parse_args()
+
+    cfg_path = args.config or Path(__file__).resolve().parent.parent / "config.yaml"
+    config = load_config(cfg_path)
+    spell_cfg = (config.get("NLP") or {}).get("SPELL") or {}
+    out_dir = Path(args.out or spell_cfg.get("DIR", "artifacts/spell"))
+
+    for lang in LANGS:
+        t0 = time.perf_counter()
+        words = read_vocab(DATA_DIR / f"vocab_{lang}.txt")
+        path = build_index(
+            words, out_dir / f"{lang}.sym", max_edit=args.max_edit, prefix_len=args.prefix_len
+        )
+        build_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ix = SpellIndex(path)
+        open_ms = (time.perf_counter() - t0) * 1000
+        print(
+            f"[SPELL] {path}: {len(ix)} words, {path.stat().st_size} B, "
+            f"build {build_sec:.2f} s, open {open_ms:.2f} ms"
+        )
+        ix.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# device_app/tools/idle_cpu.py
+"""
+Đo CPU lúc idle của main loop: polling 20 ms (cũ) vs event queue (IRQ).
+
+    python -m device_app.tools.idle_cpu [--seconds 10]
+
+Không cần phần cứng: dùng DebugButtons + display/power giả.
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+
+from device_app.core.pipeline import TranslatorPipeline
+from device_app.hardware.buttons import DebugButtons
+
+
+class _Null:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _Power(_Null):
+    def get_percent(self):
+        return 100
+
+    def is_low(self):
+        return False
+
+
+class _PollOnly:
+    """Che get_event → pipeline rơi về vòng polling cũ."""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def is_talk_pressed(self):
+        return self._inner.is_talk_pressed()
+
+    def poll_mode_event(self):
+        return self._inner.poll_mode_event()
+
+
+def measure(buttons, seconds: float) -> float:
+    pipeline = TranslatorPipeline(
+        display=_Null(),
+        buttons=buttons,
+        audio=_Null(),
+        power=_Power(),
+        device_env="DEV",
+    )
+    worker = threading.Thread(target=pipeline.run, daemon=True)
+
+    cpu0 = time.process_time()
+    t0 = time.monotonic()
+    worker.start()
+    time.sleep(seconds)
+    pipeline._running = False
+    worker.join(timeout=pipeline.tick_sec + 1.0)
+    wall = time.monotonic() - t0
+    return 100.0 * (time.process_time() - cpu0) / wall
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    args = ap.parse_args()
+
+    poll = measure(_PollOnly(DebugButtons()), args.seconds)
+    event = measure(DebugButtons(), args.seconds)
+
+    print(f"[IDLE CPU] polling 20 ms : {poll:6.3f}% of one core")
+    print(f"[IDLE CPU] event queue   : {event:6.3f}% of one core")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# device_app/tools/loadgen.py
+"""
+Đo thông lượng / độ trễ của device_app.service theo số client đồng thời.
+
+    python -m device_app.tools.loadgen --endpoint translate --concurrency 1 2 4 8 16
+    python -m device_app.tools.loadgen --socket /run/translator.sock --endpoint transcribe --wav a.wav
+
+Closed-loop: mỗi client gửi request tiếp ngay khi nhận phản hồi. In req/s,
+p50 / p95 / p99 (ms) và cỡ batch trung bình phía server cho từng mức tải.
+503 (queue đầy) tính riêng, không tính vào latency.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import io
+import json
+import socket
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from device_app.core.batcher import percentile
+
+TEXTS = {
+    "vi": "xin chào, cho tôi hỏi đường đến bến thành",
+    "en": "hello, could you tell me the way to the station",
+}
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+
+def _connect(args: argparse.Namespace) -> http.client.HTTPConnection:
+    if args.socket:
+        return _UnixConnection(args.socket, args.timeout)
+    return http.client.HTTPConnection(args.host, args.port, timeout=args.timeout)
+
+
+def silence_wav(sec: float = 2.0) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * int(16000 * sec))
+    return buf.getvalue()
+
+
+def _request(args: argparse.Namespace) -> Tuple[str, bytes, Dict[str, str]]:
+    lang = args.direction.split("_")[0]
+    if args.endpoint == "transcribe":
+        body = Path(args.wav).read_bytes() if args.wav else silence_wav()
+        return f"/v1/transcribe/{lang}", body, {"Content-Type": "audio/wav"}
+    text = args.text or TEXTS[lang]
+    path = f"/v1/translate/{args.direction}" if args.endpoint == "translate" else f"/v1/synthesize/{lang}"
+    return path, json.dumps({"text": text}).encode("utf-8"), {"Content-Type": "application/json"}
+
+
+def run_level(args: argparse.Namespace, concurrency: int) -> Dict[str, Any]:
+    path, body, headers = _request(args)
+    lat: List[float] = []
+    counts = {"ok": 0, "busy": 0, "error": 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def client() -> None:
+        conn: Optional[http.client.HTTPConnection] = None
+        while time.perf_counter() < stop_at:
+            t0 = time.perf_counter()
+            try:
+                conn = conn or _connect(args)
+                conn.request("POST", path, body, headers)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+            except (OSError, http.client.HTTPException):
+                status = 0
+                if conn is not None:
+                    conn.close()
+                conn = None
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                if status == 200:
+                    counts["ok"] += 1
+                    lat.append(ms)
+                elif status == 503:
+                    counts["busy"] += 1
+                else:
+                    counts["error"] += 1
+            if status == 503:
+                time.sleep(0.01)
+        if conn is not None:
+            conn.close()
+
+    t_start = time.perf_counter()
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+
+    lat.sort()
+    return {
+        "concurrency": concurrency,
+        "rps": round(counts["ok"] / elapsed, 2),
+        "p50_ms": percentile(lat, 0.5),
+        "p95_ms": percentile(lat, 0.95),
+        "p99_ms": percentile(lat, 0.99),
+        **counts,
+    }
+
+
+def server_stats(args: argparse.Namespace) -> Dict[str, Any]:
+    conn = _connect(args)
+    try:
+        conn.request("GET", "/v1/stats")
+        return json.loads(conn.getresponse().read())
+    except (OSError, http.client.HTTPException, ValueError):
+        return {}
+    finally:
+        conn.close()
+
+
+def _fmt(v: Optional[float]) -> str:
+    return "-" if v is None else f"{v:.1f}"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--socket", default="", help="Unix socket của service")
+    ap.add_argument("--endpoint", choices=["translate", "transcribe", "synthesize"], default="translate")
+    ap.add_argument("--direction", choices=["vi_en", "en_vi"], default="vi_en", help="ngôn ngữ nguồn = phần đầu")
+    ap.add_argument("--text", default="")
+    ap.add_argument("--wav", default="", help="WAV 16 kHz cho transcribe (mặc định 2 s im lặng)")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    ap.add_argument("--duration", type=float, default=10.0, help="giây / mức tải")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--json", default="", help="ghi kết quả ra file")
+    args = ap.parse_args()
+
+    route = {
+        "translate": f"translate/{args.direction}",
+        "transcribe": f"transcribe/{args.direction.split('_')[0]}",
+        "synthesize": f"synthesize/{args.direction.split('_')[0]}",
+    }[args.endpoint]
+
+    rows = []
+    print(f"{'conc':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'batch':>6} {'503':>5} {'err':>5}")
+    for c in args.concurrency:
+        before = server_stats(args).get(route) or {}
+        row = run_level(args, c)
+        after = server_stats(args).get(route) or {}
+        batches = (after.get("batches") or 0) - (before.get("batches") or 0)
+        items = (after.get("items") or 0) - (before.get("items") or 0)
+        row["mean_batch"] = round(items / batches, 2) if batches else None
+        rows.append(row)
+        print(
+            f"{c:>5} {row['rps']:>8.2f} {_fmt(row['p50_ms']):>8} {_fmt(row['p95_ms']):>8} "
+            f"{_fmt(row['p99_ms']):>8} {_fmt(row['mean_batch']):>6} {row['busy']:>5} {row['error']:>5}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
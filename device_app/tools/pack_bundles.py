@@ -0,0 +1,105 @@
+# device_app/tools/pack_bundles.py
+"""
+Đóng gói artifacts/<name>/ → artifacts/bundles/<name>/ (xem utils/bundle.py).
+
+    python -m device_app.tools.pack_bundles [--src artifacts] [--out artifacts/bundles] [name ...]
+
+- Thư mục HF có *.bin (NMT Marian) → save_pretrained(safe_serialization) → model.safetensors
+- *.onnx → initializer ra <model>.onnx.data (external data, ORT mmap được)
+- File còn lại (tokenizer, processor JSON, vocab...) → copy nguyên
+
+Chạy trên máy build (cần torch / transformers / onnx), copy cả thư mục
+bundles/ xuống thiết bị.
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import time
+from pathlib import Path
+
+from device_app.utils.bundle import MANIFEST, write_manifest
+
+# initializer nhỏ hơn ngưỡng giữ trong graph (tránh hàng nghìn offset lẻ)
+ONNX_EXTERNAL_MIN_BYTES = 1024
+
+
+def _is_hf_torch_dir(d: Path) -> bool:
+    return (d / "config.json").is_file() and any(d.glob("*.bin"))
+
+
+def _pack_hf(src: Path, dst: Path) -> None:
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(src, torch_dtype=torch.float32)
+    model.save_pretrained(dst, safe_serialization=True)
+    AutoTokenizer.from_pretrained(src, use_fast=False).save_pretrained(dst)
+
+
+def _pack_onnx(src: Path, dst: Path) -> None:
+    import onnx
+
+    model = onnx.load(str(src), load_external_data=True)
+    onnx.save_model(
+        model,
+        str(dst),
+        save_as_external_data=True,
+        all_tensors_to_one_file=True,
+        location=dst.name + ".data",
+        size_threshold=ONNX_EXTERNAL_MIN_BYTES,
+    )
+
+
+def pack(src: Path, out: Path) -> Path:
+    dst = out / src.name
+    if dst.exists():
+        shutil.rmtree(dst)
+    dst.mkdir(parents=True)
+
+    if _is_hf_torch_dir(src):
+        _pack_hf(src, dst)
+        kind = "nmt"
+    else:
+        kind = "files"
+
+    for p in sorted(src.rglob("*")):
+        rel = p.relative_to(src)
+        target = dst / rel
+        if p.is_dir() or target.exists():
+            continue
+        if kind == "nmt" and p.parent == src and p.suffix == ".bin":
+            continue  # đã thay bằng model.safetensors
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if p.suffix == ".onnx":
+            _pack_onnx(p, target)
+            kind = "onnx"
+        elif not p.name.endswith(".onnx.data"):
+            shutil.copy2(p, target)
+
+    write_manifest(dst, name=src.name, kind=kind)
+    return dst
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--src", default="artifacts")
+    ap.add_argument("--out", default="artifacts/bundles")
+    ap.add_argument("names", nargs="*", help="mặc định: mọi thư mục con của --src")
+    args = ap.parse_args()
+
+    src_root, out = Path(args.src), Path(args.out)
+    names = args.names or [
+        d.name for d in sorted(src_root.iterdir()) if d.is_dir() and d.resolve() != out.resolve()
+    ]
+
+    for name in names:
+        t0 = time.perf_counter()
+        dst = pack(src_root / name, out)
+        size = sum(p.stat().st_size for p in dst.rglob("*") if p.is_file())
+        print(f"[BUNDLE] {name} → {dst} ({size / 1e6:.1f} MB, {time.perf_counter() - t0:.1f}s)")
+        print(f"         manifest: {dst / MANIFEST}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# device_app/tools/thread_sweep.py
+"""
+Quét cấu hình THREADS, mỗi tổ hợp replay 1 trace thật (model thật) và chọn
+tổ hợp có latency nhả nút → tiếng đầu tiên tốt nhất.
+
+    python -m device_app.tools.thread_sweep traces/s1 \\
+        --torch 1 2 3 4 --ort 1 2 3 --piper 1 2 --audio-core none 0
+
+Mỗi tổ hợp chạy trong 1 process mới: pool ORT / torch chỉ đặt được 1 lần
+trước khi load model.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from device_app.utils.config import load_config
+
+
+def _run_one(trace_dir: str, config: dict, threads: Dict[str, Any], core: str) -> Optional[dict]:
+    cfg = dict(config)
+    cfg["THREADS"] = dict(config.get("THREADS") or {}, ENABLED=True, **threads)
+    cfg["LOGGING"] = {"MODE": "silent"}
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False, encoding="utf-8") as f:
+        yaml.safe_dump(cfg, f, allow_unicode=True)
+        cfg_path = f.name
+    try:
+        proc = subprocess.run(
+            [
+                sys.executable, "-m", "device_app.sim.replay", trace_dir,
+                "--speed", "0", "--core", core, "--config", cfg_path, "--json",
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    finally:
+        os.unlink(cfg_path)
+
+    if proc.returncode != 0:
+        print(f"  failed: {proc.stderr.strip().splitlines()[-1:]}")
+        return None
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("trace_dir")
+    ap.add_argument("--config", default=None)
+    ap.add_argument("--core", choices=("sync", "async"), default="async")
+    ap.add_argument("--torch", type=int, nargs="+", default=[1, 2, 3])
+    ap.add_argument("--ort", type=int, nargs="+", default=[1, 2, 3])
+    ap.add_argument("--piper", type=int, nargs="+", default=[1, 2])
+    ap.add_argument("--audio-core", nargs="+", default=["none", "0"], help="'none' = không giữ core")
+    args = ap.parse_args()
+
+    cfg_path = args.config or Path(__file__).resolve().parent.parent / "config.yaml"
+    config = load_config(cfg_path)
+
+    results: List[Dict[str, Any]] = []
+    grid = itertools.product(args.torch, args.ort, args.piper, args.audio_core)
+    for torch_n, ort_n, piper_n, audio in grid:
+        threads = {
+            "TORCH": torch_n,
+            "ORT_INTRA": ort_n,
+            "PIPER": piper_n,
+            "AUDIO_CORES": [] if audio == "none" else [int(audio)],
+        }
+        label = f"torch={torch_n} ort={ort_n} piper={piper_n} audio={audio}"
+        print(f"[SWEEP] {label}")
+        summary = _run_one(args.trace_dir, config, threads, args.core)
+        if summary and summary.get("p50_ms") is not None:
+            print(f"  p50={summary['p50_ms']} ms  max={summary['max_ms']} ms")
+            results.append(dict(summary, label=label, threads=threads))
+
+    if not results:
+        print("[SWEEP] no successful run")
+        return
+
+    results.sort(key=lambda r: (r["p50_ms"], r["max_ms"]))
+    print("\n=== THREAD SWEEP (p50 release → first audio) ===")
+    for r in results:
+        print(f"  {r['p50_ms']:8.1f} ms  max {r['max_ms']:8.1f} ms   {r['label']}")
+
+    best = results[0]
+    print("\nBest → config.yaml THREADS:")
+    print(yaml.safe_dump({"THREADS": dict(best["threads"], ENABLED=True)}, sort_keys=False))
+
+
+if __name__ == "__main__":
+    main()
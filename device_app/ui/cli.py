@@ -14,7 +14,7 @@ def _print_modes(modes: Iterable[Mode]) -> None:
         elif m is Mode.EN_VI:
             label = "EN → VI (nói tiếng Anh, dịch sang Việt)"
         else:
-            label = "EN → EN (sửa / cải thiện câu tiếng Anh)"
+            label = "AUTO (tự nhận tiếng Việt / Anh rồi dịch)"
         print(f"  {idx}. {label}")
     print("========================================")
 
@@ -27,7 +27,7 @@ def ask_mode(default: Mode = Mode.EN_VI) -> Mode:
 
     Nếu người dùng chỉ nhấn Enter thì dùng chế độ mặc định.
     """
-    modes = [Mode.VI_EN, Mode.EN_VI, Mode.EN_EN]
+    modes = [Mode.VI_EN, Mode.EN_VI, Mode.AUTO]
 
     _print_modes(modes)
     ans = input(
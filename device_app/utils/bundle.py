@@ -0,0 +1,206 @@
+# device_app/utils/bundle.py
+"""
+Model bundle: bản đóng gói của 1 thư mục artifacts/<name>/ để boot nhanh.
+
+    artifacts/bundles/<name>/
+        bundle.json              manifest (format, id, sha256 + size từng file)
+        model.safetensors        NMT: weights mmap được (thay pytorch_model.bin)
+        <model>.onnx + .onnx.data STT: graph nhỏ + initializer ở external data
+        ...                      tokenizer / processor: copy nguyên
+
+Weights nằm trong file mmap read-only → nạp từ page cache, nhiều process
+dùng chung trang, không parse protobuf / unpickle lớn lúc boot.
+
+Kiểm tra sha256 KHÔNG chặn boot: thread nền (nice cao) đọc lại từng file
+sau khi model đã load. Sai checksum → ghi VERIFY_FAILED vào bundle,
+lần boot sau resolve() bỏ qua bundle đó và dùng lại artifacts gốc.
+
+Đóng gói: python -m device_app.tools.pack_bundles
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("bundle")
+
+FORMAT = "tdbundle"
+FORMAT_VERSION = 1
+MANIFEST = "bundle.json"
+FAILED_MARK = "VERIFY_FAILED"
+
+_root: Optional[Path] = None  # None = không dùng bundle
+_verify = True
+_verifying: Set[Path] = set()
+_lock = threading.Lock()
+
+
+# ================= MANIFEST =================
+
+
+@dataclass(frozen=True)
+class BundleManifest:
+    name: str
+    kind: str
+    bundle_id: str
+    files: Dict[str, Dict[str, int | str]] = field(default_factory=dict)
+    format_version: int = FORMAT_VERSION
+    created: float = 0.0
+
+    @classmethod
+    def read(cls, bundle_dir: str | Path) -> Optional["BundleManifest"]:
+        path = Path(bundle_dir) / MANIFEST
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if raw.get("format") != FORMAT or raw.get("format_version") != FORMAT_VERSION:
+            return None
+        return cls(
+            name=raw["name"],
+            kind=raw["kind"],
+            bundle_id=raw["bundle_id"],
+            files=raw["files"],
+            format_version=raw["format_version"],
+            created=raw.get("created", 0.0),
+        )
+
+
+def file_sha256(path: str | Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk)
+            if not block:
+                return h.hexdigest()
+            h.update(block)
+
+
+def write_manifest(bundle_dir: str | Path, *, name: str, kind: str) -> BundleManifest:
+    """Hash mọi file trong bundle_dir → bundle.json. bundle_id = hash của các hash."""
+    bundle_dir = Path(bundle_dir)
+    files: Dict[str, Dict[str, int | str]] = {}
+    for p in sorted(bundle_dir.rglob("*")):
+        if not p.is_file() or p.name in (MANIFEST, FAILED_MARK):
+            continue
+        rel = p.relative_to(bundle_dir).as_posix()
+        files[rel] = {"size": p.stat().st_size, "sha256": file_sha256(p)}
+
+    top = hashlib.sha256()
+    for rel, meta in files.items():
+        top.update(f"{rel}\0{meta['sha256']}\n".encode("utf-8"))
+
+    manifest = BundleManifest(
+        name=name,
+        kind=kind,
+        bundle_id=top.hexdigest()[:16],
+        files=files,
+        created=time.time(),
+    )
+    payload = {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "name": manifest.name,
+        "kind": manifest.kind,
+        "bundle_id": manifest.bundle_id,
+        "created": manifest.created,
+        "files": files,
+    }
+    (bundle_dir / MANIFEST).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    (bundle_dir / FAILED_MARK).unlink(missing_ok=True)
+    return manifest
+
+
+def verify(bundle_dir: str | Path, manifest: BundleManifest) -> List[str]:
+    """Danh sách file sai (thiếu / sai size / sai sha256). Rỗng = OK."""
+    bundle_dir = Path(bundle_dir)
+    bad: List[str] = []
+    for rel, meta in manifest.files.items():
+        p = bundle_dir / rel
+        try:
+            if p.stat().st_size != meta["size"] or file_sha256(p) != meta["sha256"]:
+                bad.append(rel)
+        except OSError:
+            bad.append(rel)
+    return bad
+
+
+# ================= RUNTIME =================
+
+
+def configure_bundles(config: dict) -> Optional[Path]:
+    """Đọc BUNDLES trong config; gọi 1 lần trước khi load model."""
+    global _root, _verify
+    b_cfg = config.get("BUNDLES") or {}
+    _root = Path(b_cfg.get("DIR", "artifacts/bundles")) if b_cfg.get("ENABLED", False) else None
+    _verify = bool(b_cfg.get("VERIFY", True))
+    return _root
+
+
+def resolve(path: str | Path) -> Path:
+    """
+    artifacts/<name>/<rest> → artifacts/bundles/<name>/<rest> nếu bundle
+    hợp lệ và có file đó; ngược lại trả lại path gốc.
+    """
+    path = Path(path)
+    if _root is None:
+        return path
+
+    parts = path.parts
+    if "artifacts" not in parts:
+        return path
+    i = parts.index("artifacts")
+    if i + 1 >= len(parts):
+        return path
+    name = parts[i + 1]
+    bundle_dir = _root / name
+    target = bundle_dir.joinpath(*parts[i + 2 :])
+
+    if (bundle_dir / FAILED_MARK).exists():
+        _log.warning("bundle %s failed verification earlier → raw artifacts", name)
+        return path
+    manifest = BundleManifest.read(bundle_dir)
+    if manifest is None or not target.exists():
+        return path
+
+    _log.info("using bundle %s (%s)", name, manifest.bundle_id)
+    if _verify:
+        verify_in_background(bundle_dir, manifest)
+    return target
+
+
+def verify_in_background(bundle_dir: Path, manifest: BundleManifest) -> Optional[threading.Thread]:
+    """Mỗi bundle chỉ kiểm 1 lần / process; thread daemon, ưu tiên thấp."""
+    with _lock:
+        if bundle_dir in _verifying:
+            return None
+        _verifying.add(bundle_dir)
+
+    def run() -> None:
+        try:
+            # Linux: nice theo từng thread (tid) → không tranh CPU với STT/NMT
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        t0 = time.monotonic()
+        bad = verify(bundle_dir, manifest)
+        if bad:
+            _log.error("bundle %s checksum mismatch: %s", manifest.name, bad)
+            try:
+                (bundle_dir / FAILED_MARK).write_text("\n".join(bad), encoding="utf-8")
+            except OSError as e:
+                _log.error("cannot mark bundle %s: %s", manifest.name, e)
+            return
+        _log.info("bundle %s verified in %.1fs", manifest.name, time.monotonic() - t0)
+
+    t = threading.Thread(target=run, name=f"verify-{manifest.name}", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,135 @@
+# device_app/utils/deadline.py
+"""
+Hạn thời gian cho từng stage của 1 câu: STT, NMT, SYNTH (piper), PLAYBACK.
+
+Mỗi stage tự dừng theo cách của nó, không treo cả thiết bị:
+- STT      : RunOptions.terminate của ORT (timer thread bật cờ);
+             hạn = STT_SEC + STT_PER_AUDIO_SEC × độ dài câu (giữ nút 30 s
+             vẫn kịp chạy hết các cửa sổ CTC)
+- NMT      : generate(max_time=...) → dừng giữa chừng, coi như timeout
+- SYNTH    : subprocess.run(timeout=...) → piper bị kill
+- PLAYBACK : chờ stream tối đa (độ dài audio + slack) rồi sd.stop()
+
+Hết hạn → StageTimeout; pipeline bắt, ghi event "timeout" rồi nói câu
+báo lỗi đã render sẵn (không đi qua piper).
+
+configure_deadlines(config) gọi 1 lần trong main (giống apply_thread_budget).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("deadline")
+
+STAGES = ("stt", "nmt", "synth", "playback")
+
+
+class StageTimeout(RuntimeError):
+    def __init__(self, stage: str, budget_sec: float) -> None:
+        super().__init__(f"{stage} exceeded {budget_sec:.1f}s")
+        self.stage = stage
+        self.budget_sec = budget_sec
+
+    def __reduce__(self):
+        # ném từ model worker (core/model_server) sang main qua pickle
+        return (StageTimeout, (self.stage, self.budget_sec))
+
+
+@dataclass(frozen=True)
+class DeadlineBudgets:
+    """Giây cho mỗi stage; 0 = không giới hạn."""
+
+    stt: float = 0.0
+    # stt: cộng thêm giây / 1 giây audio (0 = hạn cố định)
+    stt_per_audio_sec: float = 0.0
+    nmt: float = 0.0
+    synth: float = 0.0
+    # playback: độ dài audio + slack (loa treo ALSA thì mới chạm tới)
+    playback_slack: float = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "DeadlineBudgets":
+        d_cfg = config.get("DEADLINES") or {}
+        if not d_cfg.get("ENABLED", False):
+            return cls()
+        return cls(
+            stt=float(d_cfg.get("STT_SEC", 0)),
+            stt_per_audio_sec=float(d_cfg.get("STT_PER_AUDIO_SEC", 0)),
+            nmt=float(d_cfg.get("NMT_SEC", 0)),
+            synth=float(d_cfg.get("SYNTH_SEC", 0)),
+            playback_slack=float(d_cfg.get("PLAYBACK_SLACK_SEC", 0)),
+        )
+
+
+_active = DeadlineBudgets()
+
+
+def configure_deadlines(config: dict) -> DeadlineBudgets:
+    global _active
+    _active = DeadlineBudgets.from_config(config)
+    if _active != DeadlineBudgets():
+        _log.info(
+            "deadlines: stt=%.1fs+%.2f/s nmt=%.1fs synth=%.1fs playback=+%.1fs",
+            _active.stt,
+            _active.stt_per_audio_sec,
+            _active.nmt,
+            _active.synth,
+            _active.playback_slack,
+        )
+    return _active
+
+
+def budget(stage: str, audio_sec: float = 0.0) -> Optional[float]:
+    """
+    Giây cho stage (None = không giới hạn). playback: phần slack.
+    stt: STT_SEC + STT_PER_AUDIO_SEC × audio_sec (giống playback = độ dài + slack).
+    """
+    sec = _active.playback_slack if stage == "playback" else getattr(_active, stage)
+    if sec <= 0:
+        return None
+    if stage == "stt":
+        sec += _active.stt_per_audio_sec * max(0.0, audio_sec)
+    return sec
+
+
+# ================= HELPERS =================
+
+
+@contextmanager
+def watchdog(seconds: Optional[float], on_expire: Callable[[], None]) -> Iterator[threading.Event]:
+    """
+    Gọi on_expire() từ timer thread nếu khối chưa xong sau `seconds`.
+    Event trả về được set khi đã hết hạn (để đổi lỗi của stage → StageTimeout).
+    """
+    fired = threading.Event()
+    if not seconds:
+        yield fired
+        return
+
+    def fire() -> None:
+        fired.set()
+        on_expire()
+
+    timer = threading.Timer(seconds, fire)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield fired
+    finally:
+        timer.cancel()
+
+
+def wait_until(done: Callable[[], bool], seconds: float, *, poll: float = 0.05) -> bool:
+    """Chờ done() đúng tối đa `seconds`; False nếu hết giờ."""
+    end = time.monotonic() + seconds
+    while not done():
+        if time.monotonic() >= end:
+            return False
+        time.sleep(poll)
+    return True
@@ -0,0 +1,209 @@
+# device_app/utils/log.py
+"""
+Logging có cấu trúc, không chặn thread gọi.
+
+- get_logger("pipeline") → logger "device_app.pipeline" (theo subsystem)
+- setup_logging(config): QueueHandler → QueueListener (thread "log")
+  format + ghi stdout đều nằm ở thread log, không ở pipeline / audio
+- Mức log riêng từng subsystem (LOGGING.LEVELS)
+- Giới hạn tần suất lỗi lặp lại (LOGGING.RATE_LIMIT)
+- LOGGING.MODE = "silent" → không sinh output, log call gần như miễn phí
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+ROOT = "device_app"
+
+# thuộc tính chuẩn của LogRecord; phần còn lại (extra=...) là field cấu trúc
+_STD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT}.{subsystem.lower()}")
+
+
+# ================= HANDLER / FILTER =================
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Thread gọi chỉ put_nowait record vào queue:
+    - không format (QueueHandler gốc format ngay trong prepare())
+    - queue đầy → bỏ record, đếm `dropped` (không bao giờ chặn)
+
+    Lưu ý: args được format muộn ở thread log → đừng sửa object đã log.
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Cùng 1 (logger, template) ở mức >= `min_level`: tối đa `burst` record
+    mỗi `window_sec`. Số record bị nuốt gắn vào record kế tiếp được qua
+    (field `suppressed`).
+    """
+
+    def __init__(self, window_sec: float = 10.0, burst: int = 3, min_level: int = logging.WARNING) -> None:
+        super().__init__()
+        self.window_sec = float(window_sec)
+        self.burst = int(burst)
+        self.min_level = min_level
+        self._lock = threading.Lock()
+        # key → [window_start, count_in_window, suppressed]
+        self._seen: Dict[Tuple[str, Any], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            slot = self._seen.get(key)
+            if slot is None or now - slot[0] >= self.window_sec:
+                suppressed = slot[2] if slot is not None else 0
+                self._seen[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if slot[1] < self.burst:
+                slot[1] += 1
+                return True
+            slot[2] += 1
+            return False
+
+
+# ================= FORMATTERS =================
+
+
+def _subsystem(record: logging.LogRecord) -> str:
+    name = record.name
+    if name.startswith(ROOT + "."):
+        name = name[len(ROOT) + 1 :]
+    return name.upper()
+
+
+def _extra(record: logging.LogRecord) -> Dict[str, Any]:
+    return {k: v for k, v in vars(record).items() if k not in _STD_ATTRS}
+
+
+class TextFormatter(logging.Formatter):
+    """[SUBSYSTEM] message key=value ... (giống các dòng print cũ)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"[{_subsystem(record)}] {record.getMessage()}"
+        if record.levelno >= logging.WARNING:
+            line = f"{record.levelname} {line}"
+        fields = _extra(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v!r}" for k, v in fields.items())
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """1 dòng JSON / record, dễ lọc trên journald (journalctl -o cat | jq)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        obj: Dict[str, Any] = {
+            "t": round(record.created, 3),
+            "level": record.levelname,
+            "sub": _subsystem(record),
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        obj.update(_extra(record))
+        if record.exc_info:
+            obj["exc"] = self.formatException(record.exc_info)
+        return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+# ================= SETUP =================
+
+
+def setup_logging(config: Optional[dict] = None) -> Optional[QueueListener]:
+    """
+    LOGGING:
+      MODE: console | json | silent
+      LEVEL: INFO
+      LEVELS: {pipeline.stt: DEBUG, audio: WARNING}
+      RATE_LIMIT: {WINDOW_SEC: 10, BURST: 3}
+      QUEUE_SIZE: 1000
+    """
+    global _listener, _handler
+    shutdown_logging()
+
+    log_cfg = (config or {}).get("LOGGING") or {}
+    mode = str(log_cfg.get("MODE", "console")).lower()
+
+    root = logging.getLogger(ROOT)
+    root.handlers.clear()
+    root.propagate = False
+
+    if mode == "silent":
+        # trên mọi mức → isEnabledFor() trả False ngay, không tạo record
+        root.setLevel(logging.CRITICAL + 1)
+        root.addHandler(logging.NullHandler())
+        for name in (log_cfg.get("LEVELS") or {}):
+            logging.getLogger(f"{ROOT}.{name.lower()}").setLevel(logging.NOTSET)
+        return None
+
+    root.setLevel(str(log_cfg.get("LEVEL", "INFO")).upper())
+    for name, level in (log_cfg.get("LEVELS") or {}).items():
+        logging.getLogger(f"{ROOT}.{name.lower()}").setLevel(str(level).upper())
+
+    out = logging.StreamHandler(sys.stdout)
+    out.setFormatter(JsonFormatter() if mode == "json" else TextFormatter())
+
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(int(log_cfg.get("QUEUE_SIZE", 1000)))
+    _handler = NonBlockingQueueHandler(q)
+    rl_cfg = log_cfg.get("RATE_LIMIT") or {}
+    _handler.addFilter(
+        RateLimitFilter(
+            window_sec=float(rl_cfg.get("WINDOW_SEC", 10.0)),
+            burst=int(rl_cfg.get("BURST", 3)),
+        )
+    )
+    root.addHandler(_handler)
+
+    _listener = QueueListener(q, out, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Dừng thread log sau khi ghi hết record còn trong queue."""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger(ROOT).removeHandler(_handler)
+        _handler = None
+
+
+atexit.register(shutdown_logging)
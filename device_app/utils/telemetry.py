@@ -0,0 +1,297 @@
+# device_app/utils/telemetry.py
+"""
+Telemetry tài nguyên lúc chạy: RSS/PSS, CPU từng thread, nhiệt độ + xung SoC,
+thời gian dừng của GC. Ghi JSON lines vào log xoay vòng.
+
+    python -m device_app.utils.telemetry telemetry.log     # tóm tắt 1 log
+"""
+from __future__ import annotations
+
+import argparse
+import ctypes
+import gc
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("telemetry")
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# gốc procfs / sysfs (test trỏ sang cây thư mục giả)
+PROC_ROOT = "/proc"
+SYS_ROOT = "/sys"
+
+
+# ================= /proc + /sys READERS =================
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _status_kb(field: str, name: str = "status") -> Optional[int]:
+    text = _read(f"{PROC_ROOT}/self/{name}")
+    if not text:
+        return None
+    for line in text.splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    return None
+
+
+def rss_kb() -> Optional[int]:
+    return _status_kb("VmRSS")
+
+
+def pss_kb() -> Optional[int]:
+    # smaps_rollup rẻ hơn nhiều so với cộng dồn smaps (kernel >= 4.14)
+    return _status_kb("Pss", "smaps_rollup")
+
+
+def thread_cpu_sec() -> Dict[str, float]:
+    """CPU (user+sys) của từng thread, key = tên thread Python (hoặc comm)."""
+    names = {t.native_id: t.name for t in threading.enumerate() if t.native_id}
+    out: Dict[str, float] = {}
+    for task in glob.glob(f"{PROC_ROOT}/self/task/*"):
+        stat = _read(f"{task}/stat")
+        if not stat:
+            continue
+        tid = int(os.path.basename(task))
+        # comm có thể chứa khoảng trắng → cắt sau dấu ')' cuối
+        fields = stat[stat.rfind(")") + 2 :].split()
+        cpu = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+        name = names.get(tid) or (_read(f"{task}/comm") or str(tid)).strip()
+        out[f"{name}:{tid}"] = round(cpu, 3)
+    return out
+
+
+def thermal_c() -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for zone in sorted(glob.glob(f"{SYS_ROOT}/class/thermal/thermal_zone*")):
+        temp = _read(f"{zone}/temp")
+        if temp is None:
+            continue
+        kind = (_read(f"{zone}/type") or os.path.basename(zone)).strip()
+        try:
+            out[kind] = int(temp) / 1000.0
+        except ValueError:
+            continue
+    return out
+
+
+def cpu_freq_mhz() -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for path in sorted(glob.glob(f"{SYS_ROOT}/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq")):
+        val = _read(path)
+        if val:
+            # .../cpu3/cpufreq/scaling_cur_freq → "cpu3"
+            out[path.split("/")[-3]] = int(val) // 1000
+    return out
+
+
+def malloc_trim() -> bool:
+    """Trả heap glibc đã free về OS (không có glibc → bỏ qua)."""
+    try:
+        return bool(ctypes.CDLL("libc.so.6").malloc_trim(0))
+    except Exception:
+        return False
+
+
+# ================= TELEMETRY =================
+
+
+class Telemetry:
+    """
+    - sample(tag): chụp RSS/PSS, CPU thread, nhiệt độ, xung, GC → log
+    - track_load(name): đo RSS tăng thêm khi load 1 model
+    - after_models_loaded(): gc.freeze() (tuỳ chọn) → GC không quét lại
+      hàng triệu object của model, tránh copy-on-write trang nhớ
+    - after_utterance(): malloc_trim (tuỳ chọn) + sample
+    """
+
+    def __init__(
+        self,
+        *,
+        log_path: Optional[str] = None,
+        max_bytes: int = 1_000_000,
+        backups: int = 3,
+        gc_freeze: bool = False,
+        trim_after_utterance: bool = False,
+        keep: int = 256,
+    ) -> None:
+        self.gc_freeze = gc_freeze
+        self.trim_after_utterance = trim_after_utterance
+
+        self.model_rss_kb: Dict[str, int] = {}
+        self.samples: Deque[Dict[str, Any]] = deque(maxlen=keep)
+
+        # ---- GC pauses ----
+        self._gc_t0: Optional[float] = None
+        self._gc_pauses: Deque[float] = deque(maxlen=1024)
+        self.gc_pause_max_ms = 0.0
+        self.gc_collections = 0
+        gc.callbacks.append(self._on_gc)
+
+        # ---- rolling log (logger riêng, không lẫn với log thường) ----
+        self._log: Optional[logging.Logger] = None
+        if log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            logger = logging.getLogger(f"device_app.telemetry.{id(self)}")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            self._log = logger
+
+    @classmethod
+    def from_config(cls, config: dict, *, log_path: Optional[str] = None) -> "Telemetry":
+        t_cfg = config.get("TELEMETRY") or {}
+        return cls(
+            log_path=log_path or t_cfg.get("LOG_PATH") or None,
+            max_bytes=int(t_cfg.get("MAX_BYTES", 1_000_000)),
+            backups=int(t_cfg.get("BACKUPS", 3)),
+            gc_freeze=bool(t_cfg.get("GC_FREEZE", False)),
+            trim_after_utterance=bool(t_cfg.get("MALLOC_TRIM", False)),
+        )
+
+    def close(self) -> None:
+        try:
+            gc.callbacks.remove(self._on_gc)
+        except ValueError:
+            pass
+        if self._log is not None:
+            for h in list(self._log.handlers):
+                h.close()
+                self._log.removeHandler(h)
+
+    # ================= GC =================
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_t0 = time.perf_counter()
+            return
+        if self._gc_t0 is None:
+            return
+        ms = (time.perf_counter() - self._gc_t0) * 1000.0
+        self._gc_t0 = None
+        self.gc_collections += 1
+        self._gc_pauses.append(ms)
+        if ms > self.gc_pause_max_ms:
+            self.gc_pause_max_ms = ms
+
+    def _gc_stats(self) -> Dict[str, Any]:
+        pauses = sorted(self._gc_pauses)
+        p99 = pauses[int(len(pauses) * 0.99) - 1] if len(pauses) >= 100 else (pauses[-1] if pauses else 0.0)
+        return {
+            "collections": self.gc_collections,
+            "pause_max_ms": round(self.gc_pause_max_ms, 3),
+            "pause_p99_ms": round(p99, 3),
+            "frozen": gc.get_freeze_count(),
+        }
+
+    # ================= SAMPLING =================
+
+    def sample(self, tag: str, **extra: Any) -> Dict[str, Any]:
+        rec: Dict[str, Any] = {
+            "t": round(time.time(), 3),
+            "tag": tag,
+            "rss_kb": rss_kb(),
+            "pss_kb": pss_kb(),
+            "threads_cpu_sec": thread_cpu_sec(),
+            "thermal_c": thermal_c(),
+            "cpu_mhz": cpu_freq_mhz(),
+            "gc": self._gc_stats(),
+        }
+        rec.update(extra)
+        self.samples.append(rec)
+        if self._log is not None:
+            self._log.info(json.dumps(rec, ensure_ascii=False))
+        return rec
+
+    @contextmanager
+    def track_load(self, name: str) -> Iterator[None]:
+        before = rss_kb() or 0
+        t0 = time.perf_counter()
+        yield
+        delta = (rss_kb() or 0) - before
+        self.model_rss_kb[name] = delta
+        self.sample(
+            "model_load",
+            model=name,
+            rss_delta_kb=delta,
+            load_sec=round(time.perf_counter() - t0, 3),
+        )
+        _log.info("%s: +%.1f MB RSS", name, delta / 1024)
+
+    def after_models_loaded(self) -> None:
+        if self.gc_freeze:
+            gc.collect()
+            gc.freeze()
+        self.sample("models_loaded", model_rss_kb=dict(self.model_rss_kb))
+
+    def after_utterance(self, **extra: Any) -> Dict[str, Any]:
+        trimmed = malloc_trim() if self.trim_after_utterance else False
+        return self.sample("utterance", malloc_trimmed=trimmed, **extra)
+
+
+# ================= SUMMARY =================
+
+
+def load_log(path: str) -> List[Dict[str, Any]]:
+    """Đọc log hiện tại + các file đã xoay (.1, .2 ...) theo thứ tự thời gian."""
+    # RotatingFileHandler: .1 là mới nhất sau file chính → đọc .N ... .1 rồi file chính
+    rotated = [p for p in glob.glob(path + ".*") if p.rsplit(".", 1)[1].isdigit()]
+    files = sorted(rotated, key=lambda p: -int(p.rsplit(".", 1)[1]))
+    records: List[Dict[str, Any]] = []
+    for p in files + [path]:
+        text = _read(p)
+        if not text:
+            continue
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rss = [r["rss_kb"] for r in records if r.get("rss_kb")]
+    temps = [max(r["thermal_c"].values()) for r in records if r.get("thermal_c")]
+    mhz = [min(r["cpu_mhz"].values()) for r in records if r.get("cpu_mhz")]
+    loads = {r["model"]: r["rss_delta_kb"] for r in records if r.get("tag") == "model_load"}
+    gc_max = max((r.get("gc", {}).get("pause_max_ms", 0.0) for r in records), default=0.0)
+    return {
+        "samples": len(records),
+        "rss_max_mb": round(max(rss) / 1024, 1) if rss else None,
+        "temp_max_c": max(temps) if temps else None,
+        "cpu_mhz_min": min(mhz) if mhz else None,
+        "gc_pause_max_ms": gc_max,
+        "model_rss_mb": {k: round(v / 1024, 1) for k, v in loads.items()},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("log_path")
+    args = ap.parse_args()
+    print(json.dumps(summarize(load_log(args.log_path)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# device_app/utils/thread_budget.py
+"""
+Chia CPU cho các stage thay vì để mỗi runtime tự lấy hết core.
+
+Pi 4 nhân: torch (NMT) + 2 session onnxruntime (STT) + piper (TTS) mặc định
+đều tạo pool = số core → tranh nhau, callback PortAudio bị trễ. Ở đây:
+
+- AUDIO_CORES giữ riêng cho thread audio, stage model chạy trên phần còn lại
+- torch.set_num_threads(TORCH)
+- onnxruntime: pool global dùng chung cho mọi session nếu bản ORT hỗ trợ,
+  không thì giới hạn intra/inter op từng session
+- piper: OMP_NUM_THREADS + affinity cho subprocess (đặt theo pid sau Popen)
+
+apply_thread_budget(config) gọi 1 lần ở đầu main, TRƯỚC mọi thread (log,
+display, nút bấm...) để chúng kế thừa affinity compute; log_thread_budget()
+ghi lại budget sau khi setup_logging.
+"""
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from device_app.utils.log import get_logger
+
+_log = get_logger("threads")
+
+_active: Optional["ThreadBudget"] = None
+_ort_global_pool = False
+_torch_default: Optional[int] = None
+
+
+def _all_cores() -> Tuple[int, ...]:
+    try:
+        return tuple(sorted(os.sched_getaffinity(0)))
+    except AttributeError:  # không phải Linux
+        return tuple(range(os.cpu_count() or 1))
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    torch: int
+    ort_intra: int
+    ort_inter: int
+    piper: int
+    audio_cores: Tuple[int, ...]
+    compute_cores: Tuple[int, ...]
+    ort_global_pool: bool = True
+
+    @classmethod
+    def from_config(cls, config: dict, cores: Optional[Tuple[int, ...]] = None) -> "ThreadBudget":
+        """0 / thiếu = tự tính theo số core còn lại sau khi trừ AUDIO_CORES."""
+        t_cfg = config.get("THREADS") or {}
+        cores = tuple(cores) if cores is not None else _all_cores()
+
+        audio = tuple(c for c in (t_cfg.get("AUDIO_CORES") or []) if c in cores)
+        compute = tuple(c for c in cores if c not in audio)
+        if not compute:  # máy 1 core: không giữ được core nào cho audio
+            audio, compute = (), cores
+        n = len(compute)
+
+        def pick(key: str, default: int) -> int:
+            val = int(t_cfg.get(key) or 0)
+            return max(1, min(val, n) if val > 0 else default)
+
+        return cls(
+            torch=pick("TORCH", n),
+            ort_intra=pick("ORT_INTRA", n),
+            ort_inter=pick("ORT_INTER", 1),
+            # piper chạy song song với NMT khi streaming → mặc định 1 thread
+            piper=pick("PIPER", 1),
+            audio_cores=audio,
+            compute_cores=compute,
+            ort_global_pool=bool(t_cfg.get("ORT_GLOBAL_POOL", True)),
+        )
+
+    @property
+    def piper_cores(self) -> Tuple[int, ...]:
+        # core cuối của vùng compute (torch/ORT lấp từ core đầu)
+        return self.compute_cores[-self.piper :]
+
+
+# ================= APPLY =================
+
+
+def apply_thread_budget(config: dict) -> Optional[ThreadBudget]:
+    global _active
+    if not (config.get("THREADS") or {}).get("ENABLED", False):
+        return None
+
+    budget = ThreadBudget.from_config(config)
+    _active = budget
+
+    # thread tạo sau đây (pool torch / ORT, display...) kế thừa affinity này;
+    # thread audio tự chuyển sang AUDIO_CORES qua audio_affinity()
+    if budget.audio_cores:
+        _set_affinity(budget.compute_cores)
+
+    _apply_torch(budget)
+    _apply_ort(budget)
+    return budget
+
+
+def log_thread_budget() -> None:
+    """Gọi sau setup_logging (apply chạy trước khi có handler log)."""
+    budget = _active
+    if budget is None:
+        return
+    _log.info(
+        "budget: torch=%d ort=%d/%d piper=%d audio=%s compute=%s",
+        budget.torch,
+        budget.ort_intra,
+        budget.ort_inter,
+        budget.piper,
+        list(budget.audio_cores),
+        list(budget.compute_cores),
+    )
+
+
+def active_budget() -> Optional[ThreadBudget]:
+    return _active
+
+
+def set_torch_threads(n: int) -> None:
+    """Governor đổi số thread torch lúc chạy; 0 = trả về mức THREADS / mặc định."""
+    global _torch_default
+    try:
+        import torch
+    except ImportError:
+        return
+    if _torch_default is None:
+        _torch_default = torch.get_num_threads()
+    if n <= 0:
+        n = _active.torch if _active is not None else _torch_default
+    elif _active is not None:
+        n = min(n, _active.torch)
+    torch.set_num_threads(n)
+
+
+def _set_affinity(cores: Tuple[int, ...]) -> None:
+    try:
+        os.sched_setaffinity(0, set(cores))
+    except (AttributeError, OSError) as e:
+        _log.warning("sched_setaffinity failed: %s", e)
+
+
+def _apply_torch(budget: ThreadBudget) -> None:
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(budget.torch)
+    try:
+        # chỉ đặt được trước khi torch chạy song song lần đầu
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+
+def _apply_ort(budget: ThreadBudget) -> None:
+    global _ort_global_pool
+    if not budget.ort_global_pool:
+        return
+    try:
+        from onnxruntime.capi import _pybind_state as C
+    except ImportError:
+        return
+    setter = getattr(C, "set_global_thread_pool_sizes", None)
+    if setter is None:
+        return
+    try:
+        # phải gọi trước khi tạo InferenceSession đầu tiên
+        setter(budget.ort_intra, budget.ort_inter)
+        _ort_global_pool = True
+    except Exception as e:
+        _log.warning("ORT global thread pool unavailable: %s", e)
+
+
+# ================= PER-STAGE HOOKS =================
+
+
+def ort_session_options(ort: Any) -> Any:
+    """SessionOptions cho OnnxCTCSTT (None khi chưa bật budget)."""
+    budget = _active
+    if budget is None:
+        return None
+
+    opts = ort.SessionOptions()
+    if _ort_global_pool and hasattr(opts, "use_per_session_threads"):
+        opts.use_per_session_threads = False
+    else:
+        opts.intra_op_num_threads = budget.ort_intra
+        opts.inter_op_num_threads = budget.ort_inter
+    opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    return opts
+
+
+def subprocess_kwargs() -> Dict[str, Any]:
+    """env giới hạn thread cho subprocess (piper); {} khi chưa bật budget."""
+    budget = _active
+    if budget is None:
+        return {}
+
+    n = str(budget.piper)
+    return {"env": dict(os.environ, OMP_NUM_THREADS=n, OPENBLAS_NUM_THREADS=n, MKL_NUM_THREADS=n)}
+
+
+def pin_subprocess(pid: int) -> None:
+    """
+    Ghim process con vào piper_cores, gọi ngay sau Popen. Không dùng
+    preexec_fn: process này nhiều thread (log queue, display, pool ORT /
+    torch) và preexec_fn sau fork không an toàn khi có thread. Thread của
+    piper (pool OMP) tạo sau lúc load model → kế thừa affinity này.
+    """
+    budget = _active
+    if budget is None:
+        return
+    try:
+        os.sched_setaffinity(pid, set(budget.piper_cores))
+    except (AttributeError, OSError):  # không phải Linux / process đã thoát
+        pass
+
+
+@contextmanager
+def audio_affinity() -> Iterator[None]:
+    """
+    Chuyển thread gọi sang AUDIO_CORES trong lúc mở stream: thread callback
+    của PortAudio được tạo lúc này nên kế thừa affinity đó. Ra khỏi khối thì
+    thread gọi quay về affinity cũ.
+    """
+    budget = _active
+    if budget is None or not budget.audio_cores:
+        yield
+        return
+    prev = _all_cores()
+    _set_affinity(budget.audio_cores)
+    try:
+        yield
+    finally:
+        _set_affinity(prev)
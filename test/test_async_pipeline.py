@@ -0,0 +1,183 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.async_pipeline import AsyncTranslatorPipeline
+from device_app.core.jobs import UtteranceJob
+from device_app.core.modes import Mode
+from device_app.core.state import TRANSITIONS, InvalidTransition, State
+from device_app.hardware.buttons import MODE_LONG, TALK_DOWN, TALK_UP, DebugButtons
+
+
+class FakeSTT:
+    def transcribe_file(self, path):
+        return f"hello from {Path(path).stem}"
+
+
+class FakeNLP:
+    def process(self, text):
+        return {"ok": True, "text": text}
+
+
+class FakeNMT:
+    def translate(self, text):
+        return text.upper()
+
+
+class VariantSTT(FakeSTT):
+    """Ghi lại thread gọi set_variant (phải là thread model, không phải loop)."""
+
+    def __init__(self):
+        self.variant = "default"
+        self.calls = []
+
+    def set_variant(self, name):
+        self.calls.append((name, threading.current_thread().name))
+        self.variant = name
+
+
+class FakeTTS:
+    def __init__(self):
+        self.played = []
+
+    def render(self, text):
+        return text
+
+    def play_file(self, path, delete=False):
+        self.played.append(path)
+
+
+class FakeAudio:
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.n = 0
+
+    def start_record(self):
+        pass
+
+    def stop_record(self):
+        wav = self.tmp_path / f"utt_{self.n}.wav"
+        self.n += 1
+        wav.write_bytes(b"RIFF")
+        return str(wav)
+
+
+class _Null:
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+
+def _pipeline(tmp_path, buttons=None, config=None, stt=None):
+    tts = FakeTTS()
+    p = AsyncTranslatorPipeline(
+        display=_Null(), buttons=buttons or DebugButtons(), audio=FakeAudio(tmp_path), power=_Null(),
+        device_env="PROD", config=config or {},
+        stt_en=stt or FakeSTT(), nlp_en=FakeNLP(), nmt_en_vi=FakeNMT(), tts_vi=tts,
+    )
+    seen = []
+    orig = p._transition
+
+    def _transition(to, *, force=False):
+        orig(to, force=force)
+        seen.append(to)
+
+    p._transition = _transition
+    return p, tts, seen
+
+
+def test_transition_table():
+    assert State.READY.can_transition(State.TRANSLATING)  # câu chờ trong QUEUE
+    assert not State.SPEAKING.can_transition(State.RECORDING)
+    assert all(State.READY in TRANSITIONS[s] for s in State if s is not State.READY)
+
+
+def test_invalid_transition_raises(tmp_path):
+    p, _, _ = _pipeline(tmp_path)
+    p.fsm = State.SPEAKING
+    with pytest.raises(InvalidTransition, match="SPEAKING -> TRANSLATING"):
+        p._transition(State.TRANSLATING)
+    p._transition(State.RECORDING, force=True)  # force: đường thoát lỗi
+    assert p.fsm is State.RECORDING and p.state == "RECORDING"
+
+
+def test_talk_flow_walks_the_fsm(tmp_path):
+    script = [(0.05, TALK_DOWN), (0.05, TALK_UP), (0.3, MODE_LONG)]
+    p, tts, seen = _pipeline(tmp_path, buttons=DebugButtons(script))
+
+    p.run(start_mode=Mode.EN_VI)
+
+    assert tts.played == ["HELLO FROM UTT_0"]
+    assert seen == [State.READY, State.RECORDING, State.TRANSLATING, State.SPEAKING, State.READY]
+    assert p.last_first_audio_sec is not None
+
+
+def test_queued_job_goes_ready_to_translating(tmp_path):
+    config = {"PIPELINE": {"QUEUE": {"ENABLED": True, "MAX_PENDING": 2}}}
+    p, tts, seen = _pipeline(tmp_path, config=config)
+    wav = tmp_path / "utt_q.wav"
+    wav.write_bytes(b"RIFF")
+
+    async def _go():
+        # câu đã ghi xong nằm trong QUEUE, máy đang READY → worker lấy ra dịch
+        p._loop = asyncio.get_running_loop()
+        p._transition(State.READY, force=True)
+        p._flight(+1)
+        await p._run_job_async(UtteranceJob(str(wav), Mode.EN_VI, time.monotonic()))
+
+    asyncio.run(_go())
+    p._executor.shutdown()
+
+    assert seen == [State.READY, State.TRANSLATING, State.SPEAKING, State.READY]
+    assert tts.played == ["HELLO FROM UTT_Q"] and p.is_idle()
+
+
+def test_job_while_next_utterance_records_returns_to_recording(tmp_path):
+    p, _, seen = _pipeline(tmp_path)
+    wav = tmp_path / "utt_r.wav"
+    wav.write_bytes(b"RIFF")
+
+    async def _go():
+        p._loop = asyncio.get_running_loop()
+        p._transition(State.RECORDING, force=True)
+        p._recording = True  # người thứ 2 đang giữ TALK
+        p._flight(+1)
+        await p._run_job_async(UtteranceJob(str(wav), Mode.EN_VI, time.monotonic()))
+
+    asyncio.run(_go())
+    p._executor.shutdown()
+    assert seen == [State.RECORDING, State.TRANSLATING, State.SPEAKING, State.RECORDING]
+
+
+def test_governor_switch_applies_on_model_thread_before_next_job(tmp_path):
+    stt = VariantSTT()
+    # TORCH_THREADS 0: không đổi số thread torch của cả phiên test
+    config = {"GOVERNOR": {"ENABLED": True, "PROFILES": {"SAVER": {"TORCH_THREADS": 0}}}}
+    p, tts, _ = _pipeline(tmp_path, config=config, stt=stt)
+    wav = tmp_path / "utt_g.wav"
+    wav.write_bytes(b"RIFF")
+
+    # power tick (event loop): chỉ ghi nhận profile, chưa load model
+    assert p.governor.update(10, None)
+    assert p.governor.pending.name == "saver" and stt.calls == []
+    assert p.tick_sec == p.governor.profile.tick_sec
+
+    async def _go():
+        p._loop = asyncio.get_running_loop()
+        p._transition(State.READY, force=True)
+        p._flight(+1)
+        await p._run_job_async(UtteranceJob(str(wav), Mode.EN_VI, time.monotonic()))
+
+    asyncio.run(_go())
+    p._executor.shutdown()
+
+    assert [name for name, _ in stt.calls] == ["lite"]
+    assert stt.calls[0][1].startswith("model")
+    assert p.governor.pending is None and p.last_profile == "saver"
+    assert tts.played == ["HELLO FROM UTT_G"]
@@ -0,0 +1,88 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.auto_lang import AutoLanguageDetector
+from device_app.core.modes import Mode, ModeState
+from device_app.core.pipeline import TranslatorPipeline
+
+
+class ScoredSTT:
+    def __init__(self, text, ctc, delay=0.0, barrier=None):
+        self.text, self.ctc, self.delay, self.barrier = text, ctc, delay, barrier
+        self.calls = 0
+
+    def load_audio(self, path):
+        return [0.0] * 16000
+
+    def transcribe_scored(self, audio):
+        self.calls += 1
+        if self.barrier is not None:
+            # chỉ qua được khi STT kia cũng đang chạy → 2 STT song song
+            self.barrier.wait()
+        time.sleep(self.delay)
+        return self.text, self.ctc
+
+
+def test_auto_picks_language_and_runs_both_stt_in_parallel():
+    barrier = threading.Barrier(2, timeout=2.0)
+    vi = ScoredSTT("xin chào các bạn tôi muốn đi chợ", -0.4, barrier=barrier)
+    en = ScoredSTT("sin chow cac ban toy muon dee cho", -0.9, barrier=barrier)
+    det = AutoLanguageDetector(vi, en)
+    try:
+        d = det.detect("x.wav")
+    finally:
+        det.close()
+
+    assert d.mode is Mode.VI_EN and d.text.startswith("xin chào")
+    assert vi.calls == en.calls == 1 and not barrier.broken
+
+
+def test_auto_prefers_confident_english_transcript():
+    det = AutoLanguageDetector(
+        ScoredSTT("quây ơ đờ tren", -1.6, delay=0),
+        ScoredSTT("where is the train station", -0.2, delay=0),
+    )
+    try:
+        assert det.detect("x.wav").mode is Mode.EN_VI
+    finally:
+        det.close()
+
+
+def test_mode_button_cycles_through_auto():
+    assert Mode.cycle(Mode.VI_EN) is Mode.EN_VI
+    assert Mode.cycle(Mode.EN_VI) is Mode.AUTO
+    assert Mode.cycle(Mode.AUTO) is Mode.VI_EN
+
+    assert Mode.cycle(Mode.EN_VI, auto=False) is Mode.VI_EN
+    assert Mode.cycle(Mode.AUTO, auto=False) is Mode.VI_EN
+    state = ModeState(Mode.VI_EN, auto=False)
+    assert [state.next() for _ in range(3)] == [Mode.EN_VI, Mode.VI_EN, Mode.EN_VI]
+
+
+class _Null:
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+
+def _modes_on_button(config, **models):
+    p = TranslatorPipeline(display=_Null(), buttons=_Null(), audio=_Null(), power=_Null(), config=config, **models)
+    seen = []
+    for _ in range(3):
+        p._toggle_mode()
+        seen.append(p.mode)
+    return seen
+
+
+def test_auto_in_button_cycle_only_when_enabled():
+    stt = dict(stt_vi=ScoredSTT("a", -1.0), stt_en=ScoredSTT("b", -1.0))
+    on = {"PIPELINE": {"AUTO": {"ENABLED": True}}}
+
+    assert _modes_on_button(on, **stt) == [Mode.EN_VI, Mode.AUTO, Mode.VI_EN]
+    assert _modes_on_button({}, **stt) == [Mode.EN_VI, Mode.VI_EN, Mode.EN_VI]
+    # bật nhưng thiếu 1 STT → không có AUTO
+    assert _modes_on_button(on, stt_en=stt["stt_en"]) == [Mode.EN_VI, Mode.VI_EN, Mode.EN_VI]
@@ -0,0 +1,134 @@
+import http.client
+import io
+import json
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.batcher import DynamicBatcher, Overloaded
+from device_app.service import TranslationService, decode_wav, make_server
+
+
+def test_concurrent_requests_share_a_batch():
+    seen = []
+
+    def run(items):
+        seen.append(list(items))
+        time.sleep(0.02)
+        return [x * 10 for x in items]
+
+    b = DynamicBatcher("t", run, max_batch=4, max_wait_ms=50)
+    b.start()
+    try:
+        futs = [b.submit(i) for i in range(6)]
+        out = [f.result(2) for f in futs]
+    finally:
+        b.close()
+    assert [r.value for r in out] == [0, 10, 20, 30, 40, 50]
+    assert [len(s) for s in seen] == [4, 2]
+    assert out[0].batch_size == 4 and out[0].queue_ms >= 0 and out[0].run_ms >= 15
+    assert b.stats()["items"] == 6
+
+
+def test_overload_and_per_item_errors():
+    gate = threading.Event()
+
+    def run(items):
+        gate.wait(2)
+        return [ValueError("bad") if x < 0 else x for x in items]
+
+    b = DynamicBatcher("t", run, max_batch=1, max_wait_ms=0, max_queue=2)
+    b.start()
+    try:
+        first = b.submit(1)
+        time.sleep(0.05)  # worker đã lấy request đầu, đang chờ gate
+        bad = b.submit(-1)
+        b.submit(2)
+        with pytest.raises(Overloaded):
+            b.submit(3)
+        gate.set()
+        assert first.result(2).value == 1
+        with pytest.raises(ValueError):
+            bad.result(2)
+    finally:
+        b.close()
+    assert b.rejected == 1 and b.failed == 1
+
+
+class _UpperNMT:
+    def translate_batch(self, texts):
+        return [t.upper() for t in texts]
+
+
+def _wav(sr=16000):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(b"\x00\x40" * 1600)
+    return buf.getvalue()
+
+
+def test_decode_wav():
+    pcm = decode_wav(_wav())
+    assert pcm.dtype.name == "float32" and len(pcm) == 1600 and pcm[0] == 0.5
+    with pytest.raises(ValueError):
+        decode_wav(_wav(sr=8000))
+
+
+def test_service_roundtrip():
+    svc = TranslationService.from_config({}, {"nmt_vi_en": _UpperNMT()})
+    svc.start()
+    server = make_server(svc, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        conn.request("POST", "/v1/translate/vi_en", json.dumps({"text": "xin chào"}))
+        resp = conn.getresponse()
+        data = json.loads(resp.read())
+        assert resp.status == 200 and data["text"] == "XIN CHÀO"
+        assert data["latency"]["batch"] == 1
+
+        conn.request("POST", "/v1/translate/en_vi", json.dumps({"text": "hi"}))
+        resp = conn.getresponse()
+        resp.read()
+        assert resp.status == 404
+
+        conn.request("GET", "/v1/stats")
+        assert json.loads(conn.getresponse().read())["translate/vi_en"]["items"] == 1
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+        svc.close()
+
+
+@pytest.mark.parametrize("mask", [True, False])
+def test_stt_batch_matches_per_clip(tmp_path, mask):
+    for mod in ("onnx", "onnxruntime", "transformers", "soundfile"):
+        pytest.importorskip(mod)
+    import numpy as np
+
+    from device_app.models.onnx_ctc_stt import OnnxCTCSTT
+    from device_app.sim.tiny_models import make_tiny_ctc
+
+    model, proc = make_tiny_ctc(tmp_path, attention_mask=mask)
+    stt = OnnxCTCSTT(model, proc, chunk_sec=4.0, stride_sec=0.5)
+    rng = np.random.default_rng(0)
+    clips = [(0.3 * rng.standard_normal(int(sec * 16000))).astype(np.float32) for sec in (0.5, 1.37, 2.9)]
+
+    batched = stt.transcribe_batch(clips)
+    # có mask → 1 lần chạy cả batch; không mask → chạy lẻ (pad sẽ đổi kết quả)
+    assert stt._batch_ok is (True if mask else False)
+    for got, clip in zip(batched, clips):
+        ref = stt.transcribe_detailed(clip)
+        assert got.text == ref.text
+        assert got.confidence.word_scores == pytest.approx(ref.confidence.word_scores, abs=1e-3)
@@ -0,0 +1,77 @@
+"""
+BatteryMonitor với ADC giả (không cần I2C / ADS1015)
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.hardware.battery_monitor import BatteryMonitor
+from device_app.hardware.power import PowerManager
+
+
+class FakeADC:
+    """Giả AnalogIn: trả lần lượt các điện áp, None = lỗi I2C."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.reads = 0
+
+    @property
+    def voltage(self):
+        self.reads += 1
+        v = self.values.pop(0) if len(self.values) > 1 else self.values[0]
+        if v is None:
+            raise OSError("I2C read failed")
+        return v
+
+
+def _monitor(values, **kw):
+    # R1=0 → vbat = v_adc, dễ tính phần trăm: 3.2V = 0%, 4.2V = 100%
+    power = PowerManager({"R1": 0, "R2": 1}, chan=FakeADC(values))
+    kw.setdefault("ema_alpha", 1.0)
+    kw.setdefault("median_window", 1)
+    return power, BatteryMonitor(power.read_voltage, power.voltage_to_percent, **kw)
+
+
+def test_reads_only_when_sampling():
+    power, mon = _monitor([4.2])
+    mon.sample_once()
+    for _ in range(100):
+        mon.get_percent()
+        mon.is_low()
+    assert power._chan.reads == 1
+    assert mon.get_percent() == 100
+
+
+def test_median_rejects_spike():
+    _, mon = _monitor([3.7, 3.7, 0.0, 3.7, 3.7], median_window=3)
+    for _ in range(5):
+        mon.sample_once()
+    assert mon.get_percent() == 50
+
+
+def test_low_battery_hysteresis():
+    _, mon = _monitor([3.28, 3.31, 3.33, 3.36], low_pct=10, recover_pct=15)
+    assert mon.sample_once().low  # 8%
+    assert mon.sample_once().low  # 11% → vẫn LOW
+    assert mon.sample_once().low  # 13% → vẫn LOW
+    assert not mon.sample_once().low  # 16% → hết LOW
+
+
+def test_read_errors_are_counted_and_keep_last_value():
+    _, mon = _monitor([3.7, None, None, 3.7])
+    mon.sample_once()
+    mon.sample_once()
+    mon.sample_once()
+    assert mon.errors == 2
+    assert mon.get_percent() == 50
+
+
+def test_thread_start_stop():
+    _, mon = _monitor([3.7], interval_sec=0.1)
+    mon.start()
+    mon.stop()
+    assert mon.latest.samples >= 1
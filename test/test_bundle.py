@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.tools.pack_bundles import pack
+from device_app.utils import bundle
+
+
+def _make_artifact(root):
+    src = root / "artifacts" / "stt_vi"
+    (src / "processor").mkdir(parents=True)
+    (src / "processor" / "vocab.json").write_text('{"a": 1}')
+    (src / "model.txt").write_bytes(b"\x00" * 4096)
+    return src
+
+
+def test_pack_writes_verifiable_manifest(tmp_path):
+    src = _make_artifact(tmp_path)
+    dst = pack(src, tmp_path / "artifacts" / "bundles")
+
+    manifest = bundle.BundleManifest.read(dst)
+    assert manifest is not None and manifest.name == "stt_vi"
+    assert set(manifest.files) == {"model.txt", "processor/vocab.json"}
+    assert bundle.verify(dst, manifest) == []
+
+    (dst / "model.txt").write_bytes(b"\x01" * 4096)
+    assert bundle.verify(dst, manifest) == ["model.txt"]
+
+
+def test_resolve_prefers_bundle_until_marked_bad(tmp_path):
+    src = _make_artifact(tmp_path)
+    root = tmp_path / "artifacts" / "bundles"
+    dst = pack(src, root)
+
+    bundle.configure_bundles({"BUNDLES": {"ENABLED": True, "DIR": str(root), "VERIFY": False}})
+    try:
+        assert bundle.resolve(src / "processor") == dst / "processor"
+        assert bundle.resolve(src / "missing.onnx") == src / "missing.onnx"
+
+        (dst / bundle.FAILED_MARK).write_text("model.txt")
+        assert bundle.resolve(src / "processor") == src / "processor"
+    finally:
+        bundle.configure_bundles({})
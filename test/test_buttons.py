@@ -0,0 +1,129 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.hardware import buttons
+from device_app.hardware.buttons import MODE_LONG, MODE_SHORT, TALK_DOWN, TALK_UP, IrqGpioButtons
+
+
+class FakeGPIO:
+    """RPi.GPIO giả: mức chân (nút nhả = HIGH vì kéo lên) + callback edge-detect."""
+
+    BCM, IN, PUD_UP, BOTH = "BCM", "IN", "PUD_UP", "BOTH"
+    LOW, HIGH = 0, 1
+
+    def __init__(self):
+        self.level = {}
+        self.callbacks = {}
+        self.bouncetime = {}
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, direction, pull_up_down=None):
+        self.level[pin] = self.HIGH
+
+    def input(self, pin):
+        return self.level[pin]
+
+    def add_event_detect(self, pin, edge, callback, bouncetime):
+        self.callbacks[pin] = callback
+        self.bouncetime[pin] = bouncetime
+
+    def remove_event_detect(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def edge(self, pin, pressed, bounces=0):
+        """Đổi mức chân rồi gọi callback; bounces = số callback thừa cùng mức."""
+        self.level[pin] = self.LOW if pressed else self.HIGH
+        for _ in range(1 + bounces):
+            self.callbacks[pin](pin)
+
+
+@pytest.fixture
+def gpio(monkeypatch):
+    fake = FakeGPIO()
+    monkeypatch.setattr(buttons, "GPIO", fake, raising=False)
+    monkeypatch.setattr(buttons, "_HAS_GPIO", True)
+    return fake
+
+
+def _make(long_sec=0.15):
+    cfg = {"BUTTONS": {"TALK_PIN": 17, "MODE_PIN": 27, "LONG_PRESS_SEC": long_sec}}
+    return IrqGpioButtons(cfg)
+
+
+def _drain(b):
+    out = []
+    while True:
+        evt = b.get_event(timeout=0)
+        if evt is None:
+            return out
+        out.append(evt.kind)
+
+
+def test_talk_edges_ignore_bounce(gpio):
+    b = _make()
+    assert gpio.bouncetime == {17: 50, 27: 50}
+
+    t0 = time.monotonic()
+    gpio.edge(17, True, bounces=3)
+    assert b.is_talk_pressed()
+    gpio.edge(17, False, bounces=2)
+
+    events = [b.get_event(timeout=0) for _ in range(2)]
+    assert [e.kind for e in events] == [TALK_DOWN, TALK_UP]
+    assert t0 <= events[0].t <= events[1].t  # timestamp lúc xảy ra cạnh
+    assert b.get_event(timeout=0) is None and not b.is_talk_pressed()
+
+    b.close()
+    assert gpio.callbacks == {}
+
+
+def test_mode_short_press_debounce_and_cooldown(gpio):
+    b = _make(long_sec=5.0)
+
+    # nhấn / nhả ngay (< DEBOUNCE_SEC) = nhiễu → không có event
+    gpio.edge(27, True)
+    gpio.edge(27, False)
+    assert _drain(b) == []
+
+    gpio.edge(27, True, bounces=2)
+    time.sleep(b.DEBOUNCE_SEC + 0.02)
+    gpio.edge(27, False, bounces=2)
+    assert _drain(b) == [MODE_SHORT]
+
+    # nhấn lại trong COOLDOWN_SEC → bỏ qua
+    gpio.edge(27, True)
+    time.sleep(b.DEBOUNCE_SEC + 0.02)
+    gpio.edge(27, False)
+    assert _drain(b) == []
+
+
+def test_mode_long_press_fires_once(gpio):
+    b = _make(long_sec=0.15)
+
+    gpio.edge(27, True)
+    evt = b.get_event(timeout=1.0)
+    assert evt is not None and evt.kind == MODE_LONG
+
+    time.sleep(0.2)  # giữ tiếp: không bắn lần 2
+    gpio.edge(27, False)
+    assert _drain(b) == []  # nhả sau long-press không thành short
+
+
+def test_release_before_long_press_cancels_timer(gpio):
+    b = _make(long_sec=0.15)
+
+    gpio.edge(27, True)
+    time.sleep(0.08)
+    gpio.edge(27, False)
+    assert _drain(b) == [MODE_SHORT]
+
+    time.sleep(0.15)  # timer đã huỷ → không có MODE_LONG muộn
+    assert _drain(b) == []
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.models.ctc_chunking import ChunkedCTC
+
+HOP = 320  # wav2vec2: 1 frame / 320 sample
+
+
+def _fake_model(calls):
+    def run(window):
+        calls.append(window.shape[0])
+        # "logits" của frame = trung bình sample → so sánh được với chạy cả clip
+        return window.reshape(-1, HOP).mean(axis=1, keepdims=True)
+
+    return run
+
+
+@pytest.mark.parametrize("seconds", [0.6, 3.2, 7.04])
+def test_chunked_logits_match_full_clip_and_window_is_bounded(seconds):
+    audio = np.arange(int(seconds * 16000), dtype=np.float32)
+    calls = []
+    ctc = ChunkedCTC(_fake_model(calls), chunk_sec=1.0, stride_sec=0.2)
+
+    for part in np.array_split(audio, 7):  # audio tới dần như lúc ghi âm
+        ctc.feed(part)
+    merged = ctc.finish()
+
+    full = audio.reshape(-1, HOP).mean(axis=1, keepdims=True)
+    np.testing.assert_allclose(merged, full)
+    assert max(calls) <= 16000  # không cửa sổ nào vượt chunk
+    assert ctc._buf.shape[0] <= 16000 + audio.shape[0] // 7
+
+
+def test_stride_must_leave_room_for_core():
+    with pytest.raises(ValueError):
+        ChunkedCTC(lambda w: w, chunk_sec=1.0, stride_sec=0.5)
+
+
+def test_finish_keeps_right_context_for_all_but_last_window():
+    # 1.3 s: feed chạy 1 cửa sổ, finish còn 2 → cửa sổ giữa vẫn có stride phải
+    audio = np.arange(20800, dtype=np.float32)
+    calls = []
+    ctc = ChunkedCTC(_fake_model(calls), chunk_sec=1.0, stride_sec=0.2)
+
+    ctc.feed(audio)
+    merged = ctc.finish()
+
+    # [0, 12800) | [6400, 20800): lõi 9600..19200 + 1600 sample bên phải | [16000, 20800)
+    assert calls == [12800, 14400, 4800]
+    np.testing.assert_allclose(merged, audio.reshape(-1, HOP).mean(axis=1, keepdims=True))
@@ -0,0 +1,61 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.models.piper_tts import PiperTTS
+from device_app.utils import deadline
+from device_app.utils.deadline import StageTimeout
+
+
+@pytest.fixture
+def budgets():
+    deadline.configure_deadlines(
+        {"DEADLINES": {"ENABLED": True, "SYNTH_SEC": 0.3, "NMT_SEC": 0}}
+    )
+    yield
+    deadline.configure_deadlines({})
+
+
+def test_budget_and_watchdog(budgets):
+    assert deadline.budget("synth") == 0.3
+    assert deadline.budget("nmt") is None
+
+    hits = []
+    with deadline.watchdog(0.05, lambda: hits.append(1)) as fired:
+        time.sleep(0.15)
+    assert fired.is_set() and hits == [1]
+
+    with deadline.watchdog(1.0, lambda: hits.append(2)) as fired:
+        pass
+    assert not fired.is_set() and hits == [1]
+
+
+def test_stt_budget_scales_with_audio():
+    deadline.configure_deadlines(
+        {"DEADLINES": {"ENABLED": True, "STT_SEC": 8.0, "STT_PER_AUDIO_SEC": 0.6}}
+    )
+    try:
+        assert deadline.budget("stt") == 8.0
+        # giữ nút 30 s: hạn đủ cho các cửa sổ CTC, không rơi vào câu báo lỗi
+        assert deadline.budget("stt", 30.0) == pytest.approx(26.0)
+        assert deadline.budget("nmt", 30.0) is None
+    finally:
+        deadline.configure_deadlines({})
+
+
+def test_hung_piper_is_killed(budgets, tmp_path):
+    exe = tmp_path / "piper"
+    exe.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+    exe.chmod(0o755)
+
+    tts = PiperTTS(piper_exe=str(exe))
+    t0 = time.monotonic()
+    with pytest.raises(StageTimeout) as err:
+        tts.synthesize_to_file(str(tmp_path / "out.wav"), "xin chào")
+    assert err.value.stage == "synth"
+    assert time.monotonic() - t0 < 5
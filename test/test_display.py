@@ -0,0 +1,94 @@
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.hardware.display import Display, FramebufferBackend, render_frame
+
+
+class _Recorder(FramebufferBackend):
+    """Ghi lại thời điểm mỗi lần flush; fail_first = số lần ném lỗi I2C đầu tiên."""
+
+    def __init__(self, fail_first: int = 0) -> None:
+        super().__init__()
+        self.fail_first = fail_first
+        self.times = []
+        self.changed = []
+
+    def write_pages(self, changed):
+        self.times.append(time.monotonic())
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            raise OSError("I2C remote I/O error")
+        self.changed.append(sorted(changed))
+        super().write_pages(changed)
+
+
+def _shows(display, lines):
+    return display.backend.image().tobytes() == render_frame(128, 64, lines).tobytes()
+
+
+def test_only_changed_pages_are_sent():
+    backend = _Recorder()
+    d = Display(backend, max_fps=100)
+    try:
+        d.show_status(mode="VI_EN", state="READY", battery=80)
+        d.flush()
+        d.show_status(mode="VI_EN", state="LISTENING")
+        d.flush()
+    finally:
+        d.close()
+
+    assert backend.changed[0] == list(range(8))  # khung đầu: gửi đủ
+    # chỉ dòng STATE (y=18..) đổi → vài page, không phải cả màn
+    assert 0 < len(backend.changed[1]) < 8 and 0 not in backend.changed[1]
+    assert _shows(d, ("MODE: VI_EN", "STATE: LISTENING", "BAT: 80%"))
+
+
+def test_same_state_is_not_redrawn():
+    backend = _Recorder()
+    d = Display(backend, max_fps=100)
+    try:
+        for _ in range(3):
+            d.show_status(mode="VI_EN", state="READY", battery=80)
+            d.flush()
+            time.sleep(0.02)
+    finally:
+        d.close()
+    assert d.requests == 3 and d.frames == 1 and len(backend.times) == 1
+
+
+def test_fps_cap_coalesces_bursts():
+    backend = _Recorder()
+    d = Display(backend, max_fps=20)  # >= 50 ms giữa 2 lần flush
+    try:
+        for i in range(50):
+            d.show_status(mode="EN_VI", state=f"S{i}", battery=50)
+        d.flush()
+        d.show_status(mode="EN_VI", state="DONE")
+        d.flush()
+    finally:
+        d.close()
+
+    assert d.requests == 51
+    assert d.frames <= 4  # các trạng thái trung gian bị gộp
+    gaps = [b - a for a, b in zip(backend.times, backend.times[1:])]
+    assert gaps and min(gaps) >= 0.045
+    assert _shows(d, ("MODE: EN_VI", "STATE: DONE", "BAT: 50%"))
+
+
+def test_failed_frame_is_retried():
+    backend = _Recorder(fail_first=2)
+    d = Display(backend, max_fps=100)
+    try:
+        d.show_status(mode="VI_EN", state="READY", battery=90)
+        d.flush()
+    finally:
+        d.close()
+
+    assert d.errors == 2 and len(backend.times) == 3
+    assert d._shown == d._pending
+    assert backend.changed == [list(range(8))]  # lần thành công vẫn gửi đủ page
+    assert _shows(d, ("MODE: VI_EN", "STATE: READY", "BAT: 90%"))
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.governor import Governor
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _governor(clock):
+    return Governor(min_hold_sec=30.0, clock=clock)
+
+
+def test_escalates_immediately():
+    clock = _Clock()
+    gov = _governor(clock)
+    seen = []
+    gov.on_change(lambda p: seen.append(p.name))
+
+    assert not gov.update(80, 50.0)
+    assert gov.update(45, 50.0) and gov.profile.name == "balanced"
+    assert gov.update(45, 80.0) and gov.profile.name == "saver"
+    assert seen == ["balanced", "saver"]
+    assert gov.profile.num_beams == 1
+
+
+def test_relax_needs_hysteresis_and_hold():
+    clock = _Clock()
+    gov = _governor(clock)
+    gov.update(18, None)
+    assert gov.profile.name == "saver"
+
+    # vừa qua ngưỡng 20% nhưng chưa đủ hysteresis (25%)
+    clock.t = 100.0
+    assert not gov.update(22, None)
+    assert gov.profile.name == "saver"
+
+    # đủ hysteresis nhưng chưa giữ đủ lâu sau lần đổi
+    gov.update(40, 70.0)
+    assert gov.profile.name == "saver"
+    clock.t = 200.0
+    assert gov.update(40, None) and gov.profile.name == "balanced"
+    clock.t = 210.0
+    assert not gov.update(90, None)
+    clock.t = 231.0
+    assert gov.update(90, None) and gov.profile.name == "performance"
+    assert gov.switches == 3
+
+
+def test_from_config_overrides():
+    assert Governor.from_config({}) is None
+    gov = Governor.from_config(
+        {"GOVERNOR": {"ENABLED": True, "PROFILES": {"SAVER": {"NUM_BEAMS": 2, "TICK_SEC": 3}}}}
+    )
+    saver = gov.profiles[2]
+    assert saver.num_beams == 2 and saver.tick_sec == 3.0
+    assert gov.profiles[0].num_beams == 4
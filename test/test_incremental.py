@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from device_app.core.incremental import IncrementalTranslator, common_word_prefix
+
+
+class _FakeNMT:
+    """Dịch từng từ → viết hoa; ghi lại mọi lần decode."""
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, text):
+        self.calls.append((text, ""))
+        return text.upper()
+
+    def translate_prefixed(self, text, prefix=""):
+        self.calls.append((text, prefix))
+        out = text.upper()
+        assert out.startswith(prefix)
+        return out
+
+
+class _SplitOnDot:
+    def split(self, text):
+        return [s.strip() for s in text.split(".") if s.strip()]
+
+
+def test_common_word_prefix():
+    assert common_word_prefix("a b c", "a b d") == "a b"
+    assert common_word_prefix("ab c", "a c") == ""
+
+
+def test_closed_segments_are_reused_at_release():
+    nmt = _FakeNMT()
+    inc = IncrementalTranslator(nmt, _SplitOnDot())
+    inc.update("xin chao")
+    inc.update("xin chao. toi la")
+    inc.update("xin chao. toi la nam")
+
+    n_partial = len(nmt.calls)
+    first = inc.translate_final("xin chao")
+    second = inc.translate_final("toi la nam")
+
+    # cả 2 đoạn đã dịch sẵn trong lúc nói → không decode thêm
+    assert len(nmt.calls) == n_partial
+    assert (first, second) == ("XIN CHAO", "TOI LA NAM")
+    assert inc.done_ratio == 1.0
+
+
+def test_changed_tail_is_decoded_with_committed_prefix():
+    nmt = _FakeNMT()
+    inc = IncrementalTranslator(nmt)
+    inc.update("toi muon")
+    inc.update("toi muon di")
+
+    out = inc.translate_final("toi muon di cho")
+    assert out == "TOI MUON DI CHO"
+    assert nmt.calls[-1] == ("toi muon di cho", "TOI MUON")
+    assert 0.0 < inc.done_ratio < 1.0
+
+
+def test_tiny_marian_prefixed_reuses_cached_encoder(tmp_path):
+    """Cache hit với num_beams > 1: generate() không được làm hỏng tensor trong cache."""
+    for mod in ("torch", "transformers", "sentencepiece"):
+        pytest.importorskip(mod)
+    from device_app.models.nmt_base import NMTBase
+    from device_app.sim.tiny_models import make_tiny_marian
+
+    nmt = NMTBase(str(make_tiny_marian(tmp_path)))
+    nmt.num_beams = 4
+    text = "tôi muốn đi chợ hôm nay"
+
+    first = nmt.translate_prefixed(text)
+    hidden, mask = nmt._enc_cache[text]
+    shape = tuple(hidden.shape)
+    second = nmt.translate_prefixed(text)
+
+    assert second == first
+    assert tuple(nmt._enc_cache[text][0].shape) == shape == (1, mask.shape[1], hidden.shape[-1])
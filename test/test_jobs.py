@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.jobs import JobQueue, UtteranceJob
+from device_app.core.modes import Mode
+from device_app.core.pipeline import TranslatorPipeline
+
+
+def _job(i):
+    return UtteranceJob(f"rec_{i}.wav", Mode.VI_EN, t_release=float(i))
+
+
+def test_drop_policies():
+    q = JobQueue(max_pending=2, policy="drop_oldest")
+    for i in range(3):
+        q.put(_job(i))
+    assert [q.get(0).wav_path for _ in range(2)] == ["rec_1.wav", "rec_2.wav"]
+
+    q = JobQueue(max_pending=2, policy="drop_newest")
+    dropped = [q.put(_job(i)) for i in range(3)][-1]
+    assert [d.wav_path for d in dropped] == ["rec_2.wav"]
+    assert q.depth == 2
+
+    q = JobQueue(max_pending=2, policy="keep_latest")
+    for i in range(3):
+        q.put(_job(i))
+    assert q.get(0).wav_path == "rec_2.wav"
+    assert q.get(0) is None
+
+
+def test_metrics_and_close():
+    q = JobQueue(max_pending=1)
+    q.put(_job(0))
+    q.put(_job(1))
+    assert q.get(0) is not None
+
+    stats = q.stats()
+    assert stats["enqueued"] == 2 and stats["dropped"] == 1 and stats["max_depth"] == 1
+    assert stats["wait_p50_ms"] is not None
+
+    q.close()
+    assert q.get() is None
+
+
+class _Null:
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+
+def test_pipeline_deletes_wavs_of_dropped_jobs(tmp_path):
+    p = TranslatorPipeline(
+        display=_Null(), buttons=_Null(), audio=_Null(), power=_Null(),
+        config={"PIPELINE": {"QUEUE": {"ENABLED": True, "MAX_PENDING": 2, "DROP_POLICY": "drop_oldest"}}},
+    )
+    wavs = []
+    for i in range(4):
+        wav = tmp_path / f"rec_{i}.wav"
+        wav.write_bytes(b"RIFF")
+        wavs.append(wav)
+        p._flight(+1)
+        p._enqueue(UtteranceJob(str(wav), Mode.VI_EN, t_release=float(i)))
+
+    # 2 câu cũ nhất bị bỏ → WAV bị xoá; 2 câu còn chờ giữ nguyên file
+    assert [w.exists() for w in wavs] == [False, False, True, True]
+    assert p.jobs.dropped == 2 and p.in_flight == 2
+    assert [p.jobs.get(0).wav_path for _ in range(2)] == [str(wavs[2]), str(wavs[3])]
@@ -0,0 +1,53 @@
+import logging
+import queue
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.utils.log import (
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    get_logger,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+def _record(msg, level=logging.WARNING, name="device_app.power"):
+    return logging.LogRecord(name, level, __file__, 1, msg, ("x",), None)
+
+
+def test_rate_limit_burst_then_suppressed_count():
+    f = RateLimitFilter(window_sec=3600, burst=2)
+    passed = [f.filter(_record("ADC read failed: %s")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # INFO không bị giới hạn
+    assert f.filter(_record("ADC read failed: %s", level=logging.INFO))
+
+    f.window_sec = 0.0
+    rec = _record("ADC read failed: %s")
+    assert f.filter(rec) and rec.suppressed == 3
+
+
+def test_queue_handler_does_not_format_and_never_blocks():
+    q = queue.Queue(maxsize=1)
+    h = NonBlockingQueueHandler(q)
+    rec = _record("slots %s")
+    h.handle(rec)
+    h.handle(_record("slots %s"))
+
+    got = q.get_nowait()
+    assert got is rec and got.args == ("x",)  # format để dành cho thread log
+    assert h.dropped == 1
+
+
+def test_silent_mode_disables_everything():
+    setup_logging({"LOGGING": {"MODE": "silent", "LEVELS": {"pipeline": "DEBUG"}}})
+    try:
+        log = get_logger("pipeline")
+        assert not log.isEnabledFor(logging.CRITICAL)
+    finally:
+        shutdown_logging()
+        logging.getLogger("device_app").setLevel(logging.NOTSET)
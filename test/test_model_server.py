@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.model_server import ModelSupervisor, ShmArena, TTSProxy, WorkerCrashed
+from device_app.utils.deadline import StageTimeout
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="fork + shared_memory")
+
+
+class _EchoSTT:
+    def __init__(self, config):
+        self.scale = 1.0
+        self.pid = os.getpid()
+
+    def set_scale(self, k):
+        self.scale = k
+
+    def total(self, audio):
+        return float(audio.sum()) * self.scale
+
+    def double(self, audio):
+        return audio * 2
+
+    def where(self):
+        return os.getpid()
+
+    def timeout(self):
+        raise StageTimeout("stt", 1.5)
+
+    def crash(self):
+        os._exit(3)
+
+
+class _ToneTTS:
+    def __init__(self, config):
+        self.hw_sr = 16000
+        self.model = "tone"
+
+    def render_pcm(self, text):
+        return np.ones(16000 * len(text), dtype=np.float32), self.hw_sr
+
+
+def _supervisor(**specs):
+    return ModelSupervisor(
+        {},
+        {"grp": specs},
+        start_method="fork",
+        shm_mb=1,
+        start_timeout_sec=10,
+        call_timeout_sec=10,
+        monitor_sec=0.05,
+    )
+
+
+def test_shm_arena_roundtrip():
+    arena = ShmArena.create(1 << 20)
+    try:
+        big = np.arange(100_000, dtype=np.float32)
+        small = np.arange(4, dtype=np.int16)
+        packed = arena.pack((big, {"x": small}, 3))
+        assert type(packed[0]).__name__ == "ArrayRef"
+        assert packed[1]["x"] is small  # nhỏ → pickle
+        out = arena.unpack(packed, copy=True)
+        assert np.array_equal(out[0], big) and out[2] == 3
+
+        # quá vùng shm → giữ nguyên (pickle)
+        huge = np.zeros(1 << 19, dtype=np.float32)
+        assert arena.pack(huge) is huge
+    finally:
+        arena.close(unlink=True)
+
+
+def test_rpc_errors_and_restart():
+    sup = _supervisor(stt=_EchoSTT)
+    sup.start()
+    try:
+        stt = sup.proxies()["stt"]
+        assert hasattr(stt, "total") and not hasattr(stt, "missing")
+        assert stt.where() != os.getpid()
+
+        audio = np.ones(50_000, dtype=np.float32)  # 200 KB → shared memory
+        stt.set_scale(2.0)
+        assert stt.total(audio) == 100_000.0
+        assert np.array_equal(stt.double(audio), audio * 2)
+
+        with pytest.raises(StageTimeout) as exc:
+            stt.timeout()
+        assert exc.value.stage == "stt" and exc.value.budget_sec == 1.5
+
+        pid = stt.where()
+        with pytest.raises(WorkerCrashed):
+            stt.crash()
+
+        end = time.monotonic() + 10
+        while not sup.workers["grp"].alive and time.monotonic() < end:
+            time.sleep(0.05)
+        assert stt.where() != pid
+        # setter được gọi lại sau restart
+        assert stt.total(audio) == 100_000.0
+        assert sup.stats()["grp"]["restarts"] == 1
+    finally:
+        sup.close()
+
+
+def test_tts_proxy_pcm_handles(monkeypatch):
+    sup = _supervisor(tts_x=_ToneTTS)
+    sup.start()
+    try:
+        tts = sup.proxies()["tts_x"]
+        assert isinstance(tts, TTSProxy) and tts.hw_sr == 16000
+
+        played = []
+        monkeypatch.setattr(TTSProxy, "play_pcm", lambda self, data, sr: played.append((len(data), sr)))
+        handle = tts.render("abc")
+        tts.play_file(handle, delete=True)
+        assert played == [(48000, 16000)]
+
+        tts.discard(tts.render("x"))
+        assert tts._pcm == {}
+    finally:
+        sup.close()
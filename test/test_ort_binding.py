@@ -0,0 +1,128 @@
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.models.ort_binding import BucketedSession, binding_kwargs, bucket_lengths
+
+FRAME = 4
+
+
+class _Binding:
+    def bind_ortvalue_input(self, name, value):
+        self.inp = value
+
+    def bind_ortvalue_output(self, name, value):
+        self.out = value
+
+
+class _Session:
+    """logits[t] = [tổng FRAME sample, t]; OrtValue CPU = chính mảng numpy."""
+
+    def __init__(self):
+        self.runs = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_values", type="tensor(float)")]
+
+    def get_outputs(self):
+        return [SimpleNamespace(name="logits")]
+
+    def _logits(self, x):
+        n = x.shape[1] // FRAME * FRAME
+        frames = x[:, :n].reshape(x.shape[0], -1, FRAME).sum(-1)
+        t = np.broadcast_to(np.arange(frames.shape[1], dtype=np.float32), frames.shape)
+        return np.stack([frames, t], axis=-1).astype(np.float32)
+
+    def run(self, names, feed, run_options=None):
+        x = feed["input_values"]
+        self.runs.append(("plain", x.shape[1]))
+        return [self._logits(x)]
+
+    def io_binding(self):
+        return _Binding()
+
+    def run_with_iobinding(self, binding, run_options=None):
+        self.runs.append(("bound", binding.inp.shape[1]))
+        binding.out[...] = self._logits(binding.inp)
+
+
+_ort = SimpleNamespace(OrtValue=SimpleNamespace(ortvalue_from_numpy=lambda a: a))
+
+
+def test_bucket_lengths_and_config():
+    assert bucket_lengths([4, 2, 2, 12], 160000) == [32000, 64000, 160000]
+    assert binding_kwargs({}) == {}
+    assert binding_kwargs({"STT_BINDING": {"ENABLED": True, "BUCKETS_SEC": [2]}}) == {
+        "bucket_sec": (2.0,),
+        "warmup": True,
+    }
+
+
+def test_bucketed_run_reuses_buffers():
+    sess = _Session()
+    runner = BucketedSession(_ort, sess, [16, 32])
+    assert (runner.geometry.stride, runner.geometry.field) == (FRAME, FRAME)
+    sess.runs.clear()
+    runner.warmup()
+    out_buf = runner._slots[16].out
+
+    a = np.arange(12, dtype=np.float32)
+    logits = runner.run(a)
+    assert logits.shape == (3, 2)  # 3 frame thật, pad bị cắt
+    assert np.array_equal(logits[:, 0], a.reshape(3, FRAME).sum(-1))
+
+    # lần sau ngắn hơn: phần đuôi cũ phải về 0
+    assert runner.run(np.ones(4, dtype=np.float32))[:, 0].tolist() == [4.0]
+    assert runner._slots[16].out is out_buf
+    assert runner.hits[16] == 2 and runner.misses == 0
+
+    # dài hơn bucket lớn nhất → chạy thường
+    assert runner.run(np.ones(40, dtype=np.float32)).shape == (10, 2)
+    assert runner.misses == 1
+    assert [r for r in sess.runs if r[0] == "plain"] == [("plain", 16), ("plain", 32), ("plain", 40)]
+
+
+def test_busy_bucket_falls_back():
+    runner = BucketedSession(_ort, _Session(), [16])
+    slot = runner._slot(16)
+    with slot.lock:
+        done = []
+        t = threading.Thread(target=lambda: done.append(runner.run(np.ones(8, dtype=np.float32))))
+        t.start()
+        t.join(2)
+    assert done and done[0].shape == (2, 2) and runner.misses == 1
+
+
+def test_attention_mask_hides_padding(tmp_path):
+    for mod in ("onnx", "onnxruntime", "transformers", "soundfile"):
+        pytest.importorskip(mod)
+    from device_app.models.onnx_ctc_stt import OnnxCTCSTT
+    from device_app.sim.tiny_models import make_tiny_ctc
+
+    # model giả có ngữ cảnh toàn câu: pad không mask là đổi logits
+    model, proc = make_tiny_ctc(tmp_path, attention_mask=True)
+    plain = OnnxCTCSTT(model, proc, chunk_sec=4.0, stride_sec=0.5)
+    stt = OnnxCTCSTT(model, proc, chunk_sec=4.0, stride_sec=0.5, bucket_sec=(2.0,), warmup=True)
+    assert stt.bucketed.mask_dtype is not None
+
+    t = np.arange(int(1.3 * 16000), dtype=np.float32) / 16000
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t) * np.linspace(0, 1, t.size)).astype(np.float32)
+    ref = plain._run_window(audio)
+    out = stt._run_window(audio)
+    assert stt.bucketed.hits[32000] == 1
+    assert out.shape == ref.shape
+    assert np.allclose(out, ref, atol=1e-4)
+
+    # cùng input pad nhưng mask = 1 cả đoạn pad → logits khác (test có nghĩa)
+    values = plain.processor(audio, sampling_rate=16000, return_tensors="np")["input_values"][0]
+    padded = np.zeros((1, 32000), dtype=np.float32)
+    padded[0, : values.size] = values
+    leaked = plain.session.run(None, plain._feed(padded))[0][0][: ref.shape[0]]
+    assert not np.allclose(leaked, ref, atol=1e-4)
@@ -0,0 +1,175 @@
+"""
+Benchmark từng stage + end-to-end với model giả kích thước nhỏ
+(device_app/sim/tiny_models.py) → chạy vài giây trên máy Linux bất kỳ.
+
+- So với baseline trong test/perf_baseline.json; chậm hơn quá
+  PERF_TOLERANCE (mặc định 0.5 = +50%, cộng 5 ms) → FAIL
+- PERF_UPDATE=1 → ghi lại baseline từ lần chạy này
+- Benchmark chạy được mà chưa có baseline → FAIL (không lặng lẽ SKIP)
+- Thiếu onnxruntime / torch / sentencepiece... → stage đó SKIP
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from device_app.sim import tiny_models
+
+BASELINE = Path(__file__).resolve().parent / "perf_baseline.json"
+TOLERANCE = float(os.environ.get("PERF_TOLERANCE", "0.5"))
+SLACK_MS = 5.0
+UPDATE = os.environ.get("PERF_UPDATE") == "1"
+
+
+def _bench(fn, *, repeat=5, warmup=1):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def _check(name, ms):
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.is_file() else {}
+    if UPDATE:
+        baseline[name] = round(ms, 2)
+        BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        return
+    ref = baseline.get(name)
+    if ref is None:
+        pytest.fail(f"{name}: chưa có baseline trong {BASELINE.name} (chạy với PERF_UPDATE=1 rồi commit)")
+    limit = ref * (1 + TOLERANCE) + SLACK_MS
+    assert ms <= limit, f"{name}: {ms:.1f} ms > {limit:.1f} ms (baseline {ref} ms)"
+
+
+@pytest.fixture(scope="module")
+def tiny_ctc(tmp_path_factory):
+    for mod in ("onnx", "onnxruntime", "transformers", "soundfile"):
+        pytest.importorskip(mod)
+    return tiny_models.make_tiny_ctc(tmp_path_factory.mktemp("ctc"))
+
+
+@pytest.fixture(scope="module")
+def tiny_marian(tmp_path_factory):
+    for mod in ("torch", "transformers", "sentencepiece"):
+        pytest.importorskip(mod)
+    return tiny_models.make_tiny_marian(tmp_path_factory.mktemp("marian"))
+
+
+@pytest.fixture(scope="module")
+def fake_piper(tmp_path_factory):
+    return tiny_models.make_fake_piper(tmp_path_factory.mktemp("piper"))
+
+
+def test_perf_stt(tiny_ctc, tmp_path):
+    from device_app.models.onnx_ctc_stt import OnnxCTCSTT
+
+    model_path, proc_dir = tiny_ctc
+    stt = OnnxCTCSTT(model_path, proc_dir, chunk_sec=4.0, stride_sec=0.5)
+    wav = tiny_models.write_tone_wav(tmp_path / "in.wav", 6.0)
+
+    res = stt.transcribe_with_confidence(wav)
+    assert 0.0 <= res.confidence.score <= 1.0
+    _check("stt_6s", _bench(lambda: stt.transcribe_with_confidence(wav)))
+
+
+def test_perf_stt_bucketed(tiny_ctc, tmp_path):
+    from device_app.models.onnx_ctc_stt import OnnxCTCSTT
+
+    model_path, proc_dir = tiny_ctc
+    plain = OnnxCTCSTT(model_path, proc_dir, chunk_sec=4.0, stride_sec=0.5)
+    stt = OnnxCTCSTT(model_path, proc_dir, chunk_sec=4.0, stride_sec=0.5, bucket_sec=(1.0, 2.0), warmup=True)
+    wav = tiny_models.write_tone_wav(tmp_path / "in.wav", 1.3)
+
+    audio = stt.load_audio(wav)
+    ref, res = plain.transcribe_detailed(audio), stt.transcribe_detailed(audio)
+    assert stt.bucketed.hits[32000] == 1
+    # pad sau normalize: frame thật giữ nguyên (conv không chồng lấn)
+    assert res.text == ref.text
+    _check("stt_1s_bucketed", _bench(lambda: stt.transcribe_detailed(audio)))
+
+
+def test_perf_nmt(tiny_marian):
+    from device_app.models.nmt_base import NMTBase
+
+    nmt = NMTBase(str(tiny_marian))
+    assert isinstance(nmt.translate("xin chào bạn"), str)
+    _check("nmt_short", _bench(lambda: nmt.translate("tôi muốn đi chợ hôm nay")))
+
+
+def test_perf_tts(fake_piper, tmp_path):
+    from device_app.models.piper_tts import PiperTTS
+
+    tts = PiperTTS(piper_exe=str(fake_piper))
+    out = tmp_path / "out.wav"
+    tts.synthesize_to_file(str(out), "xin chào")
+    assert out.stat().st_size > 44
+    _check("tts_short", _bench(lambda: tts.synthesize_to_file(str(out), "xin chào")))
+
+
+class _SilentTTS:
+    """PiperTTS giả tốc độ thật nhưng không phát ra loa."""
+
+    def __init__(self, exe):
+        from device_app.models.piper_tts import PiperTTS
+
+        self.impl = PiperTTS(piper_exe=str(exe))
+        self.played = []
+
+    def render(self, text):
+        return self.impl.render(text)
+
+    def speak(self, text):
+        self.play_file(self.render(text), delete=True)
+
+    def play_file(self, path, delete=False):
+        self.played.append(path)
+        if delete:
+            os.unlink(path)
+
+
+class _PassNLP:
+    def process(self, text, confidence=None):
+        return {"ok": True, "text": text or "xin chao"}
+
+
+def test_perf_end_to_end(tiny_ctc, tiny_marian, fake_piper, tmp_path):
+    from device_app.core.modes import Mode
+    from device_app.models.nmt_base import NMTBase
+    from device_app.models.onnx_ctc_stt import OnnxCTCSTT
+    from device_app.sim.replay import replay
+    from device_app.sim.trace import TRACE_FILE
+
+    records = [{"type": "meta", "version": 1}]
+    for i in range(3):
+        t = 0.1 + i
+        tiny_models.write_tone_wav(tmp_path / f"utt_{i:03d}.wav", 2.0, seed=i)
+        records += [
+            {"type": "button", "t": t, "kind": "talk_down"},
+            {"type": "button", "t": t + 0.2, "kind": "talk_up"},
+            {"type": "audio", "t": t + 0.2, "wav": f"utt_{i:03d}.wav"},
+        ]
+    (tmp_path / TRACE_FILE).write_text("\n".join(json.dumps(r) for r in records) + "\n")
+
+    tts = _SilentTTS(fake_piper)
+    models = dict(
+        stt_en=OnnxCTCSTT(*tiny_ctc, lang="en"),
+        nlp_en=_PassNLP(),
+        nmt_en_vi=NMTBase(str(tiny_marian)),
+        tts_vi=tts,
+    )
+    report = replay(tmp_path, models, speed=0, start_mode=Mode.EN_VI)
+
+    assert len(tts.played) == 3
+    _check("e2e_p50_release_to_audio", report.summary()["p50_ms"])
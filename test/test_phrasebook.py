@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.modes import Mode
+from device_app.core.pipeline import TranslatorPipeline
+from device_app.models.nlp.phrasebook import Phrasebook, build_index, read_tsv
+
+DATA = Path(__file__).resolve().parent.parent / "device_app" / "models" / "data"
+
+
+def _build(tmp_path, name="vi_en", wav=False):
+    entries = []
+    for i, (src, tgt) in enumerate(read_tsv(DATA / f"phrasebook_{name}.tsv")):
+        rel = ""
+        if wav:
+            rel = f"{name}/{i:04d}.wav"
+            (tmp_path / name).mkdir(exist_ok=True)
+            (tmp_path / rel).write_bytes(b"RIFF")
+        entries.append((src, tgt, rel))
+    return build_index(entries, tmp_path / f"{name}.pbk")
+
+
+def test_lookup_tolerates_stt_errors_and_rejects_free_text(tmp_path):
+    pb = Phrasebook(_build(tmp_path))
+    try:
+        assert pb.lookup("cam on ban rat nhieu").target == "Thank you very much"
+        assert pb.lookup("cái này bao nhiu tiền").target == "How much is this?"
+        assert pb.lookup("tôi muốn đi hà nội ngày mai") is None
+        assert pb.lookup("") is None
+        # dính chữ vẫn trúng
+        assert pb.lookup("cảm ơn bạn rấtnhiều").target == "Thank you very much"
+    finally:
+        pb.close()
+
+
+def test_lookup_rejects_near_miss_with_different_word(tmp_path):
+    en = Phrasebook(_build(tmp_path, "en_vi"))
+    vi = Phrasebook(_build(tmp_path, "vi_en"))
+    try:
+        # trigram > MIN_SCORE nhưng khác nghĩa → phải qua NMT
+        assert en.lookup("how much is that") is None
+        assert en.lookup("where is the train stop") is None
+        assert en.lookup("i am allergic to shrimp") is None
+        assert vi.lookup("rẽ trái").target == "Turn left"
+        assert vi.lookup("rẽ phải").target == "Turn right"
+        assert vi.lookup("cái kia bao nhiêu tiền") is None
+        # lỗi STT 1 ký tự trong 1 từ vẫn trúng
+        assert en.lookup("how much is thiss").target == "Cái này bao nhiêu tiền?"
+        assert en.lookup("how much is it").target == "Bao nhiêu tiền?"
+    finally:
+        en.close()
+        vi.close()
+
+
+class _NMT:
+    def translate(self, text):
+        raise AssertionError("phrasebook hit must not reach NMT")
+
+
+class _TTS:
+    def __init__(self):
+        self.played, self.rendered = [], []
+
+    def render(self, text):
+        self.rendered.append(text)
+        return text
+
+    def play_file(self, path, delete=False):
+        self.played.append((path, delete))
+
+
+class _Null:
+    def __getattr__(self, name):
+        return lambda *a, **k: None
+
+
+def test_pipeline_hit_plays_presynthesized_audio(tmp_path):
+    _build(tmp_path, wav=True)
+    tts = _TTS()
+    p = TranslatorPipeline(
+        display=_Null(), buttons=_Null(), audio=_Null(), power=_Null(),
+        config={"PHRASEBOOK": {"ENABLED": True, "DIR": str(tmp_path)}},
+        nmt_vi_en=_NMT(), tts_en=tts,
+    )
+    p._translate_result({"ok": True, "text": "xin chao"}, Mode.VI_EN)
+
+    assert tts.rendered == []
+    assert tts.played == [(str(tmp_path / "vi_en" / "0000.wav"), False)]
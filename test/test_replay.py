@@ -0,0 +1,182 @@
+"""
+Replay trace qua TranslatorPipeline với phần cứng mô phỏng + model giả
+- Không load model thật
+- Không đụng phần cứng
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pytest
+
+from device_app.core.modes import Mode
+from device_app.sim.replay import replay
+from device_app.sim.trace import TRACE_FILE, TraceRecorder, load_trace
+
+
+class FakeSTT:
+    def transcribe_file(self, path):
+        time.sleep(0.05)
+        return f"hello from {Path(path).stem}"
+
+
+class FakeNLP:
+    def process(self, text):
+        return {"ok": True, "text": text}
+
+
+class FakeNMT:
+    def translate(self, text):
+        time.sleep(0.02)
+        return text.upper()
+
+
+class FakeTTS:
+    def __init__(self):
+        self.played = []
+
+    def render(self, text):
+        return text
+
+    def play_file(self, path, delete=False):
+        self.played.append(path)
+
+
+def _write_trace(tmp_path, n=2, gap=0.5, hold=0.2):
+    records = [{"type": "meta", "version": 1}, {"type": "battery", "t": 0.0, "pct": 80}]
+    for i in range(n):
+        t = 0.1 + i * gap
+        records += [
+            {"type": "button", "t": t, "kind": "talk_down"},
+            {"type": "button", "t": t + hold, "kind": "talk_up"},
+            {"type": "audio", "t": t + hold, "wav": f"utt_{i:03d}.wav"},
+        ]
+        (tmp_path / f"utt_{i:03d}.wav").write_bytes(b"")
+    with open(tmp_path / TRACE_FILE, "w", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("core", ["sync", "async"])
+def test_replay_reports_latency_per_utterance(tmp_path, core):
+    trace = _write_trace(tmp_path)
+    tts = FakeTTS()
+    models = dict(stt_en=FakeSTT(), nlp_en=FakeNLP(), nmt_en_vi=FakeNMT(), tts_vi=tts)
+
+    report = replay(trace, models, speed=0, core=core, start_mode=Mode.EN_VI)
+
+    assert tts.played == ["HELLO FROM UTT_000", "HELLO FROM UTT_001"]
+    lat = [u.release_to_first_audio_sec for u in report.utterances]
+    assert len(lat) == 2
+    assert all(x is not None and x >= 0.05 for x in lat)
+
+
+@pytest.mark.parametrize("core", ["sync", "async"])
+def test_replay_with_utterance_queue(tmp_path, core):
+    trace = _write_trace(tmp_path, n=3)
+    tts = FakeTTS()
+    models = dict(stt_en=FakeSTT(), nlp_en=FakeNLP(), nmt_en_vi=FakeNMT(), tts_vi=tts)
+    config = {"PIPELINE": {"QUEUE": {"ENABLED": True, "MAX_PENDING": 2}}}
+
+    replay(trace, models, config=config, speed=0, core=core, start_mode=Mode.EN_VI)
+
+    assert tts.played == [f"HELLO FROM UTT_{i:03d}" for i in range(3)]
+
+
+class SlowSTT(FakeSTT):
+    def transcribe_file(self, path):
+        time.sleep(0.2)
+        return super().transcribe_file(path)
+
+
+@pytest.mark.parametrize("core", ["sync", "async"])
+def test_timed_replay_records_while_translating(tmp_path, core):
+    # 3 câu cách nhau 0.1s, mỗi câu STT ~0.25s → câu 2, 3 được ghi lúc câu 1 còn dịch
+    trace = _write_trace(tmp_path, n=3, gap=0.1, hold=0.03)
+    tts = FakeTTS()
+    models = dict(stt_en=SlowSTT(), nlp_en=FakeNLP(), nmt_en_vi=FakeNMT(), tts_vi=tts)
+    config = {"PIPELINE": {"QUEUE": {"ENABLED": True, "MAX_PENDING": 2}}}
+
+    report = replay(trace, models, config=config, speed=1.0, core=core, start_mode=Mode.EN_VI, timed=True)
+
+    assert tts.played == [f"HELLO FROM UTT_{i:03d}" for i in range(3)]
+    assert report.queue["enqueued"] == 3 and report.queue["dropped"] == 0
+    assert report.queue["max_depth"] >= 2  # có lúc 2 câu cùng nằm chờ
+    lat = [u.release_to_first_audio_sec for u in report.utterances]
+    # câu sau phải chờ câu trước trong queue → latency tăng dần
+    assert all(x is not None for x in lat) and lat[0] < lat[1] < lat[2]
+
+    # mặc định (chờ rảnh): không bao giờ có câu nằm chờ
+    tts.played.clear()
+    report = replay(trace, models, config=config, speed=0, core=core, start_mode=Mode.EN_VI)
+    assert report.queue["max_depth"] == 1 and len(tts.played) == 3
+
+
+class HungNMT:
+    def translate(self, text):
+        from device_app.utils.deadline import StageTimeout
+
+        raise StageTimeout("nmt", 0.01)
+
+
+class ErrorNLP(FakeNLP):
+    error_text = "sorry"
+
+
+class SpeakingTTS(FakeTTS):
+    def speak(self, text):
+        self.played.append(text)
+
+
+@pytest.mark.parametrize("core", ["sync", "async"])
+def test_stage_timeout_speaks_error_prompt(tmp_path, core):
+    trace = _write_trace(tmp_path, n=1)
+    tts = SpeakingTTS()
+    models = dict(stt_en=FakeSTT(), nlp_en=ErrorNLP(), nmt_en_vi=HungNMT(), tts_en=tts, tts_vi=tts)
+
+    replay(trace, models, speed=0, core=core, start_mode=Mode.EN_VI)
+
+    assert tts.played == ["sorry"]
+
+
+def test_recorder_roundtrip(tmp_path):
+    class Buttons:
+        def __init__(self):
+            self.level = [False, True, True, False]
+
+        def is_talk_pressed(self):
+            return self.level.pop(0)
+
+        def poll_mode_event(self):
+            return None
+
+    class Audio:
+        def stop_record(self):
+            src = tmp_path / "rec.wav"
+            src.write_bytes(b"RIFF")
+            return str(src)
+
+    class Power:
+        def get_percent(self):
+            return 77
+
+    rec = TraceRecorder(tmp_path / "trace")
+    buttons, audio, power = rec.wrap(Buttons(), Audio(), Power())
+    for _ in range(4):
+        buttons.is_talk_pressed()
+    audio.stop_record()
+    power.get_percent()
+    power.get_percent()
+    rec.close()
+
+    events = load_trace(tmp_path / "trace")
+    kinds = [e.get("kind") for e in events if e["type"] == "button"]
+    assert kinds == ["talk_down", "talk_up"]
+    assert [e["pct"] for e in events if e["type"] == "battery"] == [77]
+    assert (tmp_path / "trace" / "utt_000.wav").read_bytes() == b"RIFF"
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.models.nlp.segmenter import Segmenter, slot_tokens
+
+TEXTS = [
+    ("vi", "Tôi muốn đi ra ga tàu, nhưng mà trời mưa to quá nên tôi sẽ đi taxi và rồi ăn tối ở khách sạn."),
+    ("en", "I went to the market and bought some fruit, then I walked home because it was late. It rained."),
+    ("en", "one two three four five PN_PN0 PN_PN1 PN_PN2 six seven eight nine ten eleven"),
+    ("vi", "đi tới đường PN_PN0 rồi rẽ trái vào hẻm PN_PN1 PN_PN2 và hỏi anh PN_PN3 ở quán PN_PN4 gần chợ"),
+    ("en", "a b c d e f g h i j k l m n o p q r s t u v w x y z"),
+]
+
+
+@pytest.mark.parametrize("max_words", [2, 3, 4, 6, 24])
+@pytest.mark.parametrize("lang,text", TEXTS)
+def test_split_join_roundtrip_keeps_slots_attached(lang, text, max_words):
+    seg = Segmenter(lang, max_words=max_words, min_words=2)
+    parts = seg.split(text)
+
+    assert Segmenter.join(parts) == " ".join(text.split())
+    assert slot_tokens(Segmenter.join(parts)) == slot_tokens(text)
+    # không đoạn nào mở đầu bằng slot: slot luôn đi cùng từ đứng trước
+    assert not any(p.startswith("PN_") for p in parts)
+
+
+def test_hard_split_never_cuts_before_slot_group():
+    seg = Segmenter("en", max_words=4, min_words=1)
+    assert seg.split("one two three four five PN_PN0 PN_PN1 PN_PN2 six seven eight") == [
+        "one two three four",
+        "five PN_PN0 PN_PN1 PN_PN2",
+        "six seven eight",
+    ]
+    # cả câu chỉ có 1 từ + slot → để nguyên dù dài hơn MAX_WORDS
+    assert seg.split("street PN_PN0 PN_PN1 PN_PN2 PN_PN3 PN_PN4") == [
+        "street PN_PN0 PN_PN1 PN_PN2 PN_PN3 PN_PN4"
+    ]
+
+
+def test_splits_on_punctuation_comma_and_conjunction():
+    seg = Segmenter("en", max_words=6, min_words=1)
+    assert seg.split("Hello there. How are you?") == ["Hello there.", "How are you?"]
+    assert seg.split("I was tired, I was hungry and then I went home to sleep") == [
+        "I was tired, I was hungry",
+        "and then I went",
+        "home to sleep",
+    ]
+
+    vi = Segmenter("vi", max_words=6, min_words=1)
+    # "nhưng mà" là 1 liên từ → 1 ranh giới
+    assert vi.split("hôm nay tôi rất bận nhưng mà ngày mai tôi rảnh") == [
+        "hôm nay tôi rất bận",
+        "nhưng mà ngày mai tôi rảnh",
+    ]
+
+
+def test_short_pieces_are_merged():
+    seg = Segmenter("en", max_words=24, min_words=3)
+    # "Yes." quá ngắn → gộp sang đoạn sau; "Ok." gộp vào đoạn trước
+    assert seg.split("Yes. I will be there at noon. Ok.") == ["Yes. I will be there at noon. Ok."]
+    assert seg.split("") == [] and seg.split("   ") == []
+
+    seg = Segmenter("en", max_words=4, min_words=2)
+    # gộp sẽ vượt MAX_WORDS → giữ mẩu ngắn riêng
+    assert seg.split("Yes. I will go now. Ok.") == ["Yes.", "I will go now.", "Ok."]
+
+
+def test_from_config():
+    seg = Segmenter.from_config({"NMT": {"SEGMENT": {"MAX_WORDS": 10, "MIN_WORDS": 20}}}, "vi")
+    assert seg.max_words == 10 and seg.min_words == 10
+    assert Segmenter.from_config({}, "en").max_words == 24
@@ -0,0 +1,60 @@
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.models.nlp.csp import CSP
+from device_app.models.nlp.skeleton_translation import SkeletonTranslator
+from device_app.models.nlp.slots import SlotEngine
+
+
+def test_extract_numbers_slots_in_order():
+    engine = SlotEngine(re.compile(r"\b([A-Z]\w+)"))
+    skel, slots = engine.extract("go to Hanoi then Hue", lambda m, i: (f"[PN{i}]", f"[PN{i}]", m.group(1)))
+    assert skel == "go to [PN0] then [PN1]"
+    assert slots == {"[PN0]": "Hanoi", "[PN1]": "Hue"}
+    assert engine.extract("nothing here", lambda m, i: ("", "", "")) == ("nothing here", {})
+
+
+def test_skeleton_extract_and_compose_roundtrip():
+    sk = SkeletonTranslator()
+    text = "tôi muốn đi đường hoàng hoa thám vì trời đẹp, rồi qua quận bến thành"
+    skel, slots = sk.extract_vi(text)
+    assert skel == "tôi muốn đi đường [PN0] vì trời đẹp, rồi qua quận [PN1]"
+    assert slots == {"[PN0]": "hoang hoa tham", "[PN1]": "ben thanh"}
+
+    safe, safe_slots = SlotEngine.rekey(skel, slots)
+    assert safe == "tôi muốn đi đường PN_PN0 vì trời đẹp, rồi qua quận PN_PN1"
+    assert safe_slots == {"PN_PN0": "hoang hoa tham", "PN_PN1": "ben thanh"}
+    assert sk.compose("go to PN_PN0 street, then PN_PN1", safe_slots) == (
+        "go to hoang hoa tham street, then ben thanh"
+    )
+
+    skel, slots = sk.extract_en("I live in Ho Chi Minh City near Ben Thanh market")
+    assert skel == "I live in [PN0] near [PN1] market"
+    assert sk.compose(skel, slots) == "I live in Ho Chi Minh City near Ben Thanh market"
+
+
+def test_rekey_keeps_unknown_keys_and_empty_input():
+    assert SlotEngine.rekey("x", {}) == ("x", {})
+    text, slots = SlotEngine.rekey("a [PN3] b zzplace", {"[PN3]": "Hue", "zzplace": "Hanoi"})
+    assert text == "a PN_PN3 b zzplace"
+    assert slots == {"PN_PN3": "Hue", "zzplace": "Hanoi"}
+
+
+def test_restore_many_slots_does_not_eat_prefixes():
+    slots = {f"PN_PN{i}": f"Name {i}." for i in range(12)}
+    text = " ".join(slots)
+    assert SlotEngine.restore(text, slots) == " ".join(slots.values())
+    assert SlotEngine.restore("", slots) == "" and SlotEngine.restore("PN_PN1", {}) == "PN_PN1"
+    # slot không có trong text → bỏ qua, slot lặp lại → thay hết
+    assert SlotEngine.restore("PN_PN0 and PN_PN0", {"PN_PN0": "Hue", "PN_PN9": "x"}) == "Hue and Hue"
+
+
+def test_csp_restore_uses_slot_engine():
+    csp = CSP("en")
+    assert csp.restore("go to zzstreet", {"zzstreet": {"value": "Le Loi", "role": "street"}}) == (
+        "go to Le Loi street"
+    )
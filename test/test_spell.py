@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.models.ctc_confidence import SttConfidence
+from device_app.models.nlp.nlp_processor import NLPProcessorV2
+from device_app.models.nlp.spell import SpellIndex, build_index, edit_distance, read_protected, read_vocab
+
+DATA = Path(__file__).resolve().parent.parent / "device_app" / "models" / "data"
+
+
+@pytest.fixture(scope="module")
+def en_index(tmp_path_factory):
+    path = build_index(read_vocab(DATA / "vocab_en.txt"), tmp_path_factory.mktemp("spell") / "en.sym")
+    ix = SpellIndex(path, protected=read_protected("en"))
+    yield ix
+    ix.close()
+
+
+@pytest.fixture(scope="module")
+def vi_index(tmp_path_factory):
+    path = build_index(read_vocab(DATA / "vocab_vi.txt"), tmp_path_factory.mktemp("spell") / "vi.sym")
+    ix = SpellIndex(path, protected=read_protected("vi"))
+    yield ix
+    ix.close()
+
+
+def _conf(scores):
+    return SttConfidence(sum(scores) / len(scores), 0.9, 0.5, tuple(scores), -0.5)
+
+
+def test_edit_distance():
+    assert edit_distance("market", "markett", 2) == 1
+    assert edit_distance("would", "wuold", 2) == 1  # đổi chỗ 2 ký tự kề
+    assert edit_distance("hello", "world", 2) == 3  # > limit → limit + 1
+
+
+def test_corrects_oov_words_only(en_index):
+    rep = en_index.correct("i wuold like to go to the markett 2 times")
+    assert rep.text == "i would like to go to the market 2 times"
+    assert rep.corrections == (("wuold", "would"), ("markett", "market"))
+    assert not rep.truncated
+
+    # đã đúng / quá ngắn / viết hoa (tên riêng) → giữ nguyên
+    assert en_index.correct("thank you Zzyzx").corrections == ()
+
+
+def test_budget_leaves_rest_untouched(tmp_path):
+    path = build_index(["market", "would"], tmp_path / "tiny.sym")
+    ix = SpellIndex(path, budget_ms=0.0001)
+    try:
+        rep = ix.correct("wuold markett")
+        assert rep.truncated and rep.text == "wuold markett"
+    finally:
+        ix.close()
+
+
+def test_nlp_reports_spell_stats(en_index):
+    nlp = NLPProcessorV2("en", speller=en_index, spell_max_score=0.4)
+    result = nlp.process("how are you todday", _conf([0.9, 0.9, 0.9, 0.3]))
+    assert result["text"] == "how are you today"
+    assert result["stt_text"] == "how are you todday"
+    assert result["spell"]["corrections"] == 1
+    assert nlp.spell_stats["utterances"] == 1 and nlp.spell_stats["corrections"] == 1
+
+    # câu bị loại / không có điểm từng từ → không sửa, không tính
+    assert not nlp.process("")["ok"]
+    assert nlp.process("how are you todday")["text"] == "how are you todday"
+    assert nlp.spell_stats["utterances"] == 1
+
+
+def test_confident_words_are_kept(en_index):
+    nlp = NLPProcessorV2("en", speller=en_index, spell_max_score=0.4)
+    # STT chắc chắn → từ ngoài từ điển vẫn đúng ("shellfish" không thành "selfish")
+    for text in ("i am allergic to shellfish", "gluten free", "call an uber"):
+        n = len(text.split())
+        assert nlp.process(text, _conf([0.9] * n))["text"] == text
+    # số điểm không khớp số từ → không đoán
+    assert en_index.correct("todday is fine", [0.1], 0.4).corrections == ()
+
+
+@pytest.mark.parametrize(
+    "lang, text",
+    [
+        ("en", "i am allergic to shellfish"),
+        ("en", "gluten free"),
+        ("en", "call an uber"),
+        ("vi", "phở bò tái"),
+    ],
+)
+def test_protected_words_never_change(en_index, vi_index, lang, text):
+    ix = vi_index if lang == "vi" else en_index
+    # kể cả khi STT chấm thấp mọi từ
+    assert ix.correct(text, [0.1] * len(text.split()), 0.4).text == text
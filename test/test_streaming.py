@@ -0,0 +1,130 @@
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.core.streaming import _DONE, SegmentStreamer, StreamStats
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _Fake:
+    """NMT / TTS giả: render ghi WAV tạm thật vào tmp_path, play ghi lại thứ tự."""
+
+    def __init__(self, tmp_path, delays=(), fail_at=None, cancel_at=None):
+        self.tmp_path = tmp_path
+        self.delays = list(delays)
+        self.fail_at = fail_at
+        self.cancel_at = cancel_at
+        self.played = []
+        self.translated = []
+        self.rendered = 0
+
+    def translate(self, seg):
+        i = len(self.translated)
+        if i == self.fail_at:
+            raise ValueError(f"nmt failed on {seg}")
+        if i < len(self.delays):
+            time.sleep(self.delays[i])
+        self.translated.append(seg)
+        return seg.upper()
+
+    def render(self, text):
+        path = self.tmp_path / f"{self.rendered:02d}.wav"
+        self.rendered += 1
+        path.write_bytes(b"RIFF")
+        return str(path)
+
+    def play(self, path):
+        if len(self.played) == self.cancel_at:
+            # người dùng bấm nút giữa chừng: stage sau đã kịp dựng thêm WAV
+            deadline = time.monotonic() + 1.0
+            while self.rendered < self.cancel_at + 2 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            raise _Cancelled()
+        assert Path(path).is_file()  # chưa bị xoá trước khi phát
+        self.played.append(Path(path).name)
+        time.sleep(0.02)
+
+    def streamer(self, **kw):
+        return SegmentStreamer(
+            translate=self.translate, render=self.render, play=self.play, discard=os.unlink, **kw
+        )
+
+
+def test_plays_in_order_while_next_segment_translates(tmp_path):
+    fake = _Fake(tmp_path, delays=(0.03, 0.0, 0.05, 0.0, 0.01))
+    first = []
+    stats = fake.streamer(on_first_audio=lambda: first.append(len(fake.translated))).run(
+        ["a", "b", "c", "d", "e"]
+    )
+
+    assert stats.texts == ["A", "B", "C", "D", "E"]
+    assert fake.played == ["00.wav", "01.wav", "02.wav", "03.wav", "04.wav"]
+    # tiếng đầu phát trước khi dịch xong cả câu
+    assert first and first[0] < 5
+    assert stats.first_audio_sec is not None and stats.first_audio_sec < stats.total_sec
+    assert list(tmp_path.iterdir()) == []  # mọi WAV đã phát đều bị xoá
+
+
+def test_out_of_order_audio_is_played_by_index(tmp_path):
+    played = []
+    s = SegmentStreamer(translate=str, render=str, play=played.append)
+    q = queue.Queue()
+    for idx in (2, 0, 3, 1):
+        q.put((idx, (f"t{idx}", f"a{idx}")))
+    q.put((-1, _DONE))
+
+    stats = StreamStats()
+    s._play_stage(q, stats, time.monotonic())
+    assert played == ["a0", "a1", "a2", "a3"]
+    assert stats.texts == ["t0", "t1", "t2", "t3"]
+
+
+def test_producer_error_is_raised_in_caller(tmp_path):
+    fake = _Fake(tmp_path, fail_at=2)
+    with pytest.raises(ValueError, match="nmt failed on c"):
+        fake.streamer().run(["a", "b", "c", "d"])
+
+    assert fake.played == ["00.wav", "01.wav"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_error_is_raised_in_caller(tmp_path):
+    fake = _Fake(tmp_path)
+
+    def render(text):
+        if text == "B":
+            raise RuntimeError("piper failed")
+        return fake.render(text)
+
+    s = SegmentStreamer(translate=fake.translate, render=render, play=fake.play, discard=os.unlink)
+    with pytest.raises(RuntimeError, match="piper failed"):
+        s.run(["a", "b", "c"])
+    assert fake.played == ["00.wav"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_cancel_during_playback_removes_pending_wavs(tmp_path):
+    fake = _Fake(tmp_path, cancel_at=1)
+    t0 = time.monotonic()
+    with pytest.raises(_Cancelled):
+        fake.streamer(queue_size=2).run(["a", "b", "c", "d", "e", "f"])
+
+    assert time.monotonic() - t0 < 2.0  # các stage thoát, không treo chờ hàng đợi
+    assert fake.played == ["00.wav"]
+    assert fake.rendered >= 3  # đã có WAV dựng sẵn chưa phát ...
+    assert list(tmp_path.iterdir()) == []  # ... và tất cả đã bị xoá
+
+
+def test_empty_input():
+    stats = SegmentStreamer(translate=str, render=str, play=print).run([])
+    assert stats.segments == 0 and stats.texts == [] and stats.first_audio_sec is None
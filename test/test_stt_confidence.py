@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.models.ctc_confidence import ctc_confidence
+from device_app.models.nlp.nlp_processor import NLPProcessorV2
+from device_app.models.tts_base import TTSBase
+
+BLANK, DELIM, A, B = 0, 1, 2, 3
+
+
+def _logits(ids, peak):
+    out = np.zeros((len(ids), 4), dtype=np.float32)
+    out[np.arange(len(ids)), ids] = peak
+    return out
+
+
+def test_confidence_per_word_and_blank_ratio():
+    ids = [BLANK, A, A, BLANK, DELIM, B, BLANK, BLANK]
+    logits = _logits(ids, 8.0)
+    logits[5, B] = 0.5  # từ thứ 2 mơ hồ
+
+    c = ctc_confidence(logits, blank_id=BLANK, delim_id=DELIM)
+    assert len(c.word_scores) == 2
+    assert c.word_scores[0] > 0.99 and c.word_scores[1] < 0.5
+    assert c.blank_ratio == 0.5
+    assert 0.0 < c.score < 1.0
+
+
+def test_nlp_rejects_low_confidence_and_keeps_good_text():
+    good = ctc_confidence(_logits([A, DELIM, B], 8.0), blank_id=BLANK, delim_id=DELIM)
+    noise = ctc_confidence(_logits([A, DELIM, B], 0.3), blank_id=BLANK, delim_id=DELIM)
+    nlp = NLPProcessorV2.from_config({}, "vi")
+
+    assert nlp.process("xin chào", good)["ok"]
+    bad = nlp.process("xờ", noise)
+    assert not bad["ok"] and bad["reason"] == "low_confidence"
+    assert bad["fallback"] == "Bạn nói lại giúp mình"
+    # STT không có điểm → hành vi cũ
+    assert nlp.process("xờ")["ok"]
+
+
+class _CountingTTS(TTSBase):
+    def __init__(self):
+        super().__init__()
+        self.synth, self.played = 0, []
+
+    def synthesize_to_file(self, path, text):
+        self.synth += 1
+        open(path, "wb").close()
+
+    def play_file(self, wav_path, *, delete=False):
+        self.played.append(delete)
+
+
+def test_fallback_is_prerendered_once(tmp_path):
+    tts = _CountingTTS()
+    tts.prerender(["Please say again"], str(tmp_path))
+    tts.speak("Please say again")
+    tts.speak("Please say again")
+
+    assert tts.synth == 1 and tts.played == [False, False]
@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.utils import telemetry
+from device_app.utils.telemetry import Telemetry, load_log, summarize
+
+TICK = telemetry._CLK_TCK
+
+
+def _write(root, rel, text):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def fake_root(tmp_path, monkeypatch):
+    """Cây /proc + /sys giả: 2 thread, 3 thermal zone (1 hỏng), 2 CPU."""
+    proc, sys_ = tmp_path / "proc", tmp_path / "sys"
+    _write(proc, "self/status", "Name:\tpython\nVmPeak:\t 999 kB\nVmRSS:\t  204800 kB\n")
+    _write(proc, "self/smaps_rollup", "Rss:  204800 kB\nPss:   150000 kB\n")
+    # comm có khoảng trắng + ')' → phải cắt sau ')' cuối
+    fields = ["S"] + ["0"] * 10 + [str(3 * TICK), str(TICK)] + ["0"] * 5
+    _write(proc, "self/task/999991/stat", "999991 (stt (ort) pool) " + " ".join(fields))
+    _write(proc, "self/task/999991/comm", "stt (ort) pool\n")
+    _write(proc, "self/task/999992/stat", "999992 (piper) " + " ".join(["S"] + ["0"] * 10 + ["0", str(TICK // 2)]))
+    _write(proc, "self/task/999992/comm", "piper\n")
+
+    _write(sys_, "class/thermal/thermal_zone0/temp", "52300\n")
+    _write(sys_, "class/thermal/thermal_zone0/type", "cpu-thermal\n")
+    _write(sys_, "class/thermal/thermal_zone1/temp", "n/a\n")
+    (sys_ / "class/thermal/thermal_zone2").mkdir(parents=True)
+    _write(sys_, "devices/system/cpu/cpu0/cpufreq/scaling_cur_freq", "1500000\n")
+    _write(sys_, "devices/system/cpu/cpu1/cpufreq/scaling_cur_freq", "600000\n")
+
+    monkeypatch.setattr(telemetry, "PROC_ROOT", str(proc))
+    monkeypatch.setattr(telemetry, "SYS_ROOT", str(sys_))
+    return tmp_path
+
+
+def test_readers_parse_fake_proc_and_sys(fake_root):
+    assert telemetry.rss_kb() == 204800
+    assert telemetry.pss_kb() == 150000
+    assert telemetry.thread_cpu_sec() == {"stt (ort) pool:999991": 4.0, "piper:999992": 0.5}
+    assert telemetry.thermal_c() == {"cpu-thermal": 52.3}
+    assert telemetry.cpu_freq_mhz() == {"cpu0": 1500, "cpu1": 600}
+
+
+def test_missing_files_are_none_or_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(telemetry, "PROC_ROOT", str(tmp_path / "none"))
+    monkeypatch.setattr(telemetry, "SYS_ROOT", str(tmp_path / "none"))
+    assert telemetry.rss_kb() is None and telemetry.pss_kb() is None
+    assert telemetry.thread_cpu_sec() == {} and telemetry.thermal_c() == {} and telemetry.cpu_freq_mhz() == {}
+
+
+def test_samples_go_to_rotating_log_and_summary(fake_root):
+    log_path = fake_root / "logs" / "telemetry.jsonl"
+    t = Telemetry(log_path=str(log_path), max_bytes=1500, backups=5)
+    try:
+        with t.track_load("nmt"):
+            pass
+        t.after_models_loaded()
+        for _ in range(5):
+            rec = t.after_utterance(mode="VI_EN", first_audio_sec=0.8)
+    finally:
+        t.close()
+
+    assert rec["tag"] == "utterance" and rec["mode"] == "VI_EN" and rec["malloc_trimmed"] is False
+    assert rec["rss_kb"] == 204800 and rec["cpu_mhz"] == {"cpu0": 1500, "cpu1": 600}
+    assert t.model_rss_kb == {"nmt": 0}
+    assert len(list(log_path.parent.iterdir())) > 1  # đã xoay file
+
+    records = load_log(str(log_path))
+    assert [r["tag"] for r in records] == ["model_load", "models_loaded"] + ["utterance"] * 5
+    s = summarize(records)
+    assert s["samples"] == 7
+    assert s["rss_max_mb"] == 200.0 and s["temp_max_c"] == 52.3 and s["cpu_mhz_min"] == 600
+    assert s["model_rss_mb"] == {"nmt": 0.0}
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_app.utils import thread_budget
+from device_app.utils.thread_budget import ThreadBudget
+
+
+def test_budget_reserves_audio_core_and_clamps():
+    cfg = {"THREADS": {"AUDIO_CORES": [0], "TORCH": 8, "ORT_INTRA": 0, "PIPER": 2}}
+    b = ThreadBudget.from_config(cfg, cores=(0, 1, 2, 3))
+
+    assert b.audio_cores == (0,)
+    assert b.compute_cores == (1, 2, 3)
+    assert b.torch == 3  # không vượt số core compute
+    assert b.ort_intra == 3  # 0 = auto
+    assert b.piper_cores == (2, 3)
+
+
+def test_budget_without_reservation_uses_all_cores():
+    b = ThreadBudget.from_config({"THREADS": {"AUDIO_CORES": [7]}}, cores=(0, 1))
+    assert b.audio_cores == () and b.compute_cores == (0, 1)
+    assert b.piper == 1
+
+
+def test_piper_pinned_by_pid_not_preexec(monkeypatch):
+    if not hasattr(os, "sched_setaffinity"):
+        pytest.skip("sched_setaffinity chỉ có trên Linux")
+    cores = tuple(sorted(os.sched_getaffinity(0)))
+    b = ThreadBudget.from_config({"THREADS": {"PIPER": 1}}, cores=cores)
+    monkeypatch.setattr(thread_budget, "_active", b)
+
+    kwargs = thread_budget.subprocess_kwargs()
+    assert "preexec_fn" not in kwargs and kwargs["env"]["OMP_NUM_THREADS"] == "1"
+
+    proc = subprocess.Popen(["sleep", "5"], **kwargs)
+    try:
+        thread_budget.pin_subprocess(proc.pid)
+        assert os.sched_getaffinity(proc.pid) == {cores[-1]}
+    finally:
+        proc.kill()
+        proc.wait()